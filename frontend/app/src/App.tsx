@@ -606,6 +606,9 @@ export class App extends PureComponent<Props, State> {
 
     if (newState === ConnectionState.CONNECTED) {
       logMessage("Reconnected to server; requesting a script run")
+      // The server may not have our widget states anymore, e.g. if it was
+      // restarted, so send all of them.
+      this.widgetMgr.resetSentWidgetStates()
       // Trigger a full app rerun:
       this.widgetMgr.sendUpdateWidgetsMessage(undefined)
       this.setState({ dialog: null })
@@ -892,7 +895,12 @@ export class App extends PureComponent<Props, State> {
    */
   handleSessionEvent = (sessionEvent: SessionEvent): void => {
     this.sessionEventDispatcher.handleSessionEventMsg(sessionEvent)
-    if (sessionEvent.type === "scriptCompilationException") {
+    if (sessionEvent.type === "widgetStatesOutOfSync") {
+      // The server ignored our last update, because it doesn't have the
+      // widget states it builds on. Send all of them in a full app rerun.
+      this.widgetMgr.resetSentWidgetStates()
+      this.widgetMgr.sendUpdateWidgetsMessage(undefined)
+    } else if (sessionEvent.type === "scriptCompilationException") {
       this.setState({ scriptRunState: ScriptRunState.COMPILATION_ERROR })
       const newDialog: DialogProps = {
         type: DialogType.SCRIPT_COMPILE_ERROR,
@@ -1426,6 +1434,9 @@ export class App extends PureComponent<Props, State> {
       undefined,
       pageScriptHash
     )
+    // The server forgets the states of the widgets that aren't on the new
+    // page, so the next update can't be a delta of the states we sent before.
+    this.widgetMgr.resetSentWidgetStates()
   }
 
   isAppInReadyState = (prevState: Readonly<State>): boolean => {
@@ -549,20 +549,42 @@ export class WebsocketConnection {
   }
 
   private async handleMessage(data: ArrayBuffer): Promise<void> {
+    const encodedMsg = new Uint8Array(data)
+    const msg = ForwardMsg.decode(encodedMsg)
+
+    if (msg.type === "forwardMsgList") {
+      // The server bundled several messages into a single frame. Each
+      // entry is a complete serialized ForwardMsg. Message indices are
+      // assigned synchronously, so the entries are dispatched in order.
+      await Promise.all(
+        (msg.forwardMsgList?.messages ?? []).map(encodedEntry =>
+          this.handleDecodedMessage(
+            ForwardMsg.decode(encodedEntry),
+            encodedEntry
+          )
+        )
+      )
+      return
+    }
+
+    await this.handleDecodedMessage(msg, encodedMsg)
+  }
+
+  private async handleDecodedMessage(
+    msg: ForwardMsg,
+    encodedMsg: Uint8Array
+  ): Promise<void> {
     // Assign this message an index.
     const messageIndex = this.nextMessageIndex
     this.nextMessageIndex += 1
 
     PerformanceEvents.record({ name: "BeginHandleMessage", messageIndex })
 
-    const encodedMsg = new Uint8Array(data)
-    const msg = ForwardMsg.decode(encodedMsg)
-
     PerformanceEvents.record({
       name: "DecodedMessage",
       messageIndex,
       messageType: msg.type,
-      len: data.byteLength,
+      len: encodedMsg.byteLength,
     })
 
     this.messageQueue[messageIndex] = await this.cache.processMessagePayload(
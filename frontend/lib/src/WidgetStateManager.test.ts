@@ -730,12 +730,14 @@ describe("Widget State Manager", () => {
         new ButtonProto({ id: "submitButton2" })
       )
 
-      // Our most recent backMsg should be populated with the both forms' widget values,
-      // plus the second submitButton's fromSubmitValue.
+      // Our most recent backMsg should be populated with the second form's
+      // widget values, plus the second submitButton's fromSubmitValue. The
+      // first form's values were already sent.
       expect(sendBackMsg).toHaveBeenLastCalledWith(
         {
+          isDelta: true,
+          version: 1,
           widgets: [
-            { id: FORM_1.id, stringValue: "foo" },
             { id: "submitButton2", triggerValue: true },
             { id: FORM_2.id, stringValue: "bar" },
           ],
@@ -779,6 +781,146 @@ describe("Widget State Manager", () => {
     })
   })
 
+  describe("sends widget state deltas", () => {
+    it("only sends the widget states that changed", () => {
+      widgetMgr.setStringValue(
+        { id: "widget1" },
+        "foo",
+        { fromUi: true },
+        undefined
+      )
+      widgetMgr.setStringValue(
+        { id: "widget2" },
+        "bar",
+        { fromUi: true },
+        undefined
+      )
+      widgetMgr.setStringValue(
+        { id: "widget2" },
+        "baz",
+        { fromUi: true },
+        undefined
+      )
+
+      expect(sendBackMsg.mock.calls.map(call => call[0])).toEqual([
+        { widgets: [{ id: "widget1", stringValue: "foo" }] },
+        {
+          isDelta: true,
+          version: 1,
+          widgets: [{ id: "widget2", stringValue: "bar" }],
+        },
+        {
+          isDelta: true,
+          version: 2,
+          widgets: [{ id: "widget2", stringValue: "baz" }],
+        },
+      ])
+    })
+
+    it("sends all widget states after resetSentWidgetStates", () => {
+      widgetMgr.setStringValue(
+        { id: "widget1" },
+        "foo",
+        { fromUi: true },
+        undefined
+      )
+      widgetMgr.resetSentWidgetStates()
+      widgetMgr.setStringValue(
+        { id: "widget2" },
+        "bar",
+        { fromUi: true },
+        undefined
+      )
+
+      expect(sendBackMsg).toHaveBeenLastCalledWith(
+        {
+          widgets: [
+            { id: "widget1", stringValue: "foo" },
+            { id: "widget2", stringValue: "bar" },
+          ],
+        },
+        undefined
+      )
+    })
+
+    it("sends JSON merge patches of large JSON values", () => {
+      const editingState = {
+        edited_rows: { "0": { a: "x".repeat(100) } },
+        added_rows: [],
+        deleted_rows: [1, 2],
+      }
+      widgetMgr.setStringValue(
+        { id: "editor" },
+        JSON.stringify(editingState),
+        { fromUi: true },
+        undefined
+      )
+      widgetMgr.setStringValue(
+        { id: "editor" },
+        JSON.stringify({
+          ...editingState,
+          edited_rows: { ...editingState.edited_rows, "1": { b: 2 } },
+          deleted_rows: [],
+        }),
+        { fromUi: true },
+        undefined
+      )
+
+      expect(sendBackMsg).toHaveBeenLastCalledWith(
+        {
+          isDelta: true,
+          version: 1,
+          widgets: [
+            {
+              id: "editor",
+              jsonPatchValue: '{"edited_rows":{"1":{"b":2}},"deleted_rows":[]}',
+            },
+          ],
+        },
+        undefined
+      )
+    })
+
+    it("marks string values that hold JSON objects", () => {
+      widgetMgr.setStringValue(
+        { id: "editor" },
+        JSON.stringify({ edited_rows: {} }),
+        { fromUi: true },
+        undefined
+      )
+      widgetMgr.setStringValue(
+        { id: "text" },
+        "{not json",
+        { fromUi: true },
+        undefined
+      )
+
+      expect(sendBackMsg.mock.calls[0][0].widgets[0].isJsonStringValue).toBe(
+        true
+      )
+      expect(sendBackMsg.mock.calls[1][0].widgets[0].isJsonStringValue).toBe(
+        false
+      )
+    })
+
+    it("does not send JSON merge patches that would set null", () => {
+      widgetMgr.setJsonValue(
+        { id: "widget" },
+        { foo: "x".repeat(100), bar: 1 },
+        { fromUi: true },
+        undefined
+      )
+      widgetMgr.setJsonValue(
+        { id: "widget" },
+        { foo: "x".repeat(100), bar: null },
+        { fromUi: true },
+        undefined
+      )
+
+      expect(sendBackMsg.mock.calls[1][0].widgets[0].value).toBe("jsonValue")
+    })
+  })
+
   describe("manages element state values", () => {
     it("sets extra widget information properly", () => {
       widgetMgr.setElementState("id", "color", "red")
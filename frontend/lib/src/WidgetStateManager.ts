@@ -15,6 +15,7 @@
  */
 
 import produce, { Draft } from "immer"
+import isEqual from "lodash/isEqual"
 import { Long, util } from "protobufjs"
 
 import {
@@ -69,6 +70,104 @@ export function createFormsData(): FormsData {
   }
 }
 
+/**
+ * Return a JSON merge patch (RFC 7396) that turns `source` into `target`, or
+ * undefined if there is none. Merge patches can't set values to null, since
+ * null removes them.
+ */
+function createJsonMergePatch(source: any, target: any): any {
+  if (
+    typeof source !== "object" ||
+    typeof target !== "object" ||
+    source === null ||
+    target === null ||
+    Array.isArray(source) ||
+    Array.isArray(target)
+  ) {
+    return containsNull(target) ? undefined : target
+  }
+
+  const patch: Record<string, any> = {}
+  for (const key of Object.keys(source)) {
+    if (!(key in target)) {
+      patch[key] = null
+    }
+  }
+  for (const key of Object.keys(target)) {
+    if (!(key in source) || !isEqual(source[key], target[key])) {
+      const valuePatch = createJsonMergePatch(source[key], target[key])
+      if (valuePatch === undefined) {
+        return undefined
+      }
+      patch[key] = valuePatch
+    }
+  }
+  return patch
+}
+
+/** True if `value` is null or holds null anywhere inside of it. */
+function containsNull(value: any): boolean {
+  if (value === null) {
+    return true
+  }
+  return typeof value === "object" && Object.values(value).some(containsNull)
+}
+
+/**
+ * Return the JSON that `state` holds, if any. String values, like the ones of
+ * data_editor, count if they hold a JSON object formatted like
+ * JSON.stringify does, so that the server can reproduce them exactly.
+ */
+function getJsonValue(state: WidgetState): string | undefined {
+  if (state.value === "jsonValue") {
+    return state.jsonValue
+  }
+  if (state.value === "stringValue" && state.stringValue.startsWith("{")) {
+    try {
+      const value = JSON.parse(state.stringValue)
+      if (JSON.stringify(value) === state.stringValue) {
+        return state.stringValue
+      }
+    } catch {
+      // Not JSON.
+    }
+  }
+  return undefined
+}
+
+/**
+ * If `state` and `previousState` both hold JSON, return a WidgetState
+ * with the JSON merge patch that turns the previous object into the new one,
+ * if it's shorter than the new object.
+ */
+function createJsonPatchState(
+  state: WidgetState,
+  previousState: WidgetState | undefined
+): WidgetState | undefined {
+  const value = getJsonValue(state)
+  const previousValue =
+    previousState !== undefined ? getJsonValue(previousState) : undefined
+  if (value === undefined || previousValue === undefined) {
+    return undefined
+  }
+
+  let patch
+  try {
+    patch = createJsonMergePatch(JSON.parse(previousValue), JSON.parse(value))
+  } catch {
+    return undefined
+  }
+  if (patch === undefined || typeof patch !== "object") {
+    return undefined
+  }
+
+  const jsonPatchValue = JSON.stringify(patch)
+  if (jsonPatchValue.length >= value.length) {
+    return undefined
+  }
+  return new WidgetState({ id: state.id, jsonPatchValue })
+}
+
 /**
  * A Dictionary that maps widgetID -> WidgetState, and provides some utility
  * functions.
@@ -120,6 +219,30 @@ export class WidgetStateDict {
     return msg
   }
 
+  /**
+   * Create a WidgetStates message that only holds the states that changed
+   * since `previousStates`. The widgets that hold large JSON objects, like
+   * data_editor, send JSON merge patches of their previous values instead.
+   */
+  public createWidgetStatesDeltaMsg(
+    previousStates: Map<string, WidgetState>
+  ): WidgetStates {
+    const msg = new WidgetStates({ isDelta: true })
+    this.widgetStates.forEach((state, widgetId) => {
+      // WidgetStates are replaced rather than modified when they change.
+      const previousState = previousStates.get(widgetId)
+      if (state !== previousState) {
+        msg.widgets.push(createJsonPatchState(state, previousState) ?? state)
+      }
+    })
+    return msg
+  }
+
+  /** Return a copy of the dict's contents. */
+  public toMap(): Map<string, WidgetState> {
+    return new Map(this.widgetStates)
+  }
+
   /**
    * Copy the contents of another WidgetStateDict into this one, overwriting
    * any values with duplicate keys.
@@ -186,6 +309,15 @@ export class WidgetStateManager {
   // This state is not never sent to the server.
   private readonly elementStates = new Map<string, Map<string, any>>()
 
+  // The widget states in the last message sent to the server, or undefined if
+  // the next message must hold all widget states. Later messages only hold the
+  // states that changed since then.
+  private lastSentWidgetStates?: Map<string, WidgetState>
+
+  // The version of the last message sent to the server. Messages holding all
+  // widget states have version 0, and each delta after them increments it.
+  private widgetStatesVersion = 0
+
   constructor(props: Props) {
     this.props = props
     this.formsData = createFormsData()
@@ -580,10 +712,37 @@ export class WidgetStateManager {
   }
 
   public sendUpdateWidgetsMessage(fragmentId: string | undefined): void {
-    this.props.sendRerunBackMsg(
-      this.widgetStates.createWidgetStatesMsg(),
-      fragmentId
-    )
+    let msg: WidgetStates
+    if (this.lastSentWidgetStates === undefined) {
+      msg = this.widgetStates.createWidgetStatesMsg()
+      this.widgetStatesVersion = 0
+    } else {
+      msg = this.widgetStates.createWidgetStatesDeltaMsg(
+        this.lastSentWidgetStates
+      )
+      this.widgetStatesVersion += 1
+      msg.version = this.widgetStatesVersion
+    }
+    this.lastSentWidgetStates = this.widgetStates.toMap()
+
+    // Tell the server which string values it may get JSON patches for.
+    msg.widgets.forEach(state => {
+      if (state.value === "stringValue" && getJsonValue(state) !== undefined) {
+        state.isJsonStringValue = true
+      }
+    })
+
+    this.props.sendRerunBackMsg(msg, fragmentId)
+  }
+
+  /**
+   * Make the next update message hold all widget states rather than the ones
+   * that changed. This is called when the server may not have the widget
+   * states we last sent, e.g. when we reconnect to it, or when it tells us
+   * that it missed some.
+   */
+  public resetSentWidgetStates(): void {
+    this.lastSentWidgetStates = undefined
   }
 
   public getActiveWidgetStates(activeIds: Set<string>): WidgetStates {
@@ -360,6 +360,16 @@ _create_option(
     type_=int,
 )
 
+_create_option(
+    "global.maxCachedMessageBytes",
+    description="""Evict the least recently used cached ForwardMsgs when the
+        total size of all cached ForwardMsgs exceeds this many bytes.
+        Zero means there is no limit, and messages only expire by age.""",
+    visibility="hidden",
+    default_val=0,
+    type_=int,
+)
+
 _create_option(
     "global.storeCachedForwardMessagesInMemory",
     description="""If True, store cached ForwardMsgs in backend memory.
@@ -370,6 +380,41 @@ _create_option(
     type_=bool,
 )
 
+_create_option(
+    "global.persistedCacheStorage",
+    description="""Where @st.cache_data(persist="disk") stores cached values.
+        "files" stores every value in its own file. "segment" stores all values
+        of a function in a single memory-mapped, append-only segment file, and
+        also enforces max_entries and ttl on disk.""",
+    visibility="hidden",
+    default_val="files",
+    type_=str,
+)
+
+_FORWARD_MSG_HASH_ALGORITHMS = ("md5", "blake2b")
+# blake2b supports digests of 1 to 64 bytes, but short ones collide too easily.
+_MIN_FORWARD_MSG_HASH_DIGEST_SIZE = 16
+_MAX_FORWARD_MSG_HASH_DIGEST_SIZE = 64
+
+_create_option(
+    "global.forwardMsgHashAlgorithm",
+    description="""The hash function used to identify ForwardMsgs in the
+        ForwardMsg cache. One of "md5" or "blake2b". blake2b is noticeably
+        faster than md5 on large messages.""",
+    visibility="hidden",
+    default_val="md5",
+    type_=str,
+)
+
+_create_option(
+    "global.forwardMsgHashDigestSize",
+    description="""Size of the ForwardMsg hash digest in bytes, between 16 and
+        64. Only used when global.forwardMsgHashAlgorithm is "blake2b".""",
+    visibility="hidden",
+    default_val=16,
+    type_=int,
+)
+
 
 # Config Section: Logger #
 _create_section("logger", "Settings to customize Streamlit log messages.")
@@ -485,6 +530,27 @@ _create_option(
     type_=bool,
 )
 
+_create_option(
+    "runner.persistBytecode",
+    description="""
+        Save the compiled bytecode of scripts in ~/.streamlit/bytecode, so
+        that scripts don't have to be transformed and compiled again after a
+        server restart or a change to another script.
+        """,
+    default_val=False,
+    type_=bool,
+)
+
+_create_option(
+    "runner.precompilePages",
+    description="""
+        Compile the main script and all pages in the pages/ directory when the
+        server starts, instead of when they first run.
+        """,
+    default_val=False,
+    type_=bool,
+)
+
 _create_option(
     "runner.postScriptGC",
     description="""
@@ -518,6 +584,10 @@ _create_option(
         Some execution environments may require serializing all data in Session
         State, so it may be useful to detect incompatibility during development,
         or when the execution environment will stop supporting it in the future.
+
+        Values are checked when they're set. Values that are mutated in place
+        (for example, by appending to a list) are checked when they're set
+        again.
     """,
     default_val=False,
     type_=bool,
@@ -540,6 +610,48 @@ _create_option(
     type_=str,
 )
 
+_create_option(
+    "runner.scriptRunPoolSize",
+    description="""
+        Number of worker threads that run the scripts of all sessions. Script
+        runs wait in a global queue until a worker is free, and reruns
+        triggered by widget interactions go ahead of initial page loads.
+
+        If 0, every session starts its own script thread, and there's no
+        limit on how many scripts run at once.
+    """,
+    default_val=0,
+    type_=int,
+)
+
+_create_option(
+    "runner.maxQueuedScriptRuns",
+    description="""
+        Number of script runs that may wait for a worker when
+        runner.scriptRunPoolSize is set, before runner.overloadPolicy applies.
+
+        If 0, there's no limit.
+    """,
+    default_val=100,
+    type_=int,
+)
+
+_create_option(
+    "runner.overloadPolicy",
+    description="""
+        What to do with new script runs when runner.maxQueuedScriptRuns runs
+        are already waiting for a worker.
+
+        Allowed values:
+        * "queue": Queue them anyway.
+        * "shed": Drop the newest script run of the lowest priority.
+        * "busy": Like "shed", but tell the user whose script run was dropped
+          that the app is busy.
+    """,
+    default_val="queue",
+    type_=str,
+)
+
 # Config Section: Server #
 
 _create_section("server", "Settings for the Streamlit server")
@@ -566,7 +678,10 @@ _create_option(
                        falls back to polling if watchdog is not available.
         * "watchdog" : Force Streamlit to use the watchdog module.
         * "poll"     : Force Streamlit to always use polling.
-        * "none"     : Streamlit will not watch files.
+        * "none"     : Streamlit will not watch files. Recommended for
+                       production deployments, where source files don't
+                       change: sessions then skip looking for newly imported
+                       modules after every script run.
     """,
     default_val="auto",
     type_=str,
@@ -695,6 +810,78 @@ _create_option(
     type_=bool,
 )
 
+_create_option(
+    "server.workers",
+    description="""
+        Number of server processes to run.
+
+        With more than one worker, the server forks the workers after binding
+        its port. Each worker runs its own sessions, and all requests of a
+        browser are routed to the same worker (using a cookie). Values of
+        @st.cache_data functions are shared between workers on disk.
+
+        Only supported on platforms with os.fork (not on Windows), and not
+        together with server.sslCertFile.
+        """,
+    default_val=1,
+    type_=int,
+)
+
+_create_option(
+    "server.sessionStorage",
+    description="""
+        Where to keep the sessions of browser tabs that disconnected, so that
+        they can continue where they left off when they reconnect.
+
+        Allowed values:
+        * "memory" : Keep up to 128 sessions in memory, for two minutes.
+        * "disk"   : Keep up to 128 sessions in memory, for two minutes, and
+                     then save their Session State values to
+                     ~/.streamlit/sessions.db. Values that can't be pickled
+                     are not saved.
+        """,
+    default_val="memory",
+    type_=str,
+)
+
+_create_option(
+    "server.sessionStorageMaxSize",
+    description="""
+        Max size, in megabytes, of the sessions saved to disk when
+        `server.sessionStorage` is "disk". When the limit is exceeded, the
+        sessions that disconnected first are removed.
+        """,
+    default_val=100,
+    type_=int,
+)
+
+_create_option(
+    "server.mediaFileStorage",
+    description="""
+        Where to store the files of st.image, st.audio, st.video and
+        st.download_button.
+
+        Allowed values:
+        * "memory" : Keep all files in memory.
+        * "disk"   : Keep small files in memory, up to
+                     `server.mediaFileStorageMemoryBudget`, and write the rest
+                     to a temporary directory.
+        """,
+    default_val="memory",
+    type_=str,
+)
+
+_create_option(
+    "server.mediaFileStorageMemoryBudget",
+    description="""
+        Max size, in megabytes, of the media files kept in memory when
+        `server.mediaFileStorage` is "disk". When the limit is exceeded, the
+        files that were served least recently are written to disk.
+        """,
+    default_val=50,
+    type_=int,
+)
+
 _create_option(
     "server.maxUploadSize",
     description="""
@@ -713,6 +900,17 @@ _create_option(
     type_=int,
 )
 
+_create_option(
+    "server.cacheMemoryBudget",
+    description="""
+        Max size, in megabytes, of all entries kept in memory by st.cache_data and
+        st.cache_resource. When the limit is exceeded, large entries that are rarely
+        read are evicted first. Zero means there is no limit.
+        """,
+    default_val=0,
+    type_=int,
+)
+
 _create_option(
     "server.enableArrowTruncation",
     description="""
@@ -734,6 +932,31 @@ _create_option(
     type_=bool,
 )
 
+_create_option(
+    "server.batchForwardMessages",
+    description="""
+        Deliver all pending messages for a session in a single websocket frame
+        rather than writing one frame per message. This reduces per-message
+        overhead when scripts produce many elements per run.
+        """,
+    default_val=False,
+    type_=bool,
+)
+
+_create_option(
+    "server.sessionSendQuantum",
+    description="""
+        Max size, in megabytes, of the messages that each session may send to
+        its client per pass through the server's send loop. May be fractional,
+        e.g. 0.5. Sessions with more pending data than this are served over
+        several passes, taking turns with other sessions so that a single
+        session streaming a large amount of data doesn't delay everyone else.
+        Set to 0 to disable the limit.
+        """,
+    default_val=4.0,
+    type_=float,
+)
+
 _create_option(
     "server.enableStaticServing",
     description="""
@@ -1238,6 +1461,28 @@ If cross origin resource sharing is required, please disable server.enableXsrfPr
             """
             )
 
+    # ForwardMsg hashes identify the messages that clients have cached, so a
+    # collision would make a client display the wrong element.
+    hash_algorithm = get_option("global.forwardMsgHashAlgorithm")
+    if hash_algorithm not in _FORWARD_MSG_HASH_ALGORITHMS:
+        raise StreamlitAPIException(
+            f'Invalid value "{hash_algorithm}" for config option '
+            "global.forwardMsgHashAlgorithm. It must be one of "
+            f"{', '.join(_FORWARD_MSG_HASH_ALGORITHMS)}."
+        )
+    digest_size = get_option("global.forwardMsgHashDigestSize")
+    if not (
+        _MIN_FORWARD_MSG_HASH_DIGEST_SIZE
+        <= digest_size
+        <= _MAX_FORWARD_MSG_HASH_DIGEST_SIZE
+    ):
+        raise StreamlitAPIException(
+            f"Invalid value {digest_size} for config option "
+            "global.forwardMsgHashDigestSize. It must be between "
+            f"{_MIN_FORWARD_MSG_HASH_DIGEST_SIZE} and "
+            f"{_MAX_FORWARD_MSG_HASH_DIGEST_SIZE}."
+        )
+
 
 def _set_development_mode() -> None:
     development.is_development_mode = get_option("global.developmentMode")
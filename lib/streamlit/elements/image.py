@@ -21,11 +21,25 @@
 
 from __future__ import annotations
 
+import hashlib
 import io
 import os
 import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from enum import IntEnum
-from typing import TYPE_CHECKING, Final, List, Literal, Sequence, Union, cast
+from typing import (
+    TYPE_CHECKING,
+    Final,
+    Hashable,
+    List,
+    Literal,
+    NamedTuple,
+    Sequence,
+    Union,
+    cast,
+)
 
 from typing_extensions import TypeAlias
 
@@ -34,6 +48,8 @@ from streamlit.errors import StreamlitAPIException
 from streamlit.proto.Image_pb2 import ImageList as ImageListProto
 from streamlit.runtime import caching
 from streamlit.runtime.metrics_util import gather_metrics
+from streamlit.runtime.uploaded_file_manager import UploadedFile
+from streamlit.util import HASHLIB_KWARGS
 
 if TYPE_CHECKING:
     from typing import Any
@@ -49,6 +65,15 @@ if TYPE_CHECKING:
 # DPI.
 MAXIMUM_CONTENT_WIDTH: Final[int] = 2 * 730
 
+# The maximum total size of the transcoded images that are kept in memory, so
+# that unchanged images don't have to be decoded, resized and encoded again on
+# every rerun.
+_TRANSCODE_CACHE_MAX_BYTES: Final = 64 * 1024 * 1024  # 64MB
+
+# The images of a list are transcoded on this many threads at most. PIL
+# releases the GIL while it decodes, resizes and encodes images.
+_MAX_TRANSCODE_WORKERS: Final = min(8, os.cpu_count() or 1)
+
 PILImage: TypeAlias = Union[
     "ImageFile.ImageFile", "Image.Image", "GifImagePlugin.GifImageFile"
 ]
@@ -56,7 +81,7 @@ AtomicImage: TypeAlias = Union[PILImage, "npt.NDArray[Any]", io.BytesIO, str, by
 ImageOrImageList: TypeAlias = Union[AtomicImage, List[AtomicImage]]
 UseColumnWith: TypeAlias = Union[Literal["auto", "always", "never"], bool, None]
 Channels: TypeAlias = Literal["RGB", "BGR"]
-ImageFormat: TypeAlias = Literal["JPEG", "PNG", "GIF"]
+ImageFormat: TypeAlias = Literal["JPEG", "PNG", "GIF", "WEBP"]
 ImageFormatOrAuto: TypeAlias = Literal[ImageFormat, "auto"]
 
 
@@ -130,10 +155,11 @@ class ImageMixin:
             `image[:, :, 0]` is the red channel, `image[:, :, 1]` is green, and
             `image[:, :, 2]` is blue. For images coming from libraries like
             OpenCV you should set this to "BGR", instead.
-        output_format : "JPEG", "PNG", or "auto"
+        output_format : "JPEG", "PNG", "WEBP", or "auto"
             This parameter specifies the format to use when transferring the
             image data. Photos should use the JPEG format for lossy compression
             while diagrams should use the PNG format for lossless compression.
+            WEBP compresses photos better than JPEG, and supports transparency.
             Defaults to "auto" which identifies the compression type based
             on the type and format of the image argument.
 
@@ -190,15 +216,17 @@ def _image_is_gif(image: PILImage) -> bool:
 def _validate_image_format_string(
     image_data: bytes | PILImage, format: str
 ) -> ImageFormat:
-    """Return either "JPEG", "PNG", or "GIF", based on the input `format` string.
+    """Return either "JPEG", "PNG", "GIF", or "WEBP", based on the input `format`
+    string.
 
     - If `format` is "JPEG" or "JPG" (or any capitalization thereof), return "JPEG"
     - If `format` is "PNG" (or any capitalization thereof), return "PNG"
+    - If `format` is "WEBP" (or any capitalization thereof), return "WEBP"
     - For all other strings, return "PNG" if the image has an alpha channel,
     "GIF" if the image is a GIF, and "JPEG" otherwise.
     """
     format = format.upper()
-    if format == "JPEG" or format == "PNG":
+    if format == "JPEG" or format == "PNG" or format == "WEBP":
         return cast(ImageFormat, format)
 
     # We are forgiving on the spelling of JPEG
@@ -332,20 +360,107 @@ def _clip_image(image: npt.NDArray[Any], clamp: bool) -> npt.NDArray[Any]:
     return data
 
 
-def image_to_url(
+class _TranscodedImage(NamedTuple):
+    """An image that's ready to be added to the MediaFileManager."""
+
+    path_or_data: bytes | str
+    mimetype: str
+
+
+class _TranscodeCache:
+    """A thread-safe LRU cache of transcoded images, limited to a total size
+    in bytes.
+    """
+
+    def __init__(self, max_bytes: int):
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, _TranscodedImage] = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> _TranscodedImage | None:
+        with self._lock:
+            transcoded = self._entries.get(key)
+            if transcoded is not None:
+                self._entries.move_to_end(key)
+            return transcoded
+
+    def set(self, key: Hashable, transcoded: _TranscodedImage) -> None:
+        size = len(transcoded.path_or_data)
+        if size > self._max_bytes:
+            return
+        with self._lock:
+            old_transcoded = self._entries.pop(key, None)
+            if old_transcoded is not None:
+                self._total_bytes -= len(old_transcoded.path_or_data)
+            self._entries[key] = transcoded
+            self._total_bytes += size
+            while self._total_bytes > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= len(evicted.path_or_data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+
+_transcode_cache = _TranscodeCache(_TRANSCODE_CACHE_MAX_BYTES)
+_transcode_executor = ThreadPoolExecutor(
+    max_workers=_MAX_TRANSCODE_WORKERS, thread_name_prefix="ImageTranscode"
+)
+
+
+def _get_image_fingerprint(image: AtomicImage) -> Hashable | None:
+    """Return a value that changes whenever the given image does, or None if
+    the image can't be fingerprinted.
+
+    Files are fingerprinted by their modification time and size, and in-memory
+    images by a hash of their content, which is much cheaper than transcoding
+    them. PIL images aren't fingerprinted: they are encoded with their palette
+    and metadata too, not just their pixels.
+    """
+    import numpy as np
+
+    if isinstance(image, str):
+        try:
+            stat_result = os.stat(image)
+        except OSError:
+            return None
+        return ("path", image, stat_result.st_mtime_ns, stat_result.st_size)
+
+    hasher = hashlib.blake2b(digest_size=16, **HASHLIB_KWARGS)
+    if isinstance(image, bytes):
+        hasher.update(image)
+        return ("bytes", hasher.digest())
+    if isinstance(image, UploadedFile):
+        # Unlike getbuffer, this doesn't copy memory-mapped uploads into memory.
+        with image.get_content_view() as buffer:
+            hasher.update(buffer)
+        return ("bytes", hasher.digest())
+    if isinstance(image, io.BytesIO):
+        with image.getbuffer() as buffer:
+            hasher.update(buffer)
+        return ("bytes", hasher.digest())
+    if isinstance(image, np.ndarray) and not image.dtype.hasobject:
+        hasher.update(np.ascontiguousarray(image).data)
+        return ("ndarray", image.shape, image.dtype.str, hasher.digest())
+    return None
+
+
+def _transcode_image(
     image: AtomicImage,
     width: int,
     clamp: bool,
     channels: Channels,
     output_format: ImageFormatOrAuto,
-    image_id: str,
-) -> str:
-    """Return a URL that an image can be served from.
-    If `image` is already a URL, return it unmodified.
-    Otherwise, add the image to the MediaFileManager and return the URL.
+) -> _TranscodedImage | str:
+    """Convert an image to the data that's served to the frontend, resized and
+    reformatted as necessary. If `image` is a URL, return it unmodified, and if
+    it's an SVG, return it as a data URI.
 
-    (When running in "raw" mode, we won't actually load data into the
-    MediaFileManager, and we'll return an empty URL.)
+    Images are cached, so that unchanged images aren't transcoded again. This
+    doesn't use the script run context, so it can run on any thread.
     """
     import numpy as np
     from PIL import Image, ImageFile
@@ -381,7 +496,19 @@ def image_to_url(
             # Return SVG as data URI:
             return f"data:image/svg+xml;base64,{image_b64_encoded}"
 
-        # Otherwise, try to open it as a file.
+    fingerprint = _get_image_fingerprint(image)
+    cache_key = (
+        (fingerprint, width, output_format, clamp, channels)
+        if fingerprint is not None
+        else None
+    )
+    if cache_key is not None:
+        transcoded = _transcode_cache.get(cache_key)
+        if transcoded is not None:
+            return transcoded
+
+    if isinstance(image, str):
+        # Try to open it as a file.
         try:
             with open(image, "rb") as f:
                 image_data = f.read()
@@ -395,9 +522,7 @@ def image_to_url(
             if mimetype is None:
                 mimetype = "application/octet-stream"
 
-            url = runtime.get_instance().media_file_mgr.add(image, mimetype, image_id)
-            caching.save_media_data(image, mimetype, image_id)
-            return url
+            return _TranscodedImage(image, mimetype)
 
     # PIL Images
     elif isinstance(image, (ImageFile.ImageFile, Image.Image)):
@@ -444,15 +569,52 @@ def image_to_url(
     image_data = _ensure_image_size_and_format(image_data, width, image_format)
     mimetype = _get_image_format_mimetype(image_format)
 
+    transcoded = _TranscodedImage(image_data, mimetype)
+    if cache_key is not None:
+        _transcode_cache.set(cache_key, transcoded)
+    return transcoded
+
+
+def _add_to_media_file_mgr(transcoded: _TranscodedImage | str, image_id: str) -> str:
+    """Add a transcoded image to the MediaFileManager and return its URL. URLs
+    are returned unmodified.
+
+    (When running in "raw" mode, we won't actually load data into the
+    MediaFileManager, and we'll return an empty URL.)
+    """
+    if isinstance(transcoded, str):
+        return transcoded
+
     if runtime.exists():
-        url = runtime.get_instance().media_file_mgr.add(image_data, mimetype, image_id)
-        caching.save_media_data(image_data, mimetype, image_id)
+        url = runtime.get_instance().media_file_mgr.add(
+            transcoded.path_or_data, transcoded.mimetype, image_id
+        )
+        caching.save_media_data(transcoded.path_or_data, transcoded.mimetype, image_id)
         return url
     else:
         # When running in "raw mode", we can't access the MediaFileManager.
         return ""
 
 
+def image_to_url(
+    image: AtomicImage,
+    width: int,
+    clamp: bool,
+    channels: Channels,
+    output_format: ImageFormatOrAuto,
+    image_id: str,
+) -> str:
+    """Return a URL that an image can be served from.
+    If `image` is already a URL, return it unmodified.
+    Otherwise, add the image to the MediaFileManager and return the URL.
+
+    (When running in "raw" mode, we won't actually load data into the
+    MediaFileManager, and we'll return an empty URL.)
+    """
+    transcoded = _transcode_image(image, width, clamp, channels, output_format)
+    return _add_to_media_file_mgr(transcoded, image_id)
+
+
 def marshall_images(
     coordinates: str,
     image: ImageOrImageList,
@@ -498,6 +660,7 @@ def marshall_images(
         This parameter specifies the format to use when transferring the
         image data. Photos should use the JPEG format for lossy compression
         while diagrams should use the PNG format for lossless compression.
+        WEBP compresses photos better than JPEG, and supports transparency.
         Defaults to 'auto' which identifies the compression type based
         on the type and format of the image argument.
     """
@@ -538,8 +701,29 @@ def marshall_images(
     )
 
     proto_imgs.width = int(width)
+
+    # Transcode the images of a list in parallel. They are added to the
+    # MediaFileManager on this thread, which has the script run context.
+    transcoded_images: list[_TranscodedImage | str]
+    if len(images) > 1:
+        transcoded_images = list(
+            _transcode_executor.map(
+                lambda image: _transcode_image(
+                    image, width, clamp, channels, output_format
+                ),
+                images,
+            )
+        )
+    else:
+        transcoded_images = [
+            _transcode_image(image, width, clamp, channels, output_format)
+            for image in images
+        ]
+
     # Each image in an image list needs to be kept track of at its own coordinates.
-    for coord_suffix, (image, caption) in enumerate(zip(images, captions)):
+    for coord_suffix, (transcoded, caption) in enumerate(
+        zip(transcoded_images, captions)
+    ):
         proto_img = proto_imgs.imgs.add()
         if caption is not None:
             proto_img.caption = str(caption)
@@ -548,6 +732,4 @@ def marshall_images(
         # MediaFileManager. For this, we just add the index to the image's "coordinates".
         image_id = "%s-%i" % (coordinates, coord_suffix)
 
-        proto_img.url = image_to_url(
-            image, width, clamp, channels, output_format, image_id
-        )
+        proto_img.url = _add_to_media_file_mgr(transcoded, image_id)
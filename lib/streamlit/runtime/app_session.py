@@ -15,6 +15,8 @@
 from __future__ import annotations
 
 import asyncio
+import json
+import pickle
 import sys
 import uuid
 from enum import Enum
@@ -35,18 +37,26 @@ from streamlit.proto.NewSession_pb2 import (
     UserInfo,
 )
 from streamlit.runtime import caching
+from streamlit.runtime.forward_msg_cache import populate_hash_if_needed
 from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
 from streamlit.runtime.fragment import FragmentStorage, MemoryFragmentStorage
 from streamlit.runtime.metrics_util import Installation
 from streamlit.runtime.pages_manager import PagesManager
-from streamlit.runtime.scriptrunner import RerunData, ScriptRunner, ScriptRunnerEvent
+from streamlit.runtime.scriptrunner import (
+    RerunData,
+    ScriptRunner,
+    ScriptRunnerEvent,
+    get_script_run_pool,
+)
 from streamlit.runtime.secrets import secrets_singleton
+from streamlit.runtime.session_manager import SessionSnapshot
 from streamlit.version import STREAMLIT_VERSION_STRING
 from streamlit.watcher import LocalSourcesWatcher
 
 if TYPE_CHECKING:
     from streamlit.proto.BackMsg_pb2 import BackMsg
     from streamlit.proto.PagesChanged_pb2 import PagesChanged
+    from streamlit.proto.WidgetStates_pb2 import WidgetStates
     from streamlit.runtime.script_data import ScriptData
     from streamlit.runtime.scriptrunner.script_cache import ScriptCache
     from streamlit.runtime.state import SessionState
@@ -62,6 +72,11 @@ class AppSessionState(Enum):
     SHUTDOWN_REQUESTED = "SHUTDOWN_REQUESTED"
 
 
+# Deltas smaller than this aren't diffed against the previous script run: a
+# reference message wouldn't be much smaller than the delta itself.
+_MIN_DIFFED_DELTA_SIZE_BYTES: Final = 128
+
+
 def _generate_scriptrun_id() -> str:
     """Randomly generate a unique ID for a script execution."""
     return str(uuid.uuid4())
@@ -166,6 +181,19 @@ class AppSession:
 
         self._fragment_storage: FragmentStorage = MemoryFragmentStorage()
 
+        # Mappings of delta_path -> hash of the deltas that were sent to the
+        # client in the previous script run, and in the current one. Only
+        # accessed from the eventloop thread, by the Runtime.
+        self._prev_delta_hashes: dict[tuple[int, ...], str] = {}
+        self._delta_hashes: dict[tuple[int, ...], str] = {}
+
+        # The version of the last WidgetStates the client sent, or None if
+        # we're waiting for it to send all widget states again, and the last
+        # JSON object it sent for each widget, which json_patch_values apply to,
+        # as (name of the value field, value).
+        self._widget_states_version: int | None = 0
+        self._json_widget_values: dict[str, tuple[str, str]] = {}
+
         _LOGGER.debug("AppSession initialized (id=%s)", self.id)
 
     def __del__(self) -> None:
@@ -245,7 +273,7 @@ class AppSession:
             if runtime.exists():
                 rt = runtime.get_instance()
                 rt.media_file_mgr.clear_session_refs(self.id)
-                rt.media_file_mgr.remove_orphaned_files()
+                rt.media_file_mgr.remove_orphaned_files(self.id)
 
             # Shut down the ScriptRunner, if one is active.
             # self._state must not be set to SHUTDOWN_REQUESTED until
@@ -278,6 +306,51 @@ class AppSession:
         if self._message_enqueued_callback:
             self._message_enqueued_callback()
 
+    def is_unchanged_delta(self, msg: ForwardMsg) -> bool:
+        """Record the hash of a delta that is about to be sent to the client, and
+        return True if the same delta was sent at the same delta_path in the
+        previous script run.
+
+        The Runtime sends such deltas as "reference" messages, so that the
+        client reuses the element it already has instead of receiving it
+        again. Deltas that are too small to be worth hashing are never
+        considered unchanged.
+
+        Notes
+        -----
+        Threading: UNSAFE. Must be called on the eventloop thread.
+        """
+        if (
+            msg.WhichOneof("type") != "delta"
+            or msg.ByteSize() < _MIN_DIFFED_DELTA_SIZE_BYTES
+        ):
+            return False
+
+        delta_path = tuple(msg.metadata.delta_path)
+        msg_hash = populate_hash_if_needed(msg)
+        self._delta_hashes[delta_path] = msg_hash
+        return self._prev_delta_hashes.get(delta_path) == msg_hash
+
+    def on_script_finished_sent(
+        self, status: ForwardMsg.ScriptFinishedStatus.ValueType
+    ) -> None:
+        """Start tracking the deltas of a new script run, once the client was
+        sent the script_finished message of the previous one.
+
+        Notes
+        -----
+        Threading: UNSAFE. Must be called on the eventloop thread.
+        """
+        if status == ForwardMsg.FINISHED_SUCCESSFULLY:
+            # The client removes the elements that weren't sent in this run, so
+            # forget about them too.
+            self._prev_delta_hashes = self._delta_hashes
+        else:
+            # Fragment runs and interrupted runs only replace some of the
+            # elements.
+            self._prev_delta_hashes.update(self._delta_hashes)
+        self._delta_hashes = {}
+
     def handle_backmsg(self, msg: BackMsg) -> None:
         """Process a BackMsg."""
         try:
@@ -410,6 +483,7 @@ class AppSession:
             user_info=self._user_info,
             fragment_storage=self._fragment_storage,
             pages_manager=self._pages_manager,
+            script_run_pool=get_script_run_pool(),
         )
         self._scriptrunner.on_event.connect(self._on_scriptrunner_event)
         self._scriptrunner.start()
@@ -418,6 +492,61 @@ class AppSession:
     def session_state(self) -> SessionState:
         return self._session_state
 
+    def get_session_state_value_sizes(self) -> dict[str, int]:
+        """Return the estimated memory used by each session state value, in
+        bytes. See `SessionState.get_value_sizes`.
+
+        Threading: SAFE. Takes the lock that the running script takes to
+        access its session state.
+        """
+        scriptrunner = self._scriptrunner
+        if scriptrunner is not None:
+            return scriptrunner.get_session_state_value_sizes()
+        # Without a ScriptRunner, session state is only used on the event loop.
+        return self._session_state.get_value_sizes()
+
+    def get_snapshot(self, script_run_count: int) -> SessionSnapshot:
+        """Return the state that a new AppSession needs to continue where this
+        one left off. See `restore_snapshot`.
+
+        Values in session state that can't be pickled are left out.
+
+        Threading: SAFE. Takes the lock that the running script takes to
+        access its session state.
+        """
+        scriptrunner = self._scriptrunner
+        if scriptrunner is not None:
+            user_state = scriptrunner.get_pickled_session_state_values()
+        else:
+            # Without a ScriptRunner, session state is only used on the event
+            # loop, which doesn't change it while the session is disconnected.
+            user_state = self._session_state.get_pickled_user_values()
+
+        return SessionSnapshot(
+            session_id=self.id,
+            script_run_count=script_run_count,
+            client_state=self._client_state.SerializeToString(),
+            user_state=user_state,
+        )
+
+    def restore_snapshot(self, snapshot: SessionSnapshot) -> None:
+        """Restore the state of a shut down AppSession from the snapshot
+        returned by its `get_snapshot`.
+
+        This must be called before the session's first script run.
+        """
+        client_state = ClientState()
+        client_state.ParseFromString(snapshot.client_state)
+        self._client_state = client_state
+
+        for key, pickled_value in snapshot.user_state.items():
+            try:
+                self._session_state[key] = pickle.loads(pickled_value)
+            except Exception as ex:
+                _LOGGER.debug(
+                    "Not restoring session state value %s (id=%s): %s", key, self.id, ex
+                )
+
     def _should_rerun_on_file_change(self, filepath: str) -> bool:
         pages = self._pages_manager.get_pages()
 
@@ -530,7 +659,8 @@ class AppSession:
 
         exception : BaseException | None
             An exception thrown during compilation. Set only for the
-            SCRIPT_STOPPED_WITH_COMPILE_ERROR event.
+            SCRIPT_STOPPED_WITH_COMPILE_ERROR event. For the SCRIPT_REJECTED
+            event, the warning to show to the user, if any.
 
         client_state : streamlit.proto.ClientState_pb2.ClientState | None
             The ScriptRunner's final ClientState. Set only for the
@@ -634,6 +764,12 @@ class AppSession:
             if self._local_sources_watcher:
                 self._local_sources_watcher.update_watched_modules()
 
+        elif event == ScriptRunnerEvent.SCRIPT_REJECTED:
+            # The script run was dropped because the server is overloaded.
+            # A SHUTDOWN event follows.
+            if exception is not None:
+                self._enqueue_forward_msg(self._create_exception_message(exception))
+
         elif event == ScriptRunnerEvent.SHUTDOWN:
             assert (
                 client_state is not None
@@ -642,7 +778,9 @@ class AppSession:
             if self._state == AppSessionState.SHUTDOWN_REQUESTED:
                 # Only clear media files if the script is done running AND the
                 # session is actually shutting down.
-                runtime.get_instance().media_file_mgr.clear_session_refs(self.id)
+                media_file_mgr = runtime.get_instance().media_file_mgr
+                media_file_mgr.clear_session_refs(self.id)
+                media_file_mgr.remove_orphaned_files(self.id)
 
             self._client_state = client_state
             self._scriptrunner = None
@@ -783,8 +921,98 @@ class AppSession:
             to use previous client state.
 
         """
+        if (
+            client_state is not None
+            and client_state.HasField("widget_states")
+            and not self._resolve_widget_states(client_state.widget_states)
+        ):
+            return
         self.request_rerun(client_state)
 
+    def _resolve_widget_states(self, widget_states: WidgetStates) -> bool:
+        """Replace the json_patch_values in WidgetStates received from the
+        client with the values they result in.
+
+        The rest of the runtime then handles the WidgetStates like any other.
+        If it's a delta, the widgets it doesn't hold keep their values.
+
+        Returns False if the WidgetStates is a delta of states we don't have,
+        e.g. because we missed the previous WidgetStates. The client is then
+        asked to send all widget states again, and the WidgetStates must be
+        ignored.
+        """
+        # This needs to be lazily imported to avoid a dependency cycle.
+        from streamlit.runtime.state.widgets import apply_json_merge_patch
+
+        if widget_states.is_delta and (
+            self._widget_states_version is None
+            or widget_states.version != self._widget_states_version + 1
+        ):
+            if self._widget_states_version is not None:
+                _LOGGER.warning(
+                    "Missed a widget state update from the client (got version "
+                    "%s after %s). Asking it to send all widget states.",
+                    widget_states.version,
+                    self._widget_states_version,
+                )
+                self._request_all_widget_states()
+            return False
+        self._widget_states_version = widget_states.version
+
+        if not widget_states.is_delta:
+            # Forget the values of the widgets that are gone.
+            widget_ids = {state.id for state in widget_states.widgets}
+            self._json_widget_values = {
+                widget_id: value
+                for widget_id, value in self._json_widget_values.items()
+                if widget_id in widget_ids
+            }
+
+        for state in widget_states.widgets:
+            value_type = state.WhichOneof("value")
+            is_json = value_type in ("json_value", "json_patch_value") or (
+                value_type == "string_value" and state.is_json_string_value
+            )
+            if value_type == "json_patch_value":
+                base = self._json_widget_values.get(state.id)
+                if base is None:
+                    _LOGGER.warning(
+                        "Got a JSON patch for widget %s, which has no previous "
+                        "value. Asking the client to send all widget states.",
+                        state.id,
+                    )
+                    self._request_all_widget_states()
+                    return False
+                value_type, base_value = base
+                value = apply_json_merge_patch(
+                    json.loads(base_value), json.loads(state.json_patch_value)
+                )
+                # Format the value like the client's JSON.stringify does.
+                setattr(
+                    state,
+                    value_type,
+                    json.dumps(value, separators=(",", ":"), ensure_ascii=False),
+                )
+
+            if is_json and value_type is not None:
+                self._json_widget_values[state.id] = (
+                    value_type,
+                    getattr(state, value_type),
+                )
+            else:
+                self._json_widget_values.pop(state.id, None)
+
+        return True
+
+    def _request_all_widget_states(self) -> None:
+        """Ask the client to send all of its widget states again, and ignore
+        the deltas it sends until then.
+        """
+        self._widget_states_version = None
+        msg = ForwardMsg()
+        msg.session_event.widget_states_out_of_sync = True
+        self._enqueue_forward_msg(msg)
+
     def _handle_stop_script_request(self) -> None:
         """Tell the ScriptRunner to stop running its script."""
         self.request_script_stop()
@@ -22,6 +22,12 @@ from streamlit.runtime.caching.cache_data_api import (
     get_data_cache_stats_provider,
 )
 from streamlit.runtime.caching.cache_errors import CACHE_DOCS_URL
+from streamlit.runtime.caching.cache_memory_budget import (
+    get_cache_memory_budget_stats_provider,
+)
+from streamlit.runtime.caching.cache_profiler import (
+    get_cache_profiler_stats_provider,
+)
 from streamlit.runtime.caching.cache_resource_api import (
     CACHE_RESOURCE_MESSAGE_REPLAY_CTX,
     CacheResourceAPI,
@@ -103,6 +109,8 @@ __all__ = [
     "save_media_data",
     "get_data_cache_stats_provider",
     "get_resource_cache_stats_provider",
+    "get_cache_memory_budget_stats_provider",
+    "get_cache_profiler_stats_provider",
     "cache_data",
     "cache_resource",
 ]
@@ -37,7 +37,9 @@ import streamlit as st
 from streamlit import runtime
 from streamlit.errors import StreamlitAPIException
 from streamlit.logger import get_logger
+from streamlit.runtime.caching import cache_utils, zero_copy_pickle
 from streamlit.runtime.caching.cache_errors import CacheError, CacheKeyNotFoundError
+from streamlit.runtime.caching.cache_profiler import get_cache_profiler
 from streamlit.runtime.caching.cache_type import CacheType
 from streamlit.runtime.caching.cache_utils import (
     Cache,
@@ -82,6 +84,22 @@ CACHE_DATA_MESSAGE_REPLAY_CTX = CachedMessageReplayContext(CacheType.DATA)
 # The cache persistence options we support: "disk" or None
 CachePersistType: TypeAlias = Union[Literal["disk"], None]
 
+# How cached values are handed back to callers: "deep" or "zero"
+CacheCopyType: TypeAlias = Literal["deep", "zero"]
+
+# What happens when a value's TTL has passed: "blocking" or "background"
+CacheRefreshType: TypeAlias = Literal["blocking", "background"]
+
+# With refresh="background", values that are read at least once per this
+# fraction of their TTL are recomputed when they enter the last such fraction
+# of their TTL, so that they don't go stale at all.
+_PREWARM_TTL_FRACTION: Final = 0.1
+
+# With refresh="background", stale values are served for at most this many
+# TTLs after they were written. Values that aren't read in that time expire
+# from the storage, like they do with refresh="blocking".
+_STALE_VALUE_MAX_AGE_TTLS: Final = 2
+
 
 class CachedDataFuncInfo(CachedFuncInfo):
     """Implements the CachedFuncInfo interface for @st.cache_data"""
@@ -95,6 +113,9 @@ class CachedDataFuncInfo(CachedFuncInfo):
         ttl: float | timedelta | str | None,
         allow_widgets: bool,
         hash_funcs: HashFuncsDict | None = None,
+        copy: CacheCopyType = "deep",
+        max_bytes: int | None = None,
+        refresh: CacheRefreshType = "blocking",
     ):
         super().__init__(
             func,
@@ -105,6 +126,9 @@ class CachedDataFuncInfo(CachedFuncInfo):
         self.persist = persist
         self.max_entries = max_entries
         self.ttl = ttl
+        self.copy = copy
+        self.max_bytes = max_bytes
+        self.refresh = refresh
 
         self.validate_params()
 
@@ -129,6 +153,9 @@ class CachedDataFuncInfo(CachedFuncInfo):
             ttl=self.ttl,
             display_name=self.display_name,
             allow_widgets=self.allow_widgets,
+            copy=self.copy,
+            max_bytes=self.max_bytes,
+            refresh=self.refresh,
         )
 
     def validate_params(self) -> None:
@@ -161,6 +188,9 @@ class DataCaches(CacheStatsProvider):
         ttl: int | float | timedelta | str | None,
         display_name: str,
         allow_widgets: bool,
+        copy: CacheCopyType = "deep",
+        max_bytes: int | None = None,
+        refresh: CacheRefreshType = "blocking",
     ) -> DataCache:
         """Return the mem cache for the given key.
 
@@ -178,6 +208,9 @@ class DataCaches(CacheStatsProvider):
                 and cache.ttl_seconds == ttl_seconds
                 and cache.max_entries == max_entries
                 and cache.persist == persist
+                and cache.copy == copy
+                and cache.max_bytes == max_bytes
+                and cache.refresh == refresh
             ):
                 return cache
 
@@ -206,9 +239,17 @@ class DataCaches(CacheStatsProvider):
             cache_context = self.create_cache_storage_context(
                 function_key=key,
                 function_name=display_name,
-                ttl_seconds=ttl_seconds,
+                # With refresh="background", the DataCache keeps track of
+                # stale values itself, and the storage keeps serving them
+                # for a while longer.
+                ttl_seconds=(
+                    ttl_seconds * _STALE_VALUE_MAX_AGE_TTLS
+                    if refresh == "background" and ttl_seconds is not None
+                    else ttl_seconds
+                ),
                 max_entries=max_entries,
                 persist=persist,
+                max_bytes=max_bytes,
             )
             cache_storage_manager = self.get_storage_manager()
             storage = cache_storage_manager.create(cache_context)
@@ -221,6 +262,9 @@ class DataCaches(CacheStatsProvider):
                 ttl_seconds=ttl_seconds,
                 display_name=display_name,
                 allow_widgets=allow_widgets,
+                copy=copy,
+                max_bytes=max_bytes,
+                refresh=refresh,
             )
             self._function_caches[key] = cache
             return cache
@@ -294,6 +338,7 @@ class DataCaches(CacheStatsProvider):
         persist: CachePersistType,
         ttl_seconds: float | None,
         max_entries: int | None,
+        max_bytes: int | None = None,
     ) -> CacheStorageContext:
         return CacheStorageContext(
             function_key=function_key,
@@ -301,6 +346,7 @@ class DataCaches(CacheStatsProvider):
             ttl_seconds=ttl_seconds,
             max_entries=max_entries,
             persist=persist,
+            max_bytes=max_bytes,
         )
 
     def get_storage_manager(self) -> CacheStorageManager:
@@ -361,6 +407,9 @@ class CacheDataAPI:
         persist: CachePersistType | bool = None,
         experimental_allow_widgets: bool = False,
         hash_funcs: HashFuncsDict | None = None,
+        copy: CacheCopyType = "deep",
+        max_bytes: int | None = None,
+        refresh: CacheRefreshType = "blocking",
     ) -> Callable[[F], F]: ...
 
     def __call__(
@@ -373,6 +422,9 @@ class CacheDataAPI:
         persist: CachePersistType | bool = None,
         experimental_allow_widgets: bool = False,
         hash_funcs: HashFuncsDict | None = None,
+        copy: CacheCopyType = "deep",
+        max_bytes: int | None = None,
+        refresh: CacheRefreshType = "blocking",
     ):
         return self._decorator(
             func,
@@ -382,6 +434,9 @@ class CacheDataAPI:
             show_spinner=show_spinner,
             experimental_allow_widgets=experimental_allow_widgets,
             hash_funcs=hash_funcs,
+            copy=copy,
+            max_bytes=max_bytes,
+            refresh=refresh,
         )
 
     def _decorator(
@@ -394,12 +449,15 @@ class CacheDataAPI:
         persist: CachePersistType | bool,
         experimental_allow_widgets: bool,
         hash_funcs: HashFuncsDict | None = None,
+        copy: CacheCopyType = "deep",
+        max_bytes: int | None = None,
+        refresh: CacheRefreshType = "blocking",
     ):
         """Decorator to cache functions that return data (e.g. dataframe transforms, database queries, ML inference).
 
         Cached objects are stored in "pickled" form, which means that the return
         value of a cached function must be pickleable. Each caller of the cached
-        function gets its own copy of the cached data.
+        function gets its own copy of the cached data, unless ``copy="zero"``.
 
         You can clear a function's cache with ``func.clear()`` or clear the entire
         cache with ``st.cache_data.clear()``.
@@ -455,6 +513,34 @@ class CacheDataAPI:
             the provided function to generate a hash for it. See below for an example
             of how this can be used.
 
+        copy : "deep" or "zero"
+            How cached values are returned on a cache hit. ``"deep"`` (default)
+            unpickles a fresh copy of the cached value every time. ``"zero"``
+            stores the data buffers of NumPy arrays, pandas objects, and PyArrow
+            tables next to the pickled value, and returns objects that share
+            these buffers with the cache instead of copying them. Such values
+            are read-only: trying to modify them in place raises an error.
+            This is useful for large dataframes and arrays that are read on
+            every rerun.
+
+        max_bytes : int or None
+            The maximum total size, in bytes, of the pickled entries kept in
+            memory for this function, or None for no per-function limit. When
+            the limit is exceeded, large entries that are rarely read are
+            removed from memory first. All cached functions are also limited
+            by the ``server.cacheMemoryBudget`` config option. Entries
+            persisted to disk stay on disk. Defaults to None.
+
+        refresh : "blocking" or "background"
+            What happens when a cached value is read after its ``ttl`` has
+            passed. With ``"blocking"`` (default), the value is recomputed
+            before it's returned. With ``"background"``, the stale value is
+            returned right away, and recomputed on a background thread; the
+            new value replaces it once it's ready. Values that are read often
+            are also recomputed shortly before their ``ttl`` passes. Stale
+            values that replay Streamlit commands are always recomputed before
+            they're returned. Has no effect without ``ttl``.
+
         .. deprecated::
             ``experimental_allow_widgets`` is deprecated and will be removed in
             a later version.
@@ -563,6 +649,17 @@ class CacheDataAPI:
                 f"Unsupported persist option '{persist}'. Valid values are 'disk' or None."
             )
 
+        if copy not in ("deep", "zero"):
+            raise StreamlitAPIException(
+                f"Unsupported copy option '{copy}'. Valid values are 'deep' or 'zero'."
+            )
+
+        if refresh not in ("blocking", "background"):
+            raise StreamlitAPIException(
+                f"Unsupported refresh option '{refresh}'. "
+                "Valid values are 'blocking' or 'background'."
+            )
+
         if experimental_allow_widgets:
             show_widget_replay_deprecation("cache_data")
 
@@ -576,6 +673,9 @@ class CacheDataAPI:
                     ttl=ttl,
                     allow_widgets=experimental_allow_widgets,
                     hash_funcs=hash_funcs,
+                    copy=copy,
+                    max_bytes=max_bytes,
+                    refresh=refresh,
                 )
             )
 
@@ -591,6 +691,9 @@ class CacheDataAPI:
                 ttl=ttl,
                 allow_widgets=experimental_allow_widgets,
                 hash_funcs=hash_funcs,
+                copy=copy,
+                max_bytes=max_bytes,
+                refresh=refresh,
             )
         )
 
@@ -612,6 +715,9 @@ class DataCache(Cache):
         ttl_seconds: float | None,
         display_name: str,
         allow_widgets: bool = False,
+        copy: CacheCopyType = "deep",
+        max_bytes: int | None = None,
+        refresh: CacheRefreshType = "blocking",
     ):
         super().__init__()
         self.key = key
@@ -621,6 +727,82 @@ class DataCache(Cache):
         self.max_entries = max_entries
         self.persist = persist
         self.allow_widgets = allow_widgets
+        self.copy = copy
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+
+        # With refresh="background", when each value was written, and how
+        # often it was read since.
+        self._freshness_lock = threading.Lock()
+        self._write_times: dict[str, float] = {}
+        self._read_counts: dict[str, int] = {}
+
+    @property
+    def _serves_stale_values(self) -> bool:
+        return self.refresh == "background" and self.ttl_seconds is not None
+
+    def is_stale(self, value_key: str) -> bool:
+        if self.ttl_seconds is None or not self._serves_stale_values:
+            return False
+        with self._freshness_lock:
+            write_time = self._write_times.get(value_key)
+        if write_time is None:
+            return False
+        return cache_utils.TTLCACHE_TIMER() - write_time >= self.ttl_seconds
+
+    def should_prewarm(self, value_key: str) -> bool:
+        if self.ttl_seconds is None or not self._serves_stale_values:
+            return False
+        with self._freshness_lock:
+            write_time = self._write_times.get(value_key)
+            read_count = self._read_counts.get(value_key, 0)
+        if write_time is None:
+            return False
+
+        age = cache_utils.TTLCACHE_TIMER() - write_time
+        window = self.ttl_seconds * _PREWARM_TTL_FRACTION
+        if age <= 0 or age < self.ttl_seconds - window:
+            return False
+        # Prewarm if the observed read rate predicts a read in every window.
+        return read_count / age * window >= 1
+
+    def _record_read(self, value_key: str) -> None:
+        if not self._serves_stale_values:
+            return
+        with self._freshness_lock:
+            # Values loaded from a persistent storage don't have a write time.
+            # Their age is counted from their first read.
+            self._write_times.setdefault(value_key, cache_utils.TTLCACHE_TIMER())
+            self._read_counts[value_key] = self._read_counts.get(value_key, 0) + 1
+
+    def _record_write(self, value_key: str) -> None:
+        if not self._serves_stale_values:
+            return
+        assert self.ttl_seconds is not None
+        now = cache_utils.TTLCACHE_TIMER()
+        with self._freshness_lock:
+            # Keep _write_times ordered by write time, so that the values that
+            # have expired from the storage can be forgotten from the front.
+            self._write_times.pop(value_key, None)
+            self._write_times[value_key] = now
+            self._read_counts[value_key] = 0
+
+            max_age = self.ttl_seconds * _STALE_VALUE_MAX_AGE_TTLS
+            while self._write_times:
+                key, write_time = next(iter(self._write_times.items()))
+                if now - write_time < max_age:
+                    break
+                del self._write_times[key]
+                self._read_counts.pop(key, None)
+
+    def _forget_freshness(self, value_key: str | None) -> None:
+        with self._freshness_lock:
+            if value_key is None:
+                self._write_times.clear()
+                self._read_counts.clear()
+            else:
+                self._write_times.pop(value_key, None)
+                self._read_counts.pop(value_key, None)
 
     def get_stats(self) -> list[CacheStat]:
         if isinstance(self.storage, CacheStatsProvider):
@@ -632,15 +814,19 @@ class DataCache(Cache):
         if the value doesn't exist, and `CacheError` if the value exists but can't
         be unpickled.
         """
+        profiler = get_cache_profiler()
         try:
-            pickled_entry = self.storage.get(key)
+            with profiler.measure(CacheType.DATA, self.display_name, "storage_lookup"):
+                pickled_entry = self.storage.get(key)
         except CacheStorageKeyNotFoundError as e:
+            self._forget_freshness(key)
             raise CacheKeyNotFoundError(str(e)) from e
         except CacheStorageError as e:
             raise CacheError(str(e)) from e
 
         try:
-            entry = pickle.loads(pickled_entry)
+            with profiler.measure(CacheType.DATA, self.display_name, "unpickle"):
+                entry = _unpickle_entry(pickled_entry)
             if not isinstance(entry, MultiCacheResults):
                 # Loaded an old cache file format, remove it and let the caller
                 # rerun the function.
@@ -653,6 +839,7 @@ class DataCache(Cache):
 
             widget_key = entry.get_current_widget_key(ctx, CacheType.DATA)
             if widget_key in entry.results:
+                self._record_read(key)
                 return entry.results[widget_key]
             else:
                 raise CacheKeyNotFoundError()
@@ -697,13 +884,18 @@ class DataCache(Cache):
         multi_cache_results.results[widget_key] = result
 
         try:
-            pickled_entry = pickle.dumps(multi_cache_results)
+            if self.copy == "zero":
+                pickled_entry = zero_copy_pickle.dumps(multi_cache_results)
+            else:
+                pickled_entry = pickle.dumps(multi_cache_results)
         except (pickle.PicklingError, TypeError) as exc:
             raise CacheError(f"Failed to pickle {key}") from exc
 
         self.storage.set(key, pickled_entry)
+        self._record_write(key)
 
     def _clear(self, key: str | None = None) -> None:
+        self._forget_freshness(key or None)
         if not key:
             self.storage.clear()
         else:
@@ -720,10 +912,21 @@ class DataCache(Cache):
         except CacheStorageKeyNotFoundError as e:
             raise CacheKeyNotFoundError(str(e)) from e
 
-        maybe_results = pickle.loads(pickled)
+        maybe_results = _unpickle_entry(pickled)
 
         if isinstance(maybe_results, MultiCacheResults):
             return maybe_results
         else:
             self.storage.delete(key)
             raise CacheKeyNotFoundError()
+
+
+def _unpickle_entry(pickled: bytes) -> Any:
+    """Unpickle a cache entry written in either copy mode.
+
+    Entries are read the way they were written, so changing a function's
+    copy mode doesn't invalidate entries that are persisted to disk.
+    """
+    if zero_copy_pickle.is_zero_copy_pickle(pickled):
+        return zero_copy_pickle.loads(pickled)
+    return pickle.loads(pickled)
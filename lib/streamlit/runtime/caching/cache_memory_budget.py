@@ -0,0 +1,320 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Byte budgets for the in-memory caches of st.cache_data and st.cache_resource.
+
+A budget tracks the size of cache entries, and picks entries to evict once
+their total size exceeds its limit. Every function cache has its own budget if
+`max_bytes` was passed to its decorator, and all function caches share the
+global budget set by `server.cacheMemoryBudget`.
+
+Victims are picked with GreedyDual-Size-Frequency (GDSF): every entry has the
+priority `L + frequency / size`, where `L` is the priority of the last evicted
+entry, and the entry with the lowest priority is evicted first. Large entries
+that are rarely read go first, and `L` ages entries that haven't been read in a
+while, so that they can't hog the budget forever.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import weakref
+from typing import Any, Callable, Final
+
+from cachetools import TTLCache
+
+from streamlit import config
+from streamlit.runtime.stats import (
+    CounterStat,
+    GaugeStat,
+    MetricFamily,
+    Stat,
+    StatsProvider,
+)
+
+CACHE_MEMORY_BUDGET_BYTES_FAMILY: Final = MetricFamily(
+    name="cache_memory_budget_bytes",
+    type="gauge",
+    unit="bytes",
+    help="Size limit of all st.cache_data and st.cache_resource entries, set by server.cacheMemoryBudget.",
+)
+
+CACHE_EVICTIONS_FAMILY: Final = MetricFamily(
+    name="cache_evictions",
+    type="counter",
+    unit="",
+    help="Number of cache entries evicted to stay within a memory budget.",
+)
+
+
+class _BudgetEntry:
+    __slots__ = ("cache_ref", "key", "size", "frequency", "seq")
+
+    def __init__(self, cache_ref: weakref.ref[BudgetedTTLCache], key: str, size: int):
+        self.cache_ref = cache_ref
+        self.key = key
+        self.size = size
+        self.frequency = 1
+        # Sequence number of the entry's current heap item. Older heap items
+        # for the same entry are stale, and skipped when they're popped.
+        self.seq = -1
+
+
+class CacheMemoryBudget:
+    """Tracks the size of cache entries, and picks entries to evict when they
+    exceed a byte limit.
+
+    Entries may belong to any number of BudgetedTTLCaches. The budget only holds
+    weak references to them.
+
+    Notes
+    -----
+    Threading: all methods are thread safe. The budget doesn't call into the
+    caches it tracks, so it's safe to call while holding a cache's lock.
+    """
+
+    def __init__(self, get_max_bytes: Callable[[], float]):
+        self._get_max_bytes = get_max_bytes
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[int, str], _BudgetEntry] = {}
+        self._cache_keys: dict[int, set[str]] = {}
+        self._heap: list[tuple[float, int, tuple[int, str]]] = []
+        self._seq = itertools.count()
+        self._inflation = 0.0
+        self._total_bytes = 0
+        self._evictions: dict[tuple[str, str], int] = {}
+
+    @property
+    def max_bytes(self) -> float:
+        return self._get_max_bytes()
+
+    @property
+    def is_active(self) -> bool:
+        return self._get_max_bytes() > 0
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def record_write(self, cache: BudgetedTTLCache, key: str, size: int) -> None:
+        """Record that an entry was added to (or replaced in) a cache."""
+        with self._lock:
+            cache_id = id(cache)
+            entry_key = (cache_id, key)
+            entry = self._entries.get(entry_key)
+            if entry is None:
+                if cache_id not in self._cache_keys:
+                    self._cache_keys[cache_id] = set()
+                    weakref.finalize(cache, self._forget_cache, cache_id)
+                entry = _BudgetEntry(weakref.ref(cache), key, size)
+                self._entries[entry_key] = entry
+                self._cache_keys[cache_id].add(key)
+            else:
+                self._total_bytes -= entry.size
+                entry.size = size
+            self._total_bytes += size
+            self._push(entry_key, entry)
+
+    def record_hit(self, cache: BudgetedTTLCache, key: str) -> None:
+        """Record that an entry was read from a cache."""
+        with self._lock:
+            entry_key = (id(cache), key)
+            entry = self._entries.get(entry_key)
+            if entry is not None:
+                entry.frequency += 1
+                self._push(entry_key, entry)
+
+    def record_removal(self, cache: BudgetedTTLCache, key: str) -> None:
+        """Record that an entry was removed from a cache."""
+        with self._lock:
+            self._remove((id(cache), key))
+
+    def record_eviction(self, cache_type: str, cache_name: str) -> None:
+        """Count an entry that was evicted from a cache to stay within a budget."""
+        with self._lock:
+            self._evictions[cache_type, cache_name] = (
+                self._evictions.get((cache_type, cache_name), 0) + 1
+            )
+
+    def select_victims(self) -> list[tuple[BudgetedTTLCache, str]]:
+        """Stop tracking the lowest priority entries until the tracked entries
+        fit in the budget, and return their (cache, key) pairs.
+
+        The caller is responsible for removing the entries from their caches.
+        """
+        max_bytes = self._get_max_bytes()
+        victims: list[tuple[BudgetedTTLCache, str]] = []
+        with self._lock:
+            if max_bytes <= 0:
+                return victims
+
+            while self._total_bytes > max_bytes and self._heap:
+                priority, seq, entry_key = heapq.heappop(self._heap)
+                entry = self._entries.get(entry_key)
+                if entry is None or entry.seq != seq:
+                    continue
+
+                self._inflation = priority
+                self._remove(entry_key)
+                cache = entry.cache_ref()
+                if cache is not None:
+                    victims.append((cache, entry.key))
+        return victims
+
+    def get_stats(self) -> list[Stat]:
+        stats: list[Stat] = []
+        max_bytes = self._get_max_bytes()
+        if max_bytes > 0:
+            stats.append(
+                GaugeStat(CACHE_MEMORY_BUDGET_BYTES_FAMILY, (), int(max_bytes))
+            )
+        with self._lock:
+            evictions = list(self._evictions.items())
+        for (cache_type, cache_name), count in evictions:
+            stats.append(
+                CounterStat(
+                    CACHE_EVICTIONS_FAMILY,
+                    (("cache_type", cache_type), ("cache", cache_name)),
+                    count,
+                )
+            )
+        return stats
+
+    def _push(self, entry_key: tuple[int, str], entry: _BudgetEntry) -> None:
+        entry.seq = next(self._seq)
+        priority = self._inflation + entry.frequency / max(entry.size, 1)
+        heapq.heappush(self._heap, (priority, entry.seq, entry_key))
+
+        # Every hit leaves a stale heap item behind. Rebuild the heap when
+        # they start to dominate it.
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [
+                item
+                for item in self._heap
+                if (e := self._entries.get(item[2])) is not None and e.seq == item[1]
+            ]
+            heapq.heapify(self._heap)
+
+    def _remove(self, entry_key: tuple[int, str]) -> None:
+        entry = self._entries.pop(entry_key, None)
+        if entry is None:
+            return
+        self._total_bytes -= entry.size
+        cache_id, key = entry_key
+        keys = self._cache_keys.get(cache_id)
+        if keys is not None:
+            keys.discard(key)
+
+    def _forget_cache(self, cache_id: int) -> None:
+        """Stop tracking the entries of a cache that was garbage collected."""
+        with self._lock:
+            for key in self._cache_keys.pop(cache_id, set()):
+                entry = self._entries.pop((cache_id, key), None)
+                if entry is not None:
+                    self._total_bytes -= entry.size
+
+
+def _get_global_max_bytes() -> float:
+    return float(config.get_option("server.cacheMemoryBudget")) * 1024 * 1024
+
+
+# The budget shared by all function caches.
+_global_budget = CacheMemoryBudget(_get_global_max_bytes)
+
+
+def get_cache_memory_budget_stats_provider() -> StatsProvider:
+    """Return the StatsProvider for cache memory budgets."""
+    return _global_budget
+
+
+class BudgetedTTLCache(TTLCache):  # type: ignore[type-arg]
+    """A TTLCache whose entries are also evicted to stay within a per-cache
+    byte budget, and the global cache byte budget.
+
+    The owner of the cache must hold `lock` while accessing it, call
+    `record_hit` when it reads an entry, and call `enforce_budgets` after it
+    writes entries, *without* holding `lock`: evicting entries may need to
+    take the locks of other caches.
+    """
+
+    def __init__(
+        self,
+        maxsize: float,
+        ttl: float,
+        timer: Callable[[], float],
+        lock: threading.Lock,
+        entry_size: Callable[[Any], int],
+        max_bytes: int | None,
+        cache_type: str,
+        display_name: str,
+    ):
+        super().__init__(maxsize=maxsize, ttl=ttl, timer=timer)
+        self._lock = lock
+        self._entry_size = entry_size
+        self.max_bytes = max_bytes
+        self._cache_type = cache_type
+        self._display_name = display_name
+        self._budgets = [_global_budget]
+        if max_bytes:
+            function_max_bytes = float(max_bytes)
+            self._budgets.append(CacheMemoryBudget(lambda: function_max_bytes))
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        super().__setitem__(key, value)
+        budgets = [budget for budget in self._budgets if budget.is_active]
+        if budgets:
+            size = self._entry_size(value)
+            for budget in budgets:
+                budget.record_write(self, key, size)
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        for budget in self._budgets:
+            budget.record_removal(self, key)
+
+    def expire(self, time: float | None = None) -> Any:
+        # TTLCache.expire removes expired entries without going through
+        # __delitem__. cachetools>=5 returns them, so they can be untracked
+        # right away; with older versions they're untracked once they're
+        # picked as victims.
+        expired = super().expire(time)
+        for key, _ in expired or ():
+            for budget in self._budgets:
+                budget.record_removal(self, key)
+        return expired
+
+    def record_hit(self, key: str) -> None:
+        """Record a read of the given entry, which makes it less likely to be
+        evicted."""
+        for budget in self._budgets:
+            budget.record_hit(self, key)
+
+    def enforce_budgets(self) -> None:
+        """Evict entries until the budgets of this cache are respected. Entries
+        of other caches may be evicted too.
+
+        Must not be called while holding the lock of any cache.
+        """
+        for budget in self._budgets:
+            for cache, key in budget.select_victims():
+                cache._evict(key)
+
+    def _evict(self, key: str) -> None:
+        with self._lock:
+            if key not in self:
+                return
+            del self[key]
+        _global_budget.record_eviction(self._cache_type, self._display_name)
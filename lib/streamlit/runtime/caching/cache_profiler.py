@@ -0,0 +1,146 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Timing of the phases of st.cache_data and st.cache_resource calls.
+
+Every call of a cached function goes through some of these phases, which are
+timed separately for every cached function:
+
+- "hash_args": computing the cache key from the function's arguments.
+- "storage_lookup": reading the entry from the cache storage.
+- "unpickle": unpickling the entry (st.cache_data only).
+- "replay": replaying the elements and widgets of a cache hit.
+- "compute": calling the function on a cache miss.
+
+The timings are reported as histograms on the `/_stcore/metrics` endpoint.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Final, Iterator, Literal
+
+from streamlit.runtime.caching.cache_type import CacheType
+from streamlit.runtime.stats import Histogram, MetricFamily, Stat, StatsProvider
+
+CachePhase = Literal["hash_args", "storage_lookup", "unpickle", "replay", "compute"]
+
+CACHE_PHASE_DURATION_FAMILY: Final = MetricFamily(
+    name="cache_phase_duration_seconds",
+    type="histogram",
+    unit="seconds",
+    help="Time spent in each phase of a call to a cached function.",
+)
+
+# Upper bounds of the histogram buckets, from 100µs (a cheap key) to a minute
+# (a slow computation).
+_BUCKET_BOUNDS: Final = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+    10.0,
+    60.0,
+)
+
+_CACHE_TYPE_LABELS: Final = {
+    CacheType.DATA: "st_cache_data",
+    CacheType.RESOURCE: "st_cache_resource",
+}
+
+
+class CacheProfiler(StatsProvider):
+    """Records how long each phase of cached function calls takes.
+
+    Notes
+    -----
+    Threading: all methods are thread safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: dict[tuple[str, str, str], Histogram] = {}
+
+    @contextmanager
+    def measure(
+        self, cache_type: CacheType, cache_name: str, phase: CachePhase
+    ) -> Iterator[None]:
+        """Time the body of the `with` block as the given phase of a call
+        to the given cached function. Blocks that raise are timed too.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(cache_type, cache_name, phase, time.perf_counter() - start)
+
+    def record(
+        self,
+        cache_type: CacheType,
+        cache_name: str,
+        phase: CachePhase,
+        duration: float,
+    ) -> None:
+        """Record that a phase of a call to a cached function took `duration`
+        seconds.
+        """
+        key = (_CACHE_TYPE_LABELS[cache_type], cache_name, phase)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(_BUCKET_BOUNDS)
+            histogram.observe(duration)
+
+    def clear(self) -> None:
+        """Forget all recorded timings."""
+        with self._lock:
+            self._histograms.clear()
+
+    def get_stats(self) -> list[Stat]:
+        with self._lock:
+            return [
+                histogram.to_stat(
+                    CACHE_PHASE_DURATION_FAMILY,
+                    (
+                        ("cache_type", cache_type),
+                        ("cache", cache_name),
+                        ("phase", phase),
+                    ),
+                )
+                for (cache_type, cache_name, phase), histogram in sorted(
+                    self._histograms.items()
+                )
+            ]
+
+
+# Singleton CacheProfiler instance, shared by all cached functions.
+_cache_profiler = CacheProfiler()
+
+
+def get_cache_profiler() -> CacheProfiler:
+    """Return the CacheProfiler that times all cached function calls."""
+    return _cache_profiler
+
+
+def get_cache_profiler_stats_provider() -> StatsProvider:
+    """Return the StatsProvider for the timings of cached function calls."""
+    return _cache_profiler
@@ -21,13 +21,14 @@ import threading
 import types
 from typing import TYPE_CHECKING, Any, Callable, Final, TypeVar, cast, overload
 
-from cachetools import TTLCache
 from typing_extensions import TypeAlias
 
 import streamlit as st
 from streamlit.logger import get_logger
 from streamlit.runtime.caching import cache_utils
 from streamlit.runtime.caching.cache_errors import CacheKeyNotFoundError
+from streamlit.runtime.caching.cache_memory_budget import BudgetedTTLCache
+from streamlit.runtime.caching.cache_profiler import get_cache_profiler
 from streamlit.runtime.caching.cache_type import CacheType
 from streamlit.runtime.caching.cache_utils import (
     Cache,
@@ -44,7 +45,12 @@ from streamlit.runtime.caching.cached_message_replay import (
 )
 from streamlit.runtime.metrics_util import gather_metrics
 from streamlit.runtime.scriptrunner.script_run_context import get_script_run_ctx
-from streamlit.runtime.stats import CacheStat, CacheStatsProvider, group_stats
+from streamlit.runtime.stats import (
+    CacheStat,
+    CacheStatsProvider,
+    estimate_size,
+    group_stats,
+)
 from streamlit.time_util import time_to_seconds
 
 if TYPE_CHECKING:
@@ -69,6 +75,10 @@ def _equal_validate_funcs(a: ValidateFunc | None, b: ValidateFunc | None) -> boo
     return (a is None and b is None) or (a is not None and b is not None)
 
 
+def _multi_results_size(multi_results: MultiCacheResults) -> int:
+    return sum(estimate_size(result.value) for result in multi_results.results.values())
+
+
 class ResourceCaches(CacheStatsProvider):
     """Manages all ResourceCache instances"""
 
@@ -84,6 +94,7 @@ class ResourceCaches(CacheStatsProvider):
         ttl: float | timedelta | str | None,
         validate: ValidateFunc | None,
         allow_widgets: bool,
+        max_bytes: int | None = None,
     ) -> ResourceCache:
         """Return the mem cache for the given key.
 
@@ -103,6 +114,7 @@ class ResourceCaches(CacheStatsProvider):
                 and cache.ttl_seconds == ttl_seconds
                 and cache.max_entries == max_entries
                 and _equal_validate_funcs(cache.validate, validate)
+                and cache.max_bytes == max_bytes
             ):
                 return cache
 
@@ -115,6 +127,7 @@ class ResourceCaches(CacheStatsProvider):
                 ttl_seconds=ttl_seconds,
                 validate=validate,
                 allow_widgets=allow_widgets,
+                max_bytes=max_bytes,
             )
             self._function_caches[key] = cache
             return cache
@@ -157,6 +170,7 @@ class CachedResourceFuncInfo(CachedFuncInfo):
         validate: ValidateFunc | None,
         allow_widgets: bool,
         hash_funcs: HashFuncsDict | None = None,
+        max_bytes: int | None = None,
     ):
         super().__init__(
             func,
@@ -167,6 +181,7 @@ class CachedResourceFuncInfo(CachedFuncInfo):
         self.max_entries = max_entries
         self.ttl = ttl
         self.validate = validate
+        self.max_bytes = max_bytes
 
     @property
     def cache_type(self) -> CacheType:
@@ -189,6 +204,7 @@ class CachedResourceFuncInfo(CachedFuncInfo):
             ttl=self.ttl,
             validate=self.validate,
             allow_widgets=self.allow_widgets,
+            max_bytes=self.max_bytes,
         )
 
 
@@ -230,6 +246,7 @@ class CacheResourceAPI:
         validate: ValidateFunc | None = None,
         experimental_allow_widgets: bool = False,
         hash_funcs: HashFuncsDict | None = None,
+        max_bytes: int | None = None,
     ) -> Callable[[F], F]: ...
 
     def __call__(
@@ -242,6 +259,7 @@ class CacheResourceAPI:
         validate: ValidateFunc | None = None,
         experimental_allow_widgets: bool = False,
         hash_funcs: HashFuncsDict | None = None,
+        max_bytes: int | None = None,
     ):
         return self._decorator(
             func,
@@ -251,6 +269,7 @@ class CacheResourceAPI:
             validate=validate,
             experimental_allow_widgets=experimental_allow_widgets,
             hash_funcs=hash_funcs,
+            max_bytes=max_bytes,
         )
 
     def _decorator(
@@ -263,6 +282,7 @@ class CacheResourceAPI:
         validate: ValidateFunc | None,
         experimental_allow_widgets: bool,
         hash_funcs: HashFuncsDict | None = None,
+        max_bytes: int | None = None,
     ):
         """Decorator to cache functions that return global resources (e.g. database connections, ML models).
 
@@ -327,6 +347,15 @@ class CacheResourceAPI:
             the provided function to generate a hash for it. See below for an example
             of how this can be used.
 
+        max_bytes : int or None
+            The maximum total size, in bytes, of the resources kept in the
+            cache, or None for no per-function limit. When the limit is
+            exceeded, large entries that are rarely read are removed first.
+            All cached functions are also limited by the
+            ``server.cacheMemoryBudget`` config option. Sizes of pandas,
+            NumPy, and PyArrow objects are taken from their data buffers;
+            other objects are measured recursively. Defaults to None.
+
         .. deprecated::
             ``experimental_allow_widgets`` is deprecated and will be removed in
             a later version.
@@ -428,6 +457,7 @@ class CacheResourceAPI:
                     validate=validate,
                     allow_widgets=experimental_allow_widgets,
                     hash_funcs=hash_funcs,
+                    max_bytes=max_bytes,
                 )
             )
 
@@ -440,6 +470,7 @@ class CacheResourceAPI:
                 validate=validate,
                 allow_widgets=experimental_allow_widgets,
                 hash_funcs=hash_funcs,
+                max_bytes=max_bytes,
             )
         )
 
@@ -460,14 +491,22 @@ class ResourceCache(Cache):
         validate: ValidateFunc | None,
         display_name: str,
         allow_widgets: bool,
+        max_bytes: int | None = None,
     ):
         super().__init__()
         self.key = key
         self.display_name = display_name
-        self._mem_cache: TTLCache[str, MultiCacheResults] = TTLCache(
-            maxsize=max_entries, ttl=ttl_seconds, timer=cache_utils.TTLCACHE_TIMER
-        )
         self._mem_cache_lock = threading.Lock()
+        self._mem_cache = BudgetedTTLCache(
+            maxsize=max_entries,
+            ttl=ttl_seconds,
+            timer=cache_utils.TTLCACHE_TIMER,
+            lock=self._mem_cache_lock,
+            entry_size=_multi_results_size,
+            max_bytes=max_bytes,
+            cache_type="st_cache_resource",
+            display_name=display_name,
+        )
         self.validate = validate
         self.allow_widgets = allow_widgets
 
@@ -479,16 +518,23 @@ class ResourceCache(Cache):
     def ttl_seconds(self) -> float:
         return self._mem_cache.ttl
 
+    @property
+    def max_bytes(self) -> int | None:
+        return self._mem_cache.max_bytes
+
     def read_result(self, key: str) -> CachedResult:
         """Read a value and associated messages from the cache.
         Raise `CacheKeyNotFoundError` if the value doesn't exist.
         """
         with self._mem_cache_lock:
-            if key not in self._mem_cache:
-                # key does not exist in cache.
-                raise CacheKeyNotFoundError()
+            with get_cache_profiler().measure(
+                CacheType.RESOURCE, self.display_name, "storage_lookup"
+            ):
+                if key not in self._mem_cache:
+                    # key does not exist in cache.
+                    raise CacheKeyNotFoundError()
 
-            multi_results: MultiCacheResults = self._mem_cache[key]
+                multi_results: MultiCacheResults = self._mem_cache[key]
 
             ctx = get_script_run_ctx()
             if not ctx:
@@ -502,6 +548,7 @@ class ResourceCache(Cache):
                 raise CacheKeyNotFoundError()
 
             result = multi_results.results[widget_key]
+            self._mem_cache.record_hit(key)
 
             if self.validate is not None and not self.validate(result.value):
                 # Validate failed: delete the entry and raise an error.
@@ -540,6 +587,7 @@ class ResourceCache(Cache):
             result = CachedResult(value, messages, main_id, sidebar_id)
             multi_results.results[widget_key] = result
             self._mem_cache[key] = multi_results
+        self._mem_cache.enforce_budgets()
 
     def _clear(self, key: str | None = None) -> None:
         with self._mem_cache_lock:
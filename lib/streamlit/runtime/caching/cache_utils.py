@@ -23,6 +23,7 @@ import threading
 import time
 from abc import abstractmethod
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from typing import TYPE_CHECKING, Any, Callable, Final
 
 from streamlit import type_util
@@ -37,6 +38,7 @@ from streamlit.runtime.caching.cache_errors import (
     UnserializableReturnValueError,
     get_cached_func_name_md,
 )
+from streamlit.runtime.caching.cache_profiler import get_cache_profiler
 from streamlit.runtime.caching.cached_message_replay import (
     CachedMessageReplayContext,
     CachedResult,
@@ -44,6 +46,12 @@ from streamlit.runtime.caching.cached_message_replay import (
     replay_cached_messages,
 )
 from streamlit.runtime.caching.hashing import HashFuncsDict, update_hash
+from streamlit.runtime.scriptrunner.script_run_context import (
+    SCRIPT_RUN_CONTEXT_ATTR_NAME,
+    ScriptRunContext,
+    add_script_run_ctx,
+    get_script_run_ctx,
+)
 from streamlit.type_util import UNEVALUATED_DATAFRAME_TYPES
 from streamlit.util import HASHLIB_KWARGS
 
@@ -58,6 +66,17 @@ _LOGGER: Final = get_logger(__name__)
 # is exposed here as a constant so that it can be patched in unit tests.
 TTLCACHE_TIMER = time.monotonic
 
+# Stale values of caches with refresh="background" are recomputed on this
+# many threads at most.
+_MAX_REFRESH_WORKERS: Final = 4
+
+_refresh_executor = ThreadPoolExecutor(
+    max_workers=_MAX_REFRESH_WORKERS, thread_name_prefix="CacheRefresh"
+)
+_refreshes_lock = threading.Lock()
+# (id(cache), value_key) of the values that are being refreshed.
+_refreshes_in_flight: set[tuple[int, str]] = set()
+
 
 class Cache:
     """Function cache interface. Caches persist across script runs."""
@@ -87,6 +106,22 @@ class Cache:
         # a compute_value_lock for this value_key after the result is written.
         raise NotImplementedError
 
+    def is_stale(self, value_key: str) -> bool:
+        """True if the cached value is past its TTL, but is still served while
+        a new value is computed in the background.
+
+        Only caches that serve stale values need to override this.
+        """
+        return False
+
+    def should_prewarm(self, value_key: str) -> bool:
+        """True if the cached value is about to go stale, and is read often
+        enough that it's worth recomputing it in the background already.
+
+        Only caches that serve stale values need to override this.
+        """
+        return False
+
     def compute_value_lock(self, value_key: str) -> threading.Lock:
         """Return the lock that should be held while computing a new cached value.
         In a popular app with a cache that hasn't been pre-warmed, many sessions may try
@@ -141,6 +176,10 @@ class CachedFuncInfo:
     def cached_message_replay_ctx(self) -> CachedMessageReplayContext:
         raise NotImplementedError
 
+    @property
+    def display_name(self) -> str:
+        raise NotImplementedError
+
     def get_function_cache(self, function_key: str) -> Cache:
         """Get or create the function cache for the given key."""
         raise NotImplementedError
@@ -208,28 +247,43 @@ class CachedFunc:
 
         # Generate the key for the cached value. This is based on the
         # arguments passed to the function.
-        value_key = _make_value_key(
-            cache_type=self._info.cache_type,
-            func=self._info.func,
-            func_args=func_args,
-            func_kwargs=func_kwargs,
-            hash_funcs=self._info.hash_funcs,
-        )
+        with get_cache_profiler().measure(
+            self._info.cache_type, self._info.display_name, "hash_args"
+        ):
+            value_key = _make_value_key(
+                cache_type=self._info.cache_type,
+                func=self._info.func,
+                func_args=func_args,
+                func_kwargs=func_kwargs,
+                hash_funcs=self._info.hash_funcs,
+            )
 
         try:
             cached_result = cache.read_result(value_key)
-            return self._handle_cache_hit(cached_result)
         except CacheKeyNotFoundError:
-            pass
-        return self._handle_cache_miss(cache, value_key, func_args, func_kwargs)
+            return self._handle_cache_miss(cache, value_key, func_args, func_kwargs)
+
+        is_stale = cache.is_stale(value_key)
+        if cached_result.messages:
+            # Values with messages are never refreshed in the background: the
+            # messages of a background run can't be recorded reliably. Stale
+            # ones are recomputed right away instead, like expired ones.
+            if is_stale:
+                return self._handle_cache_miss(cache, value_key, func_args, func_kwargs)
+        elif is_stale or cache.should_prewarm(value_key):
+            self._refresh_in_background(cache, value_key, func_args, func_kwargs)
+        return self._handle_cache_hit(cached_result)
 
     def _handle_cache_hit(self, result: CachedResult) -> Any:
         """Handle a cache hit: replay the result's cached messages, and return its value."""
-        replay_cached_messages(
-            result,
-            self._info.cache_type,
-            self._info.func,
-        )
+        with get_cache_profiler().measure(
+            self._info.cache_type, self._info.display_name, "replay"
+        ):
+            replay_cached_messages(
+                result,
+                self._info.cache_type,
+                self._info.func,
+            )
         return result.value
 
     def _handle_cache_miss(
@@ -267,44 +321,110 @@ class CachedFunc:
             # before computing.
             try:
                 cached_result = cache.read_result(value_key)
-                # Another thread computed the value before us. Early exit!
-                return self._handle_cache_hit(cached_result)
+                if not cache.is_stale(value_key):
+                    # Another thread computed the value before us. Early exit!
+                    return self._handle_cache_hit(cached_result)
 
             except CacheKeyNotFoundError:
                 pass
 
             # We acquired the lock before any other thread. Compute the value!
-            with self._info.cached_message_replay_ctx.calling_cached_function(
-                self._info.func, self._info.allow_widgets
-            ):
-                computed_value = self._info.func(*func_args, **func_kwargs)
-
-            # We've computed our value, and now we need to write it back to the cache
-            # along with any "replay messages" that were generated during value computation.
-            messages = self._info.cached_message_replay_ctx._most_recent_messages
+            return self._compute_and_write_value(
+                cache, value_key, func_args, func_kwargs
+            )
+
+    def _refresh_in_background(
+        self,
+        cache: Cache,
+        value_key: str,
+        func_args: tuple[Any, ...],
+        func_kwargs: dict[str, Any],
+    ) -> None:
+        """Recompute a stale (or soon to be stale) value on the refresh thread
+        pool, unless it's already being recomputed. The new value replaces the
+        old one once it has been written to the cache.
+        """
+        refresh_id = (id(cache), value_key)
+        with _refreshes_lock:
+            if refresh_id in _refreshes_in_flight:
+                return
+            _refreshes_in_flight.add(refresh_id)
+
+        # Nested cached functions, and writing the result, need a
+        # ScriptRunContext. The refresh runs detached from the session that
+        # triggered it, so it can't send elements to or register widgets in
+        # that session.
+        ctx = get_script_run_ctx()
+        detached_ctx = _make_detached_script_run_ctx(ctx) if ctx else None
+
+        def refresh() -> None:
+            thread = threading.current_thread()
+            add_script_run_ctx(thread, detached_ctx)
             try:
-                cache.write_result(value_key, computed_value, messages)
-                return computed_value
-            except (CacheError, RuntimeError):
-                # An exception was thrown while we tried to write to the cache. Report it to the user.
-                # (We catch `RuntimeError` here because it will be raised by Apache Spark if we do not
-                # collect dataframe before using `st.cache_data`.)
-                if True in [
-                    type_util.is_type(computed_value, type_name)
-                    for type_name in UNEVALUATED_DATAFRAME_TYPES
-                ]:
-                    # If the returned value is an unevaluated dataframe, raise an error.
-                    # Unevaluated dataframes are not yet in the local memory, which also
-                    # means they cannot be properly cached (serialized).
-                    raise UnevaluatedDataFrameError(
-                        f"""
+                with cache.compute_value_lock(value_key):
+                    # A foreground cache miss may have recomputed the value
+                    # while we were queued.
+                    if cache.is_stale(value_key) or cache.should_prewarm(value_key):
+                        self._compute_and_write_value(
+                            cache, value_key, func_args, func_kwargs
+                        )
+            except Exception:
+                _LOGGER.warning(
+                    "Refreshing a value of %s in the background failed. "
+                    "The stale value is still served.",
+                    self._info.func.__qualname__,
+                    exc_info=True,
+                )
+            finally:
+                setattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME, None)
+                with _refreshes_lock:
+                    _refreshes_in_flight.discard(refresh_id)
+
+        _refresh_executor.submit(refresh)
+
+    def _compute_and_write_value(
+        self,
+        cache: Cache,
+        value_key: str,
+        func_args: tuple[Any, ...],
+        func_kwargs: dict[str, Any],
+    ) -> Any:
+        """Call the function, write its value to the cache, and return it.
+        The caller must hold the value's compute_value_lock.
+        """
+        with get_cache_profiler().measure(
+            self._info.cache_type, self._info.display_name, "compute"
+        ), self._info.cached_message_replay_ctx.calling_cached_function(
+            self._info.func, self._info.allow_widgets
+        ):
+            computed_value = self._info.func(*func_args, **func_kwargs)
+
+        # We've computed our value, and now we need to write it back to the cache
+        # along with any "replay messages" that were generated during value computation.
+        messages = self._info.cached_message_replay_ctx._most_recent_messages
+        try:
+            cache.write_result(value_key, computed_value, messages)
+            return computed_value
+        except (CacheError, RuntimeError):
+            # An exception was thrown while we tried to write to the cache. Report it to the user.
+            # (We catch `RuntimeError` here because it will be raised by Apache Spark if we do not
+            # collect dataframe before using `st.cache_data`.)
+            if True in [
+                type_util.is_type(computed_value, type_name)
+                for type_name in UNEVALUATED_DATAFRAME_TYPES
+            ]:
+                # If the returned value is an unevaluated dataframe, raise an error.
+                # Unevaluated dataframes are not yet in the local memory, which also
+                # means they cannot be properly cached (serialized).
+                raise UnevaluatedDataFrameError(
+                    f"""
                         The function {get_cached_func_name_md(self._info.func)} is decorated with `st.cache_data` but it returns an unevaluated dataframe
                         of type `{type_util.get_fqn_type(computed_value)}`. Please call `collect()` or `to_pandas()` on the dataframe before returning it,
                         so `st.cache_data` can serialize and cache it."""
-                    )
-                raise UnserializableReturnValueError(
-                    return_value=computed_value, func=self._info.func
                 )
+            raise UnserializableReturnValueError(
+                return_value=computed_value, func=self._info.func
+            )
 
     def clear(self, *args, **kwargs):
         """Clear the cached function's associated cache.
@@ -355,6 +475,25 @@ class CachedFunc:
         cache.clear(key=key)
 
 
+def _make_detached_script_run_ctx(ctx: ScriptRunContext) -> ScriptRunContext:
+    """Return a copy of `ctx` with its own, empty session state, whose
+    messages are dropped.
+    """
+    from streamlit.runtime.state import SafeSessionState, SessionState
+
+    return ScriptRunContext(
+        session_id=ctx.session_id,
+        _enqueue=lambda msg: None,
+        query_string=ctx.query_string,
+        session_state=SafeSessionState(SessionState(), lambda: None),
+        uploaded_file_mgr=ctx.uploaded_file_mgr,
+        main_script_path=ctx.main_script_path,
+        user_info=ctx.user_info,
+        fragment_storage=ctx.fragment_storage,
+        pages_manager=ctx.pages_manager,
+    )
+
+
 def _make_value_key(
     cache_type: CacheType,
     func: FunctionType,
@@ -25,6 +25,7 @@ import inspect
 import io
 import os
 import pickle
+import re
 import sys
 import tempfile
 import threading
@@ -50,8 +51,16 @@ _PANDAS_SAMPLE_SIZE: Final = 10000
 _NP_SIZE_LARGE: Final = 1000000
 _NP_SAMPLE_SIZE: Final = 100000
 
+# PyArrow Tables, RecordBatches, ChunkedArrays and Arrays.
+_PYARROW_TYPE_PATTERN: Final = re.compile(
+    r"^pyarrow\.lib\.(Table|RecordBatch|ChunkedArray|\w*Array)$"
+)
+
 HashFuncsDict: TypeAlias = Dict[Union[str, Type[Any]], Callable[[Any], Any]]
 
+# Hashes of objects bigger than this aren't memoized, see _ImmutableObjectHashes.
+_MEMOIZED_HASH_MAX_BYTES: Final = 1024
+
 # Arbitrary item to denote where we found a cycle in a hashed object.
 # This allows us to hash self-referencing lists, dictionaries, etc.
 _CYCLE_PLACEHOLDER: Final = (
@@ -225,6 +234,105 @@ class _HashStacks:
 hash_stacks = _HashStacks()
 
 
+class _ImmutableObjectHashes:
+    """Remembers the hashes of large objects that can't be mutated, so that
+    passing the same object to a cached function on every rerun doesn't hash
+    all of its data every time.
+
+    Hashes are keyed by the object's id, and by a version that changes if the
+    object is changed in a way that isn't a mutation of its data (e.g.
+    DataFrame columns being replaced). A weak reference to the object makes
+    sure that a hash isn't reused by another object that gets the same id, and
+    drops the hash once the object is garbage collected.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hashes: dict[int, tuple[weakref.ref[Any], Any, bytes]] = {}
+
+    def get_or_compute(
+        self, obj: Any, version: Any | None, compute: Callable[[Any], bytes]
+    ) -> bytes:
+        """Return the memoized hash of obj at the given version, or compute
+        and memoize it. If version is None, obj may be mutated, and its hash
+        is always computed.
+        """
+        if version is None:
+            return compute(obj)
+
+        obj_id = id(obj)
+        with self._lock:
+            entry = self._hashes.get(obj_id)
+        if entry is not None:
+            ref, entry_version, digest = entry
+            if ref() is obj and entry_version == version:
+                return digest
+
+        digest = compute(obj)
+        if len(digest) > _MEMOIZED_HASH_MAX_BYTES:
+            return digest
+
+        try:
+            ref = weakref.ref(obj, functools.partial(self._discard, obj_id))
+        except TypeError:
+            return digest
+        with self._lock:
+            self._hashes[obj_id] = (ref, version, digest)
+        return digest
+
+    def _discard(self, obj_id: int, ref: weakref.ref[Any]) -> None:
+        with self._lock:
+            entry = self._hashes.get(obj_id)
+            # The id may already have been reused by an object that's alive.
+            if entry is not None and entry[0] is ref:
+                del self._hashes[obj_id]
+
+
+_immutable_object_hashes = _ImmutableObjectHashes()
+
+
+def _is_read_only_ndarray(arr: Any) -> bool:
+    """True if the data of a NumPy array can't be mutated through it, or
+    through any other array or buffer that it views.
+    """
+    import numpy as np
+
+    if arr.dtype.hasobject:
+        # The array may be read-only, but the objects in it may not be.
+        return False
+
+    base = arr
+    while isinstance(base, np.ndarray):
+        if base.flags.writeable:
+            return False
+        base = base.base
+    if base is None or isinstance(base, bytes):
+        return True
+    if isinstance(base, memoryview):
+        return base.readonly
+    return False
+
+
+def _pandas_object_version(obj: Any) -> Any | None:
+    """Return a version for a Series or DataFrame whose data is read-only, or
+    None if its data may be mutated.
+    """
+    try:
+        arrays = obj._mgr.arrays
+    except AttributeError:
+        return None
+    if not all(
+        type_util.is_type(arr, "numpy.ndarray") and _is_read_only_ndarray(arr)
+        for arr in arrays
+    ):
+        return None
+
+    # Replacing the index, the columns or a block doesn't mutate any data, but
+    # changes the object that's being hashed.
+    columns = getattr(obj, "columns", None)
+    return (id(obj.index), id(columns), tuple(id(arr) for arr in arrays))
+
+
 def _int_to_bytes(i: int) -> bytes:
     num_bytes = (i.bit_length() + 8) // 8
     return i.to_bytes(num_bytes, "little", signed=True)
@@ -341,6 +449,113 @@ class _CacheFuncHasher:
         b = self.to_bytes(obj)
         hasher.update(b)
 
+    def _memoized_to_bytes(
+        self, obj: Any, version: Any | None, compute: Callable[[Any], bytes]
+    ) -> bytes:
+        if self._hash_funcs:
+            # User hash funcs may change how the parts of obj are hashed.
+            version = None
+        return _immutable_object_hashes.get_or_compute(obj, version, compute)
+
+    def _update_with_ndarray_data(self, hasher, arr: Any) -> None:
+        """Same as `self.update(hasher, arr.tobytes())`, but reads the data of
+        contiguous arrays through the buffer protocol instead of copying it.
+        """
+        if arr.dtype.hasobject or not arr.flags.c_contiguous:
+            self.update(hasher, arr.tobytes())
+            return
+
+        # This is what to_bytes() returns for a bytes object.
+        hasher.update(b"bytes:")
+        hasher.update(arr.reshape(-1).view("uint8"))
+
+    def _series_to_bytes(self, obj: Any) -> bytes:
+        import pandas as pd
+
+        h = hashlib.new("md5", **HASHLIB_KWARGS)
+        self.update(h, obj.size)
+        self.update(h, obj.dtype.name)
+
+        if len(obj) >= _PANDAS_ROWS_LARGE:
+            obj = obj.sample(n=_PANDAS_SAMPLE_SIZE, random_state=0)
+
+        try:
+            self._update_with_ndarray_data(h, pd.util.hash_pandas_object(obj).values)
+            return h.digest()
+        except TypeError:
+            # Use pickle if pandas cannot hash the object for example if
+            # it contains unhashable objects.
+            return b"%s" % pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+
+    def _dataframe_to_bytes(self, obj: Any) -> bytes:
+        import pandas as pd
+
+        h = hashlib.new("md5", **HASHLIB_KWARGS)
+        self.update(h, obj.shape)
+
+        if len(obj) >= _PANDAS_ROWS_LARGE:
+            obj = obj.sample(n=_PANDAS_SAMPLE_SIZE, random_state=0)
+        try:
+            column_hash_bytes = self.to_bytes(pd.util.hash_pandas_object(obj.dtypes))
+            self.update(h, column_hash_bytes)
+            values_hash_bytes = self.to_bytes(pd.util.hash_pandas_object(obj))
+            self.update(h, values_hash_bytes)
+            return h.digest()
+        except TypeError:
+            # Use pickle if pandas cannot hash the object for example if
+            # it contains unhashable objects.
+            return b"%s" % pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+
+    def _ndarray_to_bytes(self, obj: Any) -> bytes:
+        h = hashlib.new("md5", **HASHLIB_KWARGS)
+        self.update(h, obj.shape)
+        self.update(h, str(obj.dtype))
+
+        if obj.size >= _NP_SIZE_LARGE:
+            import numpy as np
+
+            state = np.random.RandomState(0)
+            # Same as `state.choice(obj.flat, ...)`, without first copying
+            # the whole array.
+            obj = obj.flat[state.choice(obj.size, size=_NP_SAMPLE_SIZE)]
+
+        self._update_with_ndarray_data(h, obj)
+        return h.digest()
+
+    def _arrow_to_bytes(self, obj: Any) -> bytes:
+        """Hash a PyArrow Table, RecordBatch, ChunkedArray or Array by its type
+        and the buffers of its chunks, which are read without copying them.
+        """
+        import pyarrow as pa
+
+        h = hashlib.new("md5", **HASHLIB_KWARGS)
+        if isinstance(obj, (pa.Table, pa.RecordBatch)):
+            self.update(h, obj.schema.to_string())
+            columns = obj.columns
+        else:
+            self.update(h, str(obj.type))
+            columns = [obj]
+
+        for column in columns:
+            chunks = column.chunks if isinstance(column, pa.ChunkedArray) else [column]
+            for chunk in chunks:
+                self._update_with_arrow_array(h, chunk)
+        return h.digest()
+
+    def _update_with_arrow_array(self, hasher, arr: Any) -> None:
+        import pyarrow as pa
+
+        self.update(hasher, arr.offset)
+        self.update(hasher, len(arr))
+        for buf in arr.buffers():
+            if buf is None:
+                self.update(hasher, None)
+            else:
+                self.update(hasher, buf.size)
+                hasher.update(buf)
+        if pa.types.is_dictionary(arr.type):
+            self._update_with_arrow_array(hasher, arr.dictionary)
+
     def _to_bytes(self, obj: Any) -> bytes:
         """Hash objects to bytes, including code with dependencies.
 
@@ -412,54 +627,25 @@ class _CacheFuncHasher:
             return str(obj).encode()
 
         elif type_util.is_type(obj, "pandas.core.series.Series"):
-            import pandas as pd
-
-            self.update(h, obj.size)
-            self.update(h, obj.dtype.name)
-
-            if len(obj) >= _PANDAS_ROWS_LARGE:
-                obj = obj.sample(n=_PANDAS_SAMPLE_SIZE, random_state=0)
-
-            try:
-                self.update(h, pd.util.hash_pandas_object(obj).values.tobytes())
-                return h.digest()
-            except TypeError:
-                # Use pickle if pandas cannot hash the object for example if
-                # it contains unhashable objects.
-                return b"%s" % pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+            return self._memoized_to_bytes(
+                obj, _pandas_object_version(obj), self._series_to_bytes
+            )
 
         elif type_util.is_type(obj, "pandas.core.frame.DataFrame"):
-            import pandas as pd
-
-            self.update(h, obj.shape)
-
-            if len(obj) >= _PANDAS_ROWS_LARGE:
-                obj = obj.sample(n=_PANDAS_SAMPLE_SIZE, random_state=0)
-            try:
-                column_hash_bytes = self.to_bytes(
-                    pd.util.hash_pandas_object(obj.dtypes)
-                )
-                self.update(h, column_hash_bytes)
-                values_hash_bytes = self.to_bytes(pd.util.hash_pandas_object(obj))
-                self.update(h, values_hash_bytes)
-                return h.digest()
-            except TypeError:
-                # Use pickle if pandas cannot hash the object for example if
-                # it contains unhashable objects.
-                return b"%s" % pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+            return self._memoized_to_bytes(
+                obj, _pandas_object_version(obj), self._dataframe_to_bytes
+            )
 
         elif type_util.is_type(obj, "numpy.ndarray"):
-            self.update(h, obj.shape)
-            self.update(h, str(obj.dtype))
-
-            if obj.size >= _NP_SIZE_LARGE:
-                import numpy as np
-
-                state = np.random.RandomState(0)
-                obj = state.choice(obj.flat, size=_NP_SAMPLE_SIZE)
-
-            self.update(h, obj.tobytes())
-            return h.digest()
+            return self._memoized_to_bytes(
+                obj,
+                () if _is_read_only_ndarray(obj) else None,
+                self._ndarray_to_bytes,
+            )
+
+        elif type_util.is_type(obj, _PYARROW_TYPE_PATTERN):
+            # PyArrow objects are immutable.
+            return self._memoized_to_bytes(obj, (), self._arrow_to_bytes)
         elif type_util.is_type(obj, "PIL.Image.Image"):
             import numpy as np
 
@@ -102,6 +102,11 @@ class CacheStorageContext:
         Legacy parameter, that used in Streamlit current cache storage implementation.
         Could be ignored by cache storage implementation, if storage does not support
         persistence or it persistent by default.
+
+    max_bytes : int or None
+        The maximum total size, in bytes, of the values kept in memory by the
+        cache storage. If None, only the global `server.cacheMemoryBudget`
+        limits their size.
     """
 
     function_key: str
@@ -109,6 +114,7 @@ class CacheStorageContext:
     ttl_seconds: float | None = None
     max_entries: int | None = None
     persist: Literal["disk"] | None = None
+    max_bytes: int | None = None
 
 
 class CacheStorage(Protocol):
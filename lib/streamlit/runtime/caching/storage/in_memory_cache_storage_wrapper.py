@@ -16,10 +16,9 @@ from __future__ import annotations
 import math
 import threading
 
-from cachetools import TTLCache
-
 from streamlit.logger import get_logger
 from streamlit.runtime.caching import cache_utils
+from streamlit.runtime.caching.cache_memory_budget import BudgetedTTLCache
 from streamlit.runtime.caching.storage.cache_storage_protocol import (
     CacheStorage,
     CacheStorageContext,
@@ -43,6 +42,10 @@ class InMemoryCacheStorageWrapper(CacheStorage):
     The in-memory cache is also an LRU cache, which means that the entries
     are automatically removed if the cache size exceeds a given maxsize.
 
+    Entries are also removed from the in-memory cache (but not from the
+    storage) when they exceed the cache's `max_bytes` budget, or the global
+    `server.cacheMemoryBudget`.
+
     If the storage implements its strategy for maxsize, it is recommended
     (but not necessary) that the storage implement the same LRU strategy,
     otherwise a situation may arise when different items are deleted from
@@ -62,12 +65,17 @@ class InMemoryCacheStorageWrapper(CacheStorage):
         self.function_display_name = context.function_display_name
         self._ttl_seconds = context.ttl_seconds
         self._max_entries = context.max_entries
-        self._mem_cache: TTLCache[str, bytes] = TTLCache(
+        self._mem_cache_lock = threading.Lock()
+        self._mem_cache = BudgetedTTLCache(
             maxsize=self.max_entries,
             ttl=self.ttl_seconds,
             timer=cache_utils.TTLCACHE_TIMER,
+            lock=self._mem_cache_lock,
+            entry_size=len,
+            max_bytes=context.max_bytes,
+            cache_type="st_cache_data",
+            display_name=self.function_display_name,
         )
-        self._mem_cache_lock = threading.Lock()
         self._persist_storage = persist_storage
 
     @property
@@ -128,7 +136,10 @@ class InMemoryCacheStorageWrapper(CacheStorage):
     def _read_from_mem_cache(self, key: str) -> bytes:
         with self._mem_cache_lock:
             if key in self._mem_cache:
-                entry = bytes(self._mem_cache[key])
+                # Return the stored bytes object itself, without copying it:
+                # values cached with copy="zero" share its memory.
+                entry: bytes = self._mem_cache[key]
+                self._mem_cache.record_hit(key)
                 _LOGGER.debug("Memory cache HIT: %s", key)
                 return entry
 
@@ -139,6 +150,7 @@ class InMemoryCacheStorageWrapper(CacheStorage):
     def _write_to_mem_cache(self, key: str, entry_bytes: bytes) -> None:
         with self._mem_cache_lock:
             self._mem_cache[key] = entry_bytes
+        self._mem_cache.enforce_budgets()
 
     def _remove_from_mem_cache(self, key: str) -> None:
         with self._mem_cache_lock:
@@ -0,0 +1,500 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Declares the SegmentFileCacheStorageManager class, which is used to create
+SegmentFileCacheStorage instances wrapped by InMemoryCacheStorageWrapper.
+
+Declares the SegmentFileCacheStorage class, which stores all persisted values
+of a single `@st.cache_data` function in one append-only segment file.
+
+How these classes work together
+-------------------------------
+
+- SegmentFileCacheStorageManager : creates SegmentFileCacheStorage instances
+wrapped by InMemoryCacheStorageWrapper, for functions with `persist="disk"`, and
+clears the cache storage folder.
+
+- SegmentFileCacheStorage : appends each `set` and `delete` to the function's
+segment file as a record, and keeps an in-memory index from keys to the
+location of their latest record. Values are read through a memory map of the
+segment file. `max_entries` and `ttl` are enforced on disk, and a background
+thread compacts the file once more than half of it is garbage.
+
+Unlike LocalDiskCacheStorage, which writes one file per entry, this storage
+never needs to list the cache directory, and its cost per operation doesn't
+depend on the number of cached entries.
+
+A segment file must only be used by one Streamlit process at a time.
+
+Segment file format
+-------------------
+The file is a sequence of records, each made of a header (see
+_RECORD_HEADER), the entry's key, and the entry's value. Deleted entries are
+marked by a "tombstone" record with an empty value. When a segment file is
+opened, the index is rebuilt by reading the record headers; a truncated
+record at the end of the file (e.g. after a crash) is discarded.
+"""
+
+from __future__ import annotations
+
+import math
+import mmap
+import os
+import shutil
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import BinaryIO, Final, NamedTuple
+from weakref import WeakSet
+
+from streamlit.logger import get_logger
+from streamlit.runtime.caching.storage.cache_storage_protocol import (
+    CacheStorage,
+    CacheStorageContext,
+    CacheStorageError,
+    CacheStorageKeyNotFoundError,
+    CacheStorageManager,
+)
+from streamlit.runtime.caching.storage.dummy_cache_storage import DummyCacheStorage
+from streamlit.runtime.caching.storage.in_memory_cache_storage_wrapper import (
+    InMemoryCacheStorageWrapper,
+)
+from streamlit.runtime.caching.storage.local_disk_cache_storage import (
+    get_cache_folder_path,
+)
+
+_LOGGER: Final = get_logger(__name__)
+
+_SEGMENT_FILE_EXTENSION: Final = "segment"
+
+# magic, flags, key length, value length, timestamp, CRC32 of the value
+_RECORD_HEADER: Final = struct.Struct("<4sBHQdI")
+_RECORD_MAGIC: Final = b"STCS"
+_FLAG_LIVE: Final = 0
+_FLAG_TOMBSTONE: Final = 1
+
+# Don't bother compacting segment files with less garbage than this.
+_COMPACTION_MIN_GARBAGE_BYTES: Final = 1 << 20
+
+
+class SegmentFileCacheStorageManager(CacheStorageManager):
+    def __init__(self):
+        self._storages: WeakSet[SegmentFileCacheStorage] = WeakSet()
+        self._storages_lock = threading.Lock()
+
+    def create(self, context: CacheStorageContext) -> CacheStorage:
+        """Creates a new cache storage instance wrapped with in-memory cache layer"""
+        persist_storage: CacheStorage
+        if context.persist == "disk":
+            persist_storage = SegmentFileCacheStorage(context)
+            with self._storages_lock:
+                self._storages.add(persist_storage)
+        else:
+            persist_storage = DummyCacheStorage()
+        return InMemoryCacheStorageWrapper(
+            persist_storage=persist_storage, context=context
+        )
+
+    def clear_all(self) -> None:
+        with self._storages_lock:
+            storages = list(self._storages)
+        for storage in storages:
+            storage.close()
+
+        cache_path = get_cache_folder_path()
+        if os.path.isdir(cache_path):
+            shutil.rmtree(cache_path)
+
+    def check_context(self, context: CacheStorageContext) -> None:
+        # Both max_entries and ttl are supported for persisted functions.
+        pass
+
+
+class _IndexEntry(NamedTuple):
+    """The location of a live record in the segment file."""
+
+    offset: int
+    record_len: int
+    value_len: int
+    timestamp: float
+    crc: int
+
+
+class SegmentFileCacheStorage(CacheStorage):
+    """Cache storage that persists all values of a function to a single
+    append-only segment file.
+
+    Entries are evicted in the order they were written when there are more
+    than `max_entries` of them, and expire `ttl_seconds` after they were
+    written.
+
+    Notes
+    -----
+    Threading: all public methods are thread-safe. Compaction runs on a
+    background thread, and only holds the storage's lock while it swaps the
+    compacted file in.
+    """
+
+    def __init__(self, context: CacheStorageContext):
+        self.function_key = context.function_key
+        self._ttl_seconds = context.ttl_seconds
+        self._max_entries = context.max_entries
+        self._path = os.path.join(
+            get_cache_folder_path(),
+            f"{self.function_key}.{_SEGMENT_FILE_EXTENSION}",
+        )
+
+        self._lock = threading.Lock()
+        # Live entries, in the order they were written.
+        self._index: OrderedDict[str, _IndexEntry] = OrderedDict()
+        self._live_bytes = 0
+        self._file: BinaryIO | None = None
+        self._file_size = 0
+        self._mmap: mmap.mmap | None = None
+        # Incremented whenever the segment file is closed or removed, so that
+        # an in-progress compaction knows to discard its result.
+        self._generation = 0
+        self._compaction_thread: threading.Thread | None = None
+
+    @property
+    def ttl_seconds(self) -> float:
+        return self._ttl_seconds if self._ttl_seconds is not None else math.inf
+
+    @property
+    def max_entries(self) -> float:
+        return float(self._max_entries) if self._max_entries is not None else math.inf
+
+    def get(self, key: str) -> bytes:
+        """Returns the stored value for the key, or raise
+        CacheStorageKeyNotFoundError if it's not found or expired.
+        """
+        with self._lock:
+            self._open_if_needed(create=False)
+            entry = self._index.get(key)
+            if entry is None:
+                raise CacheStorageKeyNotFoundError("Key not found in segment file")
+
+            if self._is_expired(entry):
+                self._delete(key)
+                raise CacheStorageKeyNotFoundError("Key expired in segment file")
+
+            value = self._read_value(entry)
+            if zlib.crc32(value) != entry.crc:
+                _LOGGER.error("Corrupted record for key %s in %s", key, self._path)
+                self._delete(key)
+                raise CacheStorageError("Unable to read from cache")
+
+            _LOGGER.debug("Segment file cache HIT: %s", key)
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        """Sets the value for a given key"""
+        with self._lock:
+            self._open_if_needed(create=True)
+            entry = self._append_record(key, value, _FLAG_LIVE)
+
+            old_entry = self._index.pop(key, None)
+            if old_entry is not None:
+                self._live_bytes -= old_entry.record_len
+            self._index[key] = entry
+            self._live_bytes += entry.record_len
+
+            self._evict_expired_and_excess_entries()
+            self._maybe_start_compaction()
+
+    def delete(self, key: str) -> None:
+        """Delete a given key"""
+        with self._lock:
+            self._open_if_needed(create=False)
+            self._delete(key)
+            self._maybe_start_compaction()
+
+    def clear(self) -> None:
+        """Delete all keys for the current storage"""
+        with self._lock:
+            self._close()
+            try:
+                os.remove(self._path)
+            except FileNotFoundError:
+                pass
+
+    def close(self) -> None:
+        """Release the segment file. The storage can still be used afterwards;
+        the file is reopened when it's needed again.
+        """
+        with self._lock:
+            self._close()
+
+    def compact(self) -> None:
+        """Rewrite the segment file so it only contains live entries.
+
+        Other operations can proceed while the live records are being copied.
+        Entries that are written or deleted in the meantime are reconciled
+        under the lock before the compacted file replaces the old one.
+        """
+        with self._lock:
+            if self._file is None:
+                return
+            self._evict_expired_and_excess_entries()
+            generation = self._generation
+            snapshot = dict(self._index)
+
+        tmp_path = f"{self._path}.compact"
+        try:
+            compacted: dict[str, _IndexEntry] = {}
+            offset = 0
+            with open(self._path, "rb") as src, open(tmp_path, "wb") as dst:
+                for key, entry in snapshot.items():
+                    src.seek(entry.offset)
+                    dst.write(src.read(entry.record_len))
+                    compacted[key] = entry._replace(offset=offset)
+                    offset += entry.record_len
+
+            with self._lock:
+                if generation != self._generation:
+                    # The file was closed or cleared while we were copying it.
+                    os.remove(tmp_path)
+                    return
+                self._swap_in_compacted_file(tmp_path, snapshot, compacted, offset)
+        except OSError as ex:
+            _LOGGER.warning("Unable to compact %s: %s", self._path, ex)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _swap_in_compacted_file(
+        self,
+        tmp_path: str,
+        snapshot: dict[str, _IndexEntry],
+        compacted: dict[str, _IndexEntry],
+        offset: int,
+    ) -> None:
+        """Reconcile the compacted file with changes made since the snapshot
+        was taken, and replace the segment file with it. Must be called with
+        the lock held.
+        """
+        index: OrderedDict[str, _IndexEntry] = OrderedDict()
+        with open(tmp_path, "r+b") as dst:
+            dst.seek(offset)
+            for key, entry in self._index.items():
+                if snapshot.get(key) == entry:
+                    index[key] = compacted[key]
+                    continue
+                # Written since the snapshot: copy the new record over.
+                dst.write(self._read_record(entry))
+                index[key] = entry._replace(offset=offset)
+                offset += entry.record_len
+
+            for key in snapshot.keys() - self._index.keys():
+                # Deleted since the snapshot: its record was copied, so it
+                # needs a tombstone in the compacted file.
+                tombstone = self._encode_record(key, b"", _FLAG_TOMBSTONE, 0.0)
+                dst.write(tombstone)
+                offset += len(tombstone)
+
+        self._close()
+        os.replace(tmp_path, self._path)
+        self._file = open(self._path, "r+b")
+        self._index = index
+        self._live_bytes = sum(entry.record_len for entry in index.values())
+        self._file_size = offset
+        _LOGGER.debug(
+            "Compacted %s to %s bytes (%s entries)", self._path, offset, len(index)
+        )
+
+    def _open_if_needed(self, create: bool) -> None:
+        """Open the segment file and load its index, if that hasn't happened
+        yet. Must be called with the lock held.
+        """
+        if self._file is not None:
+            return
+
+        if not os.path.exists(self._path):
+            if not create:
+                return
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            open(self._path, "ab").close()
+
+        try:
+            self._file = open(self._path, "r+b")
+            self._load_index()
+        except OSError as ex:
+            self._close()
+            raise CacheStorageError("Unable to open the cache segment file") from ex
+
+    def _load_index(self) -> None:
+        """Rebuild the index by reading the record headers of the segment file."""
+        assert self._file is not None
+        self._index.clear()
+        self._live_bytes = 0
+
+        file_size = os.fstat(self._file.fileno()).st_size
+        offset = 0
+        while offset + _RECORD_HEADER.size <= file_size:
+            self._file.seek(offset)
+            magic, flags, key_len, value_len, timestamp, crc = _RECORD_HEADER.unpack(
+                self._file.read(_RECORD_HEADER.size)
+            )
+            record_len = _RECORD_HEADER.size + key_len + value_len
+            if magic != _RECORD_MAGIC or offset + record_len > file_size:
+                break
+            key = self._file.read(key_len).decode("utf-8")
+
+            old_entry = self._index.pop(key, None)
+            if old_entry is not None:
+                self._live_bytes -= old_entry.record_len
+            if flags == _FLAG_LIVE:
+                self._index[key] = _IndexEntry(
+                    offset, record_len, value_len, timestamp, crc
+                )
+                self._live_bytes += record_len
+            offset += record_len
+
+        if offset < file_size:
+            _LOGGER.warning(
+                "Discarding %s bytes of truncated records at the end of %s",
+                file_size - offset,
+                self._path,
+            )
+            self._file.truncate(offset)
+        self._file_size = offset
+
+    def _close(self) -> None:
+        """Close the segment file. Must be called with the lock held."""
+        self._generation += 1
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._index.clear()
+        self._live_bytes = 0
+        self._file_size = 0
+
+    @staticmethod
+    def _encode_record(key: str, value: bytes, flags: int, timestamp: float) -> bytes:
+        key_bytes = key.encode("utf-8")
+        header = _RECORD_HEADER.pack(
+            _RECORD_MAGIC,
+            flags,
+            len(key_bytes),
+            len(value),
+            timestamp,
+            zlib.crc32(value),
+        )
+        return header + key_bytes + value
+
+    def _append_record(self, key: str, value: bytes, flags: int) -> _IndexEntry:
+        """Append a record to the segment file. Must be called with the lock
+        held, and with the file open.
+        """
+        assert self._file is not None
+        timestamp = time.time()
+        record = self._encode_record(key, value, flags, timestamp)
+        offset = self._file_size
+        try:
+            self._file.seek(offset)
+            self._file.write(record)
+            self._file.flush()
+        except OSError as ex:
+            # Don't leave a partial record behind.
+            try:
+                self._file.truncate(offset)
+            except OSError:
+                pass
+            raise CacheStorageError("Unable to write to cache") from ex
+
+        self._file_size += len(record)
+        return _IndexEntry(
+            offset, len(record), len(value), timestamp, zlib.crc32(value)
+        )
+
+    def _read_record(self, entry: _IndexEntry) -> bytes:
+        """Read a whole record through the memory map. Must be called with the
+        lock held.
+        """
+        mm = self._get_mmap()
+        return mm[entry.offset : entry.offset + entry.record_len]
+
+    def _read_value(self, entry: _IndexEntry) -> bytes:
+        """Read an entry's value through the memory map. Must be called with
+        the lock held.
+        """
+        mm = self._get_mmap()
+        value_end = entry.offset + entry.record_len
+        return mm[value_end - entry.value_len : value_end]
+
+    def _get_mmap(self) -> mmap.mmap:
+        """Return a memory map covering the whole segment file, remapping it
+        if the file has grown. Must be called with the lock held.
+        """
+        assert self._file is not None
+        if self._mmap is None or len(self._mmap) < self._file_size:
+            if self._mmap is not None:
+                self._mmap.close()
+            self._mmap = mmap.mmap(
+                self._file.fileno(), self._file_size, access=mmap.ACCESS_READ
+            )
+        return self._mmap
+
+    def _delete(self, key: str) -> None:
+        """Write a tombstone for the key, if it's live. Must be called with the
+        lock held.
+        """
+        entry = self._index.pop(key, None)
+        if entry is None:
+            return
+        self._live_bytes -= entry.record_len
+        self._append_record(key, b"", _FLAG_TOMBSTONE)
+
+    def _is_expired(self, entry: _IndexEntry) -> bool:
+        return time.time() - entry.timestamp > self.ttl_seconds
+
+    def _evict_expired_and_excess_entries(self) -> None:
+        """Delete expired entries, and the oldest entries beyond max_entries.
+        Must be called with the lock held.
+
+        The index is in write order, so both kinds of entries are at its front.
+        """
+        while self._index:
+            key, entry = next(iter(self._index.items()))
+            if len(self._index) <= self.max_entries and not self._is_expired(entry):
+                break
+            self._delete(key)
+
+    def _maybe_start_compaction(self) -> None:
+        """Compact the segment file in the background if more than half of it
+        is garbage. Must be called with the lock held.
+        """
+        garbage_bytes = self._file_size - self._live_bytes
+        if (
+            garbage_bytes < _COMPACTION_MIN_GARBAGE_BYTES
+            or garbage_bytes <= self._live_bytes
+            or (
+                self._compaction_thread is not None
+                and self._compaction_thread.is_alive()
+            )
+        ):
+            return
+
+        self._compaction_thread = threading.Thread(
+            target=self.compact,
+            name=f"SegmentFileCompaction-{self.function_key}",
+            daemon=True,
+        )
+        self._compaction_thread.start()
@@ -0,0 +1,189 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Declares the SharedDiskCacheStorageManager class, which is used when
+`streamlit run --workers N` runs several server processes.
+
+Every `@st.cache_data` function gets a SharedDiskCacheStorage wrapped by
+InMemoryCacheStorageWrapper. Each worker process keeps its own in-memory tier,
+and a value that one worker computed is read from disk by the others instead
+of being computed again:
+
+- Functions without `persist` store their entries in a directory that is
+  shared by the workers of one `streamlit run`, and removed when it exits.
+- Functions with `persist="disk"` store their entries in the regular cache
+  folder, just like with LocalDiskCacheStorage.
+
+Entries are written to a temporary file, which is then renamed, so that a
+worker never reads an entry that another worker is still writing.
+
+`max_entries` is only enforced by the in-memory tier, and clearing a function's
+cache in one worker doesn't clear the in-memory tiers of the other workers.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import shutil
+import time
+from typing import Final
+
+from streamlit.logger import get_logger
+from streamlit.runtime.caching.storage.cache_storage_protocol import (
+    CacheStorage,
+    CacheStorageContext,
+    CacheStorageError,
+    CacheStorageKeyNotFoundError,
+)
+from streamlit.runtime.caching.storage.in_memory_cache_storage_wrapper import (
+    InMemoryCacheStorageWrapper,
+)
+from streamlit.runtime.caching.storage.local_disk_cache_storage import (
+    LocalDiskCacheStorageManager,
+    get_cache_folder_path,
+)
+
+_LOGGER: Final = get_logger(__name__)
+
+_CACHED_FILE_EXTENSION: Final = "memo"
+
+
+class SharedDiskCacheStorageManager(LocalDiskCacheStorageManager):
+    def __init__(self, shared_dir: str):
+        self._shared_dir = shared_dir
+
+    def create(self, context: CacheStorageContext) -> CacheStorage:
+        """Creates a new cache storage instance wrapped with in-memory cache layer"""
+        directory = (
+            get_cache_folder_path() if context.persist == "disk" else self._shared_dir
+        )
+        return InMemoryCacheStorageWrapper(
+            persist_storage=SharedDiskCacheStorage(context, directory),
+            context=context,
+        )
+
+    def clear_all(self) -> None:
+        super().clear_all()
+        if os.path.isdir(self._shared_dir):
+            shutil.rmtree(self._shared_dir)
+
+
+class SharedDiskCacheStorage(CacheStorage):
+    """Cache storage that keeps every entry in its own file in `directory`,
+    where several processes can read and write it.
+    """
+
+    def __init__(self, context: CacheStorageContext, directory: str):
+        self.function_key = context.function_key
+        self.persist = context.persist
+        self._ttl_seconds = context.ttl_seconds
+        self._max_entries = context.max_entries
+        self._directory = directory
+
+    @property
+    def ttl_seconds(self) -> float:
+        return self._ttl_seconds if self._ttl_seconds is not None else math.inf
+
+    @property
+    def max_entries(self) -> float:
+        return float(self._max_entries) if self._max_entries is not None else math.inf
+
+    def get(self, key: str) -> bytes:
+        """Returns the stored value for the key, or raises
+        CacheStorageKeyNotFoundError if there is none or it has expired.
+        """
+        path = self._get_cache_file_path(key)
+        try:
+            with open(path, "rb") as input:
+                # Persisted functions don't support TTL, like with
+                # LocalDiskCacheStorage.
+                if self.persist != "disk" and self._is_expired(
+                    os.fstat(input.fileno()).st_mtime
+                ):
+                    raise CacheStorageKeyNotFoundError("Key expired in disk cache")
+                value = input.read()
+                _LOGGER.debug("Shared disk cache HIT: %s", key)
+                return value
+        except FileNotFoundError:
+            raise CacheStorageKeyNotFoundError("Key not found in disk cache")
+        except CacheStorageKeyNotFoundError:
+            self.delete(key)
+            raise
+        except Exception as ex:
+            _LOGGER.error(ex)
+            raise CacheStorageError("Unable to read from cache") from ex
+
+    def set(self, key: str, value: bytes) -> None:
+        """Sets the value for a given key"""
+        path = self._get_cache_file_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            with open(tmp_path, "wb") as output:
+                output.write(value)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            _LOGGER.debug(e)
+            # Clean up file so we don't leave partially written files.
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise CacheStorageError("Unable to write to cache") from e
+
+    def delete(self, key: str) -> None:
+        """Delete a cache file from disk. If the file does not exist on disk,
+        return silently. If another exception occurs, log it. Does not throw.
+        """
+        try:
+            os.remove(self._get_cache_file_path(key))
+        except FileNotFoundError:
+            # The file is already removed, possibly by another worker.
+            pass
+        except Exception as ex:
+            _LOGGER.exception(
+                "Unable to remove a file from the disk cache", exc_info=ex
+            )
+
+    def clear(self) -> None:
+        """Delete all keys for the current storage"""
+        if not os.path.isdir(self._directory):
+            return
+
+        for file_name in os.listdir(self._directory):
+            if self._is_cache_file(file_name):
+                try:
+                    os.remove(os.path.join(self._directory, file_name))
+                except FileNotFoundError:
+                    pass
+
+    def close(self) -> None:
+        """Dummy implementation of close, we don't need to actually "close" anything"""
+
+    def _is_expired(self, mtime: float) -> bool:
+        return time.time() - mtime > self.ttl_seconds
+
+    def _get_cache_file_path(self, value_key: str) -> str:
+        """Return the path of the disk cache file for the given value."""
+        return os.path.join(
+            self._directory,
+            f"{self.function_key}-{value_key}.{_CACHED_FILE_EXTENSION}",
+        )
+
+    def _is_cache_file(self, fname: str) -> bool:
+        """Return true if the given file name is a cache file for this storage."""
+        return fname.startswith(f"{self.function_key}-") and fname.endswith(
+            f".{_CACHED_FILE_EXTENSION}"
+        )
@@ -0,0 +1,121 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Pickling with out-of-band buffers, used by @st.cache_data(copy="zero").
+
+Objects that support pickle protocol 5 out-of-band buffers (NumPy arrays,
+pandas objects backed by them, PyArrow arrays and tables, ...) hand their
+large data buffers to the pickler instead of copying them into the pickle
+stream. `dumps` lays those buffers out in a single bytes object after the
+(small) pickle stream, and `loads` passes read-only views into that bytes
+object back to the unpickler. Unpickling therefore doesn't copy the buffers:
+the returned objects share memory with the serialized data, and are read-only.
+
+Layout of a serialized object::
+
+    MAGIC | uint32 num_buffers | uint64 pickle_len | uint64 buffer_len * n
+    | pickle stream | padding | buffer 0 | padding | buffer 1 | ...
+
+Buffers are aligned to _ALIGNMENT bytes, so that arrays viewing them are
+properly aligned.
+"""
+
+from __future__ import annotations
+
+import pickle
+import struct
+from typing import Any, Final
+
+_MAGIC: Final = b"STZC\x01"
+_HEADER: Final = struct.Struct("<IQ")
+_BUFFER_LEN: Final = struct.Struct("<Q")
+_ALIGNMENT: Final = 64
+
+
+def _padding(offset: int) -> int:
+    return -offset % _ALIGNMENT
+
+
+def is_zero_copy_pickle(data: bytes) -> bool:
+    """True if `data` was created by `dumps`, rather than by `pickle.dumps`."""
+    return data[: len(_MAGIC)] == _MAGIC
+
+
+def dumps(obj: Any) -> bytes:
+    """Pickle an object, storing its out-of-band buffers alongside the
+    pickle stream.
+
+    Raises the same exceptions as `pickle.dumps`.
+    """
+    buffers: list[pickle.PickleBuffer] = []
+    pickled = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    raw_buffers = [buf.raw() for buf in buffers]
+
+    parts: list[bytes | memoryview] = [
+        _MAGIC,
+        _HEADER.pack(len(raw_buffers), len(pickled)),
+        *(_BUFFER_LEN.pack(raw.nbytes) for raw in raw_buffers),
+        pickled,
+    ]
+    offset = sum(len(part) for part in parts)
+    for raw in raw_buffers:
+        parts.append(b"\0" * _padding(offset))
+        offset += _padding(offset)
+        parts.append(raw)
+        offset += raw.nbytes
+
+    return b"".join(parts)
+
+
+def loads(data: bytes) -> Any:
+    """Unpickle an object serialized by `dumps`, without copying its
+    out-of-band buffers.
+
+    The buffers of the returned object are read-only views into `data`, which
+    is kept alive for as long as they are.
+
+    Raises
+    ------
+    pickle.UnpicklingError
+        If the data is malformed.
+    """
+    if not is_zero_copy_pickle(data):
+        raise pickle.UnpicklingError("Not a zero-copy pickle")
+
+    view = memoryview(data).toreadonly()
+    try:
+        offset = len(_MAGIC)
+        num_buffers, pickle_len = _HEADER.unpack_from(view, offset)
+        offset += _HEADER.size
+        buffer_lens = [
+            _BUFFER_LEN.unpack_from(view, offset + i * _BUFFER_LEN.size)[0]
+            for i in range(num_buffers)
+        ]
+        offset += num_buffers * _BUFFER_LEN.size
+    except struct.error as ex:
+        raise pickle.UnpicklingError("Truncated zero-copy pickle header") from ex
+
+    pickled = view[offset : offset + pickle_len]
+    offset += pickle_len
+
+    buffers = []
+    for buffer_len in buffer_lens:
+        offset += _padding(offset)
+        buffers.append(view[offset : offset + buffer_len])
+        offset += buffer_len
+
+    if offset > len(view):
+        raise pickle.UnpicklingError("Truncated zero-copy pickle")
+
+    return pickle.loads(pickled, buffers=buffers)
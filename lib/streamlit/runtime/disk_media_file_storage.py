@@ -0,0 +1,325 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""MediaFileStorage implementation that stores large files on disk, which is
+used when `server.mediaFileStorage` is "disk".
+
+Files are written to a directory that belongs to the process, named after their
+IDs, which are hashes of their content. Small files are kept in memory, like
+with MemoryMediaFileStorage, as long as they fit in `memory_budget_bytes`. Once
+they don't, the ones that were served least recently are moved to disk.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import mmap
+import os
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Final, NamedTuple
+
+from streamlit.logger import get_logger
+from streamlit.runtime.media_file_storage import (
+    MediaFileKind,
+    MediaFileStorage,
+    MediaFileStorageError,
+)
+from streamlit.runtime.memory_media_file_storage import (
+    MediaFileSourceIndex,
+    MemoryFile,
+    _calculate_file_id,
+    get_extension_for_mimetype,
+)
+from streamlit.runtime.stats import CacheStat, CacheStatsProvider, group_stats
+
+_LOGGER: Final = get_logger(__name__)
+
+# Files that are larger than this are always stored on disk.
+_SPILL_THRESHOLD_BYTES: Final = 1024 * 1024  # 1MB
+
+
+class DiskFile(NamedTuple):
+    """A MediaFile stored on disk."""
+
+    path: str
+    content_size: int
+    mimetype: str
+    kind: MediaFileKind
+    filename: str | None
+
+    @property
+    def content(self) -> bytes | mmap.mmap:
+        """The file's content, memory-mapped from disk so that it can be
+        sliced without reading all of it.
+        """
+        if self.content_size == 0:
+            # Empty files can't be memory-mapped.
+            return b""
+        try:
+            with open(self.path, "rb") as f:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except OSError as ex:
+            raise MediaFileStorageError(f"Error opening '{self.path}'") from ex
+
+
+class DiskMediaFileStorage(MediaFileStorage, CacheStatsProvider):
+    def __init__(
+        self,
+        media_endpoint: str,
+        memory_budget_bytes: int,
+        path: str | None = None,
+    ):
+        """Create a new DiskMediaFileStorage instance
+
+        Parameters
+        ----------
+        media_endpoint
+            The name of the local endpoint that media is served from.
+            This endpoint should start with a forward-slash (e.g. "/media").
+
+        memory_budget_bytes
+            The maximum size of the small files that are kept in memory.
+
+        path
+            The directory to store files in. If None, a temporary directory is
+            created, and removed when the process exits.
+        """
+        if path is None:
+            self._tmp_dir = tempfile.TemporaryDirectory(prefix="streamlit-media-")
+            path = self._tmp_dir.name
+        else:
+            os.makedirs(path, exist_ok=True)
+        self._path = path
+        self._media_endpoint = media_endpoint
+        self._memory_budget_bytes = memory_budget_bytes
+
+        self._files_by_id: dict[str, MemoryFile | DiskFile] = {}
+        # The IDs of the files kept in memory, least recently served first,
+        # and their total size.
+        self._memory_file_ids: OrderedDict[str, None] = OrderedDict()
+        self._memory_size = 0
+        # The IDs of the files in memory that are being written to disk. They
+        # are still served from memory until they're written.
+        self._evicting_file_ids: set[str] = set()
+        # Bytes are only indexed while they are kept in memory.
+        self.source_index = MediaFileSourceIndex()
+        self._lock = threading.Lock()
+
+    def load_and_get_id(
+        self,
+        path_or_data: str | bytes,
+        mimetype: str,
+        kind: MediaFileKind,
+        filename: str | None = None,
+    ) -> str:
+        """Add a file to the manager and return its ID."""
+        source_key = MediaFileSourceIndex.get_key(path_or_data, mimetype, filename)
+        with self._lock:
+            known_file_id = self.source_index.get(source_key, path_or_data)
+        if known_file_id is not None:
+            return known_file_id
+
+        file_data: bytes
+        if isinstance(path_or_data, str):
+            file_data = self._read_file(path_or_data)
+        else:
+            file_data = path_or_data
+
+        # Because our file_ids are stable, if we already have a file with the
+        # given ID, we don't need to create a new one.
+        file_id = _calculate_file_id(file_data, mimetype, filename)
+        if file_id in self._files_by_id:
+            if isinstance(path_or_data, str):
+                with self._lock:
+                    self.source_index.add(source_key, path_or_data, file_id)
+            return file_id
+
+        _LOGGER.debug("Adding media file %s", file_id)
+        memory_file = MemoryFile(
+            content=file_data, mimetype=mimetype, kind=kind, filename=filename
+        )
+        if (
+            len(file_data) > _SPILL_THRESHOLD_BYTES
+            or len(file_data) > self._memory_budget_bytes
+        ):
+            # Large files are written outside of the lock, so that serving
+            # other files isn't blocked by it.
+            disk_file = self._write_file(file_id, memory_file)
+            with self._lock:
+                self._files_by_id[file_id] = disk_file
+                if isinstance(path_or_data, str):
+                    self.source_index.add(source_key, path_or_data, file_id)
+            return file_id
+
+        with self._lock:
+            if file_id not in self._files_by_id:
+                self._files_by_id[file_id] = memory_file
+                self._memory_file_ids[file_id] = None
+                self._memory_size += len(file_data)
+                self.source_index.add(source_key, path_or_data, file_id)
+            evicted_files = self._pick_files_to_evict()
+        self._evict_files(evicted_files)
+        return file_id
+
+    def get_file(self, filename: str) -> MemoryFile | DiskFile:
+        """Return the MemoryFile or DiskFile with the given filename. Filenames
+        are of the form "file_id.extension". (Note that this is *not* the
+        optional user-specified filename for download files.)
+
+        Raises a MediaFileStorageError if no such file exists.
+        """
+        file_id = os.path.splitext(filename)[0]
+        with self._lock:
+            try:
+                media_file = self._files_by_id[file_id]
+            except KeyError as e:
+                raise MediaFileStorageError(
+                    f"Bad filename '{filename}'. (No media file with id '{file_id}')"
+                ) from e
+            if file_id in self._memory_file_ids:
+                self._memory_file_ids.move_to_end(file_id)
+        return media_file
+
+    def get_url(self, file_id: str) -> str:
+        """Get a URL for a given media file. Raise a MediaFileStorageError if
+        no such file exists.
+        """
+        media_file = self.get_file(file_id)
+        extension = get_extension_for_mimetype(media_file.mimetype)
+        return f"{self._media_endpoint}/{file_id}{extension}"
+
+    def delete_file(self, file_id: str) -> None:
+        """Delete the file with the given ID."""
+        with self._lock:
+            media_file = self._files_by_id.pop(file_id, None)
+            self.source_index.remove(file_id)
+            if isinstance(media_file, MemoryFile):
+                del self._memory_file_ids[file_id]
+                self._memory_size -= media_file.content_size
+
+        if isinstance(media_file, DiskFile):
+            try:
+                os.remove(media_file.path)
+            except OSError as ex:
+                # E.g. on Windows, if the file is still being served.
+                _LOGGER.debug("Unable to delete media file %s: %s", file_id, ex)
+
+    def _pick_files_to_evict(self) -> dict[str, MemoryFile]:
+        """Return the files that were served least recently, and that have to
+        be moved to disk so that the rest fit in the memory budget. Must be
+        called with the lock held.
+        """
+        excess_size = self._memory_size - self._memory_budget_bytes
+        for file_id in self._evicting_file_ids:
+            # Files that are deleted while they're written stay in the set
+            # until then, so that no other thread writes them meanwhile.
+            if file_id in self._memory_file_ids:
+                excess_size -= self._files_by_id[file_id].content_size
+
+        evicted_files: dict[str, MemoryFile] = {}
+        for file_id in self._memory_file_ids:
+            if excess_size <= 0:
+                break
+            if file_id in self._evicting_file_ids:
+                continue
+            memory_file = self._files_by_id[file_id]
+            assert isinstance(memory_file, MemoryFile)
+            evicted_files[file_id] = memory_file
+            excess_size -= memory_file.content_size
+
+        self._evicting_file_ids.update(evicted_files)
+        return evicted_files
+
+    def _evict_files(self, evicted_files: dict[str, MemoryFile]) -> None:
+        """Write the files returned by `_pick_files_to_evict` to disk, outside
+        of the lock, and then serve them from disk.
+        """
+        for file_id, memory_file in evicted_files.items():
+            try:
+                disk_file = self._write_file(file_id, memory_file)
+            except MediaFileStorageError as ex:
+                # The file stays in memory, where it was in the LRU order.
+                _LOGGER.warning("Unable to move media file %s to disk: %s", file_id, ex)
+                disk_file = None
+
+            with self._lock:
+                self._evicting_file_ids.discard(file_id)
+                if disk_file is None:
+                    continue
+                if self._files_by_id.get(file_id) is not memory_file:
+                    # The file was deleted while it was being written.
+                    with contextlib.suppress(OSError):
+                        os.remove(disk_file.path)
+                    continue
+                self._files_by_id[file_id] = disk_file
+                del self._memory_file_ids[file_id]
+                self._memory_size -= memory_file.content_size
+                self.source_index.remove(file_id, keep_paths=True)
+
+    def _write_file(self, file_id: str, memory_file: MemoryFile) -> DiskFile:
+        """Write a file's content to disk, unless it's already there, and
+        return its DiskFile.
+        """
+        path = os.path.join(self._path, file_id)
+        if not os.path.exists(path):
+            # Write to a temporary file first, so that a file that's being
+            # written is never served.
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(memory_file.content)
+                os.replace(tmp_path, path)
+            except OSError as ex:
+                with contextlib.suppress(OSError):
+                    os.remove(tmp_path)
+                raise MediaFileStorageError(
+                    f"Error writing media file to '{path}'"
+                ) from ex
+
+        return DiskFile(
+            path=path,
+            content_size=memory_file.content_size,
+            mimetype=memory_file.mimetype,
+            kind=memory_file.kind,
+            filename=memory_file.filename,
+        )
+
+    def _read_file(self, filename: str) -> bytes:
+        """Read a file into memory. Raise MediaFileStorageError if we can't."""
+        try:
+            with open(filename, "rb") as f:
+                return f.read()
+        except Exception as ex:
+            raise MediaFileStorageError(f"Error opening '{filename}'") from ex
+
+    def get_stats(self) -> list[CacheStat]:
+        # Only the files kept in memory count.
+        with self._lock:
+            sizes = [
+                self._files_by_id[file_id].content_size
+                for file_id in self._memory_file_ids
+            ]
+
+        stats: list[CacheStat] = [
+            CacheStat(
+                category_name="st_disk_media_file_storage",
+                cache_name="",
+                byte_length=size,
+            )
+            for size in sizes
+        ]
+        return group_stats(stats)
@@ -0,0 +1,385 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Declares the DiskSessionStorage class, which is used when
+`server.sessionStorage` is "disk".
+
+Disconnected sessions are first kept in memory, just like with
+MemorySessionStorage, so that clients that reconnect after a short network
+blip get their session back as it was. Once a session has been disconnected for
+longer than `ttl_seconds`, or more than `maxsize` sessions are disconnected,
+its SessionSnapshot is written to a SQLite database and the session is shut
+down. When its client reconnects later, the SessionManager creates a new
+session from the snapshot.
+
+Pickling session state and waiting for the database can take a while, so when
+the storage is used from the Runtime's event loop, snapshots are written, read
+and deleted on a background thread. A session is shut down once its snapshot is
+written, and the SessionManager loads the snapshot with `load_snapshot` before
+it calls `pop_snapshot`.
+
+The database holds the snapshots of several apps, and of several processes
+(e.g. with `server.workers`), so each snapshot is saved with the path of its
+app's main script. Once the snapshots in the database take more than
+`max_bytes`, the oldest ones are removed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Final, Iterator
+
+from streamlit.logger import get_logger
+from streamlit.runtime.session_manager import (
+    SessionInfo,
+    SessionSnapshot,
+    SessionSnapshotStorage,
+    SessionStorageError,
+)
+
+_LOGGER: Final = get_logger(__name__)
+
+# How long to wait for another process that is writing to the database.
+_DB_TIMEOUT_SECONDS: Final = 5.0
+
+
+class DiskSessionStorage(SessionSnapshotStorage):
+    """A SessionStorage that keeps recently disconnected sessions in memory, and
+    the SessionSnapshots of older ones in a SQLite database.
+
+    `list` and `get` only return the sessions that are in memory.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        script_path: str,
+        max_bytes: int,
+        maxsize: int = 128,
+        ttl_seconds: float = 2 * 60,  # 2 minutes
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Instantiate a new DiskSessionStorage.
+
+        Parameters
+        ----------
+        path
+            The path of the SQLite database file. It's created if it doesn't
+            exist.
+
+        script_path
+            The path of the app's main script. Only snapshots that were saved
+            with the same path are returned by `pop_snapshot`.
+
+        max_bytes
+            The maximum size of all snapshots in the database.
+
+        maxsize
+            The maximum number of sessions kept in memory.
+
+        ttl_seconds
+            The time in seconds for a session to be kept in memory, before it is
+            shut down and its snapshot is written to the database.
+
+        clock
+            The function returning the current time. Overridden in tests.
+        """
+        self._path = path
+        self._script_path = script_path
+        self._max_bytes = max_bytes
+        self._maxsize = maxsize
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+
+        # Mapping of session_id -> (SessionInfo, time it was saved), oldest first.
+        self._sessions: OrderedDict[str, tuple[SessionInfo, float]] = OrderedDict()
+
+        # Mapping of session_id -> SessionInfo, for the sessions whose snapshots
+        # are being written. They're shut down once their snapshot is written.
+        self._spilling: dict[str, SessionInfo] = {}
+
+        # Mapping of session_id -> (SessionSnapshot, time it was loaded), for the
+        # snapshots read by `load_snapshot`, oldest first.
+        self._loaded_snapshots: OrderedDict[
+            str, tuple[SessionSnapshot | None, float]
+        ] = OrderedDict()
+
+        # The connection is opened on first use, so that a storage that is
+        # created before `server.workers` processes are forked isn't shared
+        # between them.
+        self._conn: sqlite3.Connection | None = None
+        self._conn_pid: int | None = None
+        self._conn_lock = threading.Lock()
+
+        # All database accesses made from the event loop run on this thread, one
+        # after another, so e.g. a snapshot is never deleted before it's written.
+        # Like the connection, it's created on first use.
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_pid: int | None = None
+
+    def get(self, session_id: str) -> SessionInfo | None:
+        self._spill_expired_sessions()
+        entry = self._sessions.get(session_id)
+        return entry[0] if entry is not None else self._spilling.get(session_id)
+
+    def save(self, session_info: SessionInfo) -> None:
+        session_id = session_info.session.id
+        self._sessions.pop(session_id, None)
+        self._sessions[session_id] = (session_info, self._clock())
+        self._spill_expired_sessions()
+
+    def delete(self, session_id: str) -> None:
+        if self._sessions.pop(session_id, None) is not None:
+            return
+        # If the session's snapshot is being written, the session keeps running,
+        # and the snapshot is deleted once it's written.
+        self._spilling.pop(session_id, None)
+        self._loaded_snapshots.pop(session_id, None)
+        self._run_in_background(self._delete_snapshot, session_id)
+
+    def list(self) -> list[SessionInfo]:
+        self._spill_expired_sessions()
+        return [session_info for session_info, _ in self._sessions.values()] + list(
+            self._spilling.values()
+        )
+
+    async def load_snapshot(self, session_id: str) -> None:
+        snapshot = None
+        try:
+            snapshot = await asyncio.get_running_loop().run_in_executor(
+                self._get_executor(), self._read_snapshot, session_id
+            )
+        finally:
+            # Also when reading failed, so that pop_snapshot doesn't retry on the
+            # event loop.
+            self._loaded_snapshots.pop(session_id, None)
+            self._loaded_snapshots[session_id] = (snapshot, self._clock())
+
+    def pop_snapshot(self, session_id: str) -> SessionSnapshot | None:
+        entry = self._loaded_snapshots.pop(session_id, None)
+        snapshot = entry[0] if entry is not None else self._read_snapshot(session_id)
+        if snapshot is not None:
+            self._run_in_background(self._delete_snapshot, session_id)
+        return snapshot
+
+    def _spill_expired_sessions(self) -> None:
+        """Shut down the sessions that have been kept in memory for too long, or
+        that don't fit, once their snapshots are saved to the database.
+        """
+        now = self._clock()
+        while self._sessions:
+            session_id, (session_info, saved_at) = next(iter(self._sessions.items()))
+            if (
+                len(self._sessions) <= self._maxsize
+                and now - saved_at < self._ttl_seconds
+            ):
+                break
+            del self._sessions[session_id]
+            self._spilling[session_id] = session_info
+            self._run_in_background(
+                self._write_snapshot,
+                session_info,
+                on_done=functools.partial(self._on_spilled, session_info),
+            )
+
+        # Snapshots that were loaded for a client that went away are still in the
+        # database.
+        while self._loaded_snapshots:
+            session_id, (_, loaded_at) = next(iter(self._loaded_snapshots.items()))
+            if now - loaded_at < self._ttl_seconds:
+                break
+            del self._loaded_snapshots[session_id]
+
+    def _on_spilled(self, session_info: SessionInfo) -> None:
+        session = session_info.session
+        # The session isn't shut down if its client reconnected in the meantime.
+        if self._spilling.get(session.id) is session_info:
+            del self._spilling[session.id]
+            session.shutdown()
+
+    def _run_in_background(
+        self,
+        func: Callable[..., None],
+        *args: Any,
+        on_done: Callable[[], None] | None = None,
+    ) -> None:
+        """Run func on the storage's thread if called from an event loop, or
+        right away otherwise, then call on_done on the caller's thread.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # E.g. in scripts that use the storage directly.
+            func(*args)
+            if on_done is not None:
+                on_done()
+            return
+
+        future = loop.run_in_executor(self._get_executor(), func, *args)
+        if on_done is not None:
+            future.add_done_callback(lambda _: on_done())
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="DiskSessionStorage"
+            )
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def _write_snapshot(self, session_info: SessionInfo) -> None:
+        session = session_info.session
+        try:
+            snapshot = session.get_snapshot(session_info.script_run_count)
+            self._save_snapshot(snapshot)
+        except Exception as ex:
+            # The session is lost, just like when MemorySessionStorage drops it.
+            _LOGGER.warning("Unable to save session %s to disk: %s", session.id, ex)
+
+    def _read_snapshot(self, session_id: str) -> SessionSnapshot | None:
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT script_run_count, client_state, user_state FROM snapshots "
+                "WHERE session_id = ? AND script_path = ?",
+                (session_id, self._script_path),
+            ).fetchone()
+            if row is None:
+                return None
+
+            script_run_count, client_state, pickled_user_state = row
+            try:
+                user_state = pickle.loads(pickled_user_state)
+            except Exception as ex:
+                # E.g. it was saved by another version of Streamlit. The client
+                # gets a new session instead.
+                _LOGGER.warning(
+                    "Unable to load session %s from disk: %s", session_id, ex
+                )
+                conn.execute(
+                    "DELETE FROM snapshots WHERE session_id = ?", (session_id,)
+                )
+                return None
+
+        return SessionSnapshot(
+            session_id=session_id,
+            script_run_count=script_run_count,
+            client_state=client_state,
+            user_state=user_state,
+        )
+
+    def _delete_snapshot(self, session_id: str) -> None:
+        try:
+            with self._transaction() as conn:
+                conn.execute(
+                    "DELETE FROM snapshots WHERE session_id = ?", (session_id,)
+                )
+        except SessionStorageError as ex:
+            # It's removed with the oldest snapshots later on.
+            _LOGGER.warning("Unable to delete session %s from disk: %s", session_id, ex)
+
+    def _save_snapshot(self, snapshot: SessionSnapshot) -> None:
+        user_state = pickle.dumps(snapshot.user_state)
+        size = len(snapshot.client_state) + len(user_state)
+        if size > self._max_bytes:
+            _LOGGER.debug(
+                "Not saving session %s to disk: it takes %s bytes",
+                snapshot.session_id,
+                size,
+            )
+            return
+
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    snapshot.session_id,
+                    self._script_path,
+                    time.time(),
+                    size,
+                    snapshot.script_run_count,
+                    snapshot.client_state,
+                    user_state,
+                ),
+            )
+            # Remove the oldest snapshots until the rest fit in max_bytes.
+            conn.execute(
+                """
+                DELETE FROM snapshots WHERE session_id IN (
+                    SELECT session_id FROM (
+                        SELECT
+                            session_id,
+                            SUM(size) OVER (
+                                ORDER BY saved_at DESC, rowid DESC
+                                ROWS UNBOUNDED PRECEDING
+                            ) AS total_size
+                        FROM snapshots
+                    )
+                    WHERE total_size > ?
+                )
+                """,
+                (self._max_bytes,),
+            )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Return the connection to the database, within a transaction that is
+        committed when the context exits, or rolled back on errors.
+        """
+        try:
+            with self._conn_lock:
+                if self._conn is None or self._conn_pid != os.getpid():
+                    self._conn = self._connect()
+                    self._conn_pid = os.getpid()
+                with self._conn:
+                    yield self._conn
+        except (sqlite3.Error, OSError) as ex:
+            raise SessionStorageError(
+                f"Error accessing the session database {self._path}"
+            ) from ex
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+        conn = sqlite3.connect(
+            self._path,
+            timeout=_DB_TIMEOUT_SECONDS,
+            # The storage is used from its own thread, but may be created on
+            # another one.
+            check_same_thread=False,
+        )
+        # Let several processes read and write at the same time.
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    session_id TEXT PRIMARY KEY,
+                    script_path TEXT NOT NULL,
+                    saved_at REAL NOT NULL,
+                    size INTEGER NOT NULL,
+                    script_run_count INTEGER NOT NULL,
+                    client_state BLOB NOT NULL,
+                    user_state BLOB NOT NULL
+                )
+                """
+            )
+        return conn
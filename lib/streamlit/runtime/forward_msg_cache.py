@@ -15,13 +15,21 @@
 from __future__ import annotations
 
 import hashlib
-from typing import TYPE_CHECKING, Final, MutableMapping
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Final, MutableMapping
 from weakref import WeakKeyDictionary
 
 from streamlit import config, util
 from streamlit.logger import get_logger
 from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
-from streamlit.runtime.stats import CacheStat, CacheStatsProvider, group_stats
+from streamlit.runtime.stats import (
+    CacheStat,
+    CounterStat,
+    GaugeStat,
+    MetricFamily,
+    Stat,
+    StatsProvider,
+)
 from streamlit.util import HASHLIB_KWARGS
 
 if TYPE_CHECKING:
@@ -29,6 +37,78 @@ if TYPE_CHECKING:
 
 _LOGGER: Final = get_logger(__name__)
 
+FORWARD_MSG_CACHE_MAX_BYTES_FAMILY: Final = MetricFamily(
+    name="forward_msg_cache_max_bytes",
+    type="gauge",
+    unit="bytes",
+    help="Size limit of the ForwardMsg cache, set by global.maxCachedMessageBytes.",
+)
+
+FORWARD_MSG_CACHE_EVICTIONS_FAMILY: Final = MetricFamily(
+    name="forward_msg_cache_evictions",
+    type="counter",
+    unit="",
+    help="Number of ForwardMsg cache entries evicted to stay within the size limit.",
+)
+
+
+def _create_hasher() -> Any:
+    """Create a hash object for the configured ForwardMsg hash algorithm.
+
+    The algorithm and digest size are validated when the config is loaded.
+    """
+    if config.get_option("global.forwardMsgHashAlgorithm") == "blake2b":
+        return hashlib.blake2b(
+            digest_size=config.get_option("global.forwardMsgHashDigestSize"),
+            **HASHLIB_KWARGS,
+        )
+    # MD5 is good enough for what we need, which is uniqueness.
+    return hashlib.md5(**HASHLIB_KWARGS)
+
+
+def _serialize_payload(msg: ForwardMsg) -> bytes:
+    """Serialize the parts of a ForwardMsg that are hashed and cached: that is,
+    everything except its hash and metadata.
+    """
+    msg_hash = msg.hash
+    metadata = msg.metadata
+    msg.ClearField("hash")
+    msg.ClearField("metadata")
+
+    payload = msg.SerializeToString()
+
+    msg.hash = msg_hash
+    msg.metadata.CopyFrom(metadata)
+    return payload
+
+
+def _serialize_hash_and_metadata(msg: ForwardMsg, include_hash: bool) -> bytes:
+    """Serialize just the hash (optionally) and the metadata of a ForwardMsg.
+
+    Protobuf parsers merge concatenated messages, so appending these bytes to
+    the message's payload produces a valid serialization of the whole message
+    without having to serialize the payload again.
+    """
+    extra = ForwardMsg()
+    if include_hash:
+        extra.hash = msg.hash
+    if msg.HasField("metadata"):
+        extra.metadata.CopyFrom(msg.metadata)
+    return extra.SerializeToString()
+
+
+def _populate_hash(msg: ForwardMsg) -> bytes:
+    """Compute and assign the hash for a ForwardMsg that doesn't have one yet.
+
+    Returns the serialized payload that the hash was computed from, so that
+    callers can reuse it instead of serializing the message again.
+    """
+    payload = _serialize_payload(msg)
+    hasher = _create_hasher()
+    hasher.update(payload)
+    msg.hash = hasher.hexdigest()
+    return payload
+
 
 def populate_hash_if_needed(msg: ForwardMsg) -> str:
     """Computes and assigns the unique hash for a ForwardMsg.
@@ -48,20 +128,24 @@ def populate_hash_if_needed(msg: ForwardMsg) -> str:
 
     """
     if msg.hash == "":
-        # Move the message's metadata aside. It's not part of the
-        # hash calculation.
-        metadata = msg.metadata
-        msg.ClearField("metadata")
+        _populate_hash(msg)
+
+    return msg.hash
 
-        # MD5 is good enough for what we need, which is uniqueness.
-        hasher = hashlib.md5(**HASHLIB_KWARGS)
-        hasher.update(msg.SerializeToString())
-        msg.hash = hasher.hexdigest()
 
-        # Restore metadata.
-        msg.metadata.CopyFrom(metadata)
+def serialize_with_hash(msg: ForwardMsg) -> bytes:
+    """Populate the ForwardMsg's hash if needed, and serialize it.
 
-    return msg.hash
+    This is equivalent to calling populate_hash_if_needed followed by
+    msg.SerializeToString(), but if the message doesn't have a hash yet, the
+    serialized payload used for hashing is reused for the result, so the
+    message is only serialized once.
+    """
+    if msg.hash != "":
+        return msg.SerializeToString()
+
+    payload = _populate_hash(msg)
+    return payload + _serialize_hash_and_metadata(msg, include_hash=True)
 
 
 def create_reference_msg(msg: ForwardMsg) -> ForwardMsg:
@@ -88,7 +172,7 @@ def create_reference_msg(msg: ForwardMsg) -> ForwardMsg:
     return ref_msg
 
 
-class ForwardMsgCache(CacheStatsProvider):
+class ForwardMsgCache(StatsProvider):
     """A cache of ForwardMsgs.
 
     Large ForwardMsgs (e.g. those containing big DataFrame payloads) are
@@ -107,10 +191,27 @@ class ForwardMsgCache(CacheStatsProvider):
         Stores the cached message, and the set of AppSessions
         that we've sent the cached message to.
 
+        The message itself is kept in serialized form. Its payload (everything
+        but the metadata) is identical for every session that receives the
+        message, so the same bytes are reused for every websocket write.
+
         """
 
-        def __init__(self, msg: ForwardMsg | None):
-            self.msg = msg
+        def __init__(self, msg: ForwardMsg | None, payload: bytes | None = None):
+            # The serialized message, without metadata but with its hash.
+            self.payload: bytes | None = None
+            # A ForwardMsg with just the metadata of the message that created
+            # this entry, which get_message hands out along with the payload.
+            self._metadata_msg: ForwardMsg | None = None
+
+            if msg is not None:
+                if payload is None:
+                    payload = _serialize_payload(msg)
+                self.payload = payload + ForwardMsg(hash=msg.hash).SerializeToString()
+                self._metadata_msg = ForwardMsg()
+                if msg.HasField("metadata"):
+                    self._metadata_msg.metadata.CopyFrom(msg.metadata)
+
             self._session_script_run_counts: MutableMapping[AppSession, int] = (
                 WeakKeyDictionary()
             )
@@ -118,7 +219,23 @@ class ForwardMsgCache(CacheStatsProvider):
         def __repr__(self) -> str:
             return util.repr_(self)
 
-        def add_session_ref(self, session: AppSession, script_run_count: int) -> None:
+        @property
+        def msg(self) -> ForwardMsg | None:
+            """The cached message, deserialized from the entry's payload."""
+            if self.payload is None or self._metadata_msg is None:
+                return None
+            msg = ForwardMsg()
+            msg.ParseFromString(self.payload)
+            msg.MergeFrom(self._metadata_msg)
+            return msg
+
+        @property
+        def byte_length(self) -> int:
+            if self.payload is None or self._metadata_msg is None:
+                return 0
+            return len(self.payload) + self._metadata_msg.ByteSize()
+
+        def add_session_ref(self, session: AppSession, script_run_count: int) -> int:
             """Adds a reference to a AppSession that has referenced
             this Entry's message.
 
@@ -128,6 +245,11 @@ class ForwardMsgCache(CacheStatsProvider):
             script_run_count : int
                 The session's run count at the time of the call
 
+            Returns
+            -------
+            int
+                The run count that was recorded for the session.
+
             """
             prev_run_count = self._session_script_run_counts.get(session, 0)
             if script_run_count < prev_run_count:
@@ -137,10 +259,23 @@ class ForwardMsgCache(CacheStatsProvider):
                 )
                 script_run_count = prev_run_count
             self._session_script_run_counts[session] = script_run_count
+            return script_run_count
 
         def has_session_ref(self, session: AppSession) -> bool:
             return session in self._session_script_run_counts
 
+        def get_session_script_run_count(self, session: AppSession) -> int | None:
+            """The run count recorded for the given session's reference, or
+            None if the session doesn't reference this Entry.
+            """
+            return self._session_script_run_counts.get(session)
+
+        def get_session_refs(self) -> list[tuple[AppSession, int]]:
+            """The (session, run count) pairs of all sessions that reference
+            this Entry.
+            """
+            return list(self._session_script_run_counts.items())
+
         def get_session_ref_age(
             self, session: AppSession, script_run_count: int
         ) -> int:
@@ -161,7 +296,16 @@ class ForwardMsgCache(CacheStatsProvider):
             return len(self._session_script_run_counts) > 0
 
     def __init__(self):
-        self._entries: dict[str, ForwardMsgCache.Entry] = {}
+        # Entries in least-recently-used order.
+        self._entries: OrderedDict[str, ForwardMsgCache.Entry] = OrderedDict()
+        # Reverse index of the entries each session references, bucketed by
+        # the run count recorded for the reference. This lets us expire and
+        # remove a session's references without scanning every entry.
+        self._session_index: MutableMapping[AppSession, dict[int, set[str]]] = (
+            WeakKeyDictionary()
+        )
+        self._total_bytes = 0
+        self._num_evictions = 0
 
     def __repr__(self) -> str:
         return util.repr_(self)
@@ -175,6 +319,9 @@ class ForwardMsgCache(CacheStatsProvider):
         so that it can track which sessions have already received
         each given ForwardMsg.
 
+        If the cache grows beyond `global.maxCachedMessageBytes`, the least
+        recently used entries are evicted.
+
         Parameters
         ----------
         msg : ForwardMsg
@@ -183,15 +330,27 @@ class ForwardMsgCache(CacheStatsProvider):
             The number of times the session's script has run
 
         """
-        populate_hash_if_needed(msg)
+        payload = _populate_hash(msg) if msg.hash == "" else None
         entry = self._entries.get(msg.hash, None)
         if entry is None:
             if config.get_option("global.storeCachedForwardMessagesInMemory"):
-                entry = ForwardMsgCache.Entry(msg)
+                entry = ForwardMsgCache.Entry(msg, payload)
             else:
                 entry = ForwardMsgCache.Entry(None)
             self._entries[msg.hash] = entry
-        entry.add_session_ref(session, script_run_count)
+            self._total_bytes += entry.byte_length
+        else:
+            self._entries.move_to_end(msg.hash)
+
+        prev_run_count = entry.get_session_script_run_count(session)
+        run_count = entry.add_session_ref(session, script_run_count)
+        if run_count != prev_run_count:
+            if prev_run_count is not None:
+                self._remove_from_session_index(session, prev_run_count, msg.hash)
+            buckets = self._session_index.setdefault(session, {})
+            buckets.setdefault(run_count, set()).add(msg.hash)
+
+        self._evict_to_byte_budget()
 
     def get_message(self, hash: str) -> ForwardMsg | None:
         """Return the message with the given ID if it exists in the cache.
@@ -207,7 +366,33 @@ class ForwardMsgCache(CacheStatsProvider):
 
         """
         entry = self._entries.get(hash, None)
-        return entry.msg if entry else None
+        if entry is None:
+            return None
+        self._entries.move_to_end(hash)
+        return entry.msg
+
+    def get_serialized_message(self, msg: ForwardMsg) -> bytes | None:
+        """Serialize a ForwardMsg using the cached payload of the entry with
+        the same hash, instead of serializing the message from scratch.
+
+        Parameters
+        ----------
+        msg : ForwardMsg
+            A message that has already been hashed.
+
+        Returns
+        -------
+        bytes | None
+            The serialized message, with the given message's own metadata, or
+            None if the message's payload isn't stored in the cache.
+
+        """
+        if msg.hash == "":
+            return None
+        entry = self._entries.get(msg.hash, None)
+        if entry is None or entry.payload is None:
+            return None
+        return entry.payload + _serialize_hash_and_metadata(msg, include_hash=False)
 
     def has_message_reference(
         self, msg: ForwardMsg, session: AppSession, script_run_count: int
@@ -232,17 +417,13 @@ class ForwardMsgCache(CacheStatsProvider):
         ----------
         session : AppSession
         """
+        buckets = self._session_index.pop(session, None)
+        if buckets is None:
+            return
 
-        # Operate on a copy of our entries dict.
-        # We may be deleting from it.
-        for msg_hash, entry in self._entries.copy().items():
-            if entry.has_session_ref(session):
-                entry.remove_session_ref(session)
-
-            if not entry.has_refs():
-                # The entry has no more references. Remove it from
-                # the cache completely.
-                del self._entries[msg_hash]
+        for msg_hashes in buckets.values():
+            for msg_hash in msg_hashes:
+                self._remove_session_ref(session, msg_hash)
 
     def remove_expired_entries_for_session(
         self, session: AppSession, script_run_count: int
@@ -258,39 +439,96 @@ class ForwardMsgCache(CacheStatsProvider):
             The number of times the session's script has run
 
         """
-        max_age = config.get_option("global.maxCachedMessageAge")
+        buckets = self._session_index.get(session)
+        if not buckets:
+            return
 
-        # Operate on a copy of our entries dict.
-        # We may be deleting from it.
-        for msg_hash, entry in self._entries.copy().items():
-            if not entry.has_session_ref(session):
-                continue
-
-            age = entry.get_session_ref_age(session, script_run_count)
-            if age > max_age:
+        max_age = config.get_option("global.maxCachedMessageAge")
+        expired_run_counts = [
+            run_count for run_count in buckets if script_run_count - run_count > max_age
+        ]
+        for run_count in expired_run_counts:
+            for msg_hash in buckets.pop(run_count):
                 _LOGGER.debug(
                     "Removing expired entry [session=%s, hash=%s, age=%s]",
                     id(session),
                     msg_hash,
-                    age,
+                    script_run_count - run_count,
                 )
-                entry.remove_session_ref(session)
-                if not entry.has_refs():
-                    # The entry has no more references. Remove it from
-                    # the cache completely.
-                    del self._entries[msg_hash]
+                self._remove_session_ref(session, msg_hash)
 
     def clear(self) -> None:
         """Remove all entries from the cache"""
         self._entries.clear()
+        self._session_index.clear()
+        self._total_bytes = 0
+
+    def get_stats(self) -> list[Stat]:
+        stats: list[Stat] = []
+        if self._entries:
+            stats.append(
+                CacheStat(
+                    category_name="ForwardMessageCache",
+                    cache_name="",
+                    byte_length=self._total_bytes,
+                )
+            )
 
-    def get_stats(self) -> list[CacheStat]:
-        stats: list[CacheStat] = [
-            CacheStat(
-                category_name="ForwardMessageCache",
-                cache_name="",
-                byte_length=entry.msg.ByteSize() if entry.msg is not None else 0,
+        max_bytes: int = config.get_option("global.maxCachedMessageBytes")
+        if max_bytes > 0:
+            stats.append(GaugeStat(FORWARD_MSG_CACHE_MAX_BYTES_FAMILY, (), max_bytes))
+            stats.append(
+                CounterStat(FORWARD_MSG_CACHE_EVICTIONS_FAMILY, (), self._num_evictions)
             )
-            for _, entry in self._entries.items()
-        ]
-        return group_stats(stats)
+        return stats
+
+    def _remove_session_ref(self, session: AppSession, msg_hash: str) -> None:
+        """Remove the session's reference to an entry, and remove the entry
+        itself if nothing references it anymore. Doesn't touch the session
+        index; callers are responsible for that.
+        """
+        entry = self._entries.get(msg_hash, None)
+        if entry is None or not entry.has_session_ref(session):
+            return
+
+        entry.remove_session_ref(session)
+        if not entry.has_refs():
+            # The entry has no more references. Remove it from
+            # the cache completely.
+            self._remove_entry(msg_hash)
+
+    def _remove_entry(self, msg_hash: str) -> None:
+        """Remove an entry from the cache and from the index of every session
+        that still references it.
+        """
+        entry = self._entries.pop(msg_hash)
+        self._total_bytes -= entry.byte_length
+        for session, run_count in entry.get_session_refs():
+            self._remove_from_session_index(session, run_count, msg_hash)
+
+    def _remove_from_session_index(
+        self, session: AppSession, run_count: int, msg_hash: str
+    ) -> None:
+        buckets = self._session_index.get(session)
+        if buckets is None:
+            return
+
+        msg_hashes = buckets.get(run_count)
+        if msg_hashes is not None:
+            msg_hashes.discard(msg_hash)
+            if not msg_hashes:
+                del buckets[run_count]
+
+    def _evict_to_byte_budget(self) -> None:
+        """Evict least recently used entries until the cache fits into
+        `global.maxCachedMessageBytes`.
+        """
+        max_bytes: int = config.get_option("global.maxCachedMessageBytes")
+        if max_bytes <= 0:
+            return
+
+        while self._total_bytes > max_bytes and self._entries:
+            msg_hash = next(iter(self._entries))
+            _LOGGER.debug("Evicting least recently used entry [hash=%s]", msg_hash)
+            self._remove_entry(msg_hash)
+            self._num_evictions += 1
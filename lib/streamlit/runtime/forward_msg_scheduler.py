@@ -0,0 +1,247 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import inspect
+from collections import deque
+from typing import TYPE_CHECKING, Awaitable, Callable, Final
+
+from streamlit import config
+from streamlit.logger import get_logger
+from streamlit.runtime.stats import GaugeStat, MetricFamily
+
+if TYPE_CHECKING:
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+    from streamlit.runtime.session_manager import ActiveSessionInfo
+
+_LOGGER: Final = get_logger(__name__)
+
+FORWARD_MSG_QUEUE_DEPTH_FAMILY: Final = MetricFamily(
+    name="forward_msg_queue_depth",
+    type="gauge",
+    unit="",
+    help="Number of ForwardMsgs waiting to be sent to all sessions' clients.",
+)
+
+FORWARD_MSG_PENDING_BYTES_FAMILY: Final = MetricFamily(
+    name="forward_msg_pending_bytes",
+    type="gauge",
+    unit="bytes",
+    help="Size of the ForwardMsgs waiting to be sent to all sessions' clients.",
+)
+
+SESSION_QUEUE_DEPTH_FAMILY: Final = MetricFamily(
+    name="session_queue_depth",
+    type="gauge",
+    unit="",
+    help="Number of ForwardMsgs waiting to be sent to the busiest sessions' clients.",
+)
+
+SESSION_PENDING_BYTES_FAMILY: Final = MetricFamily(
+    name="session_pending_bytes",
+    type="gauge",
+    unit="bytes",
+    help="Size of the ForwardMsgs waiting to be sent to the busiest sessions' clients.",
+)
+
+# How many sessions get_stats reports individually.
+_TOP_PENDING_STATS_COUNT: Final = 10
+
+
+class _SessionSendState:
+    """The scheduler's bookkeeping for a single session."""
+
+    def __init__(self):
+        self.pending: deque[tuple[ForwardMsg, int]] = deque()
+        self.pending_bytes = 0
+        # Deficit round-robin counter. May go negative when a session sends a
+        # message larger than its remaining allowance; the session then sits
+        # out passes until it has paid the overdraft back.
+        self.deficit = 0
+        # The last write to the session's client that hasn't been flushed yet.
+        self.inflight_write: asyncio.Future[None] | None = None
+
+    def is_write_blocked(self) -> bool:
+        return self.inflight_write is not None and not self.inflight_write.done()
+
+
+class ForwardMsgScheduler:
+    """Delivers queued ForwardMsgs from all active sessions to their clients.
+
+    Sessions are served using deficit round-robin. On each pass, every session
+    with pending messages earns a quantum of `server.sessionSendQuantum`
+    megabytes and sends messages until that allowance is used up. Messages
+    that don't fit stay pending for the next pass, so a session streaming a
+    large amount of data can't hold up the other sessions.
+
+    If a SessionClient's write returns an awaitable, the scheduler doesn't send
+    anything else to that client until the awaitable completes. This lets
+    websocket backpressure propagate back to the scheduler without blocking
+    other sessions.
+
+    ForwardMsgScheduler is not thread-safe. It's intended to only be accessed
+    from the Runtime's eventloop thread.
+    """
+
+    def __init__(
+        self,
+        send_messages: Callable[
+            [ActiveSessionInfo, list[ForwardMsg]], Awaitable[None] | None
+        ],
+        on_write_complete: Callable[[], None],
+    ):
+        """Create a ForwardMsgScheduler.
+
+        Parameters
+        ----------
+        send_messages
+            Called with an ActiveSessionInfo and the list of messages that
+            should be delivered to its client on this pass. May return an
+            awaitable that completes when the messages have been flushed.
+        on_write_complete
+            Called when a previously incomplete write finishes, so that the
+            caller can schedule another pass.
+        """
+        self._send_messages = send_messages
+        self._on_write_complete = on_write_complete
+        self._states: dict[str, _SessionSendState] = {}
+
+    async def send_pass(self, session_infos: list[ActiveSessionInfo]) -> int:
+        """Flush the given sessions' queues and deliver as many of their
+        pending messages as the scheduling policy allows.
+
+        Parameters
+        ----------
+        session_infos
+            The currently active sessions. Scheduler state for any session that
+            isn't in this list is discarded.
+
+        Returns
+        -------
+        int
+            The number of pending messages in the deepest session queue at the
+            start of the pass.
+        """
+        quantum = int(config.get_option("server.sessionSendQuantum") * 1e6)
+
+        states = {}
+        for session_info in session_infos:
+            session_id = session_info.session.id
+            state = self._states.get(session_id) or _SessionSendState()
+            for msg in session_info.session.flush_browser_queue():
+                msg_size = msg.ByteSize()
+                state.pending.append((msg, msg_size))
+                state.pending_bytes += msg_size
+            states[session_id] = state
+        self._states = states
+
+        max_queue_depth = max(
+            (len(state.pending) for state in states.values()), default=0
+        )
+
+        for session_info in session_infos:
+            state = states[session_info.session.id]
+            if not state.pending or state.is_write_blocked():
+                continue
+
+            msgs = self._take_msgs_for_pass(state, quantum)
+            if not msgs:
+                continue
+
+            write = self._send_messages(session_info, msgs)
+            if inspect.isawaitable(write):
+                state.inflight_write = asyncio.ensure_future(write)
+                state.inflight_write.add_done_callback(self._on_write_done)
+
+            # Yield for a tick after serving each session.
+            await asyncio.sleep(0)
+
+        return max_queue_depth
+
+    def has_ready_messages(self) -> bool:
+        """True if some session has pending messages that could be sent on the
+        next pass without waiting for its client.
+        """
+        return any(
+            state.pending and not state.is_write_blocked()
+            for state in self._states.values()
+        )
+
+    def get_stats(self) -> list[GaugeStat]:
+        """Report the pending messages of all sessions, and of the sessions
+        with the most pending data.
+        """
+        stats = [
+            GaugeStat(
+                FORWARD_MSG_QUEUE_DEPTH_FAMILY,
+                (),
+                sum(len(state.pending) for state in self._states.values()),
+            ),
+            GaugeStat(
+                FORWARD_MSG_PENDING_BYTES_FAMILY,
+                (),
+                sum(state.pending_bytes for state in self._states.values()),
+            ),
+        ]
+        for session_id, state in heapq.nlargest(
+            _TOP_PENDING_STATS_COUNT,
+            (
+                (session_id, state)
+                for session_id, state in self._states.items()
+                if state.pending
+            ),
+            key=lambda item: item[1].pending_bytes,
+        ):
+            labels = (("session_id", session_id),)
+            stats.append(
+                GaugeStat(SESSION_QUEUE_DEPTH_FAMILY, labels, len(state.pending))
+            )
+            stats.append(
+                GaugeStat(SESSION_PENDING_BYTES_FAMILY, labels, state.pending_bytes)
+            )
+        return stats
+
+    @staticmethod
+    def _take_msgs_for_pass(state: _SessionSendState, quantum: int) -> list[ForwardMsg]:
+        """Pop the messages that the session is allowed to send on this pass."""
+        if quantum <= 0:
+            msgs = [msg for msg, _ in state.pending]
+            state.pending.clear()
+            state.pending_bytes = 0
+            return msgs
+
+        state.deficit += quantum
+        msgs = []
+        while state.pending and state.deficit > 0:
+            msg, msg_size = state.pending.popleft()
+            msgs.append(msg)
+            state.pending_bytes -= msg_size
+            state.deficit -= msg_size
+
+        if not state.pending:
+            # A session doesn't get to bank allowance while it's idle.
+            state.deficit = min(state.deficit, 0)
+
+        return msgs
+
+    def _on_write_done(self, write: asyncio.Future[None]) -> None:
+        if not write.cancelled() and write.exception() is not None:
+            # The client has most likely disconnected. The session will be
+            # cleaned up by whatever handles the disconnection, so there's
+            # nothing to do here other than retrieving the exception.
+            _LOGGER.debug("Write to session client failed: %s", write.exception())
+        self._on_write_complete()
@@ -18,6 +18,7 @@ from __future__ import annotations
 
 import collections
 import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Final
 
 from streamlit.logger import get_logger
@@ -25,6 +26,12 @@ from streamlit.runtime.media_file_storage import MediaFileKind, MediaFileStorage
 
 _LOGGER: Final = get_logger(__name__)
 
+# Orphaned files are deleted on this thread, shared by all MediaFileManagers,
+# so that script runs don't wait for them to be deleted.
+_sweep_executor = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="MediaFileSweeper"
+)
+
 
 def _get_session_id() -> str:
     """Get the active AppSession's session_id."""
@@ -43,9 +50,11 @@ def _get_session_id() -> str:
 class MediaFileMetadata:
     """Metadata that the MediaFileManager needs for each file it manages."""
 
-    def __init__(self, kind: MediaFileKind = MediaFileKind.MEDIA):
+    def __init__(self, kind: MediaFileKind = MediaFileKind.MEDIA, ref_count: int = 0):
         self._kind = kind
         self._is_marked_for_delete = False
+        # The number of (session, coordinates) pairs that the file is used at.
+        self.ref_count = ref_count
 
     @property
     def kind(self) -> MediaFileKind:
@@ -76,6 +85,11 @@ class MediaFileManager:
       where the file's coordinates keep changing for some reason, though! e.g.
       if new elements keep being prepended to the app. Unlikely to happen, but
       we should address it at some point.)
+
+    Each file counts the coordinates it's used at. References that a session
+    drops are only released when its own script run finishes, or when it ends,
+    so that a file that the next run displays again isn't deleted in between.
+    Files that are no longer referenced are then deleted in the background.
     """
 
     def __init__(self, storage: MediaFileStorage):
@@ -89,44 +103,97 @@ class MediaFileManager:
             collections.defaultdict(dict)
         )
 
+        # Dict[session ID] -> the IDs of the files whose references the
+        # session dropped, once per reference. They are released by the
+        # session's next call to `remove_orphaned_files`.
+        self._pending_releases: dict[str, list[str]] = collections.defaultdict(
+            list
+        )
+
+        # The IDs of the DOWNLOADABLE files that were marked for delete. They
+        # are deleted by the next call to `remove_orphaned_files`, unless
+        # they are used again in the meantime.
+        self._marked_file_ids: list[str] = []
+
+        # The IDs of the files to delete in the background, and whether
+        # `_sweep` is scheduled to delete them.
+        self._deletion_queue: collections.deque[str] = collections.deque()
+        self._is_sweep_scheduled = False
+        self._sweep_future: Future[None] | None = None
+
         # MediaFileManager is used from multiple threads, so all operations
         # need to be protected with a Lock. (This is not an RLock, which
         # means taking it multiple times from the same thread will deadlock.)
         self._lock = threading.Lock()
 
-    def _get_inactive_file_ids(self) -> set[str]:
-        """Compute the set of files that are stored in the manager, but are
-        not referenced by any active session. These are files that can be
-        safely deleted.
-
-        Thread safety: callers must hold `self._lock`.
-        """
-        # Get the set of all our file IDs.
-        file_ids = set(self._file_metadata.keys())
-
-        # Subtract all IDs that are in use by each session
-        for session_file_ids_by_coord in self._files_by_session_and_coord.values():
-            file_ids.difference_update(session_file_ids_by_coord.values())
-
-        return file_ids
+    def remove_orphaned_files(self, session_id: str | None = None) -> None:
+        """Release the references that the given session dropped, and delete
+        the files that are no longer referenced by any active session. The files
+        are deleted in the background.
 
-    def remove_orphaned_files(self) -> None:
-        """Remove all files that are no longer referenced by any active session.
+        Should be called whenever ScriptRunner completes, and when a session
+        ends.
 
         Safe to call from any thread.
+
+        Parameters
+        ----------
+        session_id
+            The ID of the session whose references are released. If None, the
+            ID of the session whose script is running on the calling thread.
         """
+        if session_id is None:
+            session_id = _get_session_id()
+
         _LOGGER.debug("Removing orphaned files...")
 
         with self._lock:
-            for file_id in self._get_inactive_file_ids():
-                file = self._file_metadata[file_id]
+            # DOWNLOADABLE files are deleted one call after they are orphaned,
+            # so that their download links keep working for a while.
+            for file_id in self._marked_file_ids:
+                file = self._file_metadata.get(file_id)
+                if file is not None and file.is_marked_for_delete:
+                    self._deletion_queue.append(file_id)
+            self._marked_file_ids = []
+
+            for file_id in self._pending_releases.pop(session_id, []):
+                file = self._file_metadata.get(file_id)
+                if file is None:
+                    continue
+                file.ref_count -= 1
+                if file.ref_count > 0:
+                    continue
                 if file.kind == MediaFileKind.MEDIA:
-                    self._delete_file(file_id)
+                    self._deletion_queue.append(file_id)
                 elif file.kind == MediaFileKind.DOWNLOADABLE:
-                    if file.is_marked_for_delete:
-                        self._delete_file(file_id)
-                    else:
-                        file.mark_for_delete()
+                    file.mark_for_delete()
+                    self._marked_file_ids.append(file_id)
+
+            if not self._deletion_queue or self._is_sweep_scheduled:
+                return
+            self._is_sweep_scheduled = True
+            self._sweep_future = _sweep_executor.submit(self._sweep)
+
+    def _sweep(self) -> None:
+        """Delete the files in the deletion queue that still aren't referenced.
+
+        The lock is taken for one file at a time, so that adding files isn't
+        blocked while many files are deleted.
+        """
+        while True:
+            with self._lock:
+                if not self._deletion_queue:
+                    self._is_sweep_scheduled = False
+                    return
+                file_id = self._deletion_queue.popleft()
+                file = self._file_metadata.get(file_id)
+                # The file may have been used again since it was queued.
+                if file is None or file.ref_count > 0:
+                    continue
+                try:
+                    self._delete_file(file_id)
+                except Exception:
+                    _LOGGER.exception("Unable to delete media file %s", file_id)
 
     def _delete_file(self, file_id: str) -> None:
         """Delete the given file from storage, and remove its metadata from
@@ -141,8 +208,8 @@ class MediaFileManager:
     def clear_session_refs(self, session_id: str | None = None) -> None:
         """Remove the given session's file references.
 
-        (This does not remove any files from the manager - you must call
-        `remove_orphaned_files` for that.)
+        (This does not release the references or remove any files from the
+        manager - you must call `remove_orphaned_files` for that.)
 
         Should be called whenever ScriptRunner completes and when a session ends.
 
@@ -154,8 +221,13 @@ class MediaFileManager:
         _LOGGER.debug("Disconnecting files for session with ID %s", session_id)
 
         with self._lock:
-            if session_id in self._files_by_session_and_coord:
-                del self._files_by_session_and_coord[session_id]
+            session_file_ids_by_coord = self._files_by_session_and_coord.pop(
+                session_id, None
+            )
+            if session_file_ids_by_coord is not None:
+                self._pending_releases[session_id].extend(
+                    session_file_ids_by_coord.values()
+                )
 
         _LOGGER.debug(
             "Sessions still active: %r", self._files_by_session_and_coord.keys()
@@ -224,9 +296,21 @@ class MediaFileManager:
             file_id = self._storage.load_and_get_id(
                 path_or_data, mimetype, kind, file_name
             )
-            metadata = MediaFileMetadata(kind=kind)
-
+            old_metadata = self._file_metadata.get(file_id)
+            metadata = MediaFileMetadata(
+                kind=kind,
+                ref_count=old_metadata.ref_count if old_metadata is not None else 0,
+            )
             self._file_metadata[file_id] = metadata
-            self._files_by_session_and_coord[session_id][coordinates] = file_id
+
+            session_file_ids_by_coord = self._files_by_session_and_coord[session_id]
+            old_file_id = session_file_ids_by_coord.get(coordinates)
+            if old_file_id != file_id:
+                metadata.ref_count += 1
+                session_file_ids_by_coord[coordinates] = file_id
+                if old_file_id is not None:
+                    # The file that was displayed at these coordinates is
+                    # replaced by this one.
+                    self._pending_releases[session_id].append(old_file_id)
 
             return self._storage.get_url(file_id)
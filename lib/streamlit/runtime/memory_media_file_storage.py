@@ -19,8 +19,9 @@ from __future__ import annotations
 import contextlib
 import hashlib
 import mimetypes
-import os.path
-from typing import Final, NamedTuple
+import os
+from collections import defaultdict
+from typing import Final, NamedTuple, Tuple, Union
 
 from streamlit.logger import get_logger
 from streamlit.runtime.media_file_storage import (
@@ -28,7 +29,14 @@ from streamlit.runtime.media_file_storage import (
     MediaFileStorage,
     MediaFileStorageError,
 )
-from streamlit.runtime.stats import CacheStat, CacheStatsProvider, group_stats
+from streamlit.runtime.stats import (
+    CacheStat,
+    CacheStatsProvider,
+    CounterStat,
+    MetricFamily,
+    Stat,
+    group_stats,
+)
 from streamlit.util import HASHLIB_KWARGS
 
 _LOGGER: Final = get_logger(__name__)
@@ -65,6 +73,140 @@ def _calculate_file_id(data: bytes, mimetype: str, filename: str | None = None)
     return filehash.hexdigest()
 
 
+MEDIA_FILE_SOURCE_HITS_FAMILY: Final = MetricFamily(
+    name="media_file_source_hits",
+    type="counter",
+    unit="",
+    help="Number of media files added again from an unchanged source.",
+)
+
+MEDIA_FILE_SOURCE_MISSES_FAMILY: Final = MetricFamily(
+    name="media_file_source_misses",
+    type="counter",
+    unit="",
+    help="Number of media files added from a new or changed source.",
+)
+
+# (path, mtime in ns, size) for files, or (sampled digest, length) for bytes;
+# then the mimetype and filename that the file ID is computed from.
+_SourceKey = Tuple[Union[str, bytes], int, int, str, Union[str, None]]
+
+# Bytes are fingerprinted by hashing this many evenly spaced samples of them,
+# the last one ending at their end, rather than all of them.
+_NUM_SAMPLES: Final = 64
+_SAMPLE_SIZE: Final = 4096
+
+
+def _get_sampled_digest(data: bytes) -> bytes:
+    """Return a digest of a fixed-size sample of data, which is much cheaper
+    than hashing all of it. Bytes with the same digest aren't necessarily
+    equal.
+    """
+    hasher = hashlib.blake2b(digest_size=16, **HASHLIB_KWARGS)
+    view = memoryview(data)
+    if len(view) <= _NUM_SAMPLES * _SAMPLE_SIZE:
+        hasher.update(view)
+    else:
+        stride = (len(view) - _SAMPLE_SIZE) // (_NUM_SAMPLES - 1)
+        for i in range(_NUM_SAMPLES):
+            hasher.update(view[i * stride : i * stride + _SAMPLE_SIZE])
+    return hasher.digest()
+
+
+class MediaFileSourceIndex:
+    """Remembers the ID of the file that each source was loaded into, so that
+    loading an unchanged source again doesn't read and hash it again.
+
+    Paths are keyed by the file's path, modification time and size. Bytes are
+    keyed by a digest of samples of their content, and only for as long as the
+    storage holds them as a file's content. That way, bytes that are built
+    again on every script run are found too. As samples may match for
+    different bytes, the bytes are also compared to the stored ones, which is
+    still much cheaper than hashing them.
+
+    Not thread safe: callers must synchronize access.
+    """
+
+    def __init__(self) -> None:
+        # Mapping of source key -> (file_id, the bytes whose ID is in the key).
+        self._entries: dict[_SourceKey, tuple[str, bytes | None]] = {}
+        self._keys_by_file_id: defaultdict[str, set[_SourceKey]] = defaultdict(set)
+        self._num_hits = 0
+        self._num_misses = 0
+
+    @staticmethod
+    def get_key(
+        path_or_data: str | bytes, mimetype: str, filename: str | None
+    ) -> _SourceKey | None:
+        """Return the key of the given source, or None if it can't be keyed
+        (e.g. because the file doesn't exist, which loading it will report).
+        """
+        if isinstance(path_or_data, str):
+            try:
+                stat_result = os.stat(path_or_data)
+            except OSError:
+                return None
+            return (
+                path_or_data,
+                stat_result.st_mtime_ns,
+                stat_result.st_size,
+                mimetype,
+                filename,
+            )
+        return (
+            _get_sampled_digest(path_or_data),
+            len(path_or_data),
+            0,
+            mimetype,
+            filename,
+        )
+
+    def get(self, key: _SourceKey | None, path_or_data: str | bytes) -> str | None:
+        """Return the ID of the file that the source was loaded into, if it's
+        unchanged since then.
+        """
+        entry = self._entries.get(key) if key is not None else None
+        if entry is not None and (
+            isinstance(path_or_data, str)
+            or entry[1] is path_or_data
+            or entry[1] == path_or_data
+        ):
+            self._num_hits += 1
+            return entry[0]
+        self._num_misses += 1
+        return None
+
+    def add(
+        self, key: _SourceKey | None, path_or_data: str | bytes, file_id: str
+    ) -> None:
+        """Record that the source was loaded into the given file. Bytes must
+        only be added if they are the file's stored content.
+        """
+        if key is None:
+            return
+        data = None if isinstance(path_or_data, str) else path_or_data
+        self._entries[key] = (file_id, data)
+        self._keys_by_file_id[file_id].add(key)
+
+    def remove(self, file_id: str, keep_paths: bool = False) -> None:
+        """Forget the sources that were loaded into the given file. If
+        keep_paths is True, only forget its bytes, e.g. because the storage no
+        longer holds them.
+        """
+        keys = self._keys_by_file_id.pop(file_id, set())
+        for key in keys:
+            if keep_paths and isinstance(key[0], str):
+                self._keys_by_file_id[file_id].add(key)
+            else:
+                del self._entries[key]
+
+    def get_stats(self) -> list[Stat]:
+        return [
+            CounterStat(MEDIA_FILE_SOURCE_HITS_FAMILY, (), self._num_hits),
+            CounterStat(MEDIA_FILE_SOURCE_MISSES_FAMILY, (), self._num_misses),
+        ]
+
+
 def get_extension_for_mimetype(mimetype: str) -> str:
     if mimetype in PREFERRED_MIMETYPE_EXTENSION_MAP:
         return PREFERRED_MIMETYPE_EXTENSION_MAP[mimetype]
@@ -101,6 +243,7 @@ class MemoryMediaFileStorage(MediaFileStorage, CacheStatsProvider):
         """
         self._files_by_id: dict[str, MemoryFile] = {}
         self._media_endpoint = media_endpoint
+        self.source_index = MediaFileSourceIndex()
 
     def load_and_get_id(
         self,
@@ -110,6 +253,11 @@ class MemoryMediaFileStorage(MediaFileStorage, CacheStatsProvider):
         filename: str | None = None,
     ) -> str:
         """Add a file to the manager and return its ID."""
+        source_key = self.source_index.get_key(path_or_data, mimetype, filename)
+        known_file_id = self.source_index.get(source_key, path_or_data)
+        if known_file_id is not None:
+            return known_file_id
+
         file_data: bytes
         if isinstance(path_or_data, str):
             file_data = self._read_file(path_or_data)
@@ -125,6 +273,9 @@ class MemoryMediaFileStorage(MediaFileStorage, CacheStatsProvider):
                 content=file_data, mimetype=mimetype, kind=kind, filename=filename
             )
             self._files_by_id[file_id] = media_file
+            self.source_index.add(source_key, path_or_data, file_id)
+        elif isinstance(path_or_data, str):
+            self.source_index.add(source_key, path_or_data, file_id)
 
         return file_id
 
@@ -157,6 +308,7 @@ class MemoryMediaFileStorage(MediaFileStorage, CacheStatsProvider):
         # that doesn't exist.
         with contextlib.suppress(KeyError):
             del self._files_by_id[file_id]
+        self.source_index.remove(file_id)
 
     def _read_file(self, filename: str) -> bytes:
         """Read a file into memory. Raise MediaFileStorageError if we can't."""
@@ -124,6 +124,7 @@ class MemoryUploadedFileManager(UploadedFileManager):
         for session_storage in file_storage_copy.values():
             all_files.extend(session_storage.values())
 
+        # Memory-mapped files are on disk, so they aren't included.
         stats: list[CacheStat] = [
             CacheStat(
                 category_name="UploadedFileManager",
@@ -131,5 +132,6 @@ class MemoryUploadedFileManager(UploadedFileManager):
                 byte_length=len(file.data),
             )
             for file in all_files
+            if isinstance(file.data, bytes)
         ]
         return group_stats(stats)
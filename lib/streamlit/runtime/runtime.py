@@ -15,18 +15,22 @@
 from __future__ import annotations
 
 import asyncio
+import threading
 import time
 import traceback
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import TYPE_CHECKING, Awaitable, Final, NamedTuple
 
-from streamlit import config
+from streamlit import config, source_util
 from streamlit.components.lib.local_component_registry import LocalComponentRegistry
+from streamlit.file_util import get_streamlit_file_path
 from streamlit.logger import get_logger
 from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
 from streamlit.runtime.app_session import AppSession
 from streamlit.runtime.caching import (
+    get_cache_memory_budget_stats_provider,
+    get_cache_profiler_stats_provider,
     get_data_cache_stats_provider,
     get_resource_cache_stats_provider,
 )
@@ -38,11 +42,16 @@ from streamlit.runtime.forward_msg_cache import (
     create_reference_msg,
     populate_hash_if_needed,
 )
+from streamlit.runtime.forward_msg_scheduler import ForwardMsgScheduler
 from streamlit.runtime.media_file_manager import MediaFileManager
 from streamlit.runtime.memory_session_storage import MemorySessionStorage
-from streamlit.runtime.runtime_util import is_cacheable_msg
+from streamlit.runtime.runtime_util import (
+    create_forward_msg_batches,
+    is_cacheable_msg,
+)
 from streamlit.runtime.script_data import ScriptData
 from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.runtime.scriptrunner.script_run_pool import get_script_run_pool
 from streamlit.runtime.session_manager import (
     ActiveSessionInfo,
     SessionClient,
@@ -54,7 +63,7 @@ from streamlit.runtime.state import (
     SCRIPT_RUN_WITHOUT_ERRORS_KEY,
     SessionStateStatProvider,
 )
-from streamlit.runtime.stats import StatsManager
+from streamlit.runtime.stats import StatsManager, StatsProvider
 from streamlit.runtime.websocket_session_manager import WebsocketSessionManager
 
 if TYPE_CHECKING:
@@ -67,8 +76,30 @@ if TYPE_CHECKING:
 # Wait for the script run result for 60s and if no result is available give up
 SCRIPT_RUN_CHECK_TIMEOUT: Final = 60
 
+# With server.batchForwardMessages enabled, the Runtime waits between zero and
+# _MAX_BATCH_FLUSH_INTERVAL_SECS before flushing session queues again,
+# proportionally to how many messages the deepest queue held on the last flush.
+# Queues holding _BATCH_FLUSH_TARGET_DEPTH messages or more get the full wait.
+_MAX_BATCH_FLUSH_INTERVAL_SECS: Final = 0.01
+_BATCH_FLUSH_TARGET_DEPTH: Final = 100
+
 _LOGGER: Final = get_logger(__name__)
 
+# Folder in ~/.streamlit where the ScriptCache persists compiled scripts.
+_BYTECODE_DIR_NAME: Final = "bytecode"
+
+
+def _get_batch_flush_interval(queue_depth: int) -> float:
+    """Return how long to wait before the next flush when messages are batched.
+
+    A shallow queue usually means a user is interacting with the app, so we
+    flush again right away to keep latency low. A deep queue means a script is
+    producing messages quickly, so we wait a bit longer to let more of them
+    coalesce into the next frame.
+    """
+    fill_ratio = min(queue_depth / _BATCH_FLUSH_TARGET_DEPTH, 1.0)
+    return fill_ratio * _MAX_BATCH_FLUSH_INTERVAL_SECS
+
 
 class RuntimeStoppedError(Exception):
     """Raised by operations on a Runtime instance that is stopped."""
@@ -149,6 +180,14 @@ class AsyncObjects(NamedTuple):
     stopped: asyncio.Future[None]
 
 
+def _create_script_cache() -> ScriptCache:
+    return ScriptCache(
+        persist_dir=get_streamlit_file_path(_BYTECODE_DIR_NAME)
+        if config.get_option("runner.persistBytecode")
+        else None
+    )
+
+
 class Runtime:
     _instance: Runtime | None = None
 
@@ -205,7 +244,7 @@ class Runtime:
         self._uploaded_file_mgr = config.uploaded_file_manager
         self._media_file_mgr = MediaFileManager(storage=config.media_file_storage)
         self._cache_storage_manager = config.cache_storage_manager
-        self._script_cache = ScriptCache()
+        self._script_cache = _create_script_cache()
 
         self._session_mgr = config.session_manager_class(
             session_storage=config.session_storage,
@@ -214,12 +253,27 @@ class Runtime:
             message_enqueued_callback=self._enqueued_some_message,
         )
 
+        self._send_scheduler = ForwardMsgScheduler(
+            send_messages=self._deliver_messages,
+            on_write_complete=self._enqueued_some_message,
+        )
+
         self._stats_mgr = StatsManager()
         self._stats_mgr.register_provider(get_data_cache_stats_provider())
         self._stats_mgr.register_provider(get_resource_cache_stats_provider())
+        self._stats_mgr.register_provider(get_cache_memory_budget_stats_provider())
+        self._stats_mgr.register_provider(get_cache_profiler_stats_provider())
         self._stats_mgr.register_provider(self._message_cache)
         self._stats_mgr.register_provider(self._uploaded_file_mgr)
+        # Reports how often unchanged media didn't have to be read and hashed.
+        source_index = getattr(config.media_file_storage, "source_index", None)
+        if isinstance(source_index, StatsProvider):
+            self._stats_mgr.register_provider(source_index)
         self._stats_mgr.register_provider(SessionStateStatProvider(self._session_mgr))
+        self._stats_mgr.register_provider(self._send_scheduler)
+        script_run_pool = get_script_run_pool()
+        if script_run_pool is not None:
+            self._stats_mgr.register_provider(script_run_pool)
 
     @property
     def state(self) -> RuntimeState:
@@ -302,6 +356,13 @@ class Runtime:
 
         await async_objs.started
 
+        if config.get_option("runner.precompilePages"):
+            threading.Thread(
+                target=self._precompile_pages,
+                name="Runtime.precompile_pages",
+                daemon=True,
+            ).start()
+
     def stop(self) -> None:
         """Request that Streamlit close all sessions and stop running.
         Note that Streamlit won't stop running immediately.
@@ -332,6 +393,25 @@ class Runtime:
         """
         return self._session_mgr.is_active_session(session_id)
 
+    async def prepare_connect_session(self, existing_session_id: str) -> None:
+        """Prepare to reconnect to an existing session, before calling
+        connect_session with its ID.
+
+        Depending on the SessionStorage that the Runtime's SessionManager uses,
+        this reads the session's state from disk without blocking the event loop.
+
+        Parameters
+        ----------
+        existing_session_id
+            The ID of the existing session that connect_session will be called
+            with.
+
+        Notes
+        -----
+        Threading: UNSAFE. Must be called on the eventloop thread.
+        """
+        await self._session_mgr.prepare_connect_session(existing_session_id)
+
     def connect_session(
         self,
         client: SessionClient,
@@ -629,22 +709,25 @@ class Runtime:
                 elif self._state == RuntimeState.ONE_OR_MORE_SESSIONS_CONNECTED:
                     async_objs.need_send_data.clear()
 
-                    for active_session_info in self._session_mgr.list_active_sessions():
-                        msg_list = active_session_info.session.flush_browser_queue()
-                        for msg in msg_list:
-                            try:
-                                self._send_message(active_session_info, msg)
-                            except SessionClientDisconnectedError:
-                                self._session_mgr.disconnect_session(
-                                    active_session_info.session.id
-                                )
-
-                            # Yield for a tick after sending a message.
-                            await asyncio.sleep(0)
-
-                    # Yield for a few milliseconds between session message
-                    # flushing.
-                    await asyncio.sleep(0.01)
+                    max_queue_depth = await self._send_scheduler.send_pass(
+                        self._session_mgr.list_active_sessions()
+                    )
+
+                    if self._send_scheduler.has_ready_messages():
+                        # Some sessions used up their allowance for this pass
+                        # and still have messages waiting. Keep going without
+                        # waiting for new messages to be enqueued.
+                        await asyncio.sleep(0)
+                        continue
+
+                    if config.get_option("server.batchForwardMessages"):
+                        # Adapt the time we wait before the next flush to how
+                        # busy the session queues were.
+                        await asyncio.sleep(_get_batch_flush_interval(max_queue_depth))
+                    else:
+                        # Yield for a few milliseconds between session message
+                        # flushing.
+                        await asyncio.sleep(0.01)
                 else:
                     # Break out of the thread loop if we encounter any other state.
                     break
@@ -683,7 +766,37 @@ Please report this bug at https://github.com/streamlit/streamlit/issues.
 """
             )
 
-    def _send_message(self, session_info: ActiveSessionInfo, msg: ForwardMsg) -> None:
+    def _deliver_messages(
+        self, session_info: ActiveSessionInfo, msgs: list[ForwardMsg]
+    ) -> Awaitable[None] | None:
+        """Deliver the given messages to a session's client. Called by our
+        ForwardMsgScheduler.
+
+        Returns
+        -------
+        Awaitable[None] | None
+            The result of the last write to the client, which may be an awaitable
+            that completes once the client has flushed the messages.
+
+        Notes
+        -----
+        Threading: UNSAFE. Must be called on the eventloop thread.
+        """
+        try:
+            if config.get_option("server.batchForwardMessages"):
+                return self._send_message_batch(session_info, msgs)
+
+            write = None
+            for msg in msgs:
+                write = self._send_message(session_info, msg)
+            return write
+        except SessionClientDisconnectedError:
+            self._session_mgr.disconnect_session(session_info.session.id)
+            return None
+
+    def _send_message(
+        self, session_info: ActiveSessionInfo, msg: ForwardMsg
+    ) -> Awaitable[None] | None:
         """Send a message to a client.
 
         If the client is likely to have already cached the message, we may
@@ -697,11 +810,62 @@ Please report this bug at https://github.com/streamlit/streamlit/issues.
         msg : ForwardMsg
             The message to send to the client
 
+        Notes
+        -----
+        Threading: UNSAFE. Must be called on the eventloop thread.
+        """
+        # Ship it off!
+        return session_info.client.write_forward_msg(
+            self._prepare_message_for_client(session_info, msg)
+        )
+
+    def _send_message_batch(
+        self, session_info: ActiveSessionInfo, msgs: list[ForwardMsg]
+    ) -> Awaitable[None] | None:
+        """Send a list of messages to a client, bundled into as few websocket
+        frames as possible.
+
+        Each message goes through the same caching logic as in `_send_message`.
+
+        Parameters
+        ----------
+        session_info : ActiveSessionInfo
+            The ActiveSessionInfo associated with websocket
+        msgs : list[ForwardMsg]
+            The messages to send to the client, in order
+
+        Notes
+        -----
+        Threading: UNSAFE. Must be called on the eventloop thread.
+        """
+        msgs_to_send = [
+            self._prepare_message_for_client(session_info, msg) for msg in msgs
+        ]
+        write = None
+        for batch in create_forward_msg_batches(msgs_to_send, self._message_cache):
+            write = session_info.client.write_forward_msg(batch)
+        return write
+
+    def _prepare_message_for_client(
+        self, session_info: ActiveSessionInfo, msg: ForwardMsg
+    ) -> ForwardMsg:
+        """Return the message that should be delivered to the client in place of
+        the given message: either the message itself, or a "reference" message
+        if the client is likely to have already cached it.
+
+        Also updates the message cache and the session's script_run_count.
+
         Notes
         -----
         Threading: UNSAFE. Must be called on the eventloop thread.
         """
         msg.metadata.cacheable = is_cacheable_msg(msg)
+        if session_info.session.is_unchanged_delta(msg):
+            # The client already has this element from the previous script
+            # run. Small deltas aren't cacheable by size alone, so mark it
+            # cacheable so that the client keeps it from now on, and is sent
+            # a reference the next time it is unchanged.
+            msg.metadata.cacheable = True
         msg_to_send = msg
         if msg.metadata.cacheable:
             populate_hash_if_needed(msg)
@@ -722,6 +886,9 @@ Please report this bug at https://github.com/streamlit/streamlit/issues.
                 msg, session_info.session, session_info.script_run_count
             )
 
+        if msg.WhichOneof("type") == "script_finished":
+            session_info.session.on_script_finished_sent(msg.script_finished)
+
         # If this was a `script_finished` message, we increment the
         # script_run_count for this session, and update the cache
         if (
@@ -739,8 +906,7 @@ Please report this bug at https://github.com/streamlit/streamlit/issues.
                 session_info.session, session_info.script_run_count
             )
 
-        # Ship it off!
-        session_info.client.write_forward_msg(msg_to_send)
+        return msg_to_send
 
     def _enqueued_some_message(self) -> None:
         """Callback called by AppSession after the AppSession has enqueued a
@@ -754,6 +920,18 @@ Please report this bug at https://github.com/streamlit/streamlit/issues.
         async_objs = self._get_async_objs()
         async_objs.eventloop.call_soon_threadsafe(async_objs.need_send_data.set)
 
+    def _precompile_pages(self) -> None:
+        """Compile the main script and all pages, so that their first runs
+        don't have to.
+        """
+        pages = source_util.get_pages(self._main_script_path)
+        for page in pages.values():
+            try:
+                self._script_cache.get_bytecode(page["script_path"])
+            except Exception as ex:
+                # The error will be shown when the page runs.
+                _LOGGER.debug("Unable to precompile %s: %s", page["script_path"], ex)
+
     def _get_async_objs(self) -> AsyncObjects:
         """Return our AsyncObjects instance. If the Runtime hasn't been
         started, this will raise an error.
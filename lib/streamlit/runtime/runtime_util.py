@@ -16,14 +16,15 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Final
 
 from streamlit import config
 from streamlit.errors import MarkdownFormattedException, StreamlitAPIException
-from streamlit.runtime.forward_msg_cache import populate_hash_if_needed
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.runtime.forward_msg_cache import serialize_with_hash
 
 if TYPE_CHECKING:
-    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+    from streamlit.runtime.forward_msg_cache import ForwardMsgCache
 
 
 class MessageSizeError(MarkdownFormattedException):
@@ -68,14 +69,26 @@ def is_cacheable_msg(msg: ForwardMsg) -> bool:
     return msg.ByteSize() >= int(config.get_option("global.minCachedMessageSize"))
 
 
-def serialize_forward_msg(msg: ForwardMsg) -> bytes:
+def serialize_forward_msg(
+    msg: ForwardMsg, message_cache: ForwardMsgCache | None = None
+) -> bytes:
     """Serialize a ForwardMsg to send to a client.
 
     If the message is too large, it will be converted to an exception message
     instead.
+
+    If a message_cache is given and it holds the message's serialized payload,
+    that payload is reused instead of serializing the message again.
     """
-    populate_hash_if_needed(msg)
-    msg_str = msg.SerializeToString()
+    if msg.WhichOneof("type") == "forward_msg_list":
+        # Batches are assembled from already-serialized messages that have
+        # been checked against the size limit individually (see
+        # create_forward_msg_batches), so there is nothing left to do here.
+        return msg.SerializeToString()
+
+    msg_str = message_cache.get_serialized_message(msg) if message_cache else None
+    if msg_str is None:
+        msg_str = serialize_with_hash(msg)
 
     if len(msg_str) > get_max_message_size_bytes():
         import streamlit.elements.exception as exception
@@ -88,6 +101,57 @@ def serialize_forward_msg(msg: ForwardMsg) -> bytes:
     return msg_str
 
 
+# The worst-case framing overhead that a single entry adds to a ForwardMsgList:
+# one byte for the field tag plus up to five bytes for the varint length prefix.
+_BATCH_ENTRY_OVERHEAD_BYTES: Final = 6
+
+
+def create_forward_msg_batches(
+    msgs: list[ForwardMsg], message_cache: ForwardMsgCache | None = None
+) -> list[ForwardMsg]:
+    """Bundle the given ForwardMsgs into as few ForwardMsgList envelopes as
+    possible.
+
+    Each message is serialized individually (and is subject to the same size
+    checks as in serialize_forward_msg). A new envelope is started whenever
+    adding the next message would push the current envelope past the max
+    websocket message size, so a single envelope never exceeds that limit
+    unless it contains just one message.
+
+    Parameters
+    ----------
+    msgs : list[ForwardMsg]
+        The messages to bundle, in the order they should be delivered.
+    message_cache : ForwardMsgCache | None
+        Passed on to serialize_forward_msg.
+
+    Returns
+    -------
+    list[ForwardMsg]
+        The envelopes, in delivery order.
+    """
+    max_size = get_max_message_size_bytes()
+    batches: list[ForwardMsg] = []
+    batch: ForwardMsg | None = None
+    batch_size = 0
+
+    for msg in msgs:
+        msg_bytes = serialize_forward_msg(msg, message_cache)
+        entry_size = len(msg_bytes) + _BATCH_ENTRY_OVERHEAD_BYTES
+
+        if batch is None or batch_size + entry_size > max_size:
+            batch = ForwardMsg()
+            # Make sure the envelope's oneof is set even before we add entries.
+            batch.forward_msg_list.SetInParent()
+            batches.append(batch)
+            batch_size = 0
+
+        batch.forward_msg_list.messages.append(msg_bytes)
+        batch_size += entry_size
+
+    return batches
+
+
 # This needs to be initialized lazily to avoid calling config.get_option() and
 # thus initializing config options when this file is first imported.
 _max_message_size_bytes: int | None = None
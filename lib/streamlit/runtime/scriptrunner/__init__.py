@@ -19,13 +19,19 @@ from streamlit.runtime.scriptrunner.script_run_context import (
     add_script_run_ctx,
     get_script_run_ctx,
 )
+from streamlit.runtime.scriptrunner.script_run_pool import (
+    ScriptRunPool,
+    get_script_run_pool,
+)
 from streamlit.runtime.scriptrunner.script_runner import ScriptRunner, ScriptRunnerEvent
 
 __all__ = [
     "RerunData",
     "ScriptRunContext",
+    "ScriptRunPool",
     "add_script_run_ctx",
     "get_script_run_ctx",
+    "get_script_run_pool",
     "RerunException",
     "ScriptRunner",
     "ScriptRunnerEvent",
@@ -14,22 +14,49 @@
 
 from __future__ import annotations
 
+import hashlib
+import importlib.util
+import marshal
 import os.path
+import sys
 import threading
-from typing import Any
+from typing import Any, Final
 
 from streamlit import config
+from streamlit.logger import get_logger
 from streamlit.runtime.scriptrunner import magic
 from streamlit.source_util import open_python_file
+from streamlit.version import STREAMLIT_VERSION_STRING
+
+_LOGGER: Final = get_logger(__name__)
+
+# Every persisted file starts with the digest of everything its bytecode
+# depends on. See `_get_source_digest`.
+_DIGEST_SIZE: Final = hashlib.sha256().digest_size
 
 
 class ScriptCache:
-    """Thread-safe cache of Python script bytecode."""
+    """Thread-safe cache of Python script bytecode.
 
-    def __init__(self):
+    If `persist_dir` is given, compiled scripts are also written to it, and
+    read back instead of transforming and compiling the same source again,
+    e.g. after a server restart or after `clear`. Each script has one file in
+    `persist_dir`, which is only used if the script's source, the Python and
+    Streamlit versions and the magic settings haven't changed since it was
+    written.
+    """
+
+    def __init__(self, persist_dir: str | None = None):
         # Mapping of script_path: bytecode
         self._cache: dict[str, Any] = {}
         self._lock = threading.Lock()
+        # Scripts are compiled while holding only their own lock, so that
+        # sessions running different scripts don't wait for each other.
+        self._path_locks: dict[str, threading.Lock] = {}
+        # Incremented by `clear`, so that bytecode that was being compiled
+        # during a `clear` isn't cached.
+        self._generation = 0
+        self._persist_dir = persist_dir
 
     def clear(self) -> None:
         """Remove all entries from the cache.
@@ -40,6 +67,7 @@ class ScriptCache:
         """
         with self._lock:
             self._cache.clear()
+            self._generation += 1
 
     def get_bytecode(self, script_path: str) -> Any:
         """Return the bytecode for the Python script at the given path.
@@ -63,27 +91,124 @@ class ScriptCache:
             if bytecode is not None:
                 # Fast path: the code is already cached.
                 return bytecode
+            path_lock = self._path_locks.setdefault(script_path, threading.Lock())
+
+        with path_lock:
+            with self._lock:
+                # The script may have been compiled while we were waiting to
+                # grab the lock.
+                bytecode = self._cache.get(script_path, None)
+                if bytecode is not None:
+                    return bytecode
+                generation = self._generation
 
             # Populate the cache
-            with open_python_file(script_path) as f:
-                filebody = f.read()
-
-            if config.get_option("runner.magicEnabled"):
-                filebody = magic.add_magic(filebody, script_path)
-
-            bytecode = compile(  # type: ignore
-                filebody,
-                # Pass in the file path so it can show up in exceptions.
-                script_path,
-                # We're compiling entire blocks of Python, so we need "exec"
-                # mode (as opposed to "eval" or "single").
-                mode="exec",
-                # Don't inherit any flags or "future" statements.
-                flags=0,
-                dont_inherit=1,
-                # Use the default optimization options.
-                optimize=-1,
-            )
+            bytecode = self._load_bytecode(script_path)
 
-            self._cache[script_path] = bytecode
+            with self._lock:
+                if generation == self._generation:
+                    self._cache[script_path] = bytecode
             return bytecode
+
+    def _load_bytecode(self, script_path: str) -> Any:
+        with open_python_file(script_path) as f:
+            filebody = f.read()
+
+        magic_enabled = config.get_option("runner.magicEnabled")
+
+        digest = None
+        if self._persist_dir is not None:
+            digest = _get_source_digest(script_path, filebody, magic_enabled)
+            bytecode = self._read_persisted_bytecode(script_path, digest)
+            if bytecode is not None:
+                return bytecode
+
+        if magic_enabled:
+            filebody = magic.add_magic(filebody, script_path)
+
+        bytecode = compile(  # type: ignore
+            filebody,
+            # Pass in the file path so it can show up in exceptions.
+            script_path,
+            # We're compiling entire blocks of Python, so we need "exec"
+            # mode (as opposed to "eval" or "single").
+            mode="exec",
+            # Don't inherit any flags or "future" statements.
+            flags=0,
+            dont_inherit=1,
+            # Use the default optimization options.
+            optimize=-1,
+        )
+
+        if digest is not None:
+            self._write_persisted_bytecode(script_path, digest, bytecode)
+        return bytecode
+
+    def _get_persisted_path(self, script_path: str) -> str:
+        assert self._persist_dir is not None
+        name = hashlib.sha256(script_path.encode("utf-8")).hexdigest()
+        return os.path.join(self._persist_dir, f"{name}.bin")
+
+    def _read_persisted_bytecode(self, script_path: str, digest: bytes) -> Any:
+        """Return the persisted bytecode of the script, or None if there is
+        none or it was compiled from something else.
+        """
+        try:
+            with open(self._get_persisted_path(script_path), "rb") as f:
+                if f.read(_DIGEST_SIZE) != digest:
+                    return None
+                return marshal.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError, TypeError) as ex:
+            _LOGGER.debug("Unable to read persisted bytecode: %s", ex)
+            return None
+
+    def _write_persisted_bytecode(
+        self, script_path: str, digest: bytes, bytecode: Any
+    ) -> None:
+        if sys.dont_write_bytecode:
+            return
+
+        path = self._get_persisted_path(script_path)
+        # Write to a temporary file first, so that other processes never read
+        # a partially written file.
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(digest)
+                f.write(marshal.dumps(bytecode))
+            os.replace(tmp_path, path)
+        except OSError as ex:
+            # The cache is an optimization. Scripts still run without it.
+            _LOGGER.debug("Unable to persist bytecode: %s", ex)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+def _get_source_digest(script_path: str, filebody: str, magic_enabled: bool) -> bytes:
+    """Return a digest of everything that the bytecode of a script depends on."""
+    hasher = hashlib.sha256()
+    # The bytecode format of this Python version.
+    hasher.update(importlib.util.MAGIC_NUMBER)
+    # `optimize=-1` compiles with the interpreter's optimization level.
+    hasher.update(str(sys.flags.optimize).encode())
+    # The script path is part of the bytecode, e.g. for tracebacks.
+    hasher.update(script_path.encode("utf-8"))
+    # How `magic.add_magic` transforms the script depends on the Streamlit
+    # version, and on the magic settings.
+    hasher.update(
+        repr(
+            (
+                STREAMLIT_VERSION_STRING,
+                magic_enabled,
+                config.get_option("magic.displayRootDocString"),
+                config.get_option("magic.displayLastExprIfNoSemicolon"),
+            )
+        ).encode()
+    )
+    hasher.update(filebody.encode("utf-8", "surrogatepass"))
+    return hasher.digest()
@@ -151,6 +151,15 @@ class ScriptRequests:
             # We'll never get here
             raise RuntimeError(f"Unrecognized ScriptRunnerState: {self._state}")
 
+    def peek_rerun_data(self) -> RerunData | None:
+        """Return the data of the pending RERUN request without handling it,
+        or None if there is no RERUN request.
+        """
+        with self._lock:
+            if self._state == ScriptRequestType.RERUN:
+                return self._rerun_data
+            return None
+
     def on_scriptrunner_yield(self) -> ScriptRequest | None:
         """Called by the ScriptRunner when it's at a yield point.
 
@@ -0,0 +1,370 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A fixed set of worker threads that run the scripts of all sessions.
+
+Without a pool, every ScriptRunner starts its own thread, and nothing limits
+how many scripts run at once. With a pool, script runs wait in a global queue
+until a worker is free. Reruns triggered by widget interactions go ahead of
+other runs, like initial page loads.
+
+Each worker handles one script run of a ScriptRunner at a time. If the
+ScriptRunner has another rerun request once its script finishes, it's queued
+again, so that a session that reruns continuously can't hog a worker.
+
+When `runner.maxQueuedScriptRuns` runs are already waiting, new runs are
+handled according to `runner.overloadPolicy`:
+
+- "queue": they're queued anyway.
+- "shed": the newest lowest-priority run that has never started is dropped.
+- "busy": like "shed", but the dropped run's user is told that the app is busy.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from enum import IntEnum
+from typing import TYPE_CHECKING, Final, Literal, cast
+
+from streamlit import config
+from streamlit.errors import StreamlitAPIException, StreamlitAPIWarning
+from streamlit.logger import get_logger
+from streamlit.runtime.stats import (
+    CounterStat,
+    GaugeStat,
+    Histogram,
+    MetricFamily,
+    Stat,
+    StatsProvider,
+)
+
+if TYPE_CHECKING:
+    from streamlit.runtime.scriptrunner.script_requests import RerunData
+    from streamlit.runtime.scriptrunner.script_runner import ScriptRunner
+
+_LOGGER: Final = get_logger(__name__)
+
+OverloadPolicy = Literal["queue", "shed", "busy"]
+
+ALLOWED_OVERLOAD_POLICIES: Final = ("queue", "shed", "busy")
+
+SCRIPT_RUN_QUEUE_DURATION_FAMILY: Final = MetricFamily(
+    name="script_run_queue_duration_seconds",
+    type="histogram",
+    unit="seconds",
+    help="Time that script runs waited for a ScriptRunPool worker.",
+)
+
+SCRIPT_RUN_QUEUE_LENGTH_FAMILY: Final = MetricFamily(
+    name="script_run_queue_length",
+    type="gauge",
+    unit="",
+    help="Number of script runs waiting for a ScriptRunPool worker.",
+)
+
+SCRIPT_RUNS_REJECTED_FAMILY: Final = MetricFamily(
+    name="script_runs_rejected",
+    type="counter",
+    unit="",
+    help="Number of script runs dropped because the ScriptRunPool was overloaded.",
+)
+
+SCRIPT_RUN_POOL_BUSY_WORKERS_FAMILY: Final = MetricFamily(
+    name="script_run_pool_busy_workers",
+    type="gauge",
+    unit="",
+    help="Number of ScriptRunPool workers that are running a script.",
+)
+
+_QUEUE_DURATION_BUCKET_BOUNDS: Final = (
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+    10.0,
+    30.0,
+)
+
+_BUSY_MESSAGE: Final = (
+    "This app is handling too many requests right now. Please try again in a moment."
+)
+
+
+class ScriptRunPriority(IntEnum):
+    """Queued script runs with lower values run first."""
+
+    # Reruns triggered by widget interactions. A user is waiting for them.
+    INTERACTIVE = 0
+    # Initial page loads and other reruns without widget states.
+    PAGE_LOAD = 1
+
+
+def _get_priority(rerun_data: RerunData | None) -> ScriptRunPriority:
+    if rerun_data is None or rerun_data.widget_states is None:
+        return ScriptRunPriority.PAGE_LOAD
+    widget_states = rerun_data.widget_states
+    # The client sends a full, empty WidgetStates with its first rerun
+    # request, before it has any widgets.
+    if not widget_states.is_delta and not widget_states.widgets:
+        return ScriptRunPriority.PAGE_LOAD
+    return ScriptRunPriority.INTERACTIVE
+
+
+class _QueuedRun:
+    __slots__ = ("runner", "priority", "seq", "enqueue_time", "started", "removed")
+
+    def __init__(
+        self,
+        runner: ScriptRunner,
+        priority: ScriptRunPriority,
+        seq: int,
+        started: bool,
+    ):
+        self.runner = runner
+        self.priority = priority
+        self.seq = seq
+        self.enqueue_time = time.monotonic()
+        # True if the runner has already run its script, and was queued again
+        # for its next rerun. Started runners are never rejected.
+        self.started = started
+        # True if the run was rejected while queued. Removed runs are skipped
+        # when they're popped from the heap.
+        self.removed = False
+
+    def __lt__(self, other: _QueuedRun) -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class ScriptRunPool(StatsProvider):
+    """Runs queued ScriptRunners on a fixed number of worker threads.
+
+    Notes
+    -----
+    Threading: all public methods are thread safe. ScriptRunner callbacks
+    (`reject` in particular) are called without holding the pool's lock.
+    """
+
+    def __init__(
+        self,
+        num_workers: int,
+        max_queued_runs: int,
+        overload_policy: OverloadPolicy,
+    ):
+        if overload_policy not in ALLOWED_OVERLOAD_POLICIES:
+            raise StreamlitAPIException(
+                "Invalid value for config option runner.overloadPolicy. "
+                f"Expected one of {ALLOWED_OVERLOAD_POLICIES}, "
+                f"but got '{overload_policy}'."
+            )
+
+        self._max_queued_runs = max_queued_runs
+        self._overload_policy = overload_policy
+
+        self._cond = threading.Condition()
+        self._heap: list[_QueuedRun] = []
+        self._seq = itertools.count()
+        self._queue_lengths = {priority: 0 for priority in ScriptRunPriority}
+        self._rejected = {priority: 0 for priority in ScriptRunPriority}
+        self._queue_durations = {
+            priority: Histogram(_QUEUE_DURATION_BUCKET_BOUNDS)
+            for priority in ScriptRunPriority
+        }
+        self._busy_workers = 0
+
+        self._workers = [
+            threading.Thread(
+                target=self._worker_loop,
+                name=f"ScriptRunPool.worker-{i}",
+                daemon=True,
+            )
+            for i in range(num_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    @property
+    def num_workers(self) -> int:
+        return len(self._workers)
+
+    @property
+    def queue_length(self) -> int:
+        with self._cond:
+            return sum(self._queue_lengths.values())
+
+    def submit(self, runner: ScriptRunner) -> None:
+        """Queue a new ScriptRunner's first script run.
+
+        If the pool is overloaded, this or another queued run may be rejected
+        instead, according to the pool's overload policy.
+        """
+        priority = _get_priority(runner.pending_rerun_data())
+        victim: _QueuedRun | None = None
+        with self._cond:
+            entry = _QueuedRun(runner, priority, next(self._seq), started=False)
+            if self._is_full():
+                victim = self._pick_victim(entry)
+
+            if victim is not entry:
+                self._push(entry)
+            if victim is not None:
+                self._rejected[victim.priority] += 1
+
+        if victim is not None:
+            _LOGGER.debug("ScriptRunPool is overloaded, rejecting a script run")
+            victim.runner.reject(
+                StreamlitAPIWarning(_BUSY_MESSAGE)
+                if self._overload_policy == "busy"
+                else None
+            )
+
+    def get_stats(self) -> list[Stat]:
+        stats: list[Stat] = []
+        with self._cond:
+            for priority in ScriptRunPriority:
+                labels = (("priority", priority.name.lower()),)
+                stats.append(
+                    self._queue_durations[priority].to_stat(
+                        SCRIPT_RUN_QUEUE_DURATION_FAMILY, labels
+                    )
+                )
+                stats.append(
+                    GaugeStat(
+                        SCRIPT_RUN_QUEUE_LENGTH_FAMILY,
+                        labels,
+                        self._queue_lengths[priority],
+                    )
+                )
+                stats.append(
+                    CounterStat(
+                        SCRIPT_RUNS_REJECTED_FAMILY, labels, self._rejected[priority]
+                    )
+                )
+            stats.append(
+                GaugeStat(SCRIPT_RUN_POOL_BUSY_WORKERS_FAMILY, (), self._busy_workers)
+            )
+        return stats
+
+    def _is_full(self) -> bool:
+        return (
+            self._overload_policy != "queue"
+            and self._max_queued_runs > 0
+            and sum(self._queue_lengths.values()) >= self._max_queued_runs
+        )
+
+    def _pick_victim(self, new_entry: _QueuedRun) -> _QueuedRun:
+        """Return the run to reject when `new_entry` is submitted to a full
+        queue: the newest run of the lowest priority that never started.
+        Must be called while holding the lock.
+        """
+        victim = new_entry
+        for entry in self._heap:
+            if (
+                not entry.removed
+                and not entry.started
+                and (entry.priority, entry.seq) > (victim.priority, victim.seq)
+            ):
+                victim = entry
+
+        if victim is not new_entry:
+            victim.removed = True
+            self._queue_lengths[victim.priority] -= 1
+        return victim
+
+    def _push(self, entry: _QueuedRun) -> None:
+        heapq.heappush(self._heap, entry)
+        self._queue_lengths[entry.priority] += 1
+        self._cond.notify()
+
+    def _requeue(self, runner: ScriptRunner) -> None:
+        """Queue a runner's next script run."""
+        priority = _get_priority(runner.pending_rerun_data())
+        with self._cond:
+            self._push(_QueuedRun(runner, priority, next(self._seq), started=True))
+
+    def _pop(self) -> ScriptRunner:
+        """Wait for the next queued run, and return its runner."""
+        with self._cond:
+            while True:
+                while not self._heap:
+                    self._cond.wait()
+                entry = heapq.heappop(self._heap)
+                if not entry.removed:
+                    break
+
+            self._queue_lengths[entry.priority] -= 1
+            self._queue_durations[entry.priority].observe(
+                time.monotonic() - entry.enqueue_time
+            )
+            self._busy_workers += 1
+            return entry.runner
+
+    def _worker_loop(self) -> None:
+        while True:
+            runner = self._pop()
+            try:
+                self._run(runner)
+            except Exception:
+                # ScriptRunner handles script errors itself. Anything that
+                # reaches us is a bug, but it mustn't take the worker down.
+                _LOGGER.exception("ScriptRunPool worker failed to run a script")
+            finally:
+                with self._cond:
+                    self._busy_workers -= 1
+
+    def _run(self, runner: ScriptRunner) -> None:
+        while runner.run_pooled_step():
+            if runner.pending_rerun_data() is not None:
+                # Give other sessions a chance to run before the next rerun.
+                self._requeue(runner)
+                return
+            # Otherwise, the next step shuts the runner down. (Unless a rerun
+            # was requested in the meantime, in which case it runs right away.)
+
+
+_pool_lock = threading.Lock()
+_pool: ScriptRunPool | None = None
+
+
+def get_script_run_pool() -> ScriptRunPool | None:
+    """Return the ScriptRunPool that runs the scripts of all sessions, or None
+    if `runner.scriptRunPoolSize` is 0 and every ScriptRunner uses its own
+    thread.
+
+    The pool is created on the first call.
+    """
+    global _pool
+
+    num_workers = cast(int, config.get_option("runner.scriptRunPoolSize"))
+    if num_workers <= 0:
+        return None
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = ScriptRunPool(
+                num_workers=num_workers,
+                max_queued_runs=cast(
+                    int, config.get_option("runner.maxQueuedScriptRuns")
+                ),
+                overload_policy=cast(
+                    OverloadPolicy, config.get_option("runner.overloadPolicy")
+                ),
+            )
+        return _pool
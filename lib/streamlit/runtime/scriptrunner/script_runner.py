@@ -38,6 +38,7 @@ from streamlit.runtime.scriptrunner.script_requests import (
     ScriptRequestType,
 )
 from streamlit.runtime.scriptrunner.script_run_context import (
+    SCRIPT_RUN_CONTEXT_ATTR_NAME,
     ScriptRunContext,
     add_script_run_ctx,
     get_script_run_ctx,
@@ -53,6 +54,7 @@ if TYPE_CHECKING:
     from streamlit.runtime.fragment import FragmentStorage
     from streamlit.runtime.pages_manager import PagesManager
     from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.runtime.scriptrunner.script_run_pool import ScriptRunPool
     from streamlit.runtime.uploaded_file_manager import UploadedFileManager
 
 _LOGGER: Final = get_logger(__name__)
@@ -78,6 +80,10 @@ class ScriptRunnerEvent(Enum):
     # by the user.
     FRAGMENT_STOPPED_WITH_SUCCESS = "FRAGMENT_STOPPED_WITH_SUCCESS"
 
+    # The script run was rejected by the ScriptRunPool, because too many
+    # script runs were waiting for a worker. A SHUTDOWN event follows.
+    SCRIPT_REJECTED = "SCRIPT_REJECTED"
+
     # The ScriptRunner is done processing the ScriptEventQueue and
     # is shut down.
     SHUTDOWN = "SHUTDOWN"
@@ -98,6 +104,11 @@ A script thread is created by a ScriptRunner when it starts. The script thread
 is where the ScriptRunner executes, including running the user script itself,
 processing messages to/from the frontend, and all the Streamlit library function
 calls in the user script.
+If `runner.scriptRunPoolSize` is set, ScriptRunners don't create threads.
+Instead, the script runs of all sessions are queued in a ScriptRunPool, and run
+one at a time on its fixed set of worker threads. The worker thread that is
+running a ScriptRunner's script is its script thread for the duration of the
+run.
 It is possible for the user script to spawn its own threads, which could call
 Streamlit functions. We restrict the ScriptRunner's execution control to the
 script thread. Calling Streamlit functions from other threads is unlikely to
@@ -118,6 +129,7 @@ class ScriptRunner:
         user_info: dict[str, str | None],
         fragment_storage: FragmentStorage,
         pages_manager: PagesManager,
+        script_run_pool: ScriptRunPool | None = None,
     ):
         """Initialize the ScriptRunner.
 
@@ -156,6 +168,13 @@ class ScriptRunner:
 
         fragment_storage
             The AppSession's FragmentStorage instance.
+
+        pages_manager
+            The AppSession's PagesManager instance.
+
+        script_run_pool
+            The ScriptRunPool to run the script on. If None, the ScriptRunner
+            starts its own script thread.
         """
         self._session_id = session_id
         self._main_script_path = main_script_path
@@ -168,6 +187,8 @@ class ScriptRunner:
         self._fragment_storage = fragment_storage
 
         self._pages_manager = pages_manager
+        self._script_run_pool = script_run_pool
+        self._initial_rerun_data = initial_rerun_data
         self._requests = ScriptRequests()
         self._requests.request_rerun(initial_rerun_data)
 
@@ -191,7 +212,8 @@ class ScriptRunner:
 
             exception : BaseException | None
                 Our compile error. Set only for the
-                SCRIPT_STOPPED_WITH_COMPILE_ERROR event.
+                SCRIPT_STOPPED_WITH_COMPILE_ERROR event. For the
+                SCRIPT_REJECTED event, the warning to show to the user, if any.
 
             widget_states : streamlit.proto.WidgetStates_pb2.WidgetStates | None
                 The ScriptRunner's final WidgetStates. Set only for the
@@ -203,8 +225,14 @@ class ScriptRunner:
         # _maybe_handle_execution_control_request.
         self._execing = False
 
-        # This is initialized in start()
+        # This is initialized in start(). With a ScriptRunPool, it's the worker
+        # thread that is running our script, if any.
         self._script_thread: threading.Thread | None = None
+        self._started = False
+
+        # With a ScriptRunPool, our ScriptRunContext outlives the worker
+        # threads that it's attached to.
+        self._pooled_ctx: ScriptRunContext | None = None
 
     def __repr__(self) -> str:
         return util.repr_(self)
@@ -233,13 +261,19 @@ class ScriptRunner:
         return self._requests.request_rerun(rerun_data)
 
     def start(self) -> None:
-        """Start a new thread to process the ScriptEventQueue.
+        """Start a new thread to process the ScriptEventQueue, or queue the
+        ScriptRunner in our ScriptRunPool.
 
         This must be called only once.
 
         """
-        if self._script_thread is not None:
+        if self._started:
             raise Exception("ScriptRunner was already started")
+        self._started = True
+
+        if self._script_run_pool is not None:
+            self._script_run_pool.submit(self)
+            return
 
         self._script_thread = threading.Thread(
             target=self._run_script_thread,
@@ -288,19 +322,7 @@ class ScriptRunner:
         _LOGGER.debug("Beginning script thread")
 
         # Create and attach the thread's ScriptRunContext
-        ctx = ScriptRunContext(
-            session_id=self._session_id,
-            _enqueue=self._enqueue_forward_msg,
-            script_requests=self._requests,
-            query_string="",
-            session_state=self._session_state,
-            uploaded_file_mgr=self._uploaded_file_mgr,
-            main_script_path=self._main_script_path,
-            user_info=self._user_info,
-            gather_usage_stats=bool(config.get_option("browser.gatherUsageStats")),
-            fragment_storage=self._fragment_storage,
-            pages_manager=self._pages_manager,
-        )
+        ctx = self._create_script_run_ctx()
         add_script_run_ctx(threading.current_thread(), ctx)
 
         request = self._requests.on_scriptrunner_ready()
@@ -313,12 +335,96 @@ class ScriptRunner:
             request = self._requests.on_scriptrunner_ready()
 
         assert request.type == ScriptRequestType.STOP
+        self._send_shutdown_event(ctx.query_string, ctx.page_script_hash)
+
+    def get_session_state_value_sizes(self) -> dict[str, int]:
+        """Return the estimated memory used by each session state value, in
+        bytes, while holding the lock that the script takes to access it.
+
+        Safe to call from any thread.
+        """
+        return self._session_state.get_value_sizes()
+
+    def get_pickled_session_state_values(self) -> dict[str, bytes]:
+        """Return the pickled values set through the session state API, while
+        holding the lock that the script takes to access them.
+
+        Safe to call from any thread.
+        """
+        return self._session_state.get_pickled_user_values()
+
+    def pending_rerun_data(self) -> RerunData | None:
+        """The data of the script run that this ScriptRunner will handle
+        next, or None if it will shut down instead.
+
+        Safe to call from any thread.
+        """
+        return self._requests.peek_rerun_data()
+
+    def run_pooled_step(self) -> bool:
+        """Handle our next request on the calling ScriptRunPool worker
+        thread: run the script once if a rerun was requested, or shut down.
 
+        Return True if the script ran, and False if the ScriptRunner shut down.
+        """
+        thread = threading.current_thread()
+        self._script_thread = thread
+        if self._pooled_ctx is None:
+            self._pooled_ctx = self._create_script_run_ctx()
+        add_script_run_ctx(thread, self._pooled_ctx)
+
+        try:
+            request = self._requests.on_scriptrunner_ready()
+            if request.type == ScriptRequestType.RERUN:
+                self._run_script(request.rerun_data)
+                return True
+
+            assert request.type == ScriptRequestType.STOP
+            self._send_shutdown_event(
+                self._pooled_ctx.query_string, self._pooled_ctx.page_script_hash
+            )
+            return False
+        finally:
+            # The worker thread runs other sessions' scripts next.
+            setattr(thread, SCRIPT_RUN_CONTEXT_ATTR_NAME, None)
+            self._script_thread = None
+
+    def reject(self, warning: BaseException | None = None) -> None:
+        """Shut down without running the script, because the ScriptRunPool
+        is overloaded. If `warning` is set, it's shown to the user.
+
+        Only called for ScriptRunners whose script never ran.
+        """
+        self._requests.request_stop()
+        self.on_event.send(
+            self, event=ScriptRunnerEvent.SCRIPT_REJECTED, exception=warning
+        )
+        self._send_shutdown_event(
+            self._initial_rerun_data.query_string,
+            self._initial_rerun_data.page_script_hash,
+        )
+
+    def _create_script_run_ctx(self) -> ScriptRunContext:
+        return ScriptRunContext(
+            session_id=self._session_id,
+            _enqueue=self._enqueue_forward_msg,
+            script_requests=self._requests,
+            query_string="",
+            session_state=self._session_state,
+            uploaded_file_mgr=self._uploaded_file_mgr,
+            main_script_path=self._main_script_path,
+            user_info=self._user_info,
+            gather_usage_stats=bool(config.get_option("browser.gatherUsageStats")),
+            fragment_storage=self._fragment_storage,
+            pages_manager=self._pages_manager,
+        )
+
+    def _send_shutdown_event(self, query_string: str, page_script_hash: str) -> None:
         # Send a SHUTDOWN event before exiting, so some state can be saved
         # for use in a future script run when not triggered by the client.
         client_state = ClientState()
-        client_state.query_string = ctx.query_string
-        client_state.page_script_hash = ctx.page_script_hash
+        client_state.query_string = query_string
+        client_state.page_script_hash = page_script_hash
         self.on_event.send(
             self, event=ScriptRunnerEvent.SHUTDOWN, client_state=client_state
         )
@@ -445,7 +551,9 @@ class ScriptRunner:
                 # before the previous script run is completed (from user
                 # interaction). Use the widget ids from the rerun data to
                 # maintain some widget state, as the rerun data should
-                # contain the latest widget ids from the frontend.
+                # contain the latest widget ids from the frontend. (Unless it
+                # only contains the widgets that changed, in which case the
+                # stale widgets are removed when the script run finishes.)
                 widget_ids: set[str] = set()
 
                 if (
@@ -453,7 +561,11 @@ class ScriptRunner:
                     and rerun_data.widget_states.widgets is not None
                 ):
                     widget_ids = {w.id for w in rerun_data.widget_states.widgets}
-                self._session_state.on_script_finished(widget_ids)
+                if (
+                    rerun_data.widget_states is None
+                    or not rerun_data.widget_states.is_delta
+                ):
+                    self._session_state.on_script_finished(widget_ids)
 
             ctx.reset(
                 query_string=rerun_data.query_string,
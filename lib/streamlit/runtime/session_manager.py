@@ -16,7 +16,14 @@ from __future__ import annotations
 
 from abc import abstractmethod
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Callable, Protocol, cast
+from typing import (
+    TYPE_CHECKING,
+    Awaitable,
+    Callable,
+    Protocol,
+    cast,
+    runtime_checkable,
+)
 
 if TYPE_CHECKING:
     from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
@@ -34,11 +41,15 @@ class SessionClient(Protocol):
     """Interface for sending data to a session's client."""
 
     @abstractmethod
-    def write_forward_msg(self, msg: ForwardMsg) -> None:
+    def write_forward_msg(self, msg: ForwardMsg) -> Awaitable[None] | None:
         """Deliver a ForwardMsg to the client.
 
         If the SessionClient has been disconnected, it should raise a
         SessionClientDisconnectedError.
+
+        Implementations may return an awaitable that completes once the message
+        has been flushed to the underlying transport. The Runtime won't send
+        any more messages to the client until it does.
         """
         raise NotImplementedError
 
@@ -81,6 +92,24 @@ class SessionInfo:
         return cast(ActiveSessionInfo, self)
 
 
+@dataclass
+class SessionSnapshot:
+    """The state of a disconnected session that was shut down, from which an
+    equivalent session can be created when the session's client reconnects.
+
+    Widget values aren't part of the snapshot, other than in `client_state`:
+    reconnecting clients send them again.
+    """
+
+    session_id: str
+    script_run_count: int
+    # The serialized ClientState of the session's last script run, which holds
+    # its query string and page.
+    client_state: bytes
+    # The pickled values set through st.session_state, keyed by user key.
+    user_state: dict[str, bytes]
+
+
 class SessionStorageError(Exception):
     """Exception class for errors raised by SessionStorage.
 
@@ -168,6 +197,56 @@ class SessionStorage(Protocol):
         raise NotImplementedError
 
 
+@runtime_checkable
+class SessionSnapshotStorage(SessionStorage, Protocol):
+    """A SessionStorage that may shut down the sessions it stores, e.g. to free
+    memory, and keep a SessionSnapshot of each instead.
+
+    SessionManagers recreate a session from its snapshot when the session's
+    client reconnects and `get` doesn't return it.
+    """
+
+    @abstractmethod
+    def pop_snapshot(self, session_id: str) -> SessionSnapshot | None:
+        """Return the SessionSnapshot corresponding to session_id, and stop tracking
+        it, or return None if one does not exist.
+
+        Parameters
+        ----------
+        session_id
+            The unique ID of the session whose snapshot is being fetched.
+
+        Returns
+        -------
+        SessionSnapshot or None
+
+        Raises
+        ------
+        SessionStorageError
+            Raised if an error occurs while attempting to fetch the snapshot.
+        """
+        raise NotImplementedError
+
+    async def load_snapshot(self, session_id: str) -> None:
+        """Read the SessionSnapshot corresponding to session_id ahead of a call to
+        `pop_snapshot`, so that `pop_snapshot` doesn't block the event loop.
+
+        The default implementation does nothing. It only needs to be overwritten
+        by SessionSnapshotStorages that keep their snapshots out of memory.
+
+        Parameters
+        ----------
+        session_id
+            The unique ID of the session whose snapshot is being loaded.
+
+        Raises
+        ------
+        SessionStorageError
+            Raised if an error occurs while attempting to load the snapshot.
+        """
+        pass
+
+
 class SessionManager(Protocol):
     """SessionManagers are responsible for encapsulating all session lifecycle behavior
     that the Streamlit Runtime may care about.
@@ -328,6 +407,23 @@ class SessionManager(Protocol):
         """
         return len(self.list_sessions())
 
+    async def prepare_connect_session(self, existing_session_id: str) -> None:
+        """Do the slow work, e.g. reading from disk, that reconnecting to the given
+        session requires, before `connect_session` is called with it.
+
+        `connect_session` must be called on the event loop thread, so this lets a
+        SessionManager whose SessionStorage keeps sessions out of memory reconnect
+        to them without blocking the event loop. The default implementation does
+        nothing.
+
+        Parameters
+        ----------
+        existing_session_id
+            The ID of the existing session that `connect_session` will be called
+            with.
+        """
+        pass
+
     # NOTE: The following methods only need to be overwritten when a concrete
     # SessionManager implementation has a notion of active vs inactive sessions.
     # If left unimplemented in a subclass, the default implementations of these methods
@@ -78,6 +78,16 @@ class SafeSessionState:
         with self._lock:
             return self._state.get_widget_states()
 
+    def get_value_sizes(self) -> dict[str, int]:
+        """Return the estimated memory used by each value, in bytes."""
+        with self._lock:
+            return self._state.get_value_sizes()
+
+    def get_pickled_user_values(self) -> dict[str, bytes]:
+        """Return the pickled values set through the session state API."""
+        with self._lock:
+            return self._state.get_pickled_user_values()
+
     def is_new_state_value(self, user_key: str) -> bool:
         with self._lock:
             return self._state.is_new_state_value(user_key)
@@ -14,6 +14,7 @@
 
 from __future__ import annotations
 
+import heapq
 import json
 import pickle
 from copy import deepcopy
@@ -45,7 +46,15 @@ from streamlit.runtime.state.common import (
     is_widget_id,
 )
 from streamlit.runtime.state.query_params import QueryParams
-from streamlit.runtime.stats import CacheStat, CacheStatsProvider, group_stats
+from streamlit.runtime.stats import (
+    CacheStat,
+    GaugeStat,
+    MetricFamily,
+    Stat,
+    StatsProvider,
+    estimate_size,
+    group_stats,
+)
 from streamlit.type_util import ValueFieldName, is_array_value_field_name
 
 if TYPE_CHECKING:
@@ -57,6 +66,24 @@ SCRIPT_RUN_WITHOUT_ERRORS_KEY: Final = (
     f"{STREAMLIT_INTERNAL_KEY_PREFIX}_SCRIPT_RUN_WITHOUT_ERRORS"
 )
 
+SESSION_STATE_MEMORY_FAMILY: Final = MetricFamily(
+    name="session_state_memory_bytes",
+    type="gauge",
+    unit="bytes",
+    help="Estimated memory used by the session states that use the most memory.",
+)
+
+SESSION_STATE_VALUE_MEMORY_FAMILY: Final = MetricFamily(
+    name="session_state_value_memory_bytes",
+    type="gauge",
+    unit="bytes",
+    help="Estimated memory used by the session state values that use the most memory.",
+)
+
+# How many sessions, and how many values, SessionStateStatProvider reports
+# individually.
+_TOP_MEMORY_STATS_COUNT: Final = 10
+
 
 @dataclass(frozen=True)
 class Serialized:
@@ -312,6 +339,18 @@ class SessionState:
     # query params are stored in session state because query params will be tied with widget state at one point.
     query_params: QueryParams = field(default_factory=QueryParams)
 
+    # Pickled sizes of the values that passed `_check_serializable`, keyed like
+    # `_keys()`. Values that were set, or updated by a widget, since then are
+    # in `_unchecked_keys` and will be checked again. Values that user code
+    # mutates in place are only checked again once they are set again.
+    _serialized_sizes: dict[str, int] = field(default_factory=dict, compare=False)
+    _unchecked_keys: set[str] = field(default_factory=set, compare=False)
+
+    # Estimated memory used by each value, keyed like `_keys()`. Values that
+    # were set, or updated by a widget, since they were estimated are removed,
+    # and estimated again by the next `get_value_sizes`.
+    _value_sizes: dict[str, int] = field(default_factory=dict, compare=False)
+
     def __repr__(self):
         return util.repr_(self)
 
@@ -337,6 +376,9 @@ class SessionState:
         self._new_session_state.clear()
         self._new_widget_state.clear()
         self._key_id_mapping.clear()
+        self._serialized_sizes.clear()
+        self._unchecked_keys.clear()
+        self._value_sizes.clear()
 
     @property
     def filtered_state(self) -> dict[str, Any]:
@@ -364,6 +406,23 @@ class SessionState:
 
         return state
 
+    def get_pickled_user_values(self) -> dict[str, bytes]:
+        """The pickled values set through the session state API, keyed by user key.
+
+        Widget values, including those of keyed widgets, aren't included, and
+        neither are values that can't be pickled.
+        """
+        pickled_values: dict[str, bytes] = {}
+        for k in self._keys():
+            if is_widget_id(k) or _is_internal_key(k):
+                continue
+            try:
+                pickled_values[k] = pickle.dumps(self[k])
+            except Exception:
+                # E.g. lambdas, locks or database connections.
+                pass
+        return pickled_values
+
     @property
     def _reverse_key_wid_map(self) -> dict[str, str]:
         """Return a mapping of widget_id : widget_key."""
@@ -474,6 +533,7 @@ class SessionState:
                 )
 
         self._new_session_state[user_key] = value
+        self._mark_unchecked(user_key)
 
     def __delitem__(self, key: str) -> None:
         widget_id = self._get_widget_id(key)
@@ -500,6 +560,7 @@ class SessionState:
         """Set the value of all widgets represented in the given WidgetStatesProto."""
         for state in widget_states.widgets:
             self._new_widget_state.set_widget_from_proto(state)
+            self._mark_unchecked(state.id)
 
     def on_script_will_rerun(self, latest_widget_states: WidgetStatesProto) -> None:
         """Called by ScriptRunner before its script re-runs.
@@ -663,21 +724,70 @@ class SessionState:
         else:
             return True
 
-    def get_stats(self) -> list[CacheStat]:
-        # Lazy-load vendored package to prevent import of numpy
-        from streamlit.vendor.pympler.asizeof import asizeof
+    def get_value_sizes(self) -> dict[str, int]:
+        """Return the estimated memory used by each value, in bytes.
 
-        stat = CacheStat("st_session_state", "", asizeof(self))
+        The result is keyed by user key, or by widget id for widgets without a
+        user key. Only values that are new, or that were marked as unchecked
+        since they were last estimated, are estimated again. Widget values that
+        haven't been deserialized yet are left out, because deserializing them
+        would change the widget state.
+        """
+        wid_key_map = self._reverse_key_wid_map
+        keys = self._keys()
+        for k in self._value_sizes.keys() - keys:
+            del self._value_sizes[k]
+
+        sizes: dict[str, int] = {}
+        for k in keys:
+            user_key = wid_key_map.get(k, k)
+            size = self._value_sizes.get(k)
+            if size is None:
+                if user_key not in self._new_session_state and isinstance(
+                    self._new_widget_state.states.get(k), Serialized
+                ):
+                    continue
+                try:
+                    value = self[k]
+                except KeyError:
+                    # Widget state without metadata. See `_compact_state`.
+                    continue
+                size = self._value_sizes[k] = estimate_size(value)
+            sizes[user_key] = size
+        return sizes
+
+    def get_stats(self) -> list[CacheStat]:
+        stat = CacheStat("st_session_state", "", sum(self.get_value_sizes().values()))
         return [stat]
 
+    def _mark_unchecked(self, key: str) -> None:
+        """Make the next `_check_serializable` check the value of the given key
+        or widget id again, because it was set or updated by a widget.
+        """
+        widget_id = self._get_widget_id(key)
+        self._unchecked_keys.add(widget_id)
+        self._value_sizes.pop(widget_id, None)
+
     def _check_serializable(self) -> None:
         """Verify that everything added to session state can be serialized.
         We use pickleability as the metric for serializability, and test for
         pickleability by just trying it.
+
+        Only values that are new, or that were set or updated by a widget since
+        the last check, are pickled. The pickled size of each value is kept in
+        `_serialized_sizes`. A value that user code mutates in place, like
+        `st.session_state.items.append(x)`, isn't checked again until it's set
+        again.
         """
-        for k in self:
+        keys = self._keys()
+        for k in self._serialized_sizes.keys() - keys:
+            del self._serialized_sizes[k]
+
+        for k in keys:
+            if k in self._serialized_sizes and k not in self._unchecked_keys:
+                continue
             try:
-                pickle.dumps(self[k])
+                self._serialized_sizes[k] = len(pickle.dumps(self[k]))
             except Exception as e:
                 err_msg = f"""Cannot serialize the value (of type `{type(self[k])}`) of '{k}' in st.session_state.
                 Streamlit has been configured to use [pickle](https://docs.python.org/3/library/pickle.html) to
@@ -685,6 +795,8 @@ class SessionState:
                 more about this behavior, see [our docs](https://docs.streamlit.io/knowledge-base/using-streamlit/serializable-session-state). """
                 raise UnserializableSessionStateError(err_msg) from e
 
+        self._unchecked_keys.clear()
+
     def maybe_check_serializable(self) -> None:
         """Verify that session state can be serialized, if the relevant config
         option is set.
@@ -716,12 +828,42 @@ def _is_stale_widget(
 
 
 @dataclass
-class SessionStateStatProvider(CacheStatsProvider):
+class SessionStateStatProvider(StatsProvider):
+    """Reports the memory used by all session states, and breaks it down by
+    the sessions, and the values, that use the most memory.
+    """
+
     _session_mgr: SessionManager
 
-    def get_stats(self) -> list[CacheStat]:
-        stats: list[CacheStat] = []
+    def get_stats(self) -> list[Stat]:
+        session_sizes: list[tuple[int, str]] = []
+        value_sizes: list[tuple[int, str, str]] = []
         for session_info in self._session_mgr.list_active_sessions():
-            session_state = session_info.session.session_state
-            stats.extend(session_state.get_stats())
-        return group_stats(stats)
+            session_id = session_info.session.id
+            sizes = session_info.session.get_session_state_value_sizes()
+            session_sizes.append((sum(sizes.values()), session_id))
+            value_sizes.extend((size, session_id, key) for key, size in sizes.items())
+
+        stats: list[Stat] = []
+        stats.extend(
+            group_stats(
+                [CacheStat("st_session_state", "", size) for size, _ in session_sizes]
+            )
+        )
+        stats.extend(
+            GaugeStat(SESSION_STATE_MEMORY_FAMILY, (("session_id", session_id),), size)
+            for size, session_id in heapq.nlargest(
+                _TOP_MEMORY_STATS_COUNT, session_sizes
+            )
+        )
+        stats.extend(
+            GaugeStat(
+                SESSION_STATE_VALUE_MEMORY_FAMILY,
+                (("session_id", session_id), ("key", key)),
+                size,
+            )
+            for size, session_id, key in heapq.nlargest(
+                _TOP_MEMORY_STATS_COUNT, value_sizes
+            )
+        )
+        return stats
@@ -16,7 +16,7 @@ from __future__ import annotations
 
 import textwrap
 from types import MappingProxyType
-from typing import TYPE_CHECKING, Final, Mapping
+from typing import TYPE_CHECKING, Any, Final, Mapping
 
 from typing_extensions import TypeAlias
 
@@ -226,7 +226,10 @@ def coalesce_widget_states(
     """Coalesce an older WidgetStates into a newer one, and return a new
     WidgetStates containing the result.
 
-    For most widget values, we just take the latest version.
+    For most widget values, we just take the latest version. If `new_states` is
+    a delta, the widgets it doesn't hold keep their values from `old_states`,
+    so the result is only a delta if both inputs are. Either way, this only
+    takes time proportional to the number of widgets in the two inputs.
 
     However, any trigger_values (which are set by buttons) that are True in
     `old_states` will be set to True in the coalesced result, so that button
@@ -242,6 +245,9 @@ def coalesce_widget_states(
     states_by_id: dict[str, WidgetState] = {
         wstate.id: wstate for wstate in new_states.widgets
     }
+    if new_states.is_delta:
+        for old_state in old_states.widgets:
+            states_by_id.setdefault(old_state.id, old_state)
 
     trigger_value_types = [("trigger_value", False), ("string_trigger_value", None)]
     for old_state in old_states.widgets:
@@ -262,10 +268,29 @@ def coalesce_widget_states(
 
     coalesced = WidgetStates()
     coalesced.widgets.extend(states_by_id.values())
+    coalesced.is_delta = old_states.is_delta and new_states.is_delta
+    coalesced.version = new_states.version
 
     return coalesced
 
 
+def apply_json_merge_patch(target: Any, patch: Any) -> Any:
+    """Apply a JSON merge patch (RFC 7396) to a deserialized JSON value, and
+    return the result. `target` is modified in place if possible.
+    """
+    if not isinstance(patch, dict):
+        return patch
+
+    if not isinstance(target, dict):
+        target = {}
+    for key, value in patch.items():
+        if value is None:
+            target.pop(key, None)
+        else:
+            target[key] = apply_json_merge_patch(target.get(key), value)
+    return target
+
+
 def _build_duplicate_widget_message(
     widget_func_name: str, user_key: str | None = None
 ) -> str:
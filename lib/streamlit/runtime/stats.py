@@ -14,14 +14,56 @@
 
 from __future__ import annotations
 
+import bisect
 import itertools
+import sys
 from abc import abstractmethod
-from typing import TYPE_CHECKING, NamedTuple, Protocol, runtime_checkable
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Final,
+    NamedTuple,
+    Protocol,
+    Sequence,
+    Union,
+    runtime_checkable,
+)
+
+from streamlit import type_util
 
 if TYPE_CHECKING:
     from streamlit.proto.openmetrics_data_model_pb2 import Metric as MetricProto
 
 
+class MetricFamily(NamedTuple):
+    """Describes an OpenMetrics metric family that stats are reported under.
+
+    Properties
+    ----------
+    name : str
+        The family's name, e.g. "cache_memory_bytes".
+    type : str
+        The OpenMetrics type of the family: "gauge", "counter" or "histogram".
+    unit : str
+        The family's unit, e.g. "bytes". May be the empty string.
+    help : str
+        A human-readable description of the family.
+    """
+
+    name: str
+    type: str
+    unit: str
+    help: str
+
+
+CACHE_MEMORY_FAMILY = MetricFamily(
+    name="cache_memory_bytes",
+    type="gauge",
+    unit="bytes",
+    help="Total memory consumed by a cache.",
+)
+
+
 class CacheStat(NamedTuple):
     """Describes a single cache entry.
 
@@ -43,6 +85,10 @@ class CacheStat(NamedTuple):
     cache_name: str
     byte_length: int
 
+    @property
+    def family(self) -> MetricFamily:
+        return CACHE_MEMORY_FAMILY
+
     def to_metric_str(self) -> str:
         return f'cache_memory_bytes{{cache_type="{self.category_name}",cache="{self.cache_name}"}} {self.byte_length}'
 
@@ -60,6 +106,233 @@ class CacheStat(NamedTuple):
         metric_point.gauge_value.int_value = self.byte_length
 
 
+def _escape_label_value(value: str) -> str:
+    """Escape a label value for the OpenMetrics text format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class GaugeStat(NamedTuple):
+    """Describes a single sample of a gauge metric that isn't about cache
+    memory usage - e.g. the number of messages waiting to be sent to a session.
+
+    Properties
+    ----------
+    family : MetricFamily
+        The metric family that the sample belongs to.
+    labels : tuple[tuple[str, str], ...]
+        The sample's (name, value) label pairs.
+    value : int
+        The sample's value.
+    """
+
+    family: MetricFamily
+    labels: tuple[tuple[str, str], ...]
+    value: int
+
+    def to_metric_str(self) -> str:
+        labels = ",".join(
+            f'{name}="{_escape_label_value(value)}"' for name, value in self.labels
+        )
+        return f"{self.family.name}{{{labels}}} {self.value}"
+
+    def marshall_metric_proto(self, metric: MetricProto) -> None:
+        """Fill an OpenMetrics `Metric` protobuf object."""
+        for name, value in self.labels:
+            label = metric.labels.add()
+            label.name = name
+            label.value = value
+
+        metric_point = metric.metric_points.add()
+        metric_point.gauge_value.int_value = self.value
+
+
+class CounterStat(NamedTuple):
+    """Describes a single sample of a counter metric - a running total that
+    only increases, e.g. the number of entries evicted from a cache.
+
+    The sample is reported as "<family name>_total", as OpenMetrics requires.
+
+    Properties
+    ----------
+    family : MetricFamily
+        The metric family that the sample belongs to. Its type must be
+        "counter", and its name must not end with "_total".
+    labels : tuple[tuple[str, str], ...]
+        The sample's (name, value) label pairs.
+    value : int
+        The total.
+    """
+
+    family: MetricFamily
+    labels: tuple[tuple[str, str], ...]
+    value: int
+
+    def to_metric_str(self) -> str:
+        labels = ",".join(
+            f'{name}="{_escape_label_value(value)}"' for name, value in self.labels
+        )
+        return f"{self.family.name}_total{{{labels}}} {self.value}"
+
+    def marshall_metric_proto(self, metric: MetricProto) -> None:
+        """Fill an OpenMetrics `Metric` protobuf object."""
+        for name, value in self.labels:
+            label = metric.labels.add()
+            label.name = name
+            label.value = value
+
+        metric_point = metric.metric_points.add()
+        metric_point.counter_value.int_value = self.value
+
+
+class HistogramStat(NamedTuple):
+    """Describes a single histogram - e.g. the distribution of the time spent
+    hashing the arguments of a cached function.
+
+    Properties
+    ----------
+    family : MetricFamily
+        The metric family that the histogram belongs to. Its type must be
+        "histogram".
+    labels : tuple[tuple[str, str], ...]
+        The histogram's (name, value) label pairs.
+    bucket_bounds : tuple[float, ...]
+        The inclusive upper bounds of the histogram's buckets, in increasing
+        order. The implicit "+Inf" bucket is not included.
+    bucket_counts : tuple[int, ...]
+        The cumulative number of observations less than or equal to each
+        bound in `bucket_bounds`.
+    sum : float
+        The sum of all observations.
+    observation_count : int
+        The number of observations. This is also the count of the "+Inf"
+        bucket.
+    """
+
+    family: MetricFamily
+    labels: tuple[tuple[str, str], ...]
+    bucket_bounds: tuple[float, ...]
+    bucket_counts: tuple[int, ...]
+    sum: float
+    observation_count: int
+
+    def to_metric_str(self) -> str:
+        name = self.family.name
+        labels = "".join(
+            f'{name}="{_escape_label_value(value)}",' for name, value in self.labels
+        )
+        lines = [
+            f'{name}_bucket{{{labels}le="{bound}"}} {count}'
+            for bound, count in zip(self.bucket_bounds, self.bucket_counts)
+        ]
+        lines.append(f'{name}_bucket{{{labels}le="+Inf"}} {self.observation_count}')
+        labels = labels.rstrip(",")
+        lines.append(f"{name}_count{{{labels}}} {self.observation_count}")
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        return "\n".join(lines)
+
+    def marshall_metric_proto(self, metric: MetricProto) -> None:
+        """Fill an OpenMetrics `Metric` protobuf object."""
+        for name, value in self.labels:
+            label = metric.labels.add()
+            label.name = name
+            label.value = value
+
+        histogram_value = metric.metric_points.add().histogram_value
+        histogram_value.double_value = self.sum
+        histogram_value.count = self.observation_count
+        for bound, count in zip(self.bucket_bounds, self.bucket_counts):
+            bucket = histogram_value.buckets.add()
+            bucket.upper_bound = bound
+            bucket.count = count
+        bucket = histogram_value.buckets.add()
+        bucket.upper_bound = float("inf")
+        bucket.count = self.observation_count
+
+
+class Histogram:
+    """Accumulates observations into buckets, for reporting as HistogramStats.
+
+    Not thread safe: callers must synchronize access.
+    """
+
+    __slots__ = ("bucket_bounds", "_bucket_counts", "sum", "count")
+
+    def __init__(self, bucket_bounds: tuple[float, ...]):
+        self.bucket_bounds = bucket_bounds
+        # Non-cumulative counts. The last one counts the observations above
+        # the largest bound.
+        self._bucket_counts = [0] * (len(bucket_bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self._bucket_counts[bisect.bisect_left(self.bucket_bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def to_stat(
+        self, family: MetricFamily, labels: tuple[tuple[str, str], ...]
+    ) -> HistogramStat:
+        return HistogramStat(
+            family=family,
+            labels=labels,
+            bucket_bounds=self.bucket_bounds,
+            bucket_counts=tuple(itertools.accumulate(self._bucket_counts[:-1])),
+            sum=self.sum,
+            observation_count=self.count,
+        )
+
+
+Stat = Union[CacheStat, GaugeStat, CounterStat, HistogramStat]
+
+# Containers with more items than this are measured by walking this many of
+# their items, and extrapolating.
+_SIZE_SAMPLE_COUNT: Final = 100
+
+
+def estimate_size(value: Any) -> int:
+    """Estimate the memory used by a value, in bytes.
+
+    The buffers of pandas, NumPy and PyArrow objects are measured directly,
+    which is much faster than walking them, and more accurate for objects that
+    share memory with other objects. Large lists, tuples, sets and dicts are
+    estimated from a sample of their items.
+    """
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return sys.getsizeof(value)
+    if type_util.is_type(value, "pandas.core.frame.DataFrame"):
+        return int(value.memory_usage(deep=True).sum())
+    if type_util.is_type(value, "pandas.core.series.Series"):
+        return int(value.memory_usage(deep=True))
+    # NumPy arrays, and PyArrow arrays, record batches and tables.
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+
+    # Lazy-load vendored package to prevent import of numpy
+    from streamlit.vendor.pympler.asizeof import asizeof
+
+    if (
+        type(value) in (list, tuple, set, frozenset, dict)
+        and len(value) > _SIZE_SAMPLE_COUNT
+    ):
+        # Take evenly spaced items, so that e.g. a list that starts with small
+        # values and ends with large ones isn't underestimated.
+        step = len(value) // _SIZE_SAMPLE_COUNT
+        sample = itertools.islice(value, 0, step * _SIZE_SAMPLE_COUNT, step)
+        if isinstance(value, dict):
+            sample_size = sum(asizeof(key, value[key]) for key in sample)
+        else:
+            sample_size = sum(asizeof(item) for item in sample)
+        return int(
+            sys.getsizeof(value) + sample_size * len(value) // _SIZE_SAMPLE_COUNT
+        )
+
+    return int(asizeof(value))
+
+
 def group_stats(stats: list[CacheStat]) -> list[CacheStat]:
     """Group a list of CacheStats by category_name and cache_name and sum byte_length"""
 
@@ -89,20 +362,30 @@ class CacheStatsProvider(Protocol):
         raise NotImplementedError
 
 
+@runtime_checkable
+class StatsProvider(Protocol):
+    """A provider of stats of any kind. CacheStatsProviders are StatsProviders
+    that only report CacheStats."""
+
+    @abstractmethod
+    def get_stats(self) -> Sequence[Stat]:
+        raise NotImplementedError
+
+
 class StatsManager:
     def __init__(self):
-        self._cache_stats_providers: list[CacheStatsProvider] = []
+        self._cache_stats_providers: list[StatsProvider] = []
 
-    def register_provider(self, provider: CacheStatsProvider) -> None:
-        """Register a CacheStatsProvider with the manager.
+    def register_provider(self, provider: StatsProvider) -> None:
+        """Register a StatsProvider with the manager.
         This function is not thread-safe. Call it immediately after
         creation.
         """
         self._cache_stats_providers.append(provider)
 
-    def get_stats(self) -> list[CacheStat]:
+    def get_stats(self) -> list[Stat]:
         """Return a list containing all stats from each registered provider."""
-        all_stats: list[CacheStat] = []
+        all_stats: list[Stat] = []
         for provider in self._cache_stats_providers:
             all_stats.extend(provider.get_stats())
 
@@ -15,6 +15,7 @@
 from __future__ import annotations
 
 import io
+import mmap
 from abc import abstractmethod
 from typing import TYPE_CHECKING, NamedTuple, Protocol, Sequence
 
@@ -26,12 +27,15 @@ if TYPE_CHECKING:
 
 
 class UploadedFileRec(NamedTuple):
-    """Metadata and raw bytes for an uploaded file. Immutable."""
+    """Metadata and raw bytes for an uploaded file. Immutable.
+
+    The bytes of large files may be a read-only memory map of a file on disk.
+    """
 
     file_id: str
     name: str
     type: str
-    data: bytes
+    data: bytes | mmap.mmap
 
 
 class UploadFileUrlInfo(NamedTuple):
@@ -60,20 +64,160 @@ class UploadedFile(io.BytesIO):
 
     This class extends BytesIO, which has copy-on-write semantics when
     initialized with `bytes`.
+
+    When the record's data is memory-mapped, the file is read straight from
+    the mapping instead, and only copied into the BytesIO when it's written to
+    (or its buffer is requested), so that large files aren't loaded into
+    memory on every script run.
     """
 
     def __init__(self, record: UploadedFileRec, file_urls: FileURLsProto):
-        # BytesIO's copy-on-write semantics doesn't seem to be mentioned in
-        # the Python docs - possibly because it's a CPython-only optimization
-        # and not guaranteed to be in other Python runtimes. But it's detailed
-        # here: https://hg.python.org/cpython/rev/79a5fbe2c78f
-        super().__init__(record.data)
+        if isinstance(record.data, mmap.mmap):
+            super().__init__()
+            self._mapped_data: mmap.mmap | None = record.data
+        else:
+            # BytesIO's copy-on-write semantics doesn't seem to be mentioned in
+            # the Python docs - possibly because it's a CPython-only optimization
+            # and not guaranteed to be in other Python runtimes. But it's detailed
+            # here: https://hg.python.org/cpython/rev/79a5fbe2c78f
+            super().__init__(record.data)
+            self._mapped_data = None
+        self._mapped_pos = 0
         self.file_id = record.file_id
         self.name = record.name
         self.type = record.type
         self.size = len(record.data)
         self._file_urls = file_urls
 
+    def _get_mapped_data(self) -> mmap.mmap | None:
+        """Return the memory-mapped data, if the file hasn't been copied into
+        the BytesIO.
+        """
+        if self._mapped_data is not None and self.closed:
+            raise ValueError("I/O operation on closed file.")
+        return self._mapped_data
+
+    def _copy_mapped_data(self) -> None:
+        """Copy the memory-mapped data into the BytesIO, so that it can be
+        modified.
+        """
+        data = self._get_mapped_data()
+        if data is not None:
+            super().__init__(data[:])
+            super().seek(self._mapped_pos)
+            self._mapped_data = None
+
+    def read(self, size: int | None = -1) -> bytes:
+        data = self._get_mapped_data()
+        if data is None:
+            return super().read(size)
+        start = min(self._mapped_pos, len(data))
+        end = len(data) if size is None or size < 0 else min(start + size, len(data))
+        self._mapped_pos = max(self._mapped_pos, end)
+        return data[start:end]
+
+    def read1(self, size: int | None = -1) -> bytes:
+        if self._get_mapped_data() is None:
+            return super().read1(size)
+        return self.read(size)
+
+    def readinto(self, buffer) -> int:
+        if self._get_mapped_data() is None:
+            return super().readinto(buffer)
+        view = memoryview(buffer).cast("B")
+        data = self.read(len(view))
+        view[: len(data)] = data
+        return len(data)
+
+    def readline(self, size: int | None = -1) -> bytes:
+        data = self._get_mapped_data()
+        if data is None:
+            return super().readline(size)
+        start = min(self._mapped_pos, len(data))
+        end = data.find(b"\n", start)
+        end = len(data) if end < 0 else end + 1
+        if size is not None and size >= 0:
+            end = min(end, start + size)
+        self._mapped_pos = max(self._mapped_pos, end)
+        return data[start:end]
+
+    def readlines(self, hint: int | None = -1) -> list[bytes]:
+        if self._get_mapped_data() is None:
+            return super().readlines(hint)
+        lines = []
+        total_size = 0
+        while line := self.readline():
+            lines.append(line)
+            total_size += len(line)
+            if hint is not None and 0 < hint <= total_size:
+                break
+        return lines
+
+    def __next__(self) -> bytes:
+        if self._get_mapped_data() is None:
+            return super().__next__()
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+
+    def seek(self, pos: int, whence: int = io.SEEK_SET) -> int:
+        data = self._get_mapped_data()
+        if data is None:
+            return super().seek(pos, whence)
+        if whence == io.SEEK_CUR:
+            pos += self._mapped_pos
+        elif whence == io.SEEK_END:
+            pos += len(data)
+        elif whence != io.SEEK_SET:
+            raise ValueError(f"invalid whence ({whence}, should be 0, 1 or 2)")
+        if pos < 0:
+            raise ValueError(f"negative seek value {pos}")
+        self._mapped_pos = pos
+        return pos
+
+    def tell(self) -> int:
+        if self._get_mapped_data() is None:
+            return super().tell()
+        return self._mapped_pos
+
+    def getvalue(self) -> bytes:
+        data = self._get_mapped_data()
+        if data is None:
+            return super().getvalue()
+        return data[:]
+
+    def getbuffer(self) -> memoryview:
+        self._copy_mapped_data()
+        return super().getbuffer()
+
+    def get_content_view(self) -> memoryview:
+        """Return a view of the file's whole content, like `getbuffer`, but
+        without copying memory-mapped data into memory. The view must not be
+        written to.
+        """
+        data = self._get_mapped_data()
+        if data is None:
+            return super().getbuffer()
+        return memoryview(data)
+
+    def write(self, buffer) -> int:
+        self._copy_mapped_data()
+        return super().write(buffer)
+
+    def writelines(self, lines) -> None:
+        self._copy_mapped_data()
+        super().writelines(lines)
+
+    def truncate(self, size: int | None = None) -> int:
+        self._copy_mapped_data()
+        return super().truncate(size)
+
+    def __getstate__(self):
+        self._copy_mapped_data()
+        # BytesIO pickles its buffer, so the data is copied into it first.
+        return super().__getstate__()  # type: ignore[misc]
+
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, UploadedFile):
             return NotImplemented
@@ -23,7 +23,10 @@ from streamlit.runtime.session_manager import (
     SessionClient,
     SessionInfo,
     SessionManager,
+    SessionSnapshot,
+    SessionSnapshotStorage,
     SessionStorage,
+    SessionStorageError,
 )
 
 if TYPE_CHECKING:
@@ -96,6 +99,16 @@ class WebsocketSessionManager(SessionManager):
 
             return existing_session.id
 
+        snapshot = (
+            self._pop_session_snapshot(existing_session_id)
+            if existing_session_id
+            and existing_session_id not in self._active_session_info_by_id
+            else None
+        )
+
+        if snapshot:
+            session_id_override = snapshot.session_id
+
         session = AppSession(
             script_data=script_data,
             uploaded_file_manager=self._uploaded_file_mgr,
@@ -105,17 +118,53 @@ class WebsocketSessionManager(SessionManager):
             session_id_override=session_id_override,
         )
 
-        _LOGGER.debug(
-            "Created new session for client %s. Session ID: %s", id(client), session.id
-        )
+        if snapshot:
+            session.restore_snapshot(snapshot)
+            _LOGGER.debug(
+                "Restored session for client %s. Session ID: %s", id(client), session.id
+            )
+        else:
+            _LOGGER.debug(
+                "Created new session for client %s. Session ID: %s",
+                id(client),
+                session.id,
+            )
 
         assert (
             session.id not in self._active_session_info_by_id
         ), f"session.id '{session.id}' registered multiple times!"
 
-        self._active_session_info_by_id[session.id] = ActiveSessionInfo(client, session)
+        self._active_session_info_by_id[session.id] = ActiveSessionInfo(
+            client, session, snapshot.script_run_count if snapshot else 0
+        )
         return session.id
 
+    async def prepare_connect_session(self, existing_session_id: str) -> None:
+        if (
+            not isinstance(self._session_storage, SessionSnapshotStorage)
+            or existing_session_id in self._active_session_info_by_id
+            or self._session_storage.get(existing_session_id)
+        ):
+            return
+        try:
+            await self._session_storage.load_snapshot(existing_session_id)
+        except SessionStorageError as ex:
+            # connect_session connects to a new session instead.
+            _LOGGER.warning("Unable to load session %s: %s", existing_session_id, ex)
+
+    def _pop_session_snapshot(self, session_id: str) -> SessionSnapshot | None:
+        """Return the snapshot of a session that the SessionStorage shut down, if
+        it supports doing so and has one.
+        """
+        if not isinstance(self._session_storage, SessionSnapshotStorage):
+            return None
+        try:
+            return self._session_storage.pop_snapshot(session_id)
+        except SessionStorageError as ex:
+            # Connect to a new session instead.
+            _LOGGER.warning("Unable to restore session %s: %s", session_id, ex)
+            return None
+
     def disconnect_session(self, session_id: str) -> None:
         if session_id in self._active_session_info_by_id:
             active_session_info = self._active_session_info_by_id[session_id]
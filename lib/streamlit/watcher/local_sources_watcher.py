@@ -16,6 +16,8 @@ from __future__ import annotations
 
 import os
 import sys
+import threading
+import weakref
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Callable, Final, NamedTuple
 
@@ -52,6 +54,8 @@ class LocalSourcesWatcher:
         self._script_folder = os.path.dirname(self._main_script_path)
         self._on_file_changed: list[Callable[[str], None]] = []
         self._is_closed = False
+        # The names of the modules in sys.modules the last time
+        # update_watched_modules was called.
         self._cached_sys_modules: set[str] = set()
 
         # Blacklist for folders that should not be watched
@@ -124,16 +128,12 @@ class LocalSourcesWatcher:
         self._is_closed = True
 
     def _register_watcher(self, filepath, module_name):
-        global PathWatcher
-        if PathWatcher is None:
-            PathWatcher = get_default_path_watcher_class()
-
-        if PathWatcher is NoOpPathWatcher:
+        if _get_path_watcher_class() is NoOpPathWatcher:
             return
 
         try:
             wm = WatchedModule(
-                watcher=PathWatcher(filepath, self.on_file_changed),
+                watcher=_get_path_watcher_class()(filepath, self.on_file_changed),
                 module_name=module_name,
             )
         except PermissionError:
@@ -165,15 +165,24 @@ class LocalSourcesWatcher:
         )
 
     def update_watched_modules(self):
-        if self._is_closed:
+        if self._is_closed or _get_path_watcher_class() is NoOpPathWatcher:
             return
 
-        if set(sys.modules) != self._cached_sys_modules:
+        # Only the modules that were imported since the last call need to be
+        # examined. Modules that were unloaded in between (e.g. by
+        # on_file_changed) are examined again if they are imported again.
+        sys_modules = dict(sys.modules)
+        module_names = set(sys_modules)
+        new_module_names = module_names - self._cached_sys_modules
+        self._cached_sys_modules = module_names
+
+        if new_module_names:
             modules_paths = {
-                name: self._exclude_blacklisted_paths(get_module_paths(module))
-                for name, module in dict(sys.modules).items()
+                name: self._exclude_blacklisted_paths(
+                    _module_paths_index.get_module_paths(name, sys_modules[name])
+                )
+                for name in new_module_names
             }
-            self._cached_sys_modules = set(sys.modules)
             self._register_necessary_watchers(modules_paths)
 
     def _register_necessary_watchers(self, module_paths: dict[str, set[str]]) -> None:
@@ -186,6 +195,53 @@ class LocalSourcesWatcher:
         return {p for p in paths if not self._folder_black_list.is_blacklisted(p)}
 
 
+def _get_path_watcher_class() -> Any:
+    global PathWatcher
+    if PathWatcher is None:
+        PathWatcher = get_default_path_watcher_class()
+    return PathWatcher
+
+
+class _ModulePathsIndex:
+    """A cache of get_module_paths results, shared by the LocalSourcesWatchers
+    of all sessions, so that each module's paths are only looked up on disk
+    once per process.
+
+    Entries only hold weak references to their modules, and are looked up
+    again when a module is replaced in sys.modules (e.g. when it's reloaded).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # Mapping of module name -> (weakref to the module, its paths).
+        self._entries: dict[str, tuple[weakref.ref[ModuleType], set[str]]] = {}
+
+    def get_module_paths(self, name: str, module: ModuleType) -> set[str]:
+        with self._lock:
+            entry = self._entries.get(name)
+        if entry is not None and entry[0]() is module:
+            return entry[1]
+
+        paths = get_module_paths(module)
+        try:
+            module_ref = weakref.ref(module)
+        except TypeError:
+            # Not a real module (some packages put other objects in
+            # sys.modules): don't cache it.
+            return paths
+
+        with self._lock:
+            self._entries[name] = (module_ref, paths)
+        return paths
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_module_paths_index: Final = _ModulePathsIndex()
+
+
 def get_module_paths(module: ModuleType) -> set[str]:
     paths_extractors = [
         # https://docs.python.org/3/reference/datamodel.html
@@ -12,13 +12,28 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-"""A class that watches a given path via polling."""
+"""A class that watches a given path via polling.
+
+All PollingPathWatchers of the process share a single _PollingRegistry, so each
+path is only polled once, however many sessions watch it. The registry polls
+every watched path in a single task per polling period, and notifies the
+watchers of the changes it finds in batches: once a change is detected, it
+keeps polling until a polling period passes without further changes, or until
+`_MAX_DEBOUNCE_POLLS` periods have passed, and only then calls the callbacks of
+all changed paths. This way, e.g. a `git pull` that touches many files results
+in a single burst of notifications, which the sessions coalesce into one rerun
+each, rather than in a rerun per file, while a path that changes all the time
+doesn't hold back the notifications for the others.
+"""
 
 from __future__ import annotations
 
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor
-from typing import Callable, Final
+from typing import Callable, Final, Optional, Tuple
+
+from typing_extensions import TypeAlias
 
 from streamlit.logger import get_logger
 from streamlit.util import repr_
@@ -28,12 +43,167 @@ _LOGGER: Final = get_logger(__name__)
 
 _MAX_WORKERS: Final = 4
 _POLLING_PERIOD_SECS: Final = 0.2
+# The maximum number of polling periods that notifications are held back for
+# while changes keep happening.
+_MAX_DEBOUNCE_POLLS: Final = 5
+
+# A path, along with the glob_pattern and allow_nonexistent arguments that it's
+# watched with.
+_WatchedPathKey: TypeAlias = Tuple[str, Optional[str], bool]
+
+
+class _WatchedPath:
+    """The state of a single polled path, and the callbacks to call when it
+    changes.
+    """
+
+    def __init__(self, key: _WatchedPathKey):
+        self.path, self.glob_pattern, self.allow_nonexistent = key
+        self.modification_time = util.path_modification_time(
+            self.path, self.allow_nonexistent
+        )
+        self.md5 = util.calc_md5_with_blocking_retries(
+            self.path,
+            glob_pattern=self.glob_pattern,
+            allow_nonexistent=self.allow_nonexistent,
+        )
+        self.callbacks: list[Callable[[str], None]] = []
+
+    def __repr__(self) -> str:
+        return repr_(self)
+
+    def check_if_changed(self) -> bool:
+        modification_time = util.path_modification_time(
+            self.path, self.allow_nonexistent
+        )
+        # We add modification_time != 0.0 check since on some file systems (s3fs/fuse)
+        # modification_time is always 0.0 because of file system limitations.
+        if modification_time != 0.0 and modification_time <= self.modification_time:
+            return False
+
+        self.modification_time = modification_time
+
+        md5 = util.calc_md5_with_blocking_retries(
+            self.path,
+            glob_pattern=self.glob_pattern,
+            allow_nonexistent=self.allow_nonexistent,
+        )
+        if md5 == self.md5:
+            return False
+
+        self.md5 = md5
+        return True
+
+
+class _PollingRegistry:
+    """Polls the paths watched by all PollingPathWatchers, and calls their
+    callbacks when the paths change.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._watched_paths: dict[_WatchedPathKey, _WatchedPath] = {}
+        # The paths that changed since the callbacks were last called, and the
+        # number of polls since the first of them changed.
+        self._changed_paths: dict[_WatchedPathKey, None] = {}
+        self._debounce_polls = 0
+        self._is_polling = False
+
+    def __repr__(self) -> str:
+        return repr_(self)
+
+    def add_callback(
+        self, key: _WatchedPathKey, callback: Callable[[str], None]
+    ) -> None:
+        with self._lock:
+            watched_path = self._watched_paths.get(key)
+            if watched_path is not None:
+                watched_path.callbacks.append(callback)
+
+        if watched_path is None:
+            # Hashing the path may take a while, so it's done outside of the
+            # lock. If another thread started watching the path meanwhile, its
+            # _WatchedPath is used.
+            new_watched_path = _WatchedPath(key)
+            with self._lock:
+                watched_path = self._watched_paths.setdefault(key, new_watched_path)
+                watched_path.callbacks.append(callback)
+
+        with self._lock:
+            if not self._is_polling:
+                self._is_polling = True
+                self._schedule()
+
+    def remove_callback(
+        self, key: _WatchedPathKey, callback: Callable[[str], None]
+    ) -> None:
+        with self._lock:
+            watched_path = self._watched_paths.get(key)
+            if watched_path is None or callback not in watched_path.callbacks:
+                return
+
+            watched_path.callbacks.remove(callback)
+            if not watched_path.callbacks:
+                del self._watched_paths[key]
+                self._changed_paths.pop(key, None)
+
+    def _schedule(self) -> None:
+        def task():
+            time.sleep(_POLLING_PERIOD_SECS)
+            self._poll()
+
+        PollingPathWatcher._executor.submit(task)
+
+    def _poll(self) -> None:
+        with self._lock:
+            if not self._watched_paths:
+                # Polling is started again by the next add_callback call.
+                self._is_polling = False
+                return
+            watched_paths = list(self._watched_paths.items())
+
+        changed_paths = []
+        for key, watched_path in watched_paths:
+            try:
+                if watched_path.check_if_changed():
+                    changed_paths.append(key)
+            except Exception as ex:
+                # E.g. the file was deleted. Keep polling it, in case it comes
+                # back, and keep polling the other paths.
+                _LOGGER.debug("Unable to poll %s: %s", watched_path.path, ex)
+
+        to_notify: list[tuple[str, Callable[[str], None]]] = []
+        with self._lock:
+            self._changed_paths.update(dict.fromkeys(changed_paths))
+            if self._changed_paths:
+                self._debounce_polls += 1
+            # Wait for the changes to settle down before notifying anyone, but
+            # not forever.
+            if not changed_paths or self._debounce_polls > _MAX_DEBOUNCE_POLLS:
+                for key in self._changed_paths:
+                    watched_path = self._watched_paths[key]
+                    to_notify.extend(
+                        (watched_path.path, callback)
+                        for callback in watched_path.callbacks
+                    )
+                self._changed_paths = {}
+                self._debounce_polls = 0
+
+        for path, callback in to_notify:
+            _LOGGER.debug("Change detected: %s", path)
+            try:
+                callback(path)
+            except Exception:
+                _LOGGER.exception("Error in the callback for %s", path)
+
+        self._schedule()
 
 
 class PollingPathWatcher:
     """Watches a path on disk via a polling loop."""
 
     _executor = ThreadPoolExecutor(max_workers=_MAX_WORKERS)
+    _registry = _PollingRegistry()
 
     @staticmethod
     def close_all() -> None:
@@ -55,70 +225,28 @@ class PollingPathWatcher:
         """Constructor.
 
         You do not need to retain a reference to a PollingPathWatcher to
-        prevent it from being garbage collected. (The global _executor object
-        retains references to all active instances.)
+        prevent it from being garbage collected. (The global _registry object
+        retains references to the callbacks of all active instances.)
         """
         # TODO(vdonato): Modernize this by switching to pathlib.
         self._path = path
         self._on_changed = on_changed
-
-        self._glob_pattern = glob_pattern
-        self._allow_nonexistent = allow_nonexistent
-
+        self._key: _WatchedPathKey = (path, glob_pattern, allow_nonexistent)
         self._active = True
 
-        self._modification_time = util.path_modification_time(
-            self._path, self._allow_nonexistent
-        )
-        self._md5 = util.calc_md5_with_blocking_retries(
-            self._path,
-            glob_pattern=self._glob_pattern,
-            allow_nonexistent=self._allow_nonexistent,
-        )
-        self._schedule()
+        PollingPathWatcher._registry.add_callback(self._key, self._notify)
 
     def __repr__(self) -> str:
         return repr_(self)
 
-    def _schedule(self) -> None:
-        def task():
-            time.sleep(_POLLING_PERIOD_SECS)
-            self._check_if_path_changed()
-
-        PollingPathWatcher._executor.submit(task)
-
-    def _check_if_path_changed(self) -> None:
-        if not self._active:
-            # Don't call self._schedule()
-            return
-
-        modification_time = util.path_modification_time(
-            self._path, self._allow_nonexistent
-        )
-        # We add modification_time != 0.0 check since on some file systems (s3fs/fuse)
-        # modification_time is always 0.0 because of file system limitations.
-        if modification_time != 0.0 and modification_time <= self._modification_time:
-            self._schedule()
-            return
-
-        self._modification_time = modification_time
-
-        md5 = util.calc_md5_with_blocking_retries(
-            self._path,
-            glob_pattern=self._glob_pattern,
-            allow_nonexistent=self._allow_nonexistent,
-        )
-        if md5 == self._md5:
-            self._schedule()
-            return
-
-        self._md5 = md5
-
-        _LOGGER.debug("Change detected: %s", self._path)
-        self._on_changed(self._path)
-
-        self._schedule()
+    def _notify(self, path: str) -> None:
+        # The registry may call this after the watcher was closed, e.g. if it
+        # was closed while other callbacks were being called.
+        if self._active:
+            self._on_changed(path)
 
     def close(self) -> None:
         """Stop watching the file system."""
-        self._active = False
+        if self._active:
+            self._active = False
+            PollingPathWatcher._registry.remove_callback(self._key, self._notify)
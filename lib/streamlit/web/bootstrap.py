@@ -26,6 +26,8 @@ from streamlit.git_util import MIN_GIT_VERSION, GitRepo
 from streamlit.logger import get_logger
 from streamlit.watcher import report_watchdog_availability, watch_file
 from streamlit.web.server import Server, server_address_is_unix_socket, server_util
+from streamlit.web.server.prefork import fork_workers, is_primary_process
+from streamlit.web.server.server import bind_listening_sockets
 
 _LOGGER: Final = get_logger(__name__)
 
@@ -104,8 +106,9 @@ def _fix_sys_argv(main_script_path: str, args: list[str]) -> None:
 def _on_server_start(server: Server) -> None:
     _maybe_print_old_git_warning(server.main_script_path)
     _maybe_print_static_folder_warning(server.main_script_path)
-    _print_url(server.is_running_hello)
-    report_watchdog_availability()
+    if is_primary_process():
+        _print_url(server.is_running_hello)
+        report_watchdog_availability()
 
     # Load secrets.toml if it exists. If the file doesn't exist, this
     # function will return without raising an exception. We catch any parse
@@ -116,6 +119,10 @@ def _on_server_start(server: Server) -> None:
         _LOGGER.error("Failed to load secrets.toml file", exc_info=ex)
 
     def maybe_open_browser():
+        if not is_primary_process():
+            # Only one worker opens the browser.
+            return
+
         if config.get_option("server.headless"):
             # Don't open browser when in headless mode.
             return
@@ -330,6 +337,13 @@ def run(
     _fix_sys_argv(main_script_path, args)
     _fix_pydeck_mapbox_api_warning()
     _fix_pydantic_duplicate_validators_error()
+
+    num_workers = config.get_option("server.workers")
+    if num_workers > 1:
+        # Only returns in the worker processes, each of which continues below
+        # and runs its own server.
+        fork_workers(num_workers, bind_listening_sockets())
+
     _install_config_watchers(flag_options)
 
     # Create the server. It won't start running yet.
@@ -14,11 +14,20 @@
 
 from __future__ import annotations
 
+import os
 from typing import TYPE_CHECKING
 
+from streamlit import config
 from streamlit.runtime.caching.storage.local_disk_cache_storage import (
     LocalDiskCacheStorageManager,
 )
+from streamlit.runtime.caching.storage.segment_file_cache_storage import (
+    SegmentFileCacheStorageManager,
+)
+from streamlit.runtime.caching.storage.shared_disk_cache_storage import (
+    SharedDiskCacheStorageManager,
+)
+from streamlit.web.server import prefork
 
 if TYPE_CHECKING:
     from streamlit.runtime.caching.storage import CacheStorageManager
@@ -35,4 +44,10 @@ def create_default_cache_storage_manager() -> CacheStorageManager:
         The cache storage manager.
 
     """
+    worker = prefork.get_worker()
+    if worker is not None:
+        # The segment storage can only be used by a single process.
+        return SharedDiskCacheStorageManager(os.path.join(worker.run_dir, "cache"))
+    if config.get_option("global.persistedCacheStorage") == "segment":
+        return SegmentFileCacheStorageManager()
     return LocalDiskCacheStorageManager()
@@ -194,9 +194,14 @@ def main_hello(**kwargs):
 
 @main.command("run")
 @configurator_options
+@click.option(
+    "--workers",
+    type=int,
+    help="Number of server processes to run. Shorthand for --server.workers.",
+)
 @click.argument("target", required=True, envvar="STREAMLIT_RUN_TARGET")
 @click.argument("args", nargs=-1)
-def main_run(target: str, args=None, **kwargs):
+def main_run(target: str, args=None, workers: int | None = None, **kwargs):
     """Run a Python script, piping stderr to Streamlit.
 
     The script can be local or it can be an url. In the latter case, Streamlit
@@ -205,6 +210,8 @@ def main_run(target: str, args=None, **kwargs):
     """
     from streamlit import url_util
 
+    if workers is not None:
+        kwargs["server_workers"] = workers
     bootstrap.load_config_options(flag_options=kwargs)
 
     _, extension = os.path.splitext(target)
@@ -57,10 +57,16 @@ class BrowserWebSocketHandler(WebSocketHandler, SessionClient):
         """Set up CORS."""
         return super().check_origin(origin) or is_url_from_allowed_origins(origin)
 
-    def write_forward_msg(self, msg: ForwardMsg) -> None:
-        """Send a ForwardMsg to the browser."""
+    def write_forward_msg(self, msg: ForwardMsg) -> Awaitable[None]:
+        """Send a ForwardMsg to the browser.
+
+        Returns the Future from Tornado's `write_message`, which completes once
+        the message has been flushed to the socket.
+        """
         try:
-            self.write_message(serialize_forward_msg(msg), binary=True)
+            return self.write_message(
+                serialize_forward_msg(msg, self._runtime.message_cache), binary=True
+            )
         except tornado.websocket.WebSocketClosedError as e:
             raise SessionClientDisconnectedError from e
 
@@ -90,7 +96,7 @@ class BrowserWebSocketHandler(WebSocketHandler, SessionClient):
 
         return None
 
-    def open(self, *args, **kwargs) -> Awaitable[None] | None:
+    async def open(self, *args, **kwargs) -> None:
         # Extract user info from the X-Streamlit-User header
         is_public_cloud_app = False
 
@@ -123,12 +129,18 @@ class BrowserWebSocketHandler(WebSocketHandler, SessionClient):
             # extract it from the Sec-Websocket-Protocol header.
             pass
 
+        if existing_session_id:
+            # Tornado doesn't call on_message until this coroutine is done.
+            await self._runtime.prepare_connect_session(existing_session_id)
+            if self.ws_connection is None:
+                # The client went away in the meantime.
+                return
+
         self._session_id = self._runtime.connect_session(
             client=self,
             user_info=user_info,
             existing_session_id=existing_session_id,
         )
-        return None
 
     def on_close(self) -> None:
         if not self._session_id:
@@ -14,11 +14,16 @@
 
 from __future__ import annotations
 
+import datetime
+import os
+from typing import Final, Union
 from urllib.parse import quote
 
 import tornado.web
+from typing_extensions import TypeAlias
 
 from streamlit.logger import get_logger
+from streamlit.runtime.disk_media_file_storage import DiskMediaFileStorage
 from streamlit.runtime.media_file_storage import MediaFileKind, MediaFileStorageError
 from streamlit.runtime.memory_media_file_storage import (
     MemoryMediaFileStorage,
@@ -28,19 +33,30 @@ from streamlit.web.server import allow_cross_origin_requests
 
 _LOGGER = get_logger(__name__)
 
+# The size of the chunks that media files are written to the response in.
+_CHUNK_SIZE_BYTES: Final = 64 * 1024
+
+LocalMediaFileStorage: TypeAlias = Union[MemoryMediaFileStorage, DiskMediaFileStorage]
+
 
 class MediaFileHandler(tornado.web.StaticFileHandler):
-    _storage: MemoryMediaFileStorage
+    _storage: LocalMediaFileStorage
+    _storage_created_at: datetime.datetime
 
     @classmethod
-    def initialize_storage(cls, storage: MemoryMediaFileStorage) -> None:
-        """Set the MemoryMediaFileStorage object used by instances of this
+    def initialize_storage(cls, storage: LocalMediaFileStorage) -> None:
+        """Set the MediaFileStorage object used by instances of this
         handler. Must be called on server startup.
         """
         # This is a class method, rather than an instance method, because
         # `get_content()` is a class method and needs to access the storage
         # instance.
         cls._storage = storage
+        # A file's content never changes, since its ID is a hash of it. The
+        # files are only as old as the storage, though.
+        cls._storage_created_at = datetime.datetime.now(datetime.timezone.utc).replace(
+            microsecond=0
+        )
 
     def set_default_headers(self) -> None:
         if allow_cross_origin_requests():
@@ -100,10 +116,14 @@ class MediaFileHandler(tornado.web.StaticFileHandler):
         media_file = self._storage.get_file(abspath)
         return media_file.content_size
 
-    def get_modified_time(self) -> None:
-        # We do not track last modified time, but this can be improved to
-        # allow caching among files in the MediaFileManager
-        return None
+    def get_modified_time(self) -> datetime.datetime:
+        return self._storage_created_at
+
+    @classmethod
+    def get_content_version(cls, abspath: str) -> str:
+        # The file ID is a hash of the file's content, so there's no need to
+        # hash it again for the ETag.
+        return os.path.splitext(abspath)[0]
 
     @classmethod
     def get_absolute_path(cls, root: str, path: str) -> str:
@@ -128,14 +148,21 @@ class MediaFileHandler(tornado.web.StaticFileHandler):
             "MediaFileHandler: Sending %s file %s", media_file.mimetype, abspath
         )
 
-        # If there is no start and end, just return the full content
-        if start is None and end is None:
-            return media_file.content
+        content = media_file.content
+
+        # If there is no start and end, just return the full content, unless
+        # it's on disk.
+        if start is None and end is None and isinstance(content, bytes):
+            return content
 
         if start is None:
             start = 0
         if end is None:
-            end = len(media_file.content)
+            end = len(content)
 
-        # content is bytes that work just by slicing supplied by start and end
-        return media_file.content[start:end]
+        # Slicing content copies it, so we only slice one chunk at a time,
+        # rather than the whole range.
+        return (
+            content[chunk_start : min(chunk_start + _CHUNK_SIZE_BYTES, end)]
+            for chunk_start in range(start, end, _CHUNK_SIZE_BYTES)
+        )
@@ -0,0 +1,491 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Running the server in several pre-forked worker processes.
+
+With `streamlit run --workers N` (`server.workers`), the process that binds
+the listening sockets forks N workers, and then only supervises them: workers
+that crash are restarted, and SIGTERM/SIGINT are forwarded to all workers.
+Each worker runs a complete server with its own Runtime.
+
+On Linux, every worker listens on its own SO_REUSEPORT socket, so the kernel
+balances new connections across workers. Elsewhere, the workers accept
+connections from the inherited listening socket.
+
+Sessions live in the memory of the worker that created them, so the requests
+of a browser must always reach the same worker: websocket reconnects, file
+uploads, media files and cached forward messages. The WORKER_COOKIE_NAME
+cookie holds the index of that worker. It's set by the first response to a
+browser without the cookie, and by the websocket handshake of a worker that
+creates a session for a browser whose cookie names another worker (because
+that worker didn't take the connection). When a worker accepts a connection,
+it peeks at the request head without consuming it, and hands connections
+whose cookie names another worker over to that worker, by passing the
+socket's file descriptor over a Unix socket. Workers don't keep connections
+alive, so that every request is routed.
+
+Routing needs to read the request head, so workers can't be combined with
+`server.sslCertFile`. Terminate SSL in a proxy in front of the server instead.
+"""
+
+from __future__ import annotations
+
+import array
+import atexit
+import json
+import os
+import random
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any, Final, NamedTuple
+
+import tornado.netutil
+from tornado.ioloop import IOLoop
+from tornado.iostream import IOStream
+from tornado.web import OutputTransform
+
+from streamlit import config
+from streamlit.logger import get_logger
+
+if TYPE_CHECKING:
+    from tornado.httpserver import HTTPServer
+    from tornado.httputil import HTTPHeaders, HTTPServerRequest
+
+_LOGGER: Final = get_logger(__name__)
+
+WORKER_COOKIE_NAME: Final = "_streamlit_worker"
+
+# Whether every worker can bind its own listening socket on the same port.
+REUSE_PORT_SUPPORTED: Final = sys.platform.startswith("linux") and hasattr(
+    socket, "SO_REUSEPORT"
+)
+
+# Workers that crash more often than this within _RESTART_WINDOW_SECONDS are
+# not restarted any more.
+_MAX_RESTARTS: Final = 5
+_RESTART_WINDOW_SECONDS: Final = 60.0
+
+# Same as tornado.netutil.bind_sockets.
+_LISTEN_BACKLOG: Final = 128
+
+# A request head larger than this is routed without looking at the rest of it.
+_PEEK_BUFFER_SIZE: Final = 16 * 1024
+# How long to wait for the request head before serving the connection locally.
+_PEEK_TIMEOUT_SECONDS: Final = 1.0
+# How long to wait before peeking again at an incomplete request head.
+_PEEK_RETRY_SECONDS: Final = 0.005
+
+
+class WorkerInfo(NamedTuple):
+    """The worker process that this server runs in."""
+
+    worker_index: int
+    num_workers: int
+    # A directory shared by all workers of one `streamlit run`.
+    run_dir: str
+    # The listening sockets of this worker.
+    sockets: list[socket.socket]
+
+
+_worker: WorkerInfo | None = None
+
+
+def get_worker() -> WorkerInfo | None:
+    """Return this worker process, or None if the server doesn't run in
+    pre-forked workers.
+    """
+    return _worker
+
+
+def is_primary_process() -> bool:
+    """True if this process should do the things that happen once per
+    `streamlit run`, like printing the URL and opening the browser.
+    """
+    return _worker is None or _worker.worker_index == 0
+
+
+def fork_workers(num_workers: int, sockets: list[socket.socket]) -> None:
+    """Fork `num_workers` worker processes that serve the listening `sockets`.
+
+    Returns in every worker process. The parent process supervises the
+    workers until all of them have exited, and then exits itself.
+    """
+    if not hasattr(os, "fork"):
+        _LOGGER.error("server.workers requires a platform that supports os.fork.")
+        sys.exit(1)
+    if config.get_option("server.sslCertFile"):
+        _LOGGER.error(
+            "server.workers can't be combined with server.sslCertFile, because "
+            "requests are routed to the worker that owns their session by "
+            "their cookies. Terminate SSL in a proxy in front of the server "
+            "instead."
+        )
+        sys.exit(1)
+
+    # The secret is generated on first access. Make sure all workers share it,
+    # so that they accept each other's XSRF tokens and signed cookies.
+    config.get_option("server.cookieSecret")
+
+    run_dir = tempfile.mkdtemp(prefix="streamlit-")
+    parent_pid = os.getpid()
+
+    def remove_run_dir() -> None:
+        if os.getpid() == parent_pid:
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+    atexit.register(remove_run_dir)
+
+    supervisor = _Supervisor(num_workers, sockets, run_dir)
+    if supervisor.start():
+        return
+    exit_code = supervisor.wait()
+    if exit_code is None:
+        # This is a worker that was restarted after a crash.
+        return
+    sys.exit(exit_code)
+
+
+class _Supervisor:
+    def __init__(self, num_workers: int, sockets: list[socket.socket], run_dir: str):
+        self._num_workers = num_workers
+        self._sockets = sockets
+        self._run_dir = run_dir
+        # With SO_REUSEPORT, every worker binds its own sockets to these
+        # addresses, and the parent's sockets are closed once all workers
+        # are forked. (A listening socket that nobody accepts on would still
+        # get its share of the connections.)
+        self._reuse_port = REUSE_PORT_SUPPORTED and all(
+            sock.family in (socket.AF_INET, socket.AF_INET6) for sock in sockets
+        )
+        self._addresses = [(sock.family, sock.getsockname()) for sock in sockets]
+        self._children: dict[int, int] = {}
+        self._restarts: list[float] = []
+        self._stopping = False
+
+    def start(self) -> bool:
+        """Fork all workers. Return True in the worker processes."""
+        for index in range(self._num_workers):
+            if self._fork(index):
+                return True
+
+        if self._reuse_port:
+            for sock in self._sockets:
+                sock.close()
+
+        signal.signal(signal.SIGTERM, self._forward_signal)
+        signal.signal(signal.SIGINT, self._forward_signal)
+        return False
+
+    def wait(self) -> int | None:
+        """Wait until all workers have exited, restarting the ones that
+        crashed. Return the exit code of the parent process, or None in a
+        restarted worker.
+        """
+        exit_code = 0
+        while self._children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+
+            index = self._children.pop(pid, None)
+            if index is None:
+                continue
+
+            if self._stopping or status == 0:
+                continue
+
+            _LOGGER.error("Worker %s exited with status %s", index, status)
+            if not self._may_restart():
+                exit_code = 1
+                continue
+
+            _LOGGER.info("Restarting worker %s", index)
+            if self._fork(index):
+                return None
+        return exit_code
+
+    def _may_restart(self) -> bool:
+        now = time.monotonic()
+        self._restarts = [
+            t for t in self._restarts if now - t < _RESTART_WINDOW_SECONDS
+        ]
+        if len(self._restarts) >= _MAX_RESTARTS:
+            _LOGGER.error("Workers are crashing repeatedly, not restarting them")
+            return False
+        self._restarts.append(now)
+        return True
+
+    def _fork(self, index: int) -> bool:
+        pid = os.fork()
+        if pid == 0:
+            self._init_worker(index)
+            return True
+        self._children[pid] = index
+        return False
+
+    def _forward_signal(self, signal_number: int, stack_frame: Any) -> None:
+        self._stopping = True
+        for pid in self._children:
+            try:
+                os.kill(pid, signal_number)
+            except ProcessLookupError:
+                pass
+
+    def _init_worker(self, index: int) -> None:
+        global _worker
+
+        # Don't inherit the supervisor's signal handlers or random state.
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        random.seed()
+
+        sockets = self._sockets
+        if self._reuse_port:
+            for sock in sockets:
+                sock.close()
+            sockets = [
+                _bind_with_reuse_port(family, address)
+                for family, address in self._addresses
+            ]
+
+        _worker = WorkerInfo(index, self._num_workers, self._run_dir, sockets)
+
+
+def _bind_with_reuse_port(family: int, address: Any) -> socket.socket:
+    """Return a new listening socket of this worker process, bound to an
+    address that other workers listen on too.
+    """
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    if family == socket.AF_INET6:
+        sock.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, 1)
+    sock.bind(address)
+    sock.setblocking(False)
+    sock.listen(_LISTEN_BACKLOG)
+    return sock
+
+
+def make_worker_cookie_transform(index: int) -> type[OutputTransform]:
+    """Return a tornado OutputTransform that sets the worker cookie to
+    `index` in responses to requests without a worker cookie, and in
+    websocket handshakes of requests whose cookie names another worker.
+    """
+    cookie_value = str(index)
+
+    class WorkerCookieTransform(OutputTransform):
+        def __init__(self, request: HTTPServerRequest):
+            super().__init__(request)
+            cookie = request.cookies.get(WORKER_COOKIE_NAME)
+            self._cookie_value = None if cookie is None else cookie.value
+
+        def transform_first_chunk(
+            self,
+            status_code: int,
+            headers: HTTPHeaders,
+            chunk: bytes,
+            finishing: bool,
+        ) -> tuple[int, HTTPHeaders, bytes]:
+            # Only the websocket connection creates a session. Other requests
+            # served by a worker that the cookie doesn't name (because that
+            # worker couldn't take the connection) mustn't change it.
+            if self._cookie_value is None or (
+                self._cookie_value != cookie_value
+                and status_code == HTTPStatus.SWITCHING_PROTOCOLS
+            ):
+                headers.add(
+                    "Set-Cookie",
+                    f"{WORKER_COOKIE_NAME}={cookie_value}; Path=/; SameSite=Lax",
+                )
+            return status_code, headers, chunk
+
+    return WorkerCookieTransform
+
+
+def parse_worker_cookie(request_head: bytes) -> int | None:
+    """Return the worker index in the cookie of an HTTP request head, if any."""
+    for line in request_head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.strip().lower() != b"cookie":
+            continue
+        for cookie in value.split(b";"):
+            cookie_name, _, cookie_value = cookie.strip().partition(b"=")
+            if cookie_name == WORKER_COOKIE_NAME.encode() and cookie_value.isdigit():
+                return int(cookie_value)
+    return None
+
+
+def get_handoff_socket_path(run_dir: str, index: int) -> str:
+    return os.path.join(run_dir, f"worker-{index}.sock")
+
+
+def send_connection(
+    handoff_sock: socket.socket, path: str, conn: socket.socket, address: Any
+) -> None:
+    """Pass the connected socket `conn` to the worker listening on the Unix
+    socket `path`. Raises OSError if that worker can't take it.
+    """
+    payload = json.dumps(address).encode()
+    fds = array.array("i", [conn.fileno()])
+    handoff_sock.sendmsg(
+        [payload], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, fds)], 0, path
+    )
+
+
+def receive_connection(handoff_sock: socket.socket) -> tuple[socket.socket, Any]:
+    """Receive a connected socket that another worker passed to this one.
+    Raises BlockingIOError if there is none.
+    """
+    fds = array.array("i")
+    payload, ancdata, _, _ = handoff_sock.recvmsg(1024, socket.CMSG_SPACE(fds.itemsize))
+    for level, type_, data in ancdata:
+        if level == socket.SOL_SOCKET and type_ == socket.SCM_RIGHTS:
+            fds.frombytes(data[: len(data) - (len(data) % fds.itemsize)])
+
+    address = json.loads(payload)
+    if isinstance(address, list):
+        address = tuple(address)
+    return socket.socket(fileno=fds[0]), address
+
+
+class ConnectionRouter:
+    """Accepts the connections of a worker's listening sockets, and makes
+    sure each of them is served by the worker that its cookie names.
+    """
+
+    def __init__(self, http_server: HTTPServer, worker: WorkerInfo):
+        self._http_server = http_server
+        self._worker = worker
+        self._handoff_sock: socket.socket | None = None
+
+    def start(self) -> None:
+        path = get_handoff_socket_path(self._worker.run_dir, self._worker.worker_index)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+        handoff_sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        handoff_sock.bind(path)
+        handoff_sock.setblocking(False)
+        self._handoff_sock = handoff_sock
+        IOLoop.current().add_handler(
+            handoff_sock.fileno(), self._on_handoff, IOLoop.READ
+        )
+
+        for sock in self._worker.sockets:
+            tornado.netutil.add_accept_handler(sock, self._on_accept)
+
+    def _on_accept(self, conn: socket.socket, address: Any) -> None:
+        conn.setblocking(False)
+        deadline = time.monotonic() + _PEEK_TIMEOUT_SECONDS
+        IOLoop.current().add_handler(
+            conn.fileno(),
+            lambda fd, events: self._on_readable(conn, address, deadline),
+            IOLoop.READ,
+        )
+
+    def _on_readable(self, conn: socket.socket, address: Any, deadline: float) -> None:
+        io_loop = IOLoop.current()
+        io_loop.remove_handler(conn.fileno())
+
+        try:
+            head = conn.recv(_PEEK_BUFFER_SIZE, socket.MSG_PEEK)
+        except BlockingIOError:
+            head = None
+        except OSError:
+            conn.close()
+            return
+
+        if head == b"":
+            # The client closed the connection.
+            conn.close()
+            return
+
+        if head is None or (
+            b"\r\n\r\n" not in head
+            and len(head) < _PEEK_BUFFER_SIZE
+            and time.monotonic() < deadline
+        ):
+            # The request head is incomplete. Peeked data stays readable, so
+            # wait a little instead of polling the socket in a busy loop.
+            io_loop.call_later(
+                _PEEK_RETRY_SECONDS,
+                lambda: io_loop.add_handler(
+                    conn.fileno(),
+                    lambda fd, events: self._on_readable(conn, address, deadline),
+                    IOLoop.READ,
+                ),
+            )
+            return
+
+        owner = parse_worker_cookie(head.partition(b"\r\n\r\n")[0])
+        if (
+            owner is not None
+            and owner != self._worker.worker_index
+            and owner < self._worker.num_workers
+            and self._hand_off(conn, address, owner)
+        ):
+            return
+        self._serve(conn, address)
+
+    def _hand_off(self, conn: socket.socket, address: Any, owner: int) -> bool:
+        assert self._handoff_sock is not None
+        try:
+            send_connection(
+                self._handoff_sock,
+                get_handoff_socket_path(self._worker.run_dir, owner),
+                conn,
+                address,
+            )
+        except OSError as ex:
+            # The owner isn't running (any more). Its sessions are gone, so
+            # serve the connection here.
+            _LOGGER.debug("Unable to hand a connection to worker %s: %s", owner, ex)
+            return False
+
+        conn.close()
+        return True
+
+    def _on_handoff(self, fd: int, events: int) -> None:
+        assert self._handoff_sock is not None
+        while True:
+            try:
+                conn, address = receive_connection(self._handoff_sock)
+            except BlockingIOError:
+                return
+            except (OSError, ValueError, IndexError) as ex:
+                _LOGGER.warning("Unable to receive a connection: %s", ex)
+                continue
+
+            conn.setblocking(False)
+            self._serve(conn, address)
+
+    def _serve(self, conn: socket.socket, address: Any) -> None:
+        # Like tornado.tcpserver.TCPServer._handle_connection, for plain
+        # (non-SSL) connections.
+        stream = IOStream(
+            conn,
+            max_buffer_size=self._http_server.max_buffer_size,
+            read_chunk_size=self._http_server.read_chunk_size,
+        )
+        self._http_server.handle_stream(stream, address)
@@ -19,7 +19,7 @@ import logging
 import os
 import sys
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Awaitable, Final
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Final
 
 import tornado.concurrent
 import tornado.locks
@@ -32,16 +32,23 @@ from streamlit import cli_util, config, file_util, util
 from streamlit.config_option import ConfigOption
 from streamlit.logger import get_logger
 from streamlit.runtime import Runtime, RuntimeConfig, RuntimeState
+from streamlit.runtime.disk_media_file_storage import DiskMediaFileStorage
+from streamlit.runtime.disk_session_storage import DiskSessionStorage
 from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.runtime.memory_session_storage import MemorySessionStorage
 from streamlit.runtime.memory_uploaded_file_manager import MemoryUploadedFileManager
 from streamlit.runtime.runtime_util import get_max_message_size_bytes
 from streamlit.web.cache_storage_manager_config import (
     create_default_cache_storage_manager,
 )
+from streamlit.web.server import prefork
 from streamlit.web.server.app_static_file_handler import AppStaticFileHandler
 from streamlit.web.server.browser_websocket_handler import BrowserWebSocketHandler
 from streamlit.web.server.component_request_handler import ComponentRequestHandler
-from streamlit.web.server.media_file_handler import MediaFileHandler
+from streamlit.web.server.media_file_handler import (
+    LocalMediaFileStorage,
+    MediaFileHandler,
+)
 from streamlit.web.server.routes import (
     AddSlashHandler,
     HealthHandler,
@@ -54,8 +61,11 @@ from streamlit.web.server.stats_request_handler import StatsRequestHandler
 from streamlit.web.server.upload_file_request_handler import UploadFileRequestHandler
 
 if TYPE_CHECKING:
+    import socket
     from ssl import SSLContext
 
+    from streamlit.runtime.session_manager import SessionStorage
+
 _LOGGER: Final = get_logger(__name__)
 
 TORNADO_SETTINGS = {
@@ -118,18 +128,46 @@ def start_listening(app: tornado.web.Application) -> None:
     key_file = config.get_option("server.sslKeyFile")
     ssl_options = _get_ssl_options(cert_file, key_file)
 
+    worker = prefork.get_worker()
     http_server = HTTPServer(
         app,
         max_buffer_size=config.get_option("server.maxUploadSize") * 1024 * 1024,
         ssl_options=ssl_options,
+        # Workers route connections by the cookie of their first request.
+        # Closing them after each request makes sure every request is routed.
+        no_keep_alive=worker is not None,
     )
 
-    if server_address_is_unix_socket():
+    if worker is not None:
+        prefork.ConnectionRouter(http_server, worker).start()
+    elif server_address_is_unix_socket():
         start_listening_unix_socket(http_server)
     else:
         start_listening_tcp_socket(http_server)
 
 
+def bind_listening_sockets() -> list[socket.socket]:
+    """Bind the sockets that the server listens on, without serving them yet.
+
+    Used to bind the sockets once, before forking the worker processes of
+    `server.workers`.
+    """
+    if server_address_is_unix_socket():
+        return [tornado.netutil.bind_unix_socket(_get_unix_socket_file_name())]
+
+    sockets: list[socket.socket] = []
+
+    def bind(port: int, address: str | None) -> None:
+        sockets.extend(
+            tornado.netutil.bind_sockets(
+                port, address, reuse_port=prefork.REUSE_PORT_SUPPORTED
+            )
+        )
+
+    _listen_with_port_search(bind)
+    return sockets
+
+
 def _get_ssl_options(cert_file: str | None, key_file: str | None) -> SSLContext | None:
     if bool(cert_file) != bool(key_file):
         _LOGGER.error(
@@ -169,15 +207,24 @@ def _get_ssl_options(cert_file: str | None, key_file: str | None) -> SSLContext
     return None
 
 
-def start_listening_unix_socket(http_server: HTTPServer) -> None:
-    address = config.get_option("server.address")
-    file_name = os.path.expanduser(address[len(UNIX_SOCKET_PREFIX) :])
+def _get_unix_socket_file_name() -> str:
+    address = str(config.get_option("server.address"))
+    return os.path.expanduser(address[len(UNIX_SOCKET_PREFIX) :])
+
 
-    unix_socket = tornado.netutil.bind_unix_socket(file_name)
+def start_listening_unix_socket(http_server: HTTPServer) -> None:
+    unix_socket = tornado.netutil.bind_unix_socket(_get_unix_socket_file_name())
     http_server.add_socket(unix_socket)
 
 
 def start_listening_tcp_socket(http_server: HTTPServer) -> None:
+    _listen_with_port_search(http_server.listen)
+
+
+def _listen_with_port_search(listen: Callable[[int, str | None], None]) -> None:
+    """Call `listen(port, address)` with the configured port. In case the port
+    is already taken, try the next ports.
+    """
     call_count = 0
 
     port = None
@@ -194,7 +241,7 @@ def start_listening_tcp_socket(http_server: HTTPServer) -> None:
             )
 
         try:
-            http_server.listen(port, address)
+            listen(port, address)
             break  # It worked! So let's break out of the loop.
 
         except OSError as e:
@@ -233,7 +280,7 @@ class Server:
         self._main_script_path = main_script_path
 
         # Initialize MediaFileStorage and its associated endpoint
-        media_file_storage = MemoryMediaFileStorage(MEDIA_ENDPOINT)
+        media_file_storage = _create_media_file_storage()
         MediaFileHandler.initialize_storage(media_file_storage)
 
         uploaded_file_mgr = MemoryUploadedFileManager(UPLOAD_FILE_ENDPOINT)
@@ -245,6 +292,7 @@ class Server:
                 media_file_storage=media_file_storage,
                 uploaded_file_manager=uploaded_file_mgr,
                 cache_storage_manager=create_default_cache_storage_manager(),
+                session_storage=_create_session_storage(main_script_path),
                 is_hello=is_hello,
             ),
         )
@@ -381,7 +429,7 @@ class Server:
                 ]
             )
 
-        return tornado.web.Application(
+        app = tornado.web.Application(
             routes,
             cookie_secret=config.get_option("server.cookieSecret"),
             xsrf_cookies=config.get_option("server.enableXsrfProtection"),
@@ -390,6 +438,11 @@ class Server:
             **TORNADO_SETTINGS,  # type: ignore[arg-type]
         )
 
+        worker = prefork.get_worker()
+        if worker is not None:
+            app.add_transform(prefork.make_worker_cookie_transform(worker.worker_index))
+        return app
+
     @property
     def browser_is_connected(self) -> bool:
         return self._runtime.state == RuntimeState.ONE_OR_MORE_SESSIONS_CONNECTED
@@ -405,6 +458,25 @@ class Server:
         self._runtime.stop()
 
 
+def _create_media_file_storage() -> LocalMediaFileStorage:
+    if config.get_option("server.mediaFileStorage") == "disk":
+        memory_budget_mb = config.get_option("server.mediaFileStorageMemoryBudget")
+        return DiskMediaFileStorage(
+            MEDIA_ENDPOINT, memory_budget_bytes=memory_budget_mb * 1024 * 1024
+        )
+    return MemoryMediaFileStorage(MEDIA_ENDPOINT)
+
+
+def _create_session_storage(main_script_path: str) -> SessionStorage:
+    if config.get_option("server.sessionStorage") == "disk":
+        return DiskSessionStorage(
+            file_util.get_streamlit_file_path("sessions.db"),
+            script_path=os.path.abspath(main_script_path),
+            max_bytes=config.get_option("server.sessionStorageMaxSize") * 1024 * 1024,
+        )
+    return MemorySessionStorage()
+
+
 def _set_tornado_log_levels() -> None:
     if not config.get_option("global.developmentMode"):
         # Hide logs unless they're super important.
@@ -18,11 +18,12 @@ from typing import TYPE_CHECKING
 
 import tornado.web
 
+from streamlit.runtime.stats import CACHE_MEMORY_FAMILY
 from streamlit.web.server.server_util import emit_endpoint_deprecation_notice
 
 if TYPE_CHECKING:
     from streamlit.proto.openmetrics_data_model_pb2 import MetricSet as MetricSetProto
-    from streamlit.runtime.stats import CacheStat, StatsManager
+    from streamlit.runtime.stats import MetricFamily, Stat, StatsManager
 
 
 class StatsRequestHandler(tornado.web.RequestHandler):
@@ -59,39 +60,72 @@ class StatsRequestHandler(tornado.web.RequestHandler):
             self.set_status(200)
 
     @staticmethod
-    def _stats_to_text(stats: list[CacheStat]) -> str:
+    def _stats_to_text(stats: list[Stat]) -> str:
         metric_type = "# TYPE cache_memory_bytes gauge"
         metric_unit = "# UNIT cache_memory_bytes bytes"
         metric_help = "# HELP Total memory consumed by a cache."
         openmetrics_eof = "# EOF\n"
 
+        stats_by_family = _group_stats_by_family(stats)
+
         # Format: header, stats, EOF
         result = [metric_type, metric_unit, metric_help]
-        result.extend(stat.to_metric_str() for stat in stats)
+        result.extend(
+            stat.to_metric_str()
+            for stat in stats_by_family.pop(CACHE_MEMORY_FAMILY, [])
+        )
+
+        # All other metric families follow the cache memory one, each with
+        # its own header.
+        for family, family_stats in stats_by_family.items():
+            result.append(f"# TYPE {family.name} {family.type}")
+            if family.unit:
+                result.append(f"# UNIT {family.name} {family.unit}")
+            result.append(f"# HELP {family.name} {family.help}")
+            result.extend(stat.to_metric_str() for stat in family_stats)
+
         result.append(openmetrics_eof)
 
         return "\n".join(result)
 
     @staticmethod
-    def _stats_to_proto(stats: list[CacheStat]) -> MetricSetProto:
+    def _stats_to_proto(stats: list[Stat]) -> MetricSetProto:
         # Lazy load the import of this proto message for better performance:
-        from streamlit.proto.openmetrics_data_model_pb2 import GAUGE
+        from streamlit.proto.openmetrics_data_model_pb2 import (
+            COUNTER,
+            GAUGE,
+            HISTOGRAM,
+        )
         from streamlit.proto.openmetrics_data_model_pb2 import (
             MetricSet as MetricSetProto,
         )
 
         metric_set = MetricSetProto()
 
-        metric_family = metric_set.metric_families.add()
-        metric_family.name = "cache_memory_bytes"
-        metric_family.type = GAUGE
-        metric_family.unit = "bytes"
-        metric_family.help = "Total memory consumed by a cache."
+        stats_by_family = _group_stats_by_family(stats)
+        # The cache memory family is always reported, even if it's empty.
+        stats_by_family.setdefault(CACHE_MEMORY_FAMILY, [])
 
-        for stat in stats:
-            metric_proto = metric_family.metrics.add()
-            stat.marshall_metric_proto(metric_proto)
+        for family in sorted(stats_by_family, key=lambda f: f != CACHE_MEMORY_FAMILY):
+            metric_family = metric_set.metric_families.add()
+            metric_family.name = family.name
+            metric_family.type = {"counter": COUNTER, "histogram": HISTOGRAM}.get(
+                family.type, GAUGE
+            )
+            metric_family.unit = family.unit
+            metric_family.help = family.help
+
+            for stat in stats_by_family[family]:
+                metric_proto = metric_family.metrics.add()
+                stat.marshall_metric_proto(metric_proto)
 
-        metric_set = MetricSetProto()
-        metric_set.metric_families.append(metric_family)
         return metric_set
+
+
+def _group_stats_by_family(stats: list[Stat]) -> dict[MetricFamily, list[Stat]]:
+    """Group stats by their metric family, preserving the order in which each
+    family first appears."""
+    stats_by_family: dict[MetricFamily, list[Stat]] = {}
+    for stat in stats:
+        stats_by_family.setdefault(stat.family, []).append(stat)
+    return stats_by_family
@@ -14,7 +14,10 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Callable
+import mmap
+import tempfile
+from email.message import Message
+from typing import IO, TYPE_CHECKING, Callable, Final, NamedTuple
 
 import tornado.httputil
 import tornado.web
@@ -26,9 +29,157 @@ from streamlit.web.server import routes, server_util
 if TYPE_CHECKING:
     from streamlit.runtime.memory_uploaded_file_manager import MemoryUploadedFileManager
 
+# Uploaded files that are larger than this are written to a temporary file
+# rather than kept in memory.
+_SPILL_THRESHOLD_BYTES: Final = 1024 * 1024  # 1MB
 
+# The maximum size of the headers of a part of a multipart request.
+_MAX_PART_HEADERS_BYTES: Final = 64 * 1024
+
+
+class _ParsedFile(NamedTuple):
+    name: str
+    content_type: str
+    file: IO[bytes]
+
+
+class _MultipartParser:
+    """Incrementally parses a multipart/form-data request body as it's
+    received, writing the files in it to spooled temporary files.
+
+    Only the last few bytes of the body that may hold a boundary are kept in
+    memory, so memory usage doesn't grow with the size of the body. Parts that
+    aren't files are ignored.
+    """
+
+    def __init__(self, boundary: bytes, spill_threshold: int):
+        # The first boundary isn't preceded by a newline, so we add one, to
+        # look for the same delimiter before every part.
+        self._delimiter = b"\r\n--" + boundary
+        self._spill_threshold = spill_threshold
+        self._buffer = bytearray(b"\r\n")
+        self._state = "preamble"
+        self._file: _ParsedFile | None = None
+        self.files: list[_ParsedFile] = []
+
+    def feed(self, data: bytes) -> None:
+        """Parse the next chunk of the body.
+
+        Raises
+        ------
+        ValueError
+            If the body is malformed.
+        """
+        self._buffer += data
+        while True:
+            if self._state in ("preamble", "body"):
+                index = self._buffer.find(self._delimiter)
+                if index < 0:
+                    # Keep the bytes that may be the start of a delimiter.
+                    end = max(len(self._buffer) - len(self._delimiter) + 1, 0)
+                    self._write_body(end)
+                    return
+                self._write_body(index)
+                del self._buffer[: len(self._delimiter)]
+                self._file = None
+                self._state = "delimiter"
+
+            elif self._state == "delimiter":
+                if len(self._buffer) < 2:
+                    return
+                if self._buffer.startswith(b"--"):
+                    self._state = "done"
+                elif self._buffer.startswith(b"\r\n"):
+                    self._state = "headers"
+                else:
+                    raise ValueError("Invalid multipart boundary")
+                del self._buffer[:2]
+
+            elif self._state == "headers":
+                index = self._buffer.find(b"\r\n\r\n")
+                if index < 0:
+                    if len(self._buffer) > _MAX_PART_HEADERS_BYTES:
+                        raise ValueError("Multipart headers are too large")
+                    return
+                headers = tornado.httputil.HTTPHeaders.parse(
+                    self._buffer[:index].decode("utf-8")
+                )
+                del self._buffer[: index + 4]
+                self._start_part(headers)
+                self._state = "body"
+
+            else:
+                # Ignore the epilogue.
+                self._buffer.clear()
+                return
+
+    def close(self) -> None:
+        """Check that the whole body was parsed.
+
+        Raises
+        ------
+        ValueError
+            If the body ended before the final boundary.
+        """
+        if self._state != "done":
+            raise ValueError("Incomplete multipart body")
+
+    def _start_part(self, headers: tornado.httputil.HTTPHeaders) -> None:
+        disposition = Message()
+        disposition["Content-Disposition"] = headers.get("Content-Disposition", "")
+        filename = disposition.get_filename()
+        if filename is None:
+            return
+        self._file = _ParsedFile(
+            name=filename,
+            content_type=headers.get("Content-Type", "application/unknown"),
+            file=tempfile.SpooledTemporaryFile(max_size=self._spill_threshold),
+        )
+        self.files.append(self._file)
+
+    def _write_body(self, end: int) -> None:
+        """Write the first `end` bytes of the buffer to the current file, if
+        we're in one, and remove them from the buffer.
+        """
+        if self._state == "body" and self._file is not None:
+            self._file.file.write(self._buffer[:end])
+        del self._buffer[:end]
+
+
+def _get_multipart_boundary(content_type: str) -> bytes | None:
+    """Return the boundary of a multipart/form-data Content-Type header."""
+    media_type, *params = content_type.split(";")
+    if media_type.strip().lower() != "multipart/form-data":
+        return None
+    for param in params:
+        key, _, value = param.strip().partition("=")
+        if key.lower() == "boundary" and value:
+            if len(value) >= 2 and value[0] == value[-1] == '"':
+                value = value[1:-1]
+            return value.encode("utf-8")
+    return None
+
+
+def _read_file_data(file: IO[bytes], size: int) -> bytes | mmap.mmap:
+    """Return the contents of an uploaded file. Files that spilled to disk are
+    memory-mapped rather than read into memory.
+    """
+    if size <= _SPILL_THRESHOLD_BYTES:
+        file.seek(0)
+        return file.read()
+    # The mapping keeps the (unlinked) temporary file around after it's closed.
+    return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+@tornado.web.stream_request_body
 class UploadFileRequestHandler(tornado.web.RequestHandler):
-    """Implements the POST /upload_file endpoint."""
+    """Implements the PUT /upload_file endpoint.
+
+    The request body is parsed as it's received, rather than after Tornado
+    buffered all of it, and the uploaded file is only kept in memory if it's
+    small. Larger files are written to a temporary file, which is memory-mapped
+    by the UploadedFileRec.
+    """
 
     def initialize(
         self,
@@ -82,22 +233,56 @@ class UploadFileRequestHandler(tornado.web.RequestHandler):
         self.set_status(204)
         self.finish()
 
+    def prepare(self) -> None:
+        """Set up the parsing of the request body, which is streamed to
+        `data_received` as it arrives.
+        """
+        self._parser: _MultipartParser | None = None
+        self._parse_error: str | None = None
+
+        if self.request.method != "PUT":
+            return
+
+        try:
+            if not self._is_active_session(self.path_kwargs["session_id"]):
+                # The request is rejected in `put`, once its body was received.
+                return
+        except Exception:
+            return
+
+        boundary = _get_multipart_boundary(self.request.headers.get("Content-Type", ""))
+        if boundary is None:
+            self._parse_error = "Expected a multipart/form-data request"
+            return
+        self._parser = _MultipartParser(boundary, _SPILL_THRESHOLD_BYTES)
+
+    def data_received(self, chunk: bytes) -> None:
+        if self._parser is None:
+            return
+        try:
+            self._parser.feed(chunk)
+        except ValueError as ex:
+            self._parse_error = str(ex)
+            self._close_files()
+            self._parser = None
+
+    def on_finish(self) -> None:
+        self._close_files()
+
+    def on_connection_close(self) -> None:
+        self._close_files()
+
+    def _close_files(self) -> None:
+        if self._parser is not None:
+            for file in self._parser.files:
+                file.file.close()
+
     def put(self, **kwargs):
         """Receive an uploaded file and add it to our UploadedFileManager."""
 
-        args: dict[str, list[bytes]] = {}
-        files: dict[str, list[Any]] = {}
-
         session_id = self.path_kwargs["session_id"]
         file_id = self.path_kwargs["file_id"]
 
-        tornado.httputil.parse_body_arguments(
-            content_type=self.request.headers["Content-Type"],
-            body=self.request.body,
-            arguments=args,
-            files=files,
-        )
-
         try:
             if not self._is_active_session(session_id):
                 raise Exception("Invalid session_id")
@@ -105,18 +290,28 @@ class UploadFileRequestHandler(tornado.web.RequestHandler):
             self.send_error(400, reason=str(e))
             return
 
+        if self._parser is not None and self._parse_error is None:
+            try:
+                self._parser.close()
+            except ValueError as ex:
+                self._parse_error = str(ex)
+
+        if self._parser is None or self._parse_error is not None:
+            self.send_error(400, reason=self._parse_error)
+            return
+
         uploaded_files: list[UploadedFileRec] = []
 
-        for _, flist in files.items():
-            for file in flist:
-                uploaded_files.append(
-                    UploadedFileRec(
-                        file_id=file_id,
-                        name=file["filename"],
-                        type=file["content_type"],
-                        data=file["body"],
-                    )
+        for file in self._parser.files:
+            size = file.file.tell()
+            uploaded_files.append(
+                UploadedFileRec(
+                    file_id=file_id,
+                    name=file.name,
+                    type=file.content_type,
+                    data=_read_file_data(file.file, size),
                 )
+            )
 
         if len(uploaded_files) != 1:
             self.send_error(
@@ -350,8 +350,12 @@ class ConfigTest(unittest.TestCase):
                 "global.developmentMode",
                 "global.disableWidgetStateDuplicationWarning",
                 "global.e2eTest",
+                "global.forwardMsgHashAlgorithm",
+                "global.forwardMsgHashDigestSize",
                 "global.maxCachedMessageAge",
+                "global.maxCachedMessageBytes",
                 "global.minCachedMessageSize",
+                "global.persistedCacheStorage",
                 "global.showWarningOnDirectExecution",
                 "global.storeCachedForwardMessagesInMemory",
                 "global.suppressDeprecationWarnings",
@@ -361,13 +365,20 @@ class ConfigTest(unittest.TestCase):
                 "logger.messageFormat",
                 "runner.enforceSerializableSessionState",
                 "runner.magicEnabled",
+                "runner.persistBytecode",
+                "runner.precompilePages",
                 "runner.postScriptGC",
                 "runner.fastReruns",
                 "runner.enumCoercion",
+                "runner.scriptRunPoolSize",
+                "runner.maxQueuedScriptRuns",
+                "runner.overloadPolicy",
                 "magic.displayRootDocString",
                 "magic.displayLastExprIfNoSemicolon",
                 "mapbox.token",
                 "server.baseUrlPath",
+                "server.batchForwardMessages",
+                "server.cacheMemoryBudget",
                 "server.enableCORS",
                 "server.cookieSecret",
                 "server.scriptHealthCheckEnabled",
@@ -380,6 +391,12 @@ class ConfigTest(unittest.TestCase):
                 "server.allowRunOnSave",
                 "server.port",
                 "server.runOnSave",
+                "server.sessionSendQuantum",
+                "server.workers",
+                "server.sessionStorage",
+                "server.sessionStorageMaxSize",
+                "server.mediaFileStorage",
+                "server.mediaFileStorageMemoryBudget",
                 "server.maxUploadSize",
                 "server.maxMessageSize",
                 "server.enableStaticServing",
@@ -420,6 +437,20 @@ class ConfigTest(unittest.TestCase):
             "browser.serverPort does not work when global.developmentMode is true.",
         )
 
+    def test_check_conflicts_forward_msg_hash_algorithm(self):
+        config._set_option("global.forwardMsgHashAlgorithm", "sha1", "test")
+        with pytest.raises(StreamlitAPIException) as e:
+            config._check_conflicts()
+        self.assertIn("global.forwardMsgHashAlgorithm", str(e.value))
+
+    @parameterized.expand([(0,), (8,), (65,)])
+    def test_check_conflicts_forward_msg_hash_digest_size(self, digest_size):
+        config._set_option("global.forwardMsgHashAlgorithm", "blake2b", "test")
+        config._set_option("global.forwardMsgHashDigestSize", digest_size, "test")
+        with pytest.raises(StreamlitAPIException) as e:
+            config._check_conflicts()
+        self.assertIn("global.forwardMsgHashDigestSize", str(e.value))
+
     def test_maybe_convert_to_number(self):
         self.assertEqual(1234, config._maybe_convert_to_number("1234"))
         self.assertEqual(1234.5678, config._maybe_convert_to_number("1234.5678"))
@@ -15,7 +15,11 @@
 """Unit tests for st.image and other image.py utility code."""
 
 import io
+import mmap
+import os
 import random
+import tempfile
+import threading
 from unittest import mock
 
 import numpy as np
@@ -28,11 +32,13 @@ import streamlit as st
 import streamlit.elements.image as image
 from streamlit.elements.image import _np_array_to_bytes, _PIL_to_bytes
 from streamlit.errors import StreamlitAPIException
+from streamlit.proto.Common_pb2 import FileURLs
 from streamlit.proto.Image_pb2 import ImageList as ImageListProto
 from streamlit.runtime.memory_media_file_storage import (
     _calculate_file_id,
     get_extension_for_mimetype,
 )
+from streamlit.runtime.uploaded_file_manager import UploadedFile, UploadedFileRec
 from streamlit.web.server.server import MEDIA_ENDPOINT
 from tests.delta_generator_test_case import DeltaGeneratorTestCase
 
@@ -139,12 +145,17 @@ IMAGES = {
 class ImageProtoTest(DeltaGeneratorTestCase):
     """Test streamlit.image."""
 
+    def setUp(self):
+        super().setUp()
+        image._transcode_cache.clear()
+
     @parameterized.expand(
         [
             (IMAGES["img_32_32_3_rgb"]["np"], "png"),
             (IMAGES["img_32_32_3_bgr"]["np"], "png"),
             (IMAGES["img_64_64_rgb"]["np"], "jpeg"),
             (IMAGES["img_32_32_3_rgba"]["np"], "jpeg"),
+            (IMAGES["img_32_32_3_rgba"]["np"], "webp"),
             (IMAGES["gif_64_64"]["gif"], "gif"),
         ]
     )
@@ -456,3 +467,115 @@ class ImageProtoTest(DeltaGeneratorTestCase):
             st.image("does/not/exist", width=-1234)
 
         self.assertTrue("Image width must be positive." in str(ctx.exception))
+
+    def test_transcoded_images_are_cached(self):
+        """Unchanged images aren't transcoded again, unless they are displayed
+        differently.
+        """
+        array = np.array(IMAGES["img_64_64_rgb"]["np"])
+        with mock.patch(
+            "streamlit.elements.image._ensure_image_size_and_format",
+            wraps=image._ensure_image_size_and_format,
+        ) as ensure_image_size_and_format:
+            url = image.image_to_url(array, 32, False, "RGB", "auto", "mock_id")
+            self.assertEqual(
+                url,
+                image.image_to_url(array.copy(), 32, False, "RGB", "auto", "mock_id"),
+            )
+            self.assertEqual(1, ensure_image_size_and_format.call_count)
+
+            image.image_to_url(array, 16, False, "RGB", "auto", "mock_id")
+            self.assertEqual(2, ensure_image_size_and_format.call_count)
+
+            array[0, 0] = 255 - array[0, 0]
+            self.assertNotEqual(
+                url, image.image_to_url(array, 32, False, "RGB", "auto", "mock_id")
+            )
+            self.assertEqual(3, ensure_image_size_and_format.call_count)
+
+    def test_fingerprints_mapped_uploads_without_copying_them(self):
+        data = _PIL_to_bytes(IMAGES["img_32_32_3_rgb"]["pil"], format="PNG")
+        with tempfile.TemporaryFile() as file:
+            file.write(data)
+            file.flush()
+            mapped_data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        uploaded_file = UploadedFile(
+            UploadedFileRec(
+                file_id="id", name="image.png", type="image/png", data=mapped_data
+            ),
+            FileURLs(),
+        )
+
+        self.assertEqual(
+            image._get_image_fingerprint(data),
+            image._get_image_fingerprint(uploaded_file),
+        )
+        self.assertIsNotNone(uploaded_file._mapped_data)
+
+    def test_transcoded_files_are_cached_until_modified(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "image.png")
+            IMAGES["img_32_32_3_rgb"]["pil"].save(path)
+
+            with mock.patch(
+                "streamlit.elements.image._ensure_image_size_and_format",
+                wraps=image._ensure_image_size_and_format,
+            ) as ensure_image_size_and_format:
+                url = image.image_to_url(path, -1, False, "RGB", "auto", "mock_id")
+                image.image_to_url(path, -1, False, "RGB", "auto", "mock_id")
+                self.assertEqual(1, ensure_image_size_and_format.call_count)
+
+                IMAGES["img_64_64_rgb"]["pil"].save(path)
+                self.assertNotEqual(
+                    url, image.image_to_url(path, -1, False, "RGB", "auto", "mock_id")
+                )
+                self.assertEqual(2, ensure_image_size_and_format.call_count)
+
+    def test_PIL_images_are_not_cached(self):
+        img = Image.new("RGB", (64, 64), color="red")
+        with mock.patch(
+            "streamlit.elements.image._ensure_image_size_and_format",
+            wraps=image._ensure_image_size_and_format,
+        ) as ensure_image_size_and_format:
+            for _ in range(2):
+                image.image_to_url(img, -1, False, "RGB", "auto", "mock_id")
+            self.assertEqual(2, ensure_image_size_and_format.call_count)
+
+    def test_image_lists_are_transcoded_in_parallel(self):
+        """The images of a list are transcoded on the executor's threads, and
+        added to the MediaFileManager in order.
+        """
+        imgs = [np.full((32, 32, 3), color, dtype=np.uint8) for color in (0, 100, 200)]
+        thread_names = set()
+
+        def transcode_image(*args, **kwargs):
+            thread_names.add(threading.current_thread().name)
+            return transcode_image.original(*args, **kwargs)
+
+        transcode_image.original = image._transcode_image
+        with mock.patch(
+            "streamlit.elements.image._transcode_image", side_effect=transcode_image
+        ):
+            st.image(imgs, output_format="PNG")
+
+        self.assertTrue(all(name.startswith("ImageTranscode") for name in thread_names))
+        el = self.get_delta_from_queue().new_element
+        for idx, img in enumerate(imgs):
+            file_id = _calculate_file_id(
+                _np_array_to_bytes(img, output_format="PNG"), "image/png"
+            )
+            self.assertEqual(
+                self.media_file_storage.get_url(file_id), el.imgs.imgs[idx].url
+            )
+
+    def test_st_image_webp(self):
+        """Test st.image with WEBP output."""
+        img = Image.new("RGBA", (64, 64), color="red")
+
+        st.image(img, output_format="webp")
+
+        el = self.get_delta_from_queue().new_element
+        file_id = _calculate_file_id(_PIL_to_bytes(img, format="WEBP"), "image/webp")
+        media_file = self.media_file_storage.get_file(file_id)
+        self.assertEqual(media_file.mimetype, "image/webp")
+        self.assertTrue(el.imgs.imgs[0].url.endswith(".webp"))
@@ -25,6 +25,7 @@ import pytest
 
 import streamlit.runtime.app_session as app_session
 from streamlit import config
+from streamlit.errors import StreamlitAPIWarning
 from streamlit.proto.AppPage_pb2 import AppPage
 from streamlit.proto.BackMsg_pb2 import BackMsg
 from streamlit.proto.ClientState_pb2 import ClientState
@@ -49,12 +50,17 @@ from streamlit.runtime.scriptrunner import (
     add_script_run_ctx,
     get_script_run_ctx,
 )
+from streamlit.runtime.scriptrunner.script_run_pool import (
+    ScriptRunPriority,
+    _get_priority,
+)
 from streamlit.runtime.state import SessionState
 from streamlit.runtime.uploaded_file_manager import (
     UploadedFileManager,
     UploadFileUrlInfo,
 )
 from streamlit.watcher.local_sources_watcher import LocalSourcesWatcher
+from tests.streamlit.message_mocks import create_dataframe_msg
 from tests.testutil import patch_config_options
 
 
@@ -194,6 +200,162 @@ class AppSessionTest(unittest.TestCase):
         session._handle_clear_cache_request()
         assert "foo" not in session._session_state
 
+    def test_get_session_state_value_sizes(self):
+        session = _create_test_session()
+        session._session_state["foo"] = "bar"
+        self.assertEqual({"foo"}, set(session.get_session_state_value_sizes()))
+
+        # While a ScriptRunner exists, it's asked, so that it takes the lock
+        # of its script's session state.
+        mock_scriptrunner = MagicMock(spec=ScriptRunner)
+        mock_scriptrunner.get_session_state_value_sizes.return_value = {"foo": 1}
+        session._scriptrunner = mock_scriptrunner
+        self.assertEqual({"foo": 1}, session.get_session_state_value_sizes())
+
+    def test_restores_snapshot(self):
+        session = _create_test_session()
+        session._session_state["foo"] = "bar"
+        session._session_state["unpicklable"] = lambda: None
+        session._client_state.query_string = "a=b"
+        session._client_state.page_script_hash = "page_hash"
+
+        snapshot = session.get_snapshot(script_run_count=3)
+        assert snapshot.session_id == session.id
+        assert snapshot.script_run_count == 3
+        assert set(snapshot.user_state) == {"foo"}
+
+        new_session = _create_test_session(session_id_override=session.id)
+        new_session.restore_snapshot(snapshot)
+        assert new_session._session_state["foo"] == "bar"
+        assert "unpicklable" not in new_session._session_state
+        assert new_session._client_state.query_string == "a=b"
+        assert new_session._client_state.page_script_hash == "page_hash"
+
+    def test_get_snapshot_takes_script_lock(self):
+        session = _create_test_session()
+        # While a ScriptRunner exists, it's asked, so that it takes the lock
+        # of its script's session state.
+        mock_scriptrunner = MagicMock(spec=ScriptRunner)
+        mock_scriptrunner.get_pickled_session_state_values.return_value = {
+            "foo": b"bar"
+        }
+        session._scriptrunner = mock_scriptrunner
+
+        self.assertEqual({"foo": b"bar"}, session.get_snapshot(1).user_state)
+
+    def test_is_unchanged_delta(self):
+        session = _create_test_session()
+
+        def is_unchanged(data, delta_id: int = 1) -> bool:
+            return session.is_unchanged_delta(create_dataframe_msg(data, delta_id))
+
+        self.assertFalse(is_unchanged([1, 2, 3]))
+        self.assertFalse(is_unchanged([4, 5, 6], 2))
+        session.on_script_finished_sent(ForwardMsg.FINISHED_SUCCESSFULLY)
+
+        self.assertTrue(is_unchanged([1, 2, 3]))
+        # Same content, but not at the same delta_path.
+        self.assertFalse(is_unchanged([1, 2, 3], 2))
+        session.on_script_finished_sent(ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY)
+
+        # Fragment runs only update the deltas they sent.
+        self.assertTrue(is_unchanged([1, 2, 3]))
+        self.assertTrue(is_unchanged([1, 2, 3], 2))
+        session.on_script_finished_sent(ForwardMsg.FINISHED_SUCCESSFULLY)
+
+        # Full runs forget the deltas they didn't send.
+        session.on_script_finished_sent(ForwardMsg.FINISHED_SUCCESSFULLY)
+        self.assertFalse(is_unchanged([1, 2, 3]))
+
+    def test_is_unchanged_delta_ignores_small_messages(self):
+        session = _create_test_session()
+        msg = ForwardMsg()
+        msg.metadata.delta_path[:] = [0, 0]
+        msg.delta.new_element.markdown.body = "hello"
+
+        self.assertFalse(session.is_unchanged_delta(msg))
+        session.on_script_finished_sent(ForwardMsg.FINISHED_SUCCESSFULLY)
+        self.assertFalse(session.is_unchanged_delta(msg))
+        self.assertEqual("", msg.hash)
+
+    def test_resolves_json_patches(self):
+        session = _create_test_session()
+        session.request_rerun = MagicMock()
+
+        client_state = ClientState()
+        client_state.widget_states.version = 1
+        client_state.widget_states.widgets.add(
+            id="editor",
+            string_value='{"edited_rows": {"0": {"a": 1}}}',
+            is_json_string_value=True,
+        )
+        session._handle_rerun_script_request(client_state)
+
+        client_state = ClientState()
+        client_state.widget_states.is_delta = True
+        client_state.widget_states.version = 2
+        client_state.widget_states.widgets.add(
+            id="editor", json_patch_value='{"edited_rows": {"1": {"b": 2}}}'
+        )
+        session._handle_rerun_script_request(client_state)
+
+        widget_states = session.request_rerun.call_args.args[0].widget_states
+        self.assertEqual(["editor"], [state.id for state in widget_states.widgets])
+        self.assertEqual(
+            '{"edited_rows":{"0":{"a":1},"1":{"b":2}}}',
+            widget_states.widgets[0].string_value,
+        )
+
+    def test_only_tracks_json_values_sent_as_json(self):
+        """String values that the client didn't mark as JSON can't be patched."""
+        session = _create_test_session()
+        session.request_rerun = MagicMock()
+        session._enqueue_forward_msg = MagicMock()
+
+        client_state = ClientState()
+        client_state.widget_states.widgets.add(id="text", string_value="{foo}")
+        session._handle_rerun_script_request(client_state)
+        self.assertEqual({}, session._json_widget_values)
+
+        client_state = ClientState()
+        client_state.widget_states.is_delta = True
+        client_state.widget_states.version = 1
+        client_state.widget_states.widgets.add(id="text", json_patch_value='{"foo": 1}')
+        session._handle_rerun_script_request(client_state)
+
+        session.request_rerun.assert_called_once()
+        session._enqueue_forward_msg.assert_called_once()
+        msg = session._enqueue_forward_msg.call_args.args[0]
+        self.assertTrue(msg.session_event.widget_states_out_of_sync)
+
+    def test_requests_all_widget_states_after_missed_delta(self):
+        """Deltas that don't follow the previous WidgetStates are ignored until
+        the client sends all widget states again."""
+        session = _create_test_session()
+        session.request_rerun = MagicMock()
+        session._enqueue_forward_msg = MagicMock()
+
+        reruns = []
+        for version, is_delta in [
+            (0, False),
+            (1, True),
+            (3, True),
+            (4, True),
+            (0, False),
+            (1, True),
+        ]:
+            client_state = ClientState()
+            client_state.widget_states.version = version
+            client_state.widget_states.is_delta = is_delta
+            session.request_rerun.reset_mock()
+            session._handle_rerun_script_request(client_state)
+            reruns.append(session.request_rerun.called)
+
+        self.assertEqual([True, True, False, False, True, True], reruns)
+        session._enqueue_forward_msg.assert_called_once()
+        msg = session._enqueue_forward_msg.call_args.args[0]
+        self.assertTrue(msg.session_event.widget_states_out_of_sync)
+
     @patch("streamlit.runtime.caching.cache_data.clear")
     @patch("streamlit.runtime.caching.cache_resource.clear")
     def test_clear_cache_all_caches(self, clear_resource_caches, clear_data_caches):
@@ -219,6 +381,31 @@ class AppSessionTest(unittest.TestCase):
         session.request_rerun(None)
         mock_create_scriptrunner.assert_called_once_with(RerunData())
 
+    @patch_config_options({"runner.fastReruns": False})
+    @patch("streamlit.runtime.app_session.AppSession._create_scriptrunner")
+    def test_rerun_priority(self, mock_create_scriptrunner: MagicMock):
+        """The initial page load's rerun is queued with a lower priority than
+        reruns triggered by widget interactions."""
+        session = _create_test_session()
+
+        # The client's first rerun request has a full, empty WidgetStates.
+        client_state = ClientState()
+        client_state.query_string = "foo=bar"
+        session.request_rerun(client_state)
+        rerun_data = mock_create_scriptrunner.call_args.args[0]
+        self.assertEqual(ScriptRunPriority.PAGE_LOAD, _get_priority(rerun_data))
+
+        client_state.widget_states.widgets.add(id="button", trigger_value=True)
+        session.request_rerun(client_state)
+        rerun_data = mock_create_scriptrunner.call_args.args[0]
+        self.assertEqual(ScriptRunPriority.INTERACTIVE, _get_priority(rerun_data))
+
+        client_state.widget_states.is_delta = True
+        del client_state.widget_states.widgets[:]
+        session.request_rerun(client_state)
+        rerun_data = mock_create_scriptrunner.call_args.args[0]
+        self.assertEqual(ScriptRunPriority.INTERACTIVE, _get_priority(rerun_data))
+
     @patch_config_options({"runner.fastReruns": False})
     @patch("streamlit.runtime.app_session.AppSession._create_scriptrunner")
     def test_rerun_with_active_scriptrunner(self, mock_create_scriptrunner: MagicMock):
@@ -314,6 +501,7 @@ class AppSessionTest(unittest.TestCase):
             user_info={"email": "test@test.com"},
             fragment_storage=session._fragment_storage,
             pages_manager=session._pages_manager,
+            script_run_pool=None,
         )
 
         assert session._scriptrunner is not None
@@ -395,6 +583,35 @@ class AppSessionTest(unittest.TestCase):
 
             assert session._state == AppSessionState.APP_NOT_RUNNING
 
+    @patch("streamlit.runtime.app_session.ScriptRunner", MagicMock(spec=ScriptRunner))
+    @patch("streamlit.runtime.app_session.AppSession._enqueue_forward_msg")
+    def test_shows_warning_of_rejected_script_run(self, mock_enqueue: MagicMock):
+        """A script run rejected by an overloaded ScriptRunPool shows its
+        warning, if it has one."""
+        session = _create_test_session()
+        session._create_scriptrunner(initial_rerun_data=RerunData())
+
+        with patch(
+            "streamlit.runtime.app_session.asyncio.get_running_loop",
+            return_value=session._event_loop,
+        ):
+            session._handle_scriptrunner_event_on_event_loop(
+                sender=session._scriptrunner,
+                event=ScriptRunnerEvent.SCRIPT_REJECTED,
+                exception=None,
+            )
+            mock_enqueue.assert_not_called()
+
+            warning = StreamlitAPIWarning("The app is busy.")
+            session._handle_scriptrunner_event_on_event_loop(
+                sender=session._scriptrunner,
+                event=ScriptRunnerEvent.SCRIPT_REJECTED,
+                exception=warning,
+            )
+            mock_enqueue.assert_called_once_with(
+                session._create_exception_message(warning)
+            )
+
     def test_passes_client_state_on_run_on_save(self):
         session = _create_test_session()
         session._run_on_save = True
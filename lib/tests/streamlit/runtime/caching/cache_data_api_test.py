@@ -21,8 +21,9 @@ import os
 import pickle
 import re
 import threading
+import time
 import unittest
-from typing import Any
+from typing import Any, List
 from unittest.mock import MagicMock, Mock, mock_open, patch
 
 from parameterized import parameterized
@@ -32,8 +33,11 @@ from streamlit import file_util
 from streamlit.errors import StreamlitAPIException
 from streamlit.proto.Text_pb2 import Text as TextProto
 from streamlit.runtime import Runtime
-from streamlit.runtime.caching import cached_message_replay
-from streamlit.runtime.caching.cache_data_api import get_data_cache_stats_provider
+from streamlit.runtime.caching import cache_utils, cached_message_replay
+from streamlit.runtime.caching.cache_data_api import (
+    _data_caches,
+    get_data_cache_stats_provider,
+)
 from streamlit.runtime.caching.cache_errors import CacheError
 from streamlit.runtime.caching.cache_type import CacheType
 from streamlit.runtime.caching.cached_message_replay import (
@@ -59,7 +63,7 @@ from streamlit.runtime.caching.storage.local_disk_cache_storage import (
     LocalDiskCacheStorageManager,
     get_cache_folder_path,
 )
-from streamlit.runtime.scriptrunner import add_script_run_ctx
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from streamlit.runtime.stats import CacheStat
 from tests.delta_generator_test_case import DeltaGeneratorTestCase
 from tests.streamlit.element_mocks import (
@@ -73,6 +77,12 @@ from tests.streamlit.runtime.caching.common_cache_test import (
 from tests.testutil import create_mock_script_run_ctx
 
 
+def wait_for_background_refreshes() -> None:
+    deadline = time.monotonic() + 5
+    while cache_utils._refreshes_in_flight and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
 def as_cached_result(value: Any) -> MultiCacheResults:
     return _as_cached_result(value, CacheType.DATA)
 
@@ -125,6 +135,197 @@ class CacheDataTest(unittest.TestCase):
         self.assertEqual(r1, [1, 1])
         self.assertEqual(r2, [0, 1])
 
+    def test_zero_copy_return(self):
+        """With copy="zero", cache hits share the cached array buffers, which
+        are read-only."""
+        import numpy as np
+
+        @st.cache_data(copy="zero")
+        def f():
+            return np.arange(1000)
+
+        r1 = f()
+        r2 = f()
+        r3 = f()
+
+        np.testing.assert_array_equal(np.arange(1000), r2)
+        self.assertFalse(r2.flags.writeable)
+        self.assertTrue(np.shares_memory(r2, r3))
+        # The value returned on a cache miss isn't affected.
+        self.assertTrue(r1.flags.writeable)
+        with self.assertRaises(ValueError):
+            r2[0] = 1
+
+    def test_max_bytes(self):
+        """Entries that are rarely read are evicted from memory once the
+        pickled entries exceed max_bytes."""
+        call_count: List[int] = [0]
+
+        @st.cache_data(max_bytes=25_000)
+        def f(key: int) -> bytes:
+            call_count[0] += 1
+            return b"x" * 10_000
+
+        f(1)
+        f(2)
+        f(1)
+        f(3)
+        self.assertEqual(3, call_count[0])
+
+        # f(2) was evicted, f(1) was read twice and is still cached.
+        f(1)
+        self.assertEqual(3, call_count[0])
+        f(2)
+        self.assertEqual(4, call_count[0])
+
+    @patch("streamlit.runtime.caching.cache_utils.TTLCACHE_TIMER")
+    def test_background_refresh(self, timer_patch: Mock):
+        """With refresh="background", stale values are returned right away,
+        and replaced once they've been recomputed."""
+        timer_patch.return_value = 0
+        call_count: List[int] = [0]
+
+        @st.cache_data(ttl=10, refresh="background")
+        def f() -> int:
+            call_count[0] += 1
+            return call_count[0]
+
+        self.assertEqual(1, f())
+
+        timer_patch.return_value = 11
+        self.assertEqual(1, f())
+        wait_for_background_refreshes()
+        self.assertEqual(2, call_count[0])
+        self.assertEqual(2, f())
+        self.assertEqual(2, call_count[0])
+
+    @patch("streamlit.runtime.caching.cache_utils.TTLCACHE_TIMER")
+    def test_background_prewarm(self, timer_patch: Mock):
+        """Values that are read often are recomputed before they go stale."""
+        timer_patch.return_value = 0
+        call_count: List[int] = [0]
+
+        @st.cache_data(ttl=10, refresh="background")
+        def f(key: str) -> int:
+            call_count[0] += 1
+            return call_count[0]
+
+        f("hot")
+        f("cold")
+        for now in range(1, 10):
+            timer_patch.return_value = now
+            f("hot")
+        wait_for_background_refreshes()
+        self.assertEqual(3, call_count[0])
+
+        # The cold value is read once, so it isn't worth recomputing early.
+        timer_patch.return_value = 9.5
+        f("cold")
+        wait_for_background_refreshes()
+        self.assertEqual(3, call_count[0])
+
+    @patch("streamlit.runtime.caching.cache_utils.TTLCACHE_TIMER")
+    def test_background_refresh_is_detached_from_session(self, timer_patch: Mock):
+        """Background refreshes don't run in the ScriptRunContext of the
+        session that triggered them."""
+        timer_patch.return_value = 0
+        session_ctx = get_script_run_ctx()
+        refresh_ctxs: List[Any] = []
+
+        @st.cache_data(ttl=10, refresh="background")
+        def f() -> int:
+            refresh_ctxs.append(get_script_run_ctx())
+            return len(refresh_ctxs)
+
+        f()
+        timer_patch.return_value = 11
+        f()
+        wait_for_background_refreshes()
+
+        self.assertEqual(2, len(refresh_ctxs))
+        self.assertIs(session_ctx, refresh_ctxs[0])
+        refresh_ctx = refresh_ctxs[1]
+        self.assertIsNotNone(refresh_ctx)
+        self.assertIsNot(session_ctx, refresh_ctx)
+        self.assertIsNot(session_ctx.session_state, refresh_ctx.session_state)
+
+    @patch("streamlit.runtime.caching.cache_utils.TTLCACHE_TIMER")
+    def test_values_with_messages_are_not_prewarmed(self, timer_patch: Mock):
+        """Values with messages are recomputed in the foreground once they're
+        stale, and never before."""
+        timer_patch.return_value = 0
+        call_count: List[int] = [0]
+
+        @st.cache_data(ttl=10, refresh="background")
+        def f() -> int:
+            call_count[0] += 1
+            st.text("hi")
+            return call_count[0]
+
+        f()
+        for now in range(1, 10):
+            timer_patch.return_value = now
+            self.assertEqual(1, f())
+        wait_for_background_refreshes()
+        self.assertEqual(1, call_count[0])
+
+        timer_patch.return_value = 11
+        self.assertEqual(2, f())
+
+    @patch("streamlit.runtime.caching.cache_utils.TTLCACHE_TIMER")
+    def test_unread_stale_values_expire(self, timer_patch: Mock):
+        """With refresh="background", values that aren't read for a while
+        expire, and the cache forgets about them."""
+        timer_patch.return_value = 0
+        call_count: List[int] = [0]
+
+        @st.cache_data(ttl=10, refresh="background")
+        def f(key: str) -> int:
+            call_count[0] += 1
+            return call_count[0]
+
+        f("a")
+        f("b")
+        timer_patch.return_value = 21
+        # "a" expired from the storage, so it's recomputed right away.
+        self.assertEqual(3, f("a"))
+
+        (cache,) = (
+            cache
+            for cache in _data_caches._function_caches.values()
+            if "test_unread_stale_values_expire" in cache.display_name
+        )
+        # Only "a" is still tracked.
+        self.assertEqual(1, len(cache._write_times))
+        self.assertEqual(1, len(cache._read_counts))
+
+    def test_bad_refresh_value(self):
+        """Throw an error if an invalid value is passed to 'refresh'."""
+        with self.assertRaises(StreamlitAPIException) as e:
+
+            @st.cache_data(refresh="never")
+            def foo():
+                pass
+
+        self.assertEqual(
+            "Unsupported refresh option 'never'. "
+            "Valid values are 'blocking' or 'background'.",
+            str(e.exception),
+        )
+
+    def test_bad_copy_value(self):
+        """Throw an error if an invalid value is passed to 'copy'."""
+        with self.assertRaises(StreamlitAPIException) as e:
+
+            @st.cache_data(copy="shallow")
+            def foo():
+                pass
+
+        self.assertEqual(
+            "Unsupported copy option 'shallow'. Valid values are 'deep' or 'zero'.",
+            str(e.exception),
+        )
+
     def test_cached_member_function_with_hash_func(self):
         """@st.cache_data can be applied to class member functions
         with corresponding hash_func.
@@ -0,0 +1,146 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for CacheMemoryBudget and BudgetedTTLCache."""
+
+import gc
+import math
+import threading
+import unittest
+
+from streamlit.runtime.caching import cache_memory_budget
+from streamlit.runtime.caching.cache_memory_budget import (
+    CACHE_EVICTIONS_FAMILY,
+    CACHE_MEMORY_BUDGET_BYTES_FAMILY,
+    BudgetedTTLCache,
+    CacheMemoryBudget,
+)
+from streamlit.runtime.stats import CounterStat, GaugeStat
+from streamlit.testing.v1.util import patch_config_options
+
+
+def create_cache(
+    max_bytes=None, ttl=math.inf, timer=None, display_name="cache"
+) -> BudgetedTTLCache:
+    return BudgetedTTLCache(
+        maxsize=math.inf,
+        ttl=ttl,
+        timer=timer or (lambda: 0),
+        lock=threading.Lock(),
+        entry_size=len,
+        max_bytes=max_bytes,
+        cache_type="st_cache_data",
+        display_name=display_name,
+    )
+
+
+class CacheMemoryBudgetTest(unittest.TestCase):
+    def test_evicts_large_rarely_read_entries_first(self):
+        budget = CacheMemoryBudget(lambda: 1000)
+        cache = create_cache()
+
+        budget.record_write(cache, "small", 100)
+        budget.record_write(cache, "large", 800)
+        budget.record_write(cache, "read", 800)
+        budget.record_hit(cache, "read")
+        budget.record_hit(cache, "read")
+
+        self.assertEqual(1700, budget.total_bytes)
+        self.assertEqual([(cache, "large")], budget.select_victims())
+        self.assertEqual(900, budget.total_bytes)
+        self.assertEqual([], budget.select_victims())
+
+    def test_removed_entries_are_not_victims(self):
+        budget = CacheMemoryBudget(lambda: 100)
+        cache = create_cache()
+
+        budget.record_write(cache, "key", 500)
+        budget.record_write(cache, "key", 50)
+        self.assertEqual(50, budget.total_bytes)
+
+        budget.record_write(cache, "other", 500)
+        budget.record_removal(cache, "other")
+        self.assertEqual([], budget.select_victims())
+
+    def test_inactive_budget_selects_nothing(self):
+        budget = CacheMemoryBudget(lambda: 0)
+        cache = create_cache()
+        budget.record_write(cache, "key", 500)
+
+        self.assertFalse(budget.is_active)
+        self.assertEqual([], budget.select_victims())
+
+    def test_forgets_collected_caches(self):
+        budget = CacheMemoryBudget(lambda: 1000)
+        cache = create_cache()
+        budget.record_write(cache, "key", 500)
+
+        del cache
+        gc.collect()
+
+        self.assertEqual(0, budget.total_bytes)
+
+
+class BudgetedTTLCacheTest(unittest.TestCase):
+    def test_max_bytes(self):
+        cache = create_cache(max_bytes=2500)
+        cache["a"] = b"x" * 1000
+        cache["b"] = b"x" * 1000
+        cache.record_hit("a")
+        cache["c"] = b"x" * 1000
+        cache.enforce_budgets()
+
+        self.assertEqual({"a", "c"}, set(cache.keys()))
+
+    def test_expired_entries_are_untracked(self):
+        now = [0.0]
+        cache = create_cache(max_bytes=2500, ttl=10, timer=lambda: now[0])
+        cache["a"] = b"x" * 1000
+        cache["b"] = b"x" * 1000
+
+        now[0] = 20
+        cache.expire()
+        cache["c"] = b"x" * 1000
+        cache["d"] = b"x" * 1000
+        cache.enforce_budgets()
+
+        self.assertEqual({"c", "d"}, set(cache.keys()))
+
+    @patch_config_options({"server.cacheMemoryBudget": 1})
+    def test_global_budget_spans_caches(self):
+        cache_a = create_cache(display_name="a")
+        cache_b = create_cache(display_name="b")
+        self.addCleanup(cache_a.clear)
+        self.addCleanup(cache_b.clear)
+
+        cache_a["key"] = b"x" * 600_000
+        cache_b["key"] = b"x" * 600_000
+        cache_b.record_hit("key")
+        cache_b.enforce_budgets()
+
+        self.assertNotIn("key", cache_a)
+        self.assertIn("key", cache_b)
+
+        stats = cache_memory_budget.get_cache_memory_budget_stats_provider().get_stats()
+        self.assertIn(
+            GaugeStat(CACHE_MEMORY_BUDGET_BYTES_FAMILY, (), 1024 * 1024), stats
+        )
+        self.assertIn(
+            CounterStat(
+                CACHE_EVICTIONS_FAMILY,
+                (("cache_type", "st_cache_data"), ("cache", "a")),
+                1,
+            ),
+            stats,
+        )
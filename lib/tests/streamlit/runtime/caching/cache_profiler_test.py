@@ -0,0 +1,151 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for CacheProfiler."""
+
+import unittest
+from unittest.mock import patch
+
+import streamlit as st
+from streamlit.runtime.caching.cache_profiler import (
+    CACHE_PHASE_DURATION_FAMILY,
+    CacheProfiler,
+    get_cache_profiler,
+)
+from streamlit.runtime.caching.cache_type import CacheType
+from streamlit.runtime.stats import HistogramStat
+from tests.delta_generator_test_case import DeltaGeneratorTestCase
+
+
+class CacheProfilerTest(unittest.TestCase):
+    def test_histogram_buckets(self):
+        profiler = CacheProfiler()
+        profiler.record(CacheType.DATA, "foo", "hash_args", 0.00005)
+        profiler.record(CacheType.DATA, "foo", "hash_args", 0.001)
+        profiler.record(CacheType.DATA, "foo", "hash_args", 100)
+
+        [stat] = profiler.get_stats()
+        self.assertIsInstance(stat, HistogramStat)
+        self.assertEqual(CACHE_PHASE_DURATION_FAMILY, stat.family)
+        self.assertEqual(
+            (("cache_type", "st_cache_data"), ("cache", "foo"), ("phase", "hash_args")),
+            stat.labels,
+        )
+        # Bounds are inclusive, and counts cumulative.
+        self.assertEqual((1, 1, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2), stat.bucket_counts)
+        self.assertEqual(3, stat.observation_count)
+        self.assertAlmostEqual(100.00105, stat.sum)
+
+    def test_measure_records_failed_blocks(self):
+        profiler = CacheProfiler()
+        with self.assertRaises(RuntimeError), profiler.measure(
+            CacheType.RESOURCE, "bar", "compute"
+        ):
+            raise RuntimeError()
+
+        [stat] = profiler.get_stats()
+        self.assertEqual(("cache_type", "st_cache_resource"), stat.labels[0])
+        self.assertEqual(1, stat.observation_count)
+
+    def test_clear(self):
+        profiler = CacheProfiler()
+        profiler.record(CacheType.DATA, "foo", "replay", 0.1)
+        profiler.clear()
+        self.assertEqual([], profiler.get_stats())
+
+
+class CachedFunctionProfilingTest(DeltaGeneratorTestCase):
+    def setUp(self):
+        super().setUp()
+        get_cache_profiler().clear()
+        self.addCleanup(get_cache_profiler().clear)
+
+    def tearDown(self):
+        st.cache_data.clear()
+        st.cache_resource.clear()
+        super().tearDown()
+
+    def _phase_counts(self) -> dict:
+        return {
+            (
+                dict(stat.labels)["cache_type"],
+                dict(stat.labels)["phase"],
+            ): stat.observation_count
+            for stat in get_cache_profiler().get_stats()
+        }
+
+    def test_cache_data_phases(self):
+        @st.cache_data
+        def foo(x):
+            return x
+
+        foo(1)
+        foo(1)
+
+        self.assertEqual(
+            {
+                ("st_cache_data", "hash_args"): 2,
+                # One lookup for the first call, one for the second call
+                # after taking the compute lock, and one for the hit.
+                ("st_cache_data", "storage_lookup"): 3,
+                ("st_cache_data", "unpickle"): 1,
+                ("st_cache_data", "compute"): 1,
+                ("st_cache_data", "replay"): 1,
+            },
+            self._phase_counts(),
+        )
+
+    def test_cache_resource_phases(self):
+        @st.cache_resource
+        def bar(x):
+            return x
+
+        bar(1)
+        bar(1)
+
+        self.assertEqual(
+            {
+                ("st_cache_resource", "hash_args"): 2,
+                ("st_cache_resource", "storage_lookup"): 3,
+                ("st_cache_resource", "compute"): 1,
+                ("st_cache_resource", "replay"): 1,
+            },
+            self._phase_counts(),
+        )
+
+    @patch("streamlit.runtime.caching.cache_profiler.time.perf_counter")
+    def test_slow_hashing_is_reported(self, perf_counter):
+        # Every timed block appears to take 2 seconds.
+        perf_counter.side_effect = [float(i * 2) for i in range(100)]
+
+        @st.cache_data
+        def foo(x):
+            return x
+
+        foo(1)
+
+        [hash_stat] = [
+            stat
+            for stat in get_cache_profiler().get_stats()
+            if ("phase", "hash_args") in stat.labels
+        ]
+        self.assertEqual(2.0, hash_stat.sum)
+        self.assertEqual(
+            (
+                "cache",
+                f"{__name__}.CachedFunctionProfilingTest"
+                ".test_slow_hashing_is_reported.<locals>.foo",
+            ),
+            hash_stat.labels[1],
+        )
@@ -176,6 +176,28 @@ If you think this is actually a Streamlit bug, please
 [file a bug report here](https://github.com/streamlit/streamlit/issues/new/choose)."""
         self.assertEqual(str(ctx.exception), expected_message)
 
+    def test_max_bytes(self):
+        """Entries that are rarely read are evicted once the cached resources
+        exceed max_bytes."""
+        call_count: List[int] = [0]
+
+        @st.cache_resource(max_bytes=2500)
+        def f(key: int) -> bytes:
+            call_count[0] += 1
+            return b"x" * 1000
+
+        f(1)
+        f(2)
+        f(1)
+        f(3)
+        self.assertEqual(3, call_count[0])
+
+        # f(2) was evicted, f(1) was read twice and is still cached.
+        f(1)
+        self.assertEqual(3, call_count[0])
+        f(2)
+        self.assertEqual(4, call_count[0])
+
     def test_cached_st_function_clear_args(self):
         self.x = 0
 
@@ -27,15 +27,16 @@ import uuid
 from dataclasses import dataclass
 from enum import Enum, auto
 from io import BytesIO, StringIO
-from unittest.mock import MagicMock, Mock
+from unittest.mock import MagicMock, Mock, patch
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
 from parameterized import parameterized
 from PIL import Image
 
 from streamlit.proto.Common_pb2 import FileURLs
-from streamlit.runtime.caching import cache_data, cache_resource
+from streamlit.runtime.caching import cache_data, cache_resource, zero_copy_pickle
 from streamlit.runtime.caching.cache_errors import UnhashableTypeError
 from streamlit.runtime.caching.cache_type import CacheType
 from streamlit.runtime.caching.hashing import (
@@ -382,6 +383,35 @@ class HashTest(unittest.TestCase):
         self.assertNotEqual(get_hash(np1), get_hash(np2))
         self.assertNotEqual(get_hash(np3), get_hash(np4))
 
+    def test_numpy_non_contiguous(self):
+        """Non-contiguous arrays are hashed by their elements, like contiguous
+        copies of them."""
+        arr = np.arange(20).reshape(4, 5)
+
+        self.assertEqual(get_hash(arr.T), get_hash(np.ascontiguousarray(arr.T)))
+        self.assertNotEqual(get_hash(arr.T), get_hash(arr))
+        self.assertEqual(get_hash(arr[:, ::2]), get_hash(arr[:, ::2].copy()))
+
+    def test_pyarrow(self):
+        table1 = pa.table({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+        table2 = pa.table({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+        table3 = pa.table({"a": [1, 2, 4], "b": ["x", "y", "z"]})
+        table4 = pa.table({"a": [1, 2, 3], "c": ["x", "y", "z"]})
+
+        self.assertEqual(get_hash(table1), get_hash(table2))
+        self.assertNotEqual(get_hash(table1), get_hash(table3))
+        self.assertNotEqual(get_hash(table1), get_hash(table4))
+        self.assertNotEqual(get_hash(table1), get_hash(table1.slice(1)))
+        self.assertEqual(get_hash(table1.column("a")), get_hash(table2.column("a")))
+        self.assertEqual(
+            get_hash(pa.array(["x", "y"]).dictionary_encode()),
+            get_hash(pa.array(["x", "y"]).dictionary_encode()),
+        )
+        self.assertNotEqual(
+            get_hash(pa.array(["x", "y"]).dictionary_encode()),
+            get_hash(pa.array(["x", "z"]).dictionary_encode()),
+        )
+
     def test_PIL_image(self):
         im1 = Image.new("RGB", (50, 50), (220, 20, 60))
         im2 = Image.new("RGB", (50, 50), (30, 144, 255))
@@ -519,6 +549,75 @@ class HashTest(unittest.TestCase):
         self.assertNotEqual(get_hash(enum_a), get_hash(enum_b))
 
 
+class ImmutableObjectHashesTest(unittest.TestCase):
+    """The hashes of objects that can't be mutated are memoized."""
+
+    def assert_hashed_once(self, obj, method_name):
+        with patch(
+            f"streamlit.runtime.caching.hashing._CacheFuncHasher.{method_name}",
+            autospec=True,
+            side_effect=lambda _, o: b"hash",
+        ) as compute:
+            get_hash(obj)
+            get_hash(obj)
+        self.assertEqual(1, compute.call_count)
+
+    def assert_hashed_every_time(self, obj, method_name):
+        with patch(
+            f"streamlit.runtime.caching.hashing._CacheFuncHasher.{method_name}",
+            autospec=True,
+            side_effect=lambda _, o: b"hash",
+        ) as compute:
+            get_hash(obj)
+            get_hash(obj)
+        self.assertEqual(2, compute.call_count)
+
+    def test_read_only_numpy(self):
+        arr = np.arange(10)
+        self.assert_hashed_every_time(arr, "_ndarray_to_bytes")
+
+        arr.flags.writeable = False
+        self.assert_hashed_once(arr, "_ndarray_to_bytes")
+
+        # A read-only view of a writeable array can change.
+        view = np.arange(10)[:5]
+        view.flags.writeable = False
+        self.assert_hashed_every_time(view, "_ndarray_to_bytes")
+
+    def test_zero_copy_dataframe(self):
+        df = pd.DataFrame({"a": np.arange(10), "b": np.arange(10.0)})
+        self.assert_hashed_every_time(df, "_dataframe_to_bytes")
+
+        read_only_df = zero_copy_pickle.loads(zero_copy_pickle.dumps(df))
+        self.assert_hashed_once(read_only_df, "_dataframe_to_bytes")
+
+    def test_replaced_dataframe_column(self):
+        """Replacing a column of a read-only DataFrame changes its hash."""
+        df = zero_copy_pickle.loads(
+            zero_copy_pickle.dumps(pd.DataFrame({"a": np.arange(10)}))
+        )
+        hash1 = get_hash(df)
+
+        df["a"] = np.arange(1, 11)
+        df["a"].values.flags.writeable = False
+        self.assertNotEqual(hash1, get_hash(df))
+
+    def test_pyarrow(self):
+        self.assert_hashed_once(pa.table({"a": [1, 2, 3]}), "_arrow_to_bytes")
+
+    def test_hash_funcs_disable_memoization(self):
+        arr = np.arange(10)
+        arr.flags.writeable = False
+        with patch(
+            "streamlit.runtime.caching.hashing._CacheFuncHasher._ndarray_to_bytes",
+            autospec=True,
+            side_effect=lambda _, o: b"hash",
+        ) as compute:
+            get_hash(arr, hash_funcs={int: str})
+            get_hash(arr, hash_funcs={int: str})
+        self.assertEqual(2, compute.call_count)
+
+
 class NotHashableTest(unittest.TestCase):
     """Tests for various unhashable types."""
 
@@ -0,0 +1,274 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for SegmentFileCacheStorage and SegmentFileCacheStorageManager"""
+
+import os
+import unittest
+from unittest.mock import patch
+
+from testfixtures import TempDirectory
+
+from streamlit.runtime.caching.storage import (
+    CacheStorageContext,
+    CacheStorageError,
+    CacheStorageKeyNotFoundError,
+)
+from streamlit.runtime.caching.storage.dummy_cache_storage import DummyCacheStorage
+from streamlit.runtime.caching.storage.in_memory_cache_storage_wrapper import (
+    InMemoryCacheStorageWrapper,
+)
+from streamlit.runtime.caching.storage.segment_file_cache_storage import (
+    SegmentFileCacheStorage,
+    SegmentFileCacheStorageManager,
+)
+
+
+class SegmentFileCacheStorageTestBase(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.tempdir = TempDirectory(create=True)
+        self.patch_get_cache_folder_path = patch(
+            "streamlit.runtime.caching.storage.segment_file_cache_storage.get_cache_folder_path",
+            return_value=self.tempdir.path,
+        )
+        self.patch_get_cache_folder_path.start()
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        self.patch_get_cache_folder_path.stop()
+        self.tempdir.cleanup()
+
+    def create_storage(self, **kwargs) -> SegmentFileCacheStorage:
+        context = CacheStorageContext(
+            function_key="func-key",
+            function_display_name="func-display-name",
+            persist="disk",
+            **kwargs,
+        )
+        storage = SegmentFileCacheStorage(context)
+        self.addCleanup(storage.close)
+        return storage
+
+
+class SegmentFileCacheStorageManagerTest(SegmentFileCacheStorageTestBase):
+    def test_create_persist_context(self):
+        """Tests that the manager wraps a SegmentFileCacheStorage in an
+        InMemoryCacheStorageWrapper if persist="disk"."""
+        context = CacheStorageContext(
+            function_key="func-key",
+            function_display_name="func-display-name",
+            persist="disk",
+            ttl_seconds=60,
+            max_entries=100,
+        )
+        storage = SegmentFileCacheStorageManager().create(context)
+
+        self.assertIsInstance(storage, InMemoryCacheStorageWrapper)
+        self.assertIsInstance(storage._persist_storage, SegmentFileCacheStorage)
+        self.assertEqual(60, storage.ttl_seconds)
+        self.assertEqual(100, storage.max_entries)
+
+    def test_create_not_persist_context(self):
+        """Tests that nothing is written to disk if persist is None."""
+        context = CacheStorageContext(
+            function_key="func-key",
+            function_display_name="func-display-name",
+        )
+        storage = SegmentFileCacheStorageManager().create(context)
+
+        self.assertIsInstance(storage._persist_storage, DummyCacheStorage)
+
+    def test_clear_all(self):
+        """clear_all closes the storages it created, and removes the cache
+        directory."""
+        manager = SegmentFileCacheStorageManager()
+        storage = manager.create(
+            CacheStorageContext(
+                function_key="func-key",
+                function_display_name="func-display-name",
+                persist="disk",
+            )
+        )
+        storage.set("key", b"value")
+
+        manager.clear_all()
+
+        self.assertFalse(os.path.exists(self.tempdir.path))
+        self.assertIsNone(storage._persist_storage._file)
+
+
+class SegmentFileCacheStorageTest(SegmentFileCacheStorageTestBase):
+    def test_get_set_delete(self):
+        storage = self.create_storage()
+
+        with self.assertRaises(CacheStorageKeyNotFoundError):
+            storage.get("key")
+
+        storage.set("key", b"value")
+        storage.set("other-key", b"other value")
+        self.assertEqual(b"value", storage.get("key"))
+
+        storage.set("key", b"new value")
+        self.assertEqual(b"new value", storage.get("key"))
+
+        storage.delete("key")
+        with self.assertRaises(CacheStorageKeyNotFoundError):
+            storage.get("key")
+        self.assertEqual(b"other value", storage.get("other-key"))
+
+    def test_values_survive_reopening(self):
+        """The index is rebuilt from the segment file, including deletions."""
+        storage = self.create_storage()
+        storage.set("key1", b"value1")
+        storage.set("key2", b"value2")
+        storage.set("key1", b"value1-updated")
+        storage.delete("key2")
+        storage.close()
+
+        reopened = self.create_storage()
+        self.assertEqual(b"value1-updated", reopened.get("key1"))
+        with self.assertRaises(CacheStorageKeyNotFoundError):
+            reopened.get("key2")
+
+    def test_truncated_record_is_discarded(self):
+        storage = self.create_storage()
+        storage.set("key1", b"value1")
+        storage.set("key2", b"value2")
+        storage.close()
+
+        path = os.path.join(self.tempdir.path, "func-key.segment")
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) - 3)
+
+        reopened = self.create_storage()
+        self.assertEqual(b"value1", reopened.get("key1"))
+        with self.assertRaises(CacheStorageKeyNotFoundError):
+            reopened.get("key2")
+
+        # New records are appended after the last good one.
+        reopened.set("key2", b"value2")
+        self.assertEqual(b"value2", reopened.get("key2"))
+
+    def test_corrupted_value(self):
+        storage = self.create_storage()
+        storage.set("key", b"value")
+        storage.close()
+
+        path = os.path.join(self.tempdir.path, "func-key.segment")
+        with open(path, "r+b") as f:
+            f.seek(-1, os.SEEK_END)
+            f.write(b"X")
+
+        reopened = self.create_storage()
+        with self.assertRaises(CacheStorageError):
+            reopened.get("key")
+
+    def test_max_entries(self):
+        """The oldest entries are evicted on disk when max_entries is exceeded."""
+        storage = self.create_storage(max_entries=2)
+        storage.set("key1", b"value1")
+        storage.set("key2", b"value2")
+        storage.set("key3", b"value3")
+
+        with self.assertRaises(CacheStorageKeyNotFoundError):
+            storage.get("key1")
+        self.assertEqual(b"value3", storage.get("key3"))
+
+        storage.close()
+        reopened = self.create_storage(max_entries=2)
+        with self.assertRaises(CacheStorageKeyNotFoundError):
+            reopened.get("key1")
+        self.assertEqual(b"value2", reopened.get("key2"))
+
+    @patch("streamlit.runtime.caching.storage.segment_file_cache_storage.time.time")
+    def test_ttl(self, mock_time):
+        storage = self.create_storage(ttl_seconds=10)
+        mock_time.return_value = 100
+        storage.set("key", b"value")
+
+        mock_time.return_value = 105
+        self.assertEqual(b"value", storage.get("key"))
+
+        mock_time.return_value = 111
+        with self.assertRaises(CacheStorageKeyNotFoundError):
+            storage.get("key")
+
+    def test_clear(self):
+        storage = self.create_storage()
+        storage.set("key", b"value")
+
+        storage.clear()
+
+        with self.assertRaises(CacheStorageKeyNotFoundError):
+            storage.get("key")
+        self.assertEqual([], os.listdir(self.tempdir.path))
+
+    def test_compact(self):
+        """Compaction drops garbage records but keeps every live entry."""
+        storage = self.create_storage()
+        for i in range(10):
+            storage.set(f"key{i}", b"x" * 1000)
+        for i in range(5):
+            storage.delete(f"key{i}")
+        storage.set("key5", b"updated")
+
+        path = os.path.join(self.tempdir.path, "func-key.segment")
+        size_before = os.path.getsize(path)
+        storage.compact()
+
+        self.assertLess(os.path.getsize(path), size_before)
+        self.assertEqual(b"updated", storage.get("key5"))
+        for i in range(6, 10):
+            self.assertEqual(b"x" * 1000, storage.get(f"key{i}"))
+        for i in range(5):
+            with self.assertRaises(CacheStorageKeyNotFoundError):
+                storage.get(f"key{i}")
+
+        storage.close()
+        reopened = self.create_storage()
+        self.assertEqual(b"updated", reopened.get("key5"))
+
+    def test_compact_reconciles_concurrent_changes(self):
+        """Changes made while the live records are being copied end up in the
+        compacted file."""
+        storage = self.create_storage()
+        storage.set("kept", b"kept")
+        storage.set("deleted", b"deleted")
+        storage.set("updated", b"old")
+
+        original_swap = storage._swap_in_compacted_file
+
+        def swap_after_changes(*args):
+            # The lock is held here, so make the changes through the
+            # internals, like set() and delete() would.
+            storage._delete("deleted")
+            entry = storage._append_record("updated", b"new", 0)
+            storage._index.pop("updated")
+            storage._index["updated"] = entry
+            original_swap(*args)
+
+        with patch.object(storage, "_swap_in_compacted_file", swap_after_changes):
+            storage.compact()
+
+        self.assertEqual(b"kept", storage.get("kept"))
+        self.assertEqual(b"new", storage.get("updated"))
+        with self.assertRaises(CacheStorageKeyNotFoundError):
+            storage.get("deleted")
+
+        storage.close()
+        reopened = self.create_storage()
+        self.assertEqual(b"new", reopened.get("updated"))
+        with self.assertRaises(CacheStorageKeyNotFoundError):
+            reopened.get("deleted")
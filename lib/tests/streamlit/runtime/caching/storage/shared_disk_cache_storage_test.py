@@ -0,0 +1,171 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for SharedDiskCacheStorage and SharedDiskCacheStorageManager"""
+
+import os
+import time
+import unittest
+from unittest.mock import patch
+
+from testfixtures import TempDirectory
+
+from streamlit.runtime.caching.storage import (
+    CacheStorageContext,
+    CacheStorageKeyNotFoundError,
+)
+from streamlit.runtime.caching.storage.in_memory_cache_storage_wrapper import (
+    InMemoryCacheStorageWrapper,
+)
+from streamlit.runtime.caching.storage.shared_disk_cache_storage import (
+    SharedDiskCacheStorage,
+    SharedDiskCacheStorageManager,
+)
+
+
+def _make_context(**kwargs) -> CacheStorageContext:
+    return CacheStorageContext(
+        function_key="func-key",
+        function_display_name="func-display-name",
+        **kwargs,
+    )
+
+
+class SharedDiskCacheStorageManagerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.tempdir = TempDirectory(create=True)
+        self.shared_dir = os.path.join(self.tempdir.path, "shared")
+        self.persist_dir = os.path.join(self.tempdir.path, "persist")
+        self.patch_get_cache_folder_path = patch(
+            "streamlit.runtime.caching.storage.shared_disk_cache_storage.get_cache_folder_path",
+            return_value=self.persist_dir,
+        )
+        self.patch_get_cache_folder_path.start()
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        self.patch_get_cache_folder_path.stop()
+        self.tempdir.cleanup()
+
+    def test_create_uses_shared_dir_without_persist(self):
+        """Entries of functions without persist go to the shared directory."""
+        manager = SharedDiskCacheStorageManager(self.shared_dir)
+        storage = manager.create(_make_context())
+
+        self.assertIsInstance(storage, InMemoryCacheStorageWrapper)
+        storage.set("key", b"value")
+        self.assertEqual(os.listdir(self.shared_dir), ["func-key-key.memo"])
+
+    def test_create_uses_cache_folder_with_persist(self):
+        """Entries of persisted functions go to the regular cache folder."""
+        manager = SharedDiskCacheStorageManager(self.shared_dir)
+        storage = manager.create(_make_context(persist="disk"))
+
+        storage.set("key", b"value")
+        self.assertEqual(os.listdir(self.persist_dir), ["func-key-key.memo"])
+        self.assertFalse(os.path.exists(self.shared_dir))
+
+    def test_workers_share_entries(self):
+        """A value set by one worker's storage is read by another one's."""
+        context = _make_context()
+        storage_1 = SharedDiskCacheStorageManager(self.shared_dir).create(context)
+        storage_2 = SharedDiskCacheStorageManager(self.shared_dir).create(context)
+
+        storage_1.set("key", b"value")
+        self.assertEqual(storage_2.get("key"), b"value")
+
+    def test_clear_all(self):
+        manager = SharedDiskCacheStorageManager(self.shared_dir)
+        manager.create(_make_context()).set("key", b"value")
+
+        with patch(
+            "streamlit.runtime.caching.storage.local_disk_cache_storage.get_cache_folder_path",
+            return_value=self.persist_dir,
+        ):
+            manager.clear_all()
+        self.assertFalse(os.path.exists(self.shared_dir))
+
+
+class SharedDiskCacheStorageTest(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.tempdir = TempDirectory(create=True)
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        self.tempdir.cleanup()
+
+    def test_get_missing_key(self):
+        storage = SharedDiskCacheStorage(_make_context(), self.tempdir.path)
+        with self.assertRaises(CacheStorageKeyNotFoundError):
+            storage.get("missing")
+
+    def test_set_get_delete(self):
+        storage = SharedDiskCacheStorage(_make_context(), self.tempdir.path)
+        storage.set("key", b"value")
+        self.assertEqual(storage.get("key"), b"value")
+
+        storage.delete("key")
+        with self.assertRaises(CacheStorageKeyNotFoundError):
+            storage.get("key")
+        # Deleting a missing key doesn't raise.
+        storage.delete("key")
+
+    def test_set_leaves_no_temporary_files(self):
+        storage = SharedDiskCacheStorage(_make_context(), self.tempdir.path)
+        storage.set("key", b"value")
+        storage.set("key", b"new value")
+
+        self.assertEqual(os.listdir(self.tempdir.path), ["func-key-key.memo"])
+        self.assertEqual(storage.get("key"), b"new value")
+
+    def test_get_expired_entry(self):
+        """Entries older than the TTL are removed on read."""
+        storage = SharedDiskCacheStorage(
+            _make_context(ttl_seconds=60), self.tempdir.path
+        )
+        storage.set("key", b"value")
+        path = os.path.join(self.tempdir.path, "func-key-key.memo")
+        old = time.time() - 120
+        os.utime(path, (old, old))
+
+        with self.assertRaises(CacheStorageKeyNotFoundError):
+            storage.get("key")
+        self.assertFalse(os.path.exists(path))
+
+    def test_persisted_entries_ignore_ttl(self):
+        storage = SharedDiskCacheStorage(
+            _make_context(ttl_seconds=60, persist="disk"), self.tempdir.path
+        )
+        storage.set("key", b"value")
+        path = os.path.join(self.tempdir.path, "func-key-key.memo")
+        old = time.time() - 120
+        os.utime(path, (old, old))
+
+        self.assertEqual(storage.get("key"), b"value")
+
+    def test_clear_only_removes_own_entries(self):
+        storage = SharedDiskCacheStorage(_make_context(), self.tempdir.path)
+        other_storage = SharedDiskCacheStorage(
+            CacheStorageContext(
+                function_key="other-key", function_display_name="other"
+            ),
+            self.tempdir.path,
+        )
+        storage.set("key", b"value")
+        other_storage.set("key", b"other value")
+
+        storage.clear()
+        self.assertEqual(os.listdir(self.tempdir.path), ["other-key-key.memo"])
@@ -0,0 +1,74 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""zero_copy_pickle unit tests."""
+
+import pickle
+import unittest
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from streamlit.runtime.caching import zero_copy_pickle
+
+
+class ZeroCopyPickleTest(unittest.TestCase):
+    def test_round_trip_plain_objects(self):
+        """Objects without out-of-band buffers round-trip unchanged."""
+        obj = {"a": [1, 2, 3], "b": "text", "c": None}
+        data = zero_copy_pickle.dumps(obj)
+
+        self.assertTrue(zero_copy_pickle.is_zero_copy_pickle(data))
+        self.assertEqual(obj, zero_copy_pickle.loads(data))
+
+    def test_numpy_arrays_share_memory(self):
+        """NumPy arrays are returned as read-only, aligned views of the data."""
+        arrays = [np.arange(10, dtype=np.int8), np.linspace(0, 1, 1000)]
+        data = zero_copy_pickle.dumps(arrays)
+
+        loaded = zero_copy_pickle.loads(data)
+        for original, result in zip(arrays, loaded):
+            np.testing.assert_array_equal(original, result)
+            self.assertFalse(result.flags.writeable)
+            self.assertTrue(result.flags.aligned)
+
+        # Loading the same data twice doesn't copy the array buffers.
+        self.assertTrue(np.shares_memory(loaded[1], zero_copy_pickle.loads(data)[1]))
+
+    def test_dataframe_and_arrow_table(self):
+        df = pd.DataFrame({"x": np.arange(100), "y": np.arange(100) * 0.5})
+        table = pa.table({"z": list(range(100))})
+
+        loaded_df, loaded_table = zero_copy_pickle.loads(
+            zero_copy_pickle.dumps((df, table))
+        )
+
+        pd.testing.assert_frame_equal(df, loaded_df)
+        self.assertTrue(table.equals(loaded_table))
+
+    def test_regular_pickle_is_rejected(self):
+        data = pickle.dumps([1, 2, 3])
+
+        self.assertFalse(zero_copy_pickle.is_zero_copy_pickle(data))
+        with self.assertRaises(pickle.UnpicklingError):
+            zero_copy_pickle.loads(data)
+
+    def test_truncated_data(self):
+        data = zero_copy_pickle.dumps(np.arange(1000))
+
+        with self.assertRaises(pickle.UnpicklingError):
+            zero_copy_pickle.loads(data[:-10])
+        with self.assertRaises(pickle.UnpicklingError):
+            zero_copy_pickle.loads(data[:8])
@@ -0,0 +1,198 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for DiskMediaFileStorage"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from streamlit.runtime.disk_media_file_storage import DiskFile, DiskMediaFileStorage
+from streamlit.runtime.media_file_storage import MediaFileKind, MediaFileStorageError
+from streamlit.runtime.memory_media_file_storage import MemoryFile
+
+
+class DiskMediaFileStorageTest(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.storage = DiskMediaFileStorage(
+            media_endpoint="/mock/media",
+            memory_budget_bytes=100,
+            path=self.tmp_dir,
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+        super().tearDown()
+
+    def _load(self, data: bytes, filename: str = "file.mp4") -> str:
+        return self.storage.load_and_get_id(
+            data, mimetype="video/mp4", kind=MediaFileKind.MEDIA, filename=filename
+        )
+
+    def test_keeps_small_files_in_memory(self):
+        file_id = self._load(b"mock_bytes")
+        self.assertEqual(
+            MemoryFile(
+                content=b"mock_bytes",
+                mimetype="video/mp4",
+                kind=MediaFileKind.MEDIA,
+                filename="file.mp4",
+            ),
+            self.storage.get_file(file_id),
+        )
+        self.assertEqual([], os.listdir(self.tmp_dir))
+
+    @patch("streamlit.runtime.disk_media_file_storage._SPILL_THRESHOLD_BYTES", 10)
+    def test_writes_large_files_to_disk(self):
+        file_id = self._load(b"x" * 50)
+        media_file = self.storage.get_file(f"{file_id}.mp4")
+
+        self.assertIsInstance(media_file, DiskFile)
+        self.assertEqual(50, media_file.content_size)
+        self.assertEqual(b"x" * 50, media_file.content[:])
+        self.assertEqual("video/mp4", media_file.mimetype)
+        self.assertEqual([file_id], os.listdir(self.tmp_dir))
+
+    def test_moves_least_recently_served_files_to_disk(self):
+        file_ids = [self._load(b"x" * 40, filename=f"{i}.mp4") for i in range(2)]
+        # Serve the first file, so that the second one is moved to disk first.
+        self.storage.get_file(file_ids[0])
+
+        third_file_id = self._load(b"x" * 40, filename="2.mp4")
+
+        self.assertIsInstance(self.storage.get_file(file_ids[0]), MemoryFile)
+        self.assertIsInstance(self.storage.get_file(file_ids[1]), DiskFile)
+        self.assertIsInstance(self.storage.get_file(third_file_id), MemoryFile)
+        self.assertEqual(80, sum(stat.byte_length for stat in self.storage.get_stats()))
+
+    def test_moves_files_to_disk_outside_of_lock(self):
+        write_file = self.storage._write_file
+
+        def checked_write_file(file_id, memory_file):
+            self.assertFalse(self.storage._lock.locked())
+            # The file is still served from memory while it's written.
+            self.assertIsInstance(self.storage.get_file(file_id), MemoryFile)
+            return write_file(file_id, memory_file)
+
+        first_file_id = self._load(b"x" * 60, filename="1.mp4")
+        with patch.object(
+            self.storage, "_write_file", side_effect=checked_write_file
+        ) as patched_write_file:
+            self._load(b"x" * 60, filename="2.mp4")
+
+        patched_write_file.assert_called_once()
+        self.assertIsInstance(self.storage.get_file(first_file_id), DiskFile)
+
+    def test_keeps_file_in_memory_if_moving_it_fails(self):
+        file_ids = [self._load(b"x" * 40, filename=f"{i}.mp4") for i in range(2)]
+        with patch.object(
+            self.storage, "_write_file", side_effect=MediaFileStorageError()
+        ):
+            third_file_id = self._load(b"x" * 40, filename="2.mp4")
+
+        for file_id in (*file_ids, third_file_id):
+            self.assertIsInstance(self.storage.get_file(file_id), MemoryFile)
+        self.assertEqual(120, self.storage._memory_size)
+
+        # The file is still the least recently served one.
+        self._load(b"x" * 40, filename="3.mp4")
+        self.assertIsInstance(self.storage.get_file(file_ids[0]), DiskFile)
+        self.storage.delete_file(file_ids[1])
+        self.assertEqual(80, self.storage._memory_size)
+
+    def test_delete_file_while_moving_it_to_disk(self):
+        write_file = self.storage._write_file
+
+        def write_deleted_file(file_id, memory_file):
+            self.storage.delete_file(file_id)
+            return write_file(file_id, memory_file)
+
+        first_file_id = self._load(b"x" * 60, filename="1.mp4")
+        with patch.object(self.storage, "_write_file", side_effect=write_deleted_file):
+            second_file_id = self._load(b"x" * 60, filename="2.mp4")
+
+        with self.assertRaises(MediaFileStorageError):
+            self.storage.get_file(first_file_id)
+        self.assertEqual([], os.listdir(self.tmp_dir))
+        self.assertEqual(60, self.storage._memory_size)
+        self.assertIsInstance(self.storage.get_file(second_file_id), MemoryFile)
+
+    def test_delete_file(self):
+        memory_file_id = self._load(b"x" * 60, filename="1.mp4")
+        disk_file_id = self._load(b"x" * 200, filename="2.mp4")
+
+        self.storage.delete_file(memory_file_id)
+        self.storage.delete_file(disk_file_id)
+
+        for file_id in (memory_file_id, disk_file_id):
+            with self.assertRaises(MediaFileStorageError):
+                self.storage.get_file(file_id)
+        self.assertEqual([], os.listdir(self.tmp_dir))
+        self.assertEqual([], self.storage.get_stats())
+
+        # Deleting a file that doesn't exist is a no-op.
+        self.storage.delete_file(memory_file_id)
+
+    def test_does_not_rehash_same_bytes_while_in_memory(self):
+        data = b"x" * 60
+        file_id = self._load(data)
+        with patch(
+            "streamlit.runtime.disk_media_file_storage._calculate_file_id"
+        ) as calculate_file_id:
+            self.assertEqual(file_id, self._load(data))
+            calculate_file_id.assert_not_called()
+
+        # Once the file is moved to disk, its bytes are hashed again.
+        self._load(b"y" * 60)
+        self.assertIsInstance(self.storage.get_file(file_id), DiskFile)
+        with patch(
+            "streamlit.runtime.disk_media_file_storage._calculate_file_id",
+            return_value=file_id,
+        ) as calculate_file_id:
+            self.assertEqual(file_id, self._load(data))
+            calculate_file_id.assert_called_once()
+
+    def test_does_not_reread_unchanged_file(self):
+        path = os.path.join(self.tmp_dir, "source.mp4")
+        with open(path, "wb") as f:
+            f.write(b"x" * 200)
+
+        with patch.object(
+            self.storage, "_read_file", wraps=self.storage._read_file
+        ) as read_file:
+            file_id = self.storage.load_and_get_id(
+                path, mimetype="video/mp4", kind=MediaFileKind.MEDIA
+            )
+            self.assertEqual(
+                file_id,
+                self.storage.load_and_get_id(
+                    path, mimetype="video/mp4", kind=MediaFileKind.MEDIA
+                ),
+            )
+            read_file.assert_called_once()
+
+    def test_get_url(self):
+        file_id = self._load(b"x" * 200)
+        self.assertEqual(f"/mock/media/{file_id}.mp4", self.storage.get_url(file_id))
+
+    def test_creates_temporary_directory(self):
+        storage = DiskMediaFileStorage("/mock/media", memory_budget_bytes=0)
+        file_id = storage.load_and_get_id(
+            b"mock_bytes", mimetype="video/mp4", kind=MediaFileKind.MEDIA
+        )
+        self.assertTrue(os.path.isfile(storage.get_file(file_id).path))
@@ -0,0 +1,274 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from streamlit.runtime.disk_session_storage import DiskSessionStorage
+from streamlit.runtime.session_manager import (
+    SessionInfo,
+    SessionSnapshot,
+    SessionSnapshotStorage,
+    SessionStorageError,
+)
+
+
+def _create_session_info(session_id: str, value_size: int = 10) -> SessionInfo:
+    session = MagicMock()
+    session.id = session_id
+    session.get_snapshot.side_effect = lambda script_run_count: SessionSnapshot(
+        session_id=session_id,
+        script_run_count=script_run_count,
+        client_state=b"client_state",
+        user_state={"foo": b"x" * value_size},
+    )
+    return SessionInfo(client=None, session=session, script_run_count=2)
+
+
+class DiskSessionStorageTest(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.now = 0.0
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.tmp_dir)
+        super().tearDown()
+
+    def _create_storage(self, script_path="/app.py", **kwargs) -> DiskSessionStorage:
+        kwargs.setdefault("max_bytes", 10_000)
+        return DiskSessionStorage(
+            os.path.join(self.tmp_dir, "sessions.db"),
+            script_path=script_path,
+            clock=lambda: self.now,
+            **kwargs,
+        )
+
+    def test_is_session_snapshot_storage(self):
+        self.assertIsInstance(self._create_storage(), SessionSnapshotStorage)
+
+    def test_keeps_recent_sessions_in_memory(self):
+        store = self._create_storage()
+        session_info = _create_session_info("foo")
+        store.save(session_info)
+
+        self.assertIs(store.get("foo"), session_info)
+        self.assertEqual(store.list(), [session_info])
+        session_info.session.shutdown.assert_not_called()
+        self.assertIsNone(store.pop_snapshot("foo"))
+
+        store.delete("foo")
+        self.assertIsNone(store.get("foo"))
+
+    def test_spills_expired_sessions(self):
+        store = self._create_storage(ttl_seconds=10)
+        session_info = _create_session_info("foo")
+        store.save(session_info)
+
+        self.now = 10
+        self.assertIsNone(store.get("foo"))
+        self.assertEqual(store.list(), [])
+        session_info.session.shutdown.assert_called_once()
+
+        snapshot = store.pop_snapshot("foo")
+        self.assertEqual(
+            snapshot,
+            SessionSnapshot(
+                session_id="foo",
+                script_run_count=2,
+                client_state=b"client_state",
+                user_state={"foo": b"x" * 10},
+            ),
+        )
+        # Snapshots can only be restored once.
+        self.assertIsNone(store.pop_snapshot("foo"))
+
+    def test_spills_oldest_sessions_over_maxsize(self):
+        store = self._create_storage(maxsize=2)
+        session_infos = [_create_session_info(f"session_{i}") for i in range(3)]
+        for session_info in session_infos:
+            store.save(session_info)
+
+        self.assertEqual(store.list(), session_infos[1:])
+        self.assertIsNotNone(store.pop_snapshot("session_0"))
+
+    def test_snapshots_persist_across_instances(self):
+        store = self._create_storage(ttl_seconds=0)
+        store.save(_create_session_info("foo"))
+
+        self.assertIsNotNone(self._create_storage().pop_snapshot("foo"))
+
+    def test_only_returns_snapshots_of_same_script(self):
+        store = self._create_storage(ttl_seconds=0)
+        store.save(_create_session_info("foo"))
+
+        self.assertIsNone(
+            self._create_storage(script_path="/other_app.py").pop_snapshot("foo")
+        )
+        self.assertIsNotNone(store.pop_snapshot("foo"))
+
+    def test_removes_oldest_snapshots_over_max_bytes(self):
+        # Each snapshot takes a bit more than 1000 bytes.
+        store = self._create_storage(ttl_seconds=0, max_bytes=2500)
+        for i in range(3):
+            store.save(_create_session_info(f"session_{i}", value_size=1000))
+
+        self.assertIsNone(store.pop_snapshot("session_0"))
+        self.assertIsNotNone(store.pop_snapshot("session_1"))
+        self.assertIsNotNone(store.pop_snapshot("session_2"))
+
+    def test_does_not_save_snapshots_over_max_bytes(self):
+        store = self._create_storage(ttl_seconds=0, max_bytes=500)
+        session_info = _create_session_info("foo", value_size=1000)
+        store.save(session_info)
+
+        self.assertIsNone(store.pop_snapshot("foo"))
+        session_info.session.shutdown.assert_called_once()
+
+    def test_delete_removes_snapshot(self):
+        store = self._create_storage(ttl_seconds=0)
+        store.save(_create_session_info("foo"))
+
+        store.delete("foo")
+        self.assertIsNone(store.pop_snapshot("foo"))
+
+    def test_drops_snapshots_that_cannot_be_unpickled(self):
+        store = self._create_storage(ttl_seconds=0)
+        store.save(_create_session_info("foo"))
+        with store._transaction() as conn:
+            conn.execute(
+                "UPDATE snapshots SET user_state = ? WHERE session_id = ?",
+                (b"cmissing_module\nmissing_class\n.", "foo"),
+            )
+
+        self.assertIsNone(store.pop_snapshot("foo"))
+        with store._transaction() as conn:
+            self.assertEqual(
+                conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0], 0
+            )
+
+    def test_shuts_down_session_if_snapshot_fails(self):
+        store = self._create_storage(ttl_seconds=0)
+        session_info = _create_session_info("foo")
+        session_info.session.get_snapshot.side_effect = RuntimeError("oops")
+
+        store.save(session_info)
+
+        session_info.session.shutdown.assert_called_once()
+        self.assertIsNone(store.pop_snapshot("foo"))
+
+
+class DiskSessionStorageEventLoopTest(unittest.IsolatedAsyncioTestCase):
+    """Tests for a DiskSessionStorage used from an event loop, like the Runtime's."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.now = 0.0
+        self.store = DiskSessionStorage(
+            os.path.join(self.tmp_dir, "sessions.db"),
+            script_path="/app.py",
+            max_bytes=10_000,
+            ttl_seconds=10,
+            clock=lambda: self.now,
+        )
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.tmp_dir)
+        super().tearDown()
+
+    async def _wait_for_background_work(self) -> None:
+        # The storage's thread runs its work in order, so this is done last.
+        await asyncio.get_running_loop().run_in_executor(
+            self.store._get_executor(), lambda: None
+        )
+
+    async def _spill(self, session_info: SessionInfo) -> None:
+        self.store.save(session_info)
+        self.now += 10
+        self.store.list()
+
+    async def test_writes_snapshots_off_the_event_loop(self):
+        session_info = _create_session_info("foo")
+        snapshot_threads = []
+        get_snapshot = session_info.session.get_snapshot.side_effect
+
+        def record_thread(script_run_count):
+            snapshot_threads.append(threading.current_thread())
+            return get_snapshot(script_run_count)
+
+        session_info.session.get_snapshot.side_effect = record_thread
+
+        await self._spill(session_info)
+        # The session is still there until its snapshot is written.
+        self.assertIs(self.store.get("foo"), session_info)
+        session_info.session.shutdown.assert_not_called()
+
+        await self._wait_for_background_work()
+        self.assertIsNone(self.store.get("foo"))
+        session_info.session.shutdown.assert_called_once()
+        self.assertEqual(len(snapshot_threads), 1)
+        self.assertIsNot(snapshot_threads[0], threading.current_thread())
+
+    async def test_does_not_shut_down_session_reconnected_while_spilling(self):
+        session_info = _create_session_info("foo")
+
+        await self._spill(session_info)
+        self.store.delete("foo")
+        await self._wait_for_background_work()
+
+        session_info.session.shutdown.assert_not_called()
+        await self.store.load_snapshot("foo")
+        self.assertIsNone(self.store.pop_snapshot("foo"))
+
+    async def test_pop_snapshot_returns_loaded_snapshot(self):
+        await self._spill(_create_session_info("foo"))
+        await self._wait_for_background_work()
+
+        await self.store.load_snapshot("foo")
+        with patch.object(self.store, "_read_snapshot") as patched_read_snapshot:
+            snapshot = self.store.pop_snapshot("foo")
+        patched_read_snapshot.assert_not_called()
+        self.assertEqual(snapshot.session_id, "foo")
+
+        # The snapshot is deleted in the background.
+        await self._wait_for_background_work()
+        await self.store.load_snapshot("foo")
+        self.assertIsNone(self.store.pop_snapshot("foo"))
+
+    async def test_pop_snapshot_does_not_retry_failed_load(self):
+        with patch.object(
+            self.store, "_transaction", side_effect=SessionStorageError()
+        ):
+            with self.assertRaises(SessionStorageError):
+                await self.store.load_snapshot("foo")
+            self.assertIsNone(self.store.pop_snapshot("foo"))
+
+    async def test_drops_expired_loaded_snapshots(self):
+        await self._spill(_create_session_info("foo"))
+        await self._wait_for_background_work()
+
+        await self.store.load_snapshot("foo")
+        self.now += 10
+        self.store.list()
+
+        self.assertEqual(self.store._loaded_snapshots, {})
+        # The snapshot is still in the database.
+        await self.store.load_snapshot("foo")
+        self.assertIsNotNone(self.store.pop_snapshot("foo"))
@@ -18,13 +18,17 @@ import unittest
 from unittest.mock import MagicMock
 
 from streamlit import config
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
 from streamlit.runtime import app_session
 from streamlit.runtime.forward_msg_cache import (
+    FORWARD_MSG_CACHE_EVICTIONS_FAMILY,
+    FORWARD_MSG_CACHE_MAX_BYTES_FAMILY,
     ForwardMsgCache,
     create_reference_msg,
     populate_hash_if_needed,
+    serialize_with_hash,
 )
-from streamlit.runtime.stats import CacheStat
+from streamlit.runtime.stats import CacheStat, CounterStat, GaugeStat
 from streamlit.testing.v1.util import patch_config_options
 from tests.streamlit.message_mocks import create_dataframe_msg
 
@@ -51,6 +55,32 @@ class ForwardMsgCacheTest(unittest.TestCase):
         msg2 = create_dataframe_msg([1, 2, 3], 2)
         self.assertEqual(populate_hash_if_needed(msg1), populate_hash_if_needed(msg2))
 
+    @patch_config_options(
+        {
+            "global.forwardMsgHashAlgorithm": "blake2b",
+            "global.forwardMsgHashDigestSize": 20,
+        }
+    )
+    def test_blake2b_msg_hash(self):
+        """Test that the hash algorithm and digest size are configurable"""
+        msg1 = create_dataframe_msg([1, 2, 3], 1)
+        msg2 = create_dataframe_msg([1, 2, 3], 2)
+        msg_hash = populate_hash_if_needed(msg1)
+
+        self.assertEqual(40, len(msg_hash))
+        self.assertEqual(msg_hash, populate_hash_if_needed(msg2))
+
+    def test_serialize_with_hash(self):
+        """Test that serialize_with_hash produces the same message as hashing
+        and serializing separately."""
+        msg = create_dataframe_msg([1, 2, 3], 7)
+        serialized = serialize_with_hash(msg)
+
+        deserialized = ForwardMsg()
+        deserialized.ParseFromString(serialized)
+        self.assertNotEqual("", msg.hash)
+        self.assertEqual(msg, deserialized)
+
     def test_reference_msg(self):
         """Test creation of 'reference' ForwardMsgs"""
         msg = create_dataframe_msg([1, 2, 3], 34)
@@ -79,6 +109,33 @@ class ForwardMsgCacheTest(unittest.TestCase):
         cache.add_message(msg, session, 0)
         self.assertEqual(msg, cache.get_message(msg_hash))
 
+    def test_get_serialized_message(self):
+        """Test that sessions share the cached payload bytes, but each get
+        their own metadata."""
+        cache = ForwardMsgCache()
+        msg1 = create_dataframe_msg([1, 2, 3], 1)
+        msg2 = create_dataframe_msg([1, 2, 3], 2)
+        cache.add_message(msg1, _create_mock_session(), 0)
+        cache.add_message(msg2, _create_mock_session(), 0)
+
+        self.assertEqual(1, len(cache._entries))
+        for msg in (msg1, msg2):
+            deserialized = ForwardMsg()
+            deserialized.ParseFromString(cache.get_serialized_message(msg))
+            self.assertEqual(msg, deserialized)
+
+        uncached_msg = create_dataframe_msg([4, 5, 6])
+        populate_hash_if_needed(uncached_msg)
+        self.assertIsNone(cache.get_serialized_message(uncached_msg))
+
+    @patch_config_options({"global.storeCachedForwardMessagesInMemory": False})
+    def test_get_serialized_message_not_stored_in_memory(self):
+        """Test that nothing is returned if messages aren't kept in memory."""
+        cache = ForwardMsgCache()
+        msg = create_dataframe_msg([1, 2, 3])
+        cache.add_message(msg, _create_mock_session(), 0)
+        self.assertIsNone(cache.get_serialized_message(msg))
+
     def test_clear(self):
         """Test MessageCache.clear"""
         cache = ForwardMsgCache()
@@ -169,6 +226,71 @@ class ForwardMsgCacheTest(unittest.TestCase):
         cache.remove_expired_entries_for_session(session2, runcount2)
         self.assertIsNone(cache.get_message(msg_hash))
 
+    def test_session_index(self):
+        """Test that the per-session index tracks each session's references
+        by run count, and that expiry only removes the expired ones."""
+        cache = ForwardMsgCache()
+        session = _create_mock_session()
+        other_session = _create_mock_session()
+
+        msg1 = create_dataframe_msg([1, 2, 3])
+        msg2 = create_dataframe_msg([1, 2, 3, 4])
+        cache.add_message(msg1, session, 0)
+        cache.add_message(msg2, session, 1)
+        cache.add_message(msg2, other_session, 0)
+        self.assertEqual(
+            {0: {msg1.hash}, 1: {msg2.hash}}, cache._session_index[session]
+        )
+
+        # Referencing a message again moves it to the new run count's bucket.
+        cache.add_message(msg1, session, 1)
+        self.assertEqual({1: {msg1.hash, msg2.hash}}, cache._session_index[session])
+
+        max_age = config.get_option("global.maxCachedMessageAge")
+        cache.remove_expired_entries_for_session(session, max_age + 2)
+        self.assertEqual({}, cache._session_index[session])
+        self.assertIsNone(cache.get_message(msg1.hash))
+        self.assertIsNotNone(cache.get_message(msg2.hash))
+
+        cache.remove_refs_for_session(other_session)
+        self.assertNotIn(other_session, cache._session_index)
+        self.assertEqual({}, cache._entries)
+
+    def test_byte_budget_evicts_least_recently_used(self):
+        """Test that entries are evicted in LRU order once the cache exceeds
+        global.maxCachedMessageBytes."""
+        cache = ForwardMsgCache()
+        session = _create_mock_session()
+        msgs = [create_dataframe_msg(list(range(i, i + 10))) for i in range(3)]
+        for msg in msgs:
+            populate_hash_if_needed(msg)
+        msg_size = msgs[0].ByteSize()
+
+        with patch_config_options(
+            {"global.maxCachedMessageBytes": int(2.5 * msg_size)}
+        ):
+            cache.add_message(msgs[0], session, 0)
+            cache.add_message(msgs[1], session, 0)
+            # Touch msgs[0], so that msgs[1] is the least recently used entry.
+            cache.add_message(msgs[0], session, 0)
+            cache.add_message(msgs[2], session, 0)
+
+            self.assertTrue(cache.has_message_reference(msgs[0], session, 0))
+            self.assertFalse(cache.has_message_reference(msgs[1], session, 0))
+            self.assertTrue(cache.has_message_reference(msgs[2], session, 0))
+            self.assertEqual(
+                {0: {msgs[0].hash, msgs[2].hash}}, cache._session_index[session]
+            )
+
+            self.assertIn(
+                CounterStat(FORWARD_MSG_CACHE_EVICTIONS_FAMILY, (), 1),
+                cache.get_stats(),
+            )
+            self.assertIn(
+                GaugeStat(FORWARD_MSG_CACHE_MAX_BYTES_FAMILY, (), int(2.5 * msg_size)),
+                cache.get_stats(),
+            )
+
     @patch_config_options({"global.storeCachedForwardMessagesInMemory": False})
     def test_store_in_memory_config_option(self):
         """Test MessageCache's storeCachedForwardMessagesInMemory config option logic"""
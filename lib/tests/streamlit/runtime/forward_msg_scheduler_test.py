@@ -0,0 +1,205 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""ForwardMsgScheduler unit tests"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import List, Tuple
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import MagicMock
+
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
+from streamlit.runtime.forward_msg_scheduler import (
+    FORWARD_MSG_PENDING_BYTES_FAMILY,
+    FORWARD_MSG_QUEUE_DEPTH_FAMILY,
+    SESSION_PENDING_BYTES_FAMILY,
+    SESSION_QUEUE_DEPTH_FAMILY,
+    ForwardMsgScheduler,
+)
+from streamlit.runtime.session_manager import ActiveSessionInfo
+from streamlit.runtime.stats import GaugeStat
+from tests.testutil import patch_config_options
+
+
+def _create_msg(index: int, size: int) -> ForwardMsg:
+    msg = ForwardMsg()
+    msg.metadata.delta_path[:] = [0, index]
+    msg.delta.new_element.markdown.body = "x" * size
+    return msg
+
+
+def _create_session_info(session_id: str) -> ActiveSessionInfo:
+    session = MagicMock()
+    session.id = session_id
+    queue = ForwardMsgQueue()
+    session.queue = queue
+    session.flush_browser_queue = queue.flush
+    return ActiveSessionInfo(client=MagicMock(), session=session)
+
+
+class ForwardMsgSchedulerTest(IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.sent: List[Tuple[str, List[ForwardMsg]]] = []
+        self.write_result = None
+        self.on_write_complete = MagicMock()
+        self.scheduler = ForwardMsgScheduler(
+            send_messages=self._send_messages,
+            on_write_complete=self.on_write_complete,
+        )
+
+    def _send_messages(self, session_info, msgs):
+        self.sent.append((session_info.session.id, msgs))
+        return self.write_result
+
+    async def test_sends_everything_without_quantum(self):
+        """With no quantum, each session's whole queue is sent in one go."""
+        session_info = _create_session_info("s1")
+        for i in range(3):
+            session_info.session.queue.enqueue(_create_msg(i, 2_000_000))
+
+        with patch_config_options({"server.sessionSendQuantum": 0}):
+            max_queue_depth = await self.scheduler.send_pass([session_info])
+
+        self.assertEqual(3, max_queue_depth)
+        self.assertEqual(1, len(self.sent))
+        self.assertEqual(3, len(self.sent[0][1]))
+        self.assertFalse(self.scheduler.has_ready_messages())
+
+    async def test_large_session_does_not_block_others(self):
+        """A session with lots of pending data is served over several passes,
+        while other sessions get their messages delivered on the first pass."""
+        big = _create_session_info("big")
+        for i in range(3):
+            big.session.queue.enqueue(_create_msg(i, 2_500_000))
+        small = _create_session_info("small")
+        small.session.queue.enqueue(_create_msg(0, 10))
+
+        with patch_config_options({"server.sessionSendQuantum": 1}):
+            await self.scheduler.send_pass([big, small])
+
+            self.assertEqual(["big", "small"], [s_id for s_id, _ in self.sent])
+            self.assertEqual(1, len(self.sent[0][1]))
+            self.assertEqual(1, len(self.sent[1][1]))
+            self.assertTrue(self.scheduler.has_ready_messages())
+
+            # The big session is now in overdraft, and has to sit out a pass.
+            self.sent.clear()
+            await self.scheduler.send_pass([big, small])
+            self.assertEqual([], self.sent)
+
+            await self.scheduler.send_pass([big, small])
+            self.assertEqual(["big"], [s_id for s_id, _ in self.sent])
+            self.assertEqual(1, len(self.sent[0][1]))
+
+    async def test_waits_for_inflight_write(self):
+        """No messages are sent to a client while its previous write is
+        still in flight."""
+        session_info = _create_session_info("s1")
+        write = asyncio.get_running_loop().create_future()
+        self.write_result = write
+
+        session_info.session.queue.enqueue(_create_msg(0, 10))
+        await self.scheduler.send_pass([session_info])
+        self.assertEqual(1, len(self.sent))
+
+        session_info.session.queue.enqueue(_create_msg(1, 10))
+        await self.scheduler.send_pass([session_info])
+        self.assertEqual(1, len(self.sent))
+        self.assertFalse(self.scheduler.has_ready_messages())
+
+        write.set_result(None)
+        await asyncio.sleep(0)
+        self.on_write_complete.assert_called_once()
+        self.assertTrue(self.scheduler.has_ready_messages())
+
+        await self.scheduler.send_pass([session_info])
+        self.assertEqual(2, len(self.sent))
+
+    async def test_drops_inactive_sessions(self):
+        """Pending messages for sessions that are no longer active are dropped."""
+        session_info = _create_session_info("s1")
+        write = asyncio.get_running_loop().create_future()
+        self.write_result = write
+
+        session_info.session.queue.enqueue(_create_msg(0, 10))
+        await self.scheduler.send_pass([session_info])
+        session_info.session.queue.enqueue(_create_msg(1, 10))
+        await self.scheduler.send_pass([session_info])
+        self.assertEqual(4, len(self.scheduler.get_stats()))
+
+        await self.scheduler.send_pass([])
+        self.assertEqual(
+            [
+                GaugeStat(FORWARD_MSG_QUEUE_DEPTH_FAMILY, (), 0),
+                GaugeStat(FORWARD_MSG_PENDING_BYTES_FAMILY, (), 0),
+            ],
+            self.scheduler.get_stats(),
+        )
+        write.cancel()
+
+    async def test_get_stats(self):
+        """Queue depth and pending bytes are reported in total and for each
+        session with pending messages."""
+        session_info = _create_session_info("s1")
+        self.write_result = asyncio.get_running_loop().create_future()
+
+        session_info.session.queue.enqueue(_create_msg(0, 10))
+        await self.scheduler.send_pass([session_info])
+
+        msgs = [_create_msg(1, 10), _create_msg(2, 20)]
+        for msg in msgs:
+            session_info.session.queue.enqueue(msg)
+        await self.scheduler.send_pass([session_info])
+
+        pending_bytes = sum(msg.ByteSize() for msg in msgs)
+        labels = (("session_id", "s1"),)
+        self.assertEqual(
+            [
+                GaugeStat(FORWARD_MSG_QUEUE_DEPTH_FAMILY, (), 2),
+                GaugeStat(FORWARD_MSG_PENDING_BYTES_FAMILY, (), pending_bytes),
+                GaugeStat(SESSION_QUEUE_DEPTH_FAMILY, labels, 2),
+                GaugeStat(SESSION_PENDING_BYTES_FAMILY, labels, pending_bytes),
+            ],
+            self.scheduler.get_stats(),
+        )
+        self.write_result.cancel()
+
+    async def test_get_stats_reports_sessions_with_most_pending_bytes(self):
+        """Only the sessions with the most pending bytes are reported
+        individually, while the totals cover all sessions."""
+        self.write_result = asyncio.get_running_loop().create_future()
+        session_infos = [_create_session_info(f"s{i}") for i in range(15)]
+        for i, session_info in enumerate(session_infos):
+            session_info.session.queue.enqueue(_create_msg(0, 10))
+            session_info.session.queue.enqueue(_create_msg(1, 100 * (i + 1)))
+        # Only send every session's first message.
+        with patch_config_options({"server.sessionSendQuantum": 0.00001}):
+            await self.scheduler.send_pass(session_infos)
+
+        stats = self.scheduler.get_stats()
+        self.assertEqual(GaugeStat(FORWARD_MSG_QUEUE_DEPTH_FAMILY, (), 15), stats[0])
+        self.assertEqual(FORWARD_MSG_PENDING_BYTES_FAMILY, stats[1].family)
+        self.assertEqual(
+            [f"s{i}" for i in range(14, 4, -1)],
+            [
+                stat.labels[0][1]
+                for stat in stats
+                if stat.family == SESSION_PENDING_BYTES_FAMILY
+            ],
+        )
+        self.write_result.cancel()
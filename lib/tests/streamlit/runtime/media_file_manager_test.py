@@ -93,6 +93,12 @@ ALL_FIXTURES.update(IMAGE_FIXTURES)
 ALL_FIXTURES.update(TEXT_FIXTURES)
 
 
+def wait_for_sweep(media_file_manager: MediaFileManager) -> None:
+    """Wait for the orphaned files to be deleted in the background."""
+    if media_file_manager._sweep_future is not None:
+        media_file_manager._sweep_future.result()
+
+
 class MediaFileManagerTest(TestCase):
     def setUp(self):
         super().setUp()
@@ -232,6 +238,7 @@ class MediaFileManagerTest(TestCase):
 
         self.media_file_manager.clear_session_refs()
         self.media_file_manager.remove_orphaned_files()
+        wait_for_sweep(self.media_file_manager)
 
         # There should be only 0 file in MFM.
         self.assertEqual(len(self.media_file_manager._file_metadata), 0)
@@ -363,6 +370,7 @@ class MediaFileManagerTest(TestCase):
 
         # After a final call to remove_orphaned_files, the files should be gone.
         self.media_file_manager.remove_orphaned_files()
+        wait_for_sweep(self.media_file_manager)
         self.assertEqual(len(self.media_file_manager._file_metadata), 0)
 
         # MediaFileStorage.delete_file should have been called once for each
@@ -371,6 +379,110 @@ class MediaFileManagerTest(TestCase):
             [call(file_id) for file_id in file_ids], any_order=True
         )
 
+    @mock.patch(
+        "streamlit.runtime.media_file_manager._get_session_id",
+        MagicMock(return_value="mock_session_id"),
+    )
+    def test_files_used_again_by_next_run_are_not_deleted(self):
+        """Files that a session uses again after clearing its references are
+        kept, and the ones it doesn't use again are deleted.
+        """
+        coord = random_coordinates()
+        self.media_file_manager.add(b"kept", "image/png", coord)
+        self.media_file_manager.add(b"replaced", "image/png", random_coordinates())
+
+        # The next run only displays the first file.
+        self.media_file_manager.clear_session_refs()
+        self.media_file_manager.add(b"kept", "image/png", coord)
+        self.media_file_manager.remove_orphaned_files()
+        wait_for_sweep(self.media_file_manager)
+
+        self.assertEqual(
+            [_calculate_file_id(b"kept", "image/png")],
+            list(self.media_file_manager._file_metadata),
+        )
+        self.assertEqual(
+            1,
+            self.media_file_manager._file_metadata[
+                _calculate_file_id(b"kept", "image/png")
+            ].ref_count,
+        )
+
+    @mock.patch("streamlit.runtime.media_file_manager._get_session_id")
+    def test_runs_of_other_sessions_do_not_release_references(
+        self, mock_get_session_id
+    ):
+        """A session's dropped references are only released when its own run
+        finishes, even if another session's run finishes in between.
+        """
+        coord = random_coordinates()
+        mock_get_session_id.return_value = "session_a"
+        self.media_file_manager.add(b"mock_data", "image/png", coord)
+
+        # Session A starts a new run, and session B's run finishes meanwhile.
+        self.media_file_manager.clear_session_refs()
+        mock_get_session_id.return_value = "session_b"
+        self.media_file_manager.clear_session_refs()
+        self.media_file_manager.remove_orphaned_files()
+        wait_for_sweep(self.media_file_manager)
+
+        # Session A displays the file again.
+        mock_get_session_id.return_value = "session_a"
+        self.media_file_manager.add(b"mock_data", "image/png", coord)
+        self.media_file_manager.remove_orphaned_files()
+        wait_for_sweep(self.media_file_manager)
+
+        file_id = _calculate_file_id(b"mock_data", "image/png")
+        self.assertEqual(1, self.media_file_manager._file_metadata[file_id].ref_count)
+
+        # Once session A ends, the file is deleted.
+        self.media_file_manager.clear_session_refs("session_a")
+        self.media_file_manager.remove_orphaned_files("session_a")
+        wait_for_sweep(self.media_file_manager)
+        self.assertEqual({}, self.media_file_manager._file_metadata)
+
+    @mock.patch(
+        "streamlit.runtime.media_file_manager._get_session_id",
+        MagicMock(return_value="mock_session_id"),
+    )
+    def test_downloadable_files_are_deleted_one_run_later(self):
+        self.media_file_manager.add(
+            b"mock_data",
+            "text/plain",
+            random_coordinates(),
+            is_for_static_download=True,
+        )
+        self.media_file_manager.clear_session_refs()
+
+        self.media_file_manager.remove_orphaned_files()
+        wait_for_sweep(self.media_file_manager)
+        self.assertEqual(1, len(self.media_file_manager._file_metadata))
+
+        self.media_file_manager.remove_orphaned_files()
+        wait_for_sweep(self.media_file_manager)
+        self.assertEqual(0, len(self.media_file_manager._file_metadata))
+
+    @mock.patch(
+        "streamlit.runtime.media_file_manager._get_session_id",
+        MagicMock(return_value="mock_session_id"),
+    )
+    @mock.patch("streamlit.runtime.media_file_manager._sweep_executor")
+    def test_sweep_skips_files_used_again(self, sweep_executor):
+        """Files that are used again after they are queued for deletion aren't
+        deleted.
+        """
+        coord = random_coordinates()
+        self.media_file_manager.add(b"mock_data", "image/png", coord)
+        self.media_file_manager.clear_session_refs()
+        self.media_file_manager.remove_orphaned_files()
+        sweep_executor.submit.assert_called_once_with(self.media_file_manager._sweep)
+
+        self.media_file_manager.add(b"mock_data", "image/png", coord)
+        self.media_file_manager._sweep()
+
+        self.assertEqual(1, len(self.media_file_manager._file_metadata))
+        self.assertFalse(self.media_file_manager._is_sweep_scheduled)
+
 
 class MediaFileManagerThreadingTest(unittest.TestCase):
     # The number of threads to run our tests on
@@ -418,6 +530,7 @@ class MediaFileManagerThreadingTest(unittest.TestCase):
             self.media_file_manager.remove_orphaned_files()
 
         call_on_threads(remove_files, num_threads=self.NUM_THREADS)
+        wait_for_sweep(self.media_file_manager)
 
         # Our files should be gone!
         self.assertEqual(0, len(self.media_file_manager._file_metadata))
@@ -14,6 +14,8 @@
 
 """Unit tests for MemoryMediaFileStorage"""
 
+import os
+import tempfile
 import unittest
 from unittest import mock
 from unittest.mock import MagicMock, mock_open
@@ -22,10 +24,15 @@ from parameterized import parameterized
 
 from streamlit.runtime.media_file_storage import MediaFileKind, MediaFileStorageError
 from streamlit.runtime.memory_media_file_storage import (
+    MEDIA_FILE_SOURCE_HITS_FAMILY,
+    MEDIA_FILE_SOURCE_MISSES_FAMILY,
     MemoryFile,
     MemoryMediaFileStorage,
+    _calculate_file_id,
+    _get_sampled_digest,
     get_extension_for_mimetype,
 )
+from streamlit.runtime.stats import CounterStat
 
 
 class MemoryMediaFileStorageTest(unittest.TestCase):
@@ -208,6 +215,123 @@ class MemoryMediaFileStorageTest(unittest.TestCase):
 
         self.assertEqual(0, len(self.storage.get_stats()))
 
+    def test_does_not_rehash_same_bytes(self):
+        """Loading the same or equal bytes again doesn't hash them again."""
+        data = b"mock_bytes"
+        with mock.patch(
+            "streamlit.runtime.memory_media_file_storage._calculate_file_id",
+            wraps=_calculate_file_id,
+        ) as calculate_file_id:
+            file_id = self.storage.load_and_get_id(
+                data, mimetype="video/mp4", kind=MediaFileKind.MEDIA
+            )
+            self.assertEqual(
+                file_id,
+                self.storage.load_and_get_id(
+                    data, mimetype="video/mp4", kind=MediaFileKind.MEDIA
+                ),
+            )
+            self.assertEqual(1, calculate_file_id.call_count)
+
+            self.assertEqual(
+                file_id,
+                self.storage.load_and_get_id(
+                    bytes(bytearray(data)),
+                    mimetype="video/mp4",
+                    kind=MediaFileKind.MEDIA,
+                ),
+            )
+            self.assertEqual(1, calculate_file_id.call_count)
+
+            # Other mimetypes get other IDs.
+            self.assertNotEqual(
+                file_id,
+                self.storage.load_and_get_id(
+                    data, mimetype="audio/wav", kind=MediaFileKind.MEDIA
+                ),
+            )
+
+    def test_rehashes_bytes_changed_between_samples(self):
+        """Bytes whose sampled digest matches stored bytes are still compared
+        to them.
+        """
+        data = bytes(10 * 1024 * 1024)
+        # A byte in the middle of two samples.
+        changed = bytearray(data)
+        changed[len(data) // 128] = 1
+
+        self.assertEqual(
+            _get_sampled_digest(data),
+            _get_sampled_digest(bytes(changed)),
+        )
+        self.assertNotEqual(
+            self.storage.load_and_get_id(
+                data, mimetype="video/mp4", kind=MediaFileKind.MEDIA
+            ),
+            self.storage.load_and_get_id(
+                bytes(changed), mimetype="video/mp4", kind=MediaFileKind.MEDIA
+            ),
+        )
+
+    def test_does_not_reread_unchanged_file(self):
+        """Loading an unchanged file again doesn't read it again, but a
+        modified file is read.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "file.mp4")
+            with open(path, "wb") as f:
+                f.write(b"mock_bytes")
+
+            with mock.patch.object(
+                self.storage, "_read_file", wraps=self.storage._read_file
+            ) as read_file:
+                file_id = self.storage.load_and_get_id(
+                    path, mimetype="video/mp4", kind=MediaFileKind.MEDIA
+                )
+                self.assertEqual(
+                    file_id,
+                    self.storage.load_and_get_id(
+                        path, mimetype="video/mp4", kind=MediaFileKind.MEDIA
+                    ),
+                )
+                self.assertEqual(1, read_file.call_count)
+
+                with open(path, "wb") as f:
+                    f.write(b"other_mock_bytes")
+                new_file_id = self.storage.load_and_get_id(
+                    path, mimetype="video/mp4", kind=MediaFileKind.MEDIA
+                )
+                self.assertNotEqual(file_id, new_file_id)
+                self.assertEqual(
+                    b"other_mock_bytes", self.storage.get_file(new_file_id).content
+                )
+                self.assertEqual(2, read_file.call_count)
+
+                # Deleted files are loaded again.
+                self.storage.delete_file(new_file_id)
+                self.assertEqual(
+                    new_file_id,
+                    self.storage.load_and_get_id(
+                        path, mimetype="video/mp4", kind=MediaFileKind.MEDIA
+                    ),
+                )
+                self.assertEqual(3, read_file.call_count)
+
+    def test_source_index_stats(self):
+        data = b"mock_bytes"
+        for _ in range(3):
+            self.storage.load_and_get_id(
+                data, mimetype="video/mp4", kind=MediaFileKind.MEDIA
+            )
+
+        self.assertEqual(
+            [
+                CounterStat(MEDIA_FILE_SOURCE_HITS_FAMILY, (), 2),
+                CounterStat(MEDIA_FILE_SOURCE_MISSES_FAMILY, (), 1),
+            ],
+            self.storage.source_index.get_stats(),
+        )
+
 
 class MemoryMediaFileStorageUtilTest(unittest.TestCase):
     """Unit tests for utility functions in memory_media_file_storage.py"""
@@ -38,7 +38,12 @@ from streamlit.runtime.forward_msg_cache import populate_hash_if_needed
 from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
 from streamlit.runtime.memory_session_storage import MemorySessionStorage
 from streamlit.runtime.memory_uploaded_file_manager import MemoryUploadedFileManager
-from streamlit.runtime.runtime import AsyncObjects, RuntimeStoppedError
+from streamlit.runtime.runtime import (
+    _MAX_BATCH_FLUSH_INTERVAL_SECS,
+    AsyncObjects,
+    RuntimeStoppedError,
+    _get_batch_flush_interval,
+)
 from streamlit.runtime.websocket_session_manager import WebsocketSessionManager
 from streamlit.watcher import event_based_path_watcher
 from tests.streamlit.message_mocks import (
@@ -123,6 +128,25 @@ class RuntimeTest(RuntimeTestCase):
         await self.runtime.stopped
         self.assertEqual(RuntimeState.STOPPED, self.runtime.state)
 
+    async def test_precompile_pages(self):
+        """_precompile_pages compiles every page, and ignores errors."""
+        pages = {
+            "hash1": {"script_path": "/mock/main.py"},
+            "hash2": {"script_path": "/mock/pages/page.py"},
+        }
+        with patch(
+            "streamlit.runtime.runtime.source_util.get_pages", return_value=pages
+        ), patch.object(
+            self.runtime._script_cache,
+            "get_bytecode",
+            side_effect=[SyntaxError(), MagicMock()],
+        ) as get_bytecode:
+            self.runtime._precompile_pages()
+
+        get_bytecode.assert_has_calls(
+            [call("/mock/main.py"), call("/mock/pages/page.py")]
+        )
+
     async def test_connect_session(self):
         """We can create and remove a single session."""
         await self.runtime.start()
@@ -543,6 +567,44 @@ class RuntimeTest(RuntimeTestCase):
             # And the same *metadata* as msg2:
             self.assertEqual(msg2.metadata, cached.metadata)
 
+    async def test_unchanged_deltas_sent_as_refs(self):
+        """Deltas that are identical to the previous script run's are cached
+        even if they are small, and sent as references from then on."""
+        with patch_config_options({"global.minCachedMessageSize": 10**9}):
+            await self.runtime.start()
+
+            client = MockSessionClient()
+            session_id = self.runtime.connect_session(
+                client=client, user_info=MagicMock()
+            )
+
+            async def run_script(data) -> ForwardMsg:
+                self.enqueue_forward_msg(session_id, create_dataframe_msg(data))
+                self.enqueue_forward_msg(
+                    session_id,
+                    create_script_finished_message(ForwardMsg.FINISHED_SUCCESSFULLY),
+                )
+                await self.tick_runtime_loop()
+                return client.forward_msgs[-2]
+
+            received = await run_script([1, 2, 3])
+            self.assertEqual("delta", received.WhichOneof("type"))
+            self.assertFalse(received.metadata.cacheable)
+
+            # Unchanged: cached so that the client keeps it.
+            received = await run_script([1, 2, 3])
+            self.assertEqual("delta", received.WhichOneof("type"))
+            self.assertTrue(received.metadata.cacheable)
+
+            # Unchanged again: the client already has it.
+            received = await run_script([1, 2, 3])
+            self.assertEqual("ref_hash", received.WhichOneof("type"))
+
+            # Changed: sent in full.
+            received = await run_script([4, 5, 6])
+            self.assertEqual("delta", received.WhichOneof("type"))
+            self.assertFalse(received.metadata.cacheable)
+
     async def test_forwardmsg_cache_clearing(self):
         """Test that the ForwardMsgCache gets properly cleared when scripts
         finish running.
@@ -606,6 +668,65 @@ class RuntimeTest(RuntimeTestCase):
             await finish_script(True)
             self.assertFalse(is_data_msg_cached())
 
+    async def test_batched_forwardmsg_delivery(self):
+        """With server.batchForwardMessages, all of a session's queued messages
+        are delivered to its client in a single ForwardMsgList."""
+        with patch_config_options({"server.batchForwardMessages": True}):
+            await self.runtime.start()
+
+            client = MockSessionClient()
+            session_id = self.runtime.connect_session(
+                client=client, user_info=MagicMock()
+            )
+
+            msgs = [create_dataframe_msg([i], i) for i in range(3)]
+            for msg in msgs:
+                self.enqueue_forward_msg(session_id, msg)
+            await self.tick_runtime_loop()
+
+            self.assertEqual(1, len(client.forward_msgs))
+            batch = client.forward_msgs.pop()
+            self.assertEqual("forward_msg_list", batch.WhichOneof("type"))
+
+            received = []
+            for msg_bytes in batch.forward_msg_list.messages:
+                received_msg = ForwardMsg()
+                received_msg.ParseFromString(msg_bytes)
+                received.append(received_msg)
+            self.assertEqual(msgs, received)
+
+    async def test_batched_forwardmsg_caching(self):
+        """Batched messages go through the ForwardMsgCache like regular ones."""
+        with patch_config_options(
+            {"server.batchForwardMessages": True, "global.minCachedMessageSize": 0}
+        ):
+            await self.runtime.start()
+
+            client = MockSessionClient()
+            session_id = self.runtime.connect_session(
+                client=client, user_info=MagicMock()
+            )
+
+            self.enqueue_forward_msg(session_id, create_dataframe_msg([1, 2, 3], 1))
+            self.enqueue_forward_msg(session_id, create_dataframe_msg([1, 2, 3], 2))
+            await self.tick_runtime_loop()
+
+            batch = client.forward_msgs.pop()
+            types = []
+            for msg_bytes in batch.forward_msg_list.messages:
+                received_msg = ForwardMsg()
+                received_msg.ParseFromString(msg_bytes)
+                types.append(received_msg.WhichOneof("type"))
+            self.assertEqual(["delta", "ref_hash"], types)
+
+    def test_get_batch_flush_interval(self):
+        """The wait between batched flushes grows with the queue depth."""
+        self.assertEqual(0, _get_batch_flush_interval(0))
+        self.assertLess(_get_batch_flush_interval(1), _get_batch_flush_interval(50))
+        self.assertEqual(
+            _MAX_BATCH_FLUSH_INTERVAL_SECS, _get_batch_flush_interval(10_000)
+        )
+
     async def test_get_async_objs(self):
         """Runtime._get_async_objs() will raise an error if called before the
         Runtime is started, and will return the Runtime's AsyncObjects instance otherwise.
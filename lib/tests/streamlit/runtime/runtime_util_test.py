@@ -15,10 +15,15 @@
 """Unit tests for runtime_util.py."""
 
 import unittest
+from unittest.mock import MagicMock
 
 from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
 from streamlit.runtime import runtime_util
-from streamlit.runtime.runtime_util import is_cacheable_msg, serialize_forward_msg
+from streamlit.runtime.runtime_util import (
+    create_forward_msg_batches,
+    is_cacheable_msg,
+    serialize_forward_msg,
+)
 from tests.streamlit.message_mocks import create_dataframe_msg
 from tests.testutil import patch_config_options
 
@@ -55,3 +60,51 @@ class RuntimeUtilTest(unittest.TestCase):
                 "exceeds the message size limit"
                 in deserialized_msg.delta.new_element.exception.message
             )
+
+    def test_serialize_forward_msg_uses_message_cache(self):
+        """Serialized bytes held by the message cache are reused."""
+        msg = create_dataframe_msg([1, 2, 3])
+        message_cache = MagicMock()
+        message_cache.get_serialized_message.return_value = b"cached"
+        self.assertEqual(b"cached", serialize_forward_msg(msg, message_cache))
+
+        message_cache.get_serialized_message.return_value = None
+        deserialized_msg = ForwardMsg()
+        deserialized_msg.ParseFromString(serialize_forward_msg(msg, message_cache))
+        self.assertEqual(msg, deserialized_msg)
+
+    def test_create_forward_msg_batches(self):
+        """All messages fit into a single envelope, in order."""
+        msgs = [create_dataframe_msg([i]) for i in range(5)]
+
+        batches = create_forward_msg_batches(msgs)
+
+        self.assertEqual(1, len(batches))
+        self.assertEqual("forward_msg_list", batches[0].WhichOneof("type"))
+        self.assertEqual(
+            msgs,
+            [
+                ForwardMsg.FromString(msg_bytes)
+                for msg_bytes in batches[0].forward_msg_list.messages
+            ],
+        )
+
+    def test_create_forward_msg_batches_splits_on_size_limit(self):
+        """A new envelope is started when the max message size would be exceeded."""
+        runtime_util._max_message_size_bytes = None  # Reset cached value
+        with patch_config_options({"server.maxMessageSize": 1}):
+            msgs = [create_dataframe_msg([1, 2, 3]) for _ in range(3)]
+            for msg in msgs:
+                msg.delta.new_element.markdown.body = "X" * 400 * 1000
+
+            batches = create_forward_msg_batches(msgs)
+
+            self.assertEqual(
+                [2, 1], [len(b.forward_msg_list.messages) for b in batches]
+            )
+            for batch in batches:
+                self.assertLessEqual(len(serialize_forward_msg(batch)), 1000 * 1000)
+        runtime_util._max_message_size_bytes = None
+
+    def test_create_forward_msg_batches_empty(self):
+        self.assertEqual([], create_forward_msg_batches([]))
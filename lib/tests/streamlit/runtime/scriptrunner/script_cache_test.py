@@ -13,12 +13,16 @@
 # limitations under the License.
 
 import os.path
+import shutil
+import tempfile
 import unittest
 from unittest import mock
 from unittest.mock import Mock
 
 from streamlit import source_util
+from streamlit.runtime.scriptrunner import magic
 from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from tests.testutil import patch_config_options
 
 
 def _get_script_path(name: str) -> str:
@@ -70,3 +74,118 @@ class ScriptCacheTest(unittest.TestCase):
         cache = ScriptCache()
         with self.assertRaises(SyntaxError):
             cache.get_bytecode(_get_script_path("compile_error.py.txt"))
+
+
+@mock.patch("sys.dont_write_bytecode", False)
+class PersistentScriptCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.persist_dir = tempfile.mkdtemp()
+        self.script_dir = tempfile.mkdtemp()
+        self.script_path = os.path.join(self.script_dir, "script.py")
+        self._write_script("x = 1\nx\n")
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.persist_dir)
+        shutil.rmtree(self.script_dir)
+        super().tearDown()
+
+    def _write_script(self, source: str) -> None:
+        with open(self.script_path, "w") as f:
+            f.write(source)
+
+    def _get_bytecode_with_compile_count(self, cache: ScriptCache):
+        """Return the script's bytecode, and how often the script was compiled."""
+        with mock.patch(
+            "streamlit.runtime.scriptrunner.script_cache.magic.add_magic",
+            side_effect=magic.add_magic,
+        ) as add_magic:
+            bytecode = cache.get_bytecode(self.script_path)
+        return bytecode, add_magic.call_count
+
+    def test_reuses_persisted_bytecode(self):
+        """A new cache reads the bytecode that another cache compiled."""
+        bytecode, compile_count = self._get_bytecode_with_compile_count(
+            ScriptCache(self.persist_dir)
+        )
+        self.assertEqual(compile_count, 1)
+        self.assertEqual(len(os.listdir(self.persist_dir)), 1)
+
+        new_bytecode, compile_count = self._get_bytecode_with_compile_count(
+            ScriptCache(self.persist_dir)
+        )
+        self.assertEqual(compile_count, 0)
+        self.assertEqual(new_bytecode, bytecode)
+
+    def test_reuses_persisted_bytecode_after_clear(self):
+        cache = ScriptCache(self.persist_dir)
+        self._get_bytecode_with_compile_count(cache)
+        cache.clear()
+
+        _, compile_count = self._get_bytecode_with_compile_count(cache)
+        self.assertEqual(compile_count, 0)
+
+    def test_recompiles_changed_script(self):
+        self._get_bytecode_with_compile_count(ScriptCache(self.persist_dir))
+        self._write_script("x = 2\nx\n")
+
+        bytecode, compile_count = self._get_bytecode_with_compile_count(
+            ScriptCache(self.persist_dir)
+        )
+        self.assertEqual(compile_count, 1)
+        self.assertIn(2, bytecode.co_consts)
+        # The script's file is replaced.
+        self.assertEqual(len(os.listdir(self.persist_dir)), 1)
+
+    def test_recompiles_with_changed_magic_settings(self):
+        self._get_bytecode_with_compile_count(ScriptCache(self.persist_dir))
+
+        with patch_config_options({"magic.displayLastExprIfNoSemicolon": True}):
+            _, compile_count = self._get_bytecode_with_compile_count(
+                ScriptCache(self.persist_dir)
+            )
+        self.assertEqual(compile_count, 1)
+
+    def test_recompiles_with_changed_streamlit_version(self):
+        self._get_bytecode_with_compile_count(ScriptCache(self.persist_dir))
+
+        with mock.patch(
+            "streamlit.runtime.scriptrunner.script_cache.STREAMLIT_VERSION_STRING",
+            "0.0.0",
+        ):
+            _, compile_count = self._get_bytecode_with_compile_count(
+                ScriptCache(self.persist_dir)
+            )
+        self.assertEqual(compile_count, 1)
+
+    def test_recompiles_corrupted_file(self):
+        self._get_bytecode_with_compile_count(ScriptCache(self.persist_dir))
+        (file_name,) = os.listdir(self.persist_dir)
+        path = os.path.join(self.persist_dir, file_name)
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) - 10)
+
+        bytecode, compile_count = self._get_bytecode_with_compile_count(
+            ScriptCache(self.persist_dir)
+        )
+        self.assertEqual(compile_count, 1)
+        exec(bytecode, {})
+
+    def test_respects_dont_write_bytecode(self):
+        with mock.patch("sys.dont_write_bytecode", True):
+            self._get_bytecode_with_compile_count(ScriptCache(self.persist_dir))
+        self.assertEqual(os.listdir(self.persist_dir), [])
+
+    def test_clear_during_compile(self):
+        """Bytecode that was compiled while the cache was cleared isn't cached."""
+        cache = ScriptCache()
+        load_bytecode = cache._load_bytecode
+
+        def load_and_clear(script_path):
+            bytecode = load_bytecode(script_path)
+            cache.clear()
+            return bytecode
+
+        with mock.patch.object(cache, "_load_bytecode", side_effect=load_and_clear):
+            self.assertIsNotNone(cache.get_bytecode(self.script_path))
+        self.assertEqual(0, len(cache._cache))
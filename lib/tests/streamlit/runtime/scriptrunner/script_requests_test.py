@@ -256,3 +256,15 @@ class ScriptRequestsTest(unittest.TestCase):
         result = reqs.on_scriptrunner_ready()
         self.assertEqual(ScriptRequest(ScriptRequestType.RERUN, RerunData()), result)
         self.assertEqual(ScriptRequestType.CONTINUE, reqs._state)
+
+    def test_peek_rerun_data(self):
+        """Return the pending RerunData without changing the state."""
+        reqs = ScriptRequests()
+        self.assertIsNone(reqs.peek_rerun_data())
+
+        reqs.request_rerun(RerunData(query_string="foo"))
+        self.assertEqual(RerunData(query_string="foo"), reqs.peek_rerun_data())
+        self.assertEqual(ScriptRequestType.RERUN, reqs._state)
+
+        reqs.request_stop()
+        self.assertIsNone(reqs.peek_rerun_data())
@@ -0,0 +1,186 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""ScriptRunPool unit tests."""
+
+from __future__ import annotations
+
+import threading
+import unittest
+
+from streamlit.errors import StreamlitAPIException, StreamlitAPIWarning
+from streamlit.proto.WidgetStates_pb2 import WidgetState, WidgetStates
+from streamlit.runtime.scriptrunner.script_requests import RerunData
+from streamlit.runtime.scriptrunner.script_run_pool import (
+    SCRIPT_RUN_QUEUE_DURATION_FAMILY,
+    SCRIPT_RUN_QUEUE_LENGTH_FAMILY,
+    SCRIPT_RUNS_REJECTED_FAMILY,
+    ScriptRunPool,
+)
+from streamlit.runtime.stats import CounterStat, GaugeStat
+
+
+class FakeScriptRunner:
+    """Stands in for a ScriptRunner. Each entry of `runs` is the RerunData of
+    a pending script run."""
+
+    def __init__(self, name: str, log: list[str], *runs: RerunData | None):
+        self.name = name
+        self.log = log
+        self.runs = list(runs)
+        self.rejected_with: list[BaseException | None] = []
+        self.done = threading.Event()
+
+    def pending_rerun_data(self) -> RerunData | None:
+        return self.runs[0] if self.runs else None
+
+    def run_pooled_step(self) -> bool:
+        if self.runs:
+            self.runs.pop(0)
+            self.log.append(self.name)
+            return True
+        self.done.set()
+        return False
+
+    def reject(self, warning: BaseException | None = None) -> None:
+        self.rejected_with.append(warning)
+        self.done.set()
+
+
+PAGE_LOAD = RerunData()
+INTERACTIVE = RerunData(
+    widget_states=WidgetStates(widgets=[WidgetState(id="button", trigger_value=True)])
+)
+
+
+class ScriptRunPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.log: list[str] = []
+        # Runners submitted while `self.gate` blocks the pool's only worker
+        # are all queued before any of them runs.
+        self.gate = threading.Event()
+        self.blocking = threading.Event()
+        self.blocker = FakeScriptRunner("blocker", self.log, PAGE_LOAD)
+        original_step = self.blocker.run_pooled_step
+
+        def blocked_step() -> bool:
+            self.blocking.set()
+            self.gate.wait(timeout=5)
+            return original_step()
+
+        self.blocker.run_pooled_step = blocked_step  # type: ignore[method-assign]
+
+    def create_pool(self, max_queued_runs=0, overload_policy="queue"):
+        pool = ScriptRunPool(
+            num_workers=1,
+            max_queued_runs=max_queued_runs,
+            overload_policy=overload_policy,
+        )
+        pool.submit(self.blocker)
+        self.assertTrue(self.blocking.wait(timeout=5))
+        return pool
+
+    def test_interactive_runs_go_first(self):
+        pool = self.create_pool()
+        page_load = FakeScriptRunner("page_load", self.log, PAGE_LOAD)
+        interactive = FakeScriptRunner("interactive", self.log, INTERACTIVE)
+        pool.submit(page_load)
+        pool.submit(interactive)
+        self.gate.set()
+
+        self.assertTrue(page_load.done.wait(timeout=5))
+        self.assertEqual(["blocker", "interactive", "page_load"], self.log)
+
+    def test_reruns_are_requeued(self):
+        """A runner with several pending reruns lets other runners go
+        between them."""
+        pool = self.create_pool()
+        chatty = FakeScriptRunner("chatty", self.log, PAGE_LOAD, PAGE_LOAD)
+        other = FakeScriptRunner("other", self.log, PAGE_LOAD)
+        pool.submit(chatty)
+        pool.submit(other)
+        self.gate.set()
+
+        self.assertTrue(chatty.done.wait(timeout=5))
+        self.assertEqual(["blocker", "chatty", "other", "chatty"], self.log)
+
+    def test_queue_policy_never_rejects(self):
+        pool = self.create_pool(max_queued_runs=1, overload_policy="queue")
+        runners = [FakeScriptRunner(str(i), self.log, PAGE_LOAD) for i in range(3)]
+        for runner in runners:
+            pool.submit(runner)
+        self.assertEqual(3, pool.queue_length)
+        self.gate.set()
+
+        for runner in runners:
+            self.assertTrue(runner.done.wait(timeout=5))
+            self.assertEqual([], runner.rejected_with)
+
+    def test_shed_policy_rejects_newest_lowest_priority_run(self):
+        pool = self.create_pool(max_queued_runs=2, overload_policy="shed")
+        page_load_1 = FakeScriptRunner("page_load_1", self.log, PAGE_LOAD)
+        page_load_2 = FakeScriptRunner("page_load_2", self.log, PAGE_LOAD)
+        interactive = FakeScriptRunner("interactive", self.log, INTERACTIVE)
+        page_load_3 = FakeScriptRunner("page_load_3", self.log, PAGE_LOAD)
+        for runner in (page_load_1, page_load_2, interactive, page_load_3):
+            pool.submit(runner)
+
+        # The interactive run took page_load_2's place, and page_load_3 found
+        # the queue full of runs of the same or higher priority.
+        self.assertEqual([None], page_load_2.rejected_with)
+        self.assertEqual([None], page_load_3.rejected_with)
+        self.assertEqual(2, pool.queue_length)
+
+        self.gate.set()
+        self.assertTrue(page_load_1.done.wait(timeout=5))
+        self.assertEqual(["blocker", "interactive", "page_load_1"], self.log)
+
+        stats = pool.get_stats()
+        self.assertIn(
+            CounterStat(SCRIPT_RUNS_REJECTED_FAMILY, (("priority", "page_load"),), 2),
+            stats,
+        )
+        self.assertIn(
+            GaugeStat(SCRIPT_RUN_QUEUE_LENGTH_FAMILY, (("priority", "page_load"),), 0),
+            stats,
+        )
+
+    def test_busy_policy_warns_rejected_users(self):
+        pool = self.create_pool(max_queued_runs=1, overload_policy="busy")
+        pool.submit(FakeScriptRunner("queued", self.log, PAGE_LOAD))
+        rejected = FakeScriptRunner("rejected", self.log, PAGE_LOAD)
+        pool.submit(rejected)
+        self.gate.set()
+
+        [warning] = rejected.rejected_with
+        self.assertIsInstance(warning, StreamlitAPIWarning)
+
+    def test_queue_duration_histogram(self):
+        pool = self.create_pool()
+        interactive = FakeScriptRunner("interactive", self.log, INTERACTIVE)
+        pool.submit(interactive)
+        self.gate.set()
+        self.assertTrue(interactive.done.wait(timeout=5))
+
+        [interactive_stat] = [
+            stat
+            for stat in pool.get_stats()
+            if stat.family == SCRIPT_RUN_QUEUE_DURATION_FAMILY
+            and stat.labels == (("priority", "interactive"),)
+        ]
+        self.assertEqual(1, interactive_stat.observation_count)
+
+    def test_invalid_overload_policy(self):
+        with self.assertRaises(StreamlitAPIException):
+            ScriptRunPool(num_workers=1, max_queued_runs=1, overload_policy="drop")
@@ -18,6 +18,7 @@ from __future__ import annotations
 
 import os
 import sys
+import threading
 import time
 from typing import Any, List, Optional
 from unittest.mock import MagicMock, call, patch
@@ -46,6 +47,7 @@ from streamlit.runtime.scriptrunner import (
     StopException,
 )
 from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.runtime.scriptrunner.script_run_pool import ScriptRunPool
 from streamlit.runtime.scriptrunner.script_requests import (
     ScriptRequest,
     ScriptRequests,
@@ -95,6 +97,58 @@ class ScriptRunnerTest(AsyncTestCase):
         super().tearDown()
         Runtime._instance = None
 
+    def test_run_script_on_script_run_pool(self):
+        """Scripts run on a ScriptRunPool worker when the runner has a pool,
+        and the worker is released from the runner's context afterwards."""
+        pool = ScriptRunPool(num_workers=1, max_queued_runs=0, overload_policy="queue")
+        scriptrunner = TestScriptRunner("good_script.py", script_run_pool=pool)
+        scriptrunner.request_rerun(RerunData())
+        scriptrunner.start()
+        scriptrunner.join()
+
+        self._assert_no_exceptions(scriptrunner)
+        self._assert_events(
+            scriptrunner,
+            [
+                ScriptRunnerEvent.SCRIPT_STARTED,
+                ScriptRunnerEvent.ENQUEUE_FORWARD_MSG,
+                ScriptRunnerEvent.SCRIPT_STOPPED_WITH_SUCCESS,
+                ScriptRunnerEvent.SHUTDOWN,
+            ],
+        )
+        self._assert_text_deltas(scriptrunner, [text_utf])
+        self.assertIsNone(scriptrunner._script_thread)
+
+    def test_reject(self):
+        """A rejected ScriptRunner shuts down without running its script."""
+        scriptrunner = TestScriptRunner("good_script.py")
+        warning = Warning("busy")
+        scriptrunner.reject(warning)
+
+        self._assert_control_events(
+            scriptrunner,
+            [ScriptRunnerEvent.SCRIPT_REJECTED, ScriptRunnerEvent.SHUTDOWN],
+        )
+        self.assertEqual(warning, scriptrunner.event_data[0]["exception"])
+        self.assertFalse(scriptrunner.request_rerun(RerunData()))
+
+    def test_get_session_state_value_sizes_takes_lock(self):
+        """Session state sizes are estimated while holding the lock that the
+        script thread takes."""
+        scriptrunner = TestScriptRunner("good_script.py")
+        lock = scriptrunner._session_state._lock
+
+        sizes: list[dict[str, int]] = []
+        thread = threading.Thread(
+            target=lambda: sizes.append(scriptrunner.get_session_state_value_sizes())
+        )
+        with lock:
+            thread.start()
+            thread.join(timeout=0.1)
+            self.assertEqual([], sizes)
+        thread.join()
+        self.assertEqual([{}], sizes)
+
     def test_startup_shutdown(self):
         """Test that we can create and shut down a ScriptRunner."""
         scriptrunner = TestScriptRunner("good_script.py")
@@ -1067,7 +1121,9 @@ class TestScriptRunner(ScriptRunner):
     # To prevent PytestCollectionWarning we set __test__ property to False
     __test__ = False
 
-    def __init__(self, script_name: str):
+    def __init__(
+        self, script_name: str, script_run_pool: Optional[ScriptRunPool] = None
+    ):
         """Initializes the ScriptRunner for the given script_name"""
         # DeltaGenerator deltas will be enqueued into self.forward_msg_queue.
         self.forward_msg_queue = ForwardMsgQueue()
@@ -1086,7 +1142,9 @@ class TestScriptRunner(ScriptRunner):
             user_info={"email": "test@test.com"},
             fragment_storage=MemoryFragmentStorage(),
             pages_manager=PagesManager(main_script_path),
+            script_run_pool=script_run_pool,
         )
+        self._shutdown = threading.Event()
 
         # Accumulates uncaught exceptions thrown by our run thread.
         self.script_thread_exceptions: List[BaseException] = []
@@ -1111,6 +1169,8 @@ class TestScriptRunner(ScriptRunner):
             if event == ScriptRunnerEvent.ENQUEUE_FORWARD_MSG:
                 forward_msg = kwargs["forward_msg"]
                 self.forward_msg_queue.enqueue(forward_msg)
+            elif event == ScriptRunnerEvent.SHUTDOWN:
+                self._shutdown.set()
 
         self.on_event.connect(record_event, weak=False)
 
@@ -1127,9 +1187,19 @@ class TestScriptRunner(ScriptRunner):
         # Set the _dg_stack here to the one belonging to the thread context
         self._dg_stack = dg_stack.get()
 
+    def run_pooled_step(self) -> bool:
+        try:
+            return super().run_pooled_step()
+        except BaseException as e:
+            self.script_thread_exceptions.append(e)
+            return False
+
     def join(self) -> None:
         """Join the script_thread if it's running."""
-        if self._script_thread is not None:
+        if self._script_run_pool is not None:
+            # Pool workers outlive the runners they run.
+            self._shutdown.wait(timeout=15)
+        elif self._script_thread is not None:
             self._script_thread.join()
 
     def clear_forward_msgs(self) -> None:
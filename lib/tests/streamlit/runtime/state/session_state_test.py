@@ -14,11 +14,12 @@
 
 """Session state unit tests."""
 
+import pickle
 import unittest
 from copy import deepcopy
 from datetime import date, datetime, timedelta
 from typing import Any, List, Tuple
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, call, patch
 
 import pytest
 from hypothesis import given, settings
@@ -26,19 +27,27 @@ from hypothesis import strategies as hst
 
 import streamlit as st
 import tests.streamlit.runtime.state.strategies as stst
-from streamlit.errors import StreamlitAPIException
+from streamlit.errors import StreamlitAPIException, UnserializableSessionStateError
 from streamlit.proto.Common_pb2 import FileURLs as FileURLsProto
 from streamlit.proto.WidgetStates_pb2 import WidgetState as WidgetStateProto
 from streamlit.runtime.scriptrunner import get_script_run_ctx
-from streamlit.runtime.state import SessionState, get_session_state
+from streamlit.runtime.state import (
+    SafeSessionState,
+    SessionState,
+    get_session_state,
+)
 from streamlit.runtime.state.common import GENERATED_WIDGET_ID_PREFIX
 from streamlit.runtime.state.session_state import (
+    SESSION_STATE_MEMORY_FAMILY,
+    SESSION_STATE_VALUE_MEMORY_FAMILY,
     Serialized,
+    SessionStateStatProvider,
     Value,
     WidgetMetadata,
     WStates,
     _is_stale_widget,
 )
+from streamlit.runtime.stats import CacheStat
 from streamlit.runtime.uploaded_file_manager import UploadedFile, UploadedFileRec
 from streamlit.testing.v1.app_test import AppTest
 from tests.delta_generator_test_case import DeltaGeneratorTestCase
@@ -744,6 +753,95 @@ class SessionStateMethodTests(unittest.TestCase):
         with pytest.raises(Exception):
             self.session_state._check_serializable()
 
+    @patch("streamlit.runtime.state.session_state.pickle.dumps", wraps=pickle.dumps)
+    def test_check_serializable_only_checks_changed_values(self, dumps):
+        self.session_state["foo"] = "bar"
+        self.session_state._check_serializable()
+        self.assertEqual(
+            len(pickle.dumps("bar")), self.session_state._serialized_sizes["foo"]
+        )
+
+        # Nothing changed since the last check
+        dumps.reset_mock()
+        self.session_state._check_serializable()
+        dumps.assert_not_called()
+
+        self.session_state["foo"] = "baz"
+        self.session_state["new_key"] = 1
+        dumps.reset_mock()
+        self.session_state._check_serializable()
+        dumps.assert_has_calls([call("baz"), call(1)], any_order=True)
+        self.assertEqual(2, dumps.call_count)
+
+    @patch("streamlit.runtime.state.session_state.pickle.dumps", wraps=pickle.dumps)
+    def test_check_serializable_skips_read_values(self, dumps):
+        safe_state = SafeSessionState(self.session_state, lambda: None)
+        safe_state["foo"] = [1, 2, 3]
+        self.session_state._check_serializable()
+
+        dumps.reset_mock()
+        self.assertEqual([1, 2, 3], safe_state["foo"])
+        self.session_state._check_serializable()
+        dumps.assert_not_called()
+
+    def test_check_serializable_after_mutation(self):
+        """Values mutated in place are checked again once they're set again."""
+        safe_state = SafeSessionState(self.session_state, lambda: None)
+        safe_state["foo"] = []
+        self.session_state._check_serializable()
+
+        safe_state["foo"].append(lambda x: x)
+        self.session_state._check_serializable()
+
+        safe_state["foo"] = safe_state["foo"]
+        with pytest.raises(UnserializableSessionStateError):
+            self.session_state._check_serializable()
+
+    @patch("streamlit.runtime.state.session_state.estimate_size", return_value=10)
+    def test_get_value_sizes_only_estimates_changed_values(self, estimate_size):
+        sizes = self.session_state.get_value_sizes()
+        self.assertEqual(10, sizes["foo"])
+        self.assertEqual(len(self.session_state), estimate_size.call_count)
+
+        estimate_size.reset_mock()
+        self.session_state.get_value_sizes()
+        estimate_size.assert_not_called()
+
+        self.session_state["new_key"] = 1
+        estimate_size.reset_mock()
+        sizes = self.session_state.get_value_sizes()
+        estimate_size.assert_called_once_with(1)
+        self.assertEqual(10, sizes["new_key"])
+
+    def test_get_value_sizes_does_not_deserialize_widget_values(self):
+        widget_state = WidgetStateProto(id="widget_id_1", int_value=5)
+        self.session_state._new_widget_state.set_widget_from_proto(widget_state)
+        self.session_state._new_widget_state.set_widget_metadata(
+            WidgetMetadata(
+                id="widget_id_1",
+                deserializer=lambda x, s: str(x),
+                serializer=lambda x: int(x),
+                value_type="int_value",
+            )
+        )
+
+        sizes = self.session_state.get_value_sizes()
+        self.assertNotIn("widget_id_1", sizes)
+        self.assertIsInstance(
+            self.session_state._new_widget_state.states["widget_id_1"], Serialized
+        )
+
+        # Once the script has read the value, its size is estimated.
+        self.assertEqual("5", self.session_state["widget_id_1"])
+        self.assertIn("widget_id_1", self.session_state.get_value_sizes())
+
+    def test_check_serializable_forgets_deleted_keys(self):
+        self.session_state["foo"] = "bar"
+        self.session_state._check_serializable()
+        del self.session_state["foo"]
+        self.session_state._check_serializable()
+        self.assertNotIn("foo", self.session_state._serialized_sizes)
+
 
 @given(state=stst.session_state())
 @settings(deadline=400)
@@ -892,3 +990,51 @@ class SessionStateStatProviderTests(DeltaGeneratorTestCase):
         state._compact_state()
         new_size_4 = state.get_stats()[0].byte_length
         assert new_size_4 <= new_size_3
+
+    def test_top_memory_stats(self):
+        sessions = []
+        for i in range(12):
+            session_state = SessionState()
+            session_state["small"] = 1
+            session_state["large"] = b"x" * (100 * i)
+            session = MagicMock(id=f"session_{i}", session_state=session_state)
+            session.get_session_state_value_sizes = session_state.get_value_sizes
+            sessions.append(MagicMock(session=session))
+        session_mgr = MagicMock()
+        session_mgr.list_active_sessions.return_value = sessions
+
+        stats = SessionStateStatProvider(session_mgr).get_stats()
+
+        cache_stats = [s for s in stats if isinstance(s, CacheStat)]
+        self.assertEqual(1, len(cache_stats))
+        self.assertEqual(
+            sum(
+                info.session.session_state.get_stats()[0].byte_length
+                for info in sessions
+            ),
+            cache_stats[0].byte_length,
+        )
+
+        session_stats = [
+            s
+            for s in stats
+            if getattr(s, "family", None) == SESSION_STATE_MEMORY_FAMILY
+        ]
+        self.assertEqual(
+            [f"session_{i}" for i in range(11, 1, -1)],
+            [dict(s.labels)["session_id"] for s in session_stats],
+        )
+
+        value_stats = [
+            s
+            for s in stats
+            if getattr(s, "family", None) == SESSION_STATE_VALUE_MEMORY_FAMILY
+        ]
+        self.assertEqual(
+            [
+                (("session_id", f"session_{i}"), ("key", "large"))
+                for i in range(11, 1, -1)
+            ],
+            [s.labels for s in value_stats],
+        )
+        self.assertEqual(1100, value_stats[0].value)
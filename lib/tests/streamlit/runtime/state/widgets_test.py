@@ -28,7 +28,10 @@ from streamlit.runtime.scriptrunner.script_run_context import get_script_run_ctx
 from streamlit.runtime.state import coalesce_widget_states
 from streamlit.runtime.state.common import GENERATED_WIDGET_ID_PREFIX, compute_widget_id
 from streamlit.runtime.state.session_state import SessionState, WidgetMetadata
-from streamlit.runtime.state.widgets import user_key_from_widget_id
+from streamlit.runtime.state.widgets import (
+    apply_json_merge_patch,
+    user_key_from_widget_id,
+)
 from tests.delta_generator_test_case import DeltaGeneratorTestCase
 
 
@@ -298,6 +301,42 @@ class WidgetManagerTests(unittest.TestCase):
         # be coalesced
         self.assertEqual(3, session_state["shape_changing_trigger"])
 
+    def test_coalesce_widget_states_deltas(self):
+        """Widgets that aren't in a delta keep their older values."""
+        old_states = WidgetStates(is_delta=True, version=1)
+        _create_widget("unchanged", old_states).int_value = 1
+        _create_widget("changed", old_states).int_value = 2
+        _create_widget("pressed", old_states).trigger_value = True
+
+        new_states = WidgetStates(is_delta=True, version=2)
+        _create_widget("changed", new_states).int_value = 3
+
+        coalesced = coalesce_widget_states(old_states, new_states)
+
+        self.assertEqual(
+            {"unchanged": 1, "changed": 3, "pressed": True},
+            {
+                state.id: getattr(state, state.WhichOneof("value"))
+                for state in coalesced.widgets
+            },
+        )
+        self.assertTrue(coalesced.is_delta)
+        self.assertEqual(2, coalesced.version)
+
+        # Coalescing a delta into full states results in full states.
+        old_states.is_delta = False
+        self.assertFalse(coalesce_widget_states(old_states, new_states).is_delta)
+
+        # Full states replace older ones.
+        new_states.is_delta = False
+        self.assertEqual(
+            ["changed"],
+            [
+                state.id
+                for state in coalesce_widget_states(old_states, new_states).widgets
+            ],
+        )
+
     def coalesce_widget_states_returns_None_if_both_inputs_None(self):
         assert coalesce_widget_states(None, None) is None
 
@@ -315,6 +354,17 @@ class WidgetHelperTests(unittest.TestCase):
         id = compute_widget_id("button", label="the label")
         assert id.startswith(GENERATED_WIDGET_ID_PREFIX)
 
+    def test_apply_json_merge_patch(self):
+        target = {"edited_rows": {"0": {"a": 1}, "1": {"b": 2}}, "added_rows": [1]}
+        patch = {"edited_rows": {"0": {"a": 5}, "1": None}, "added_rows": [1, 2]}
+
+        self.assertEqual(
+            {"edited_rows": {"0": {"a": 5}}, "added_rows": [1, 2]},
+            apply_json_merge_patch(target, patch),
+        )
+        self.assertEqual([1], apply_json_merge_patch({"a": 1}, [1]))
+        self.assertEqual({"a": 1}, apply_json_merge_patch([1], {"a": 1, "b": None}))
+
 
 class ComputeWidgetIdTests(DeltaGeneratorTestCase):
     """Enforce that new arguments added to the signature of a widget function are taken
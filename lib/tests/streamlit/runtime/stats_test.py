@@ -15,12 +15,20 @@
 import unittest
 from typing import List
 
+import numpy as np
+import pandas as pd
+
 from streamlit.runtime.stats import (
     CacheStat,
     CacheStatsProvider,
+    CounterStat,
+    GaugeStat,
+    MetricFamily,
     StatsManager,
+    estimate_size,
     group_stats,
 )
+from streamlit.vendor.pympler.asizeof import asizeof
 
 
 class MockStatsProvider(CacheStatsProvider):
@@ -107,3 +115,48 @@ class StatsManagerTest(unittest.TestCase):
                 CacheStat("provider3", "boo", 7),
             },
         )
+
+
+class EstimateSizeTest(unittest.TestCase):
+    def test_buffers(self):
+        """The buffers of bytes, NumPy arrays and DataFrames are measured directly."""
+        self.assertEqual(10, estimate_size(b"0123456789"))
+        self.assertEqual(800, estimate_size(np.zeros(100)))
+
+        df = pd.DataFrame({"a": range(100)})
+        self.assertEqual(df.memory_usage(deep=True).sum(), estimate_size(df))
+
+    def test_small_containers(self):
+        """Small containers are measured exactly."""
+        value = {"a": [1, 2, 3], "b": "foo"}
+        self.assertEqual(asizeof(value), estimate_size(value))
+
+    def test_large_containers(self):
+        """Large containers are estimated from a sample of their items."""
+        values = [
+            list(range(10_000)),
+            {str(i): [i, i] for i in range(10_000)},
+            set(range(10_000)),
+        ]
+        for value in values:
+            self.assertAlmostEqual(
+                asizeof(value), estimate_size(value), delta=asizeof(value) * 0.05
+            )
+
+
+class GaugeStatTest(unittest.TestCase):
+    def test_escapes_label_values(self):
+        stat = GaugeStat(
+            MetricFamily("family", "gauge", "", ""),
+            (("key", 'a"b\\c\nd'),),
+            1,
+        )
+        self.assertEqual('family{key="a\\"b\\\\c\\nd"} 1', stat.to_metric_str())
+
+
+class CounterStatTest(unittest.TestCase):
+    def test_to_metric_str(self):
+        stat = CounterStat(
+            MetricFamily("evictions", "counter", "", ""), (("cache", "foo"),), 3
+        )
+        self.assertEqual('evictions_total{cache="foo"} 3', stat.to_metric_str())
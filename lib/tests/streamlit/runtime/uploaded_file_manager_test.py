@@ -14,11 +14,15 @@
 
 """Unit tests for UploadedFileManager"""
 
+import mmap
+import pickle
+import tempfile
 import unittest
 
+from streamlit.proto.Common_pb2 import FileURLs
 from streamlit.runtime.memory_uploaded_file_manager import MemoryUploadedFileManager
 from streamlit.runtime.stats import CacheStat
-from streamlit.runtime.uploaded_file_manager import UploadedFileRec
+from streamlit.runtime.uploaded_file_manager import UploadedFile, UploadedFileRec
 from tests.exception_capturing_thread import call_on_threads
 
 FILE_1 = UploadedFileRec(file_id="url1", name="file1", type="type", data=b"file1")
@@ -109,6 +113,73 @@ class UploadedFileManagerTest(unittest.TestCase):
         self.assertEqual(expected, self.mgr.get_stats())
 
 
+def _create_mapped_file_rec(data: bytes) -> UploadedFileRec:
+    with tempfile.TemporaryFile() as file:
+        file.write(data)
+        file.flush()
+        mapped_data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    return UploadedFileRec(file_id="url", name="file", type="type", data=mapped_data)
+
+
+class UploadedFileTest(unittest.TestCase):
+    def test_reads_mapped_data(self):
+        """A memory-mapped UploadedFile should read like a BytesIO."""
+        data = b"line1\nline2\nline3"
+        file = UploadedFile(_create_mapped_file_rec(data), FileURLs())
+
+        self.assertEqual(len(data), file.size)
+        self.assertEqual(b"li", file.read(2))
+        self.assertEqual(b"ne1\n", file.readline())
+        self.assertEqual([b"line2\n", b"line3"], list(file))
+        self.assertEqual(b"", file.read())
+
+        file.seek(-5, 2)
+        self.assertEqual(len(data) - 5, file.tell())
+        buffer = bytearray(10)
+        self.assertEqual(5, file.readinto(buffer))
+        self.assertEqual(b"line3", buffer[:5])
+
+        file.seek(0)
+        self.assertEqual([b"line1\n", b"line2\n", b"line3"], file.readlines())
+        self.assertEqual(data, file.getvalue())
+
+    def test_copies_mapped_data_on_write(self):
+        """Writing to a memory-mapped UploadedFile should modify a copy of
+        its data."""
+        record = _create_mapped_file_rec(b"hello world")
+        file = UploadedFile(record, FileURLs())
+
+        file.seek(6)
+        file.write(b"there")
+        self.assertEqual(b"hello there", file.getvalue())
+        self.assertEqual(11, file.tell())
+        self.assertEqual(b"hello world", record.data[:])
+
+        # Other UploadedFiles of the same record aren't affected.
+        self.assertEqual(b"hello world", UploadedFile(record, FileURLs()).read())
+
+    def test_get_content_view_does_not_copy_mapped_data(self):
+        file = UploadedFile(_create_mapped_file_rec(b"hello"), FileURLs())
+
+        with file.get_content_view() as view:
+            self.assertEqual(b"hello", view.tobytes())
+        self.assertIsNotNone(file._mapped_data)
+
+    def test_pickles_mapped_data(self):
+        file = UploadedFile(_create_mapped_file_rec(b"hello"), FileURLs())
+        file.seek(2)
+
+        unpickled_file = pickle.loads(pickle.dumps(file))
+        self.assertEqual(b"llo", unpickled_file.read())
+
+    def test_closed_mapped_file(self):
+        file = UploadedFile(_create_mapped_file_rec(b"hello"), FileURLs())
+        file.close()
+
+        with self.assertRaises(ValueError):
+            file.read()
+
+
 class UploadedFileManagerThreadingTest(unittest.TestCase):
     # The number of threads to run our tests on
     NUM_THREADS = 50
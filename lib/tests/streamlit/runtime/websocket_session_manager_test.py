@@ -13,12 +13,18 @@
 # limitations under the License.
 
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
 from streamlit.runtime.script_data import ScriptData
-from streamlit.runtime.session_manager import SessionStorage
+from streamlit.runtime.session_manager import (
+    SessionInfo,
+    SessionSnapshot,
+    SessionSnapshotStorage,
+    SessionStorage,
+    SessionStorageError,
+)
 from streamlit.runtime.websocket_session_manager import WebsocketSessionManager
 
 
@@ -46,6 +52,17 @@ class MockSessionStorage(SessionStorage):
         return list(self._cache.values())
 
 
+class MockSnapshotSessionStorage(MockSessionStorage, SessionSnapshotStorage):
+    """A MockSessionStorage that also holds the snapshots of sessions."""
+
+    def __init__(self):
+        super().__init__()
+        self.snapshots = {}
+
+    def pop_snapshot(self, session_id):
+        return self.snapshots.pop(session_id, None)
+
+
 @patch(
     "streamlit.runtime.app_session.asyncio.get_running_loop",
     new=MagicMock(),
@@ -167,6 +184,46 @@ class WebsocketSessionManagerTests(unittest.TestCase):
         # reconnect.
         assert reconnected_session_info.session.register_file_watchers.call_count == 2
 
+    @patch("streamlit.runtime.app_session.AppSession.restore_snapshot")
+    def test_connect_session_restores_snapshot(self, patched_restore_snapshot):
+        snapshot = SessionSnapshot(
+            session_id="spilled_session",
+            script_run_count=5,
+            client_state=b"",
+            user_state={},
+        )
+        storage = MockSnapshotSessionStorage()
+        storage.snapshots["spilled_session"] = snapshot
+        self.session_mgr._session_storage = storage
+
+        session_id = self.connect_session(existing_session_id="spilled_session")
+        session_info = self.session_mgr.get_active_session_info(session_id)
+
+        assert session_id == "spilled_session"
+        assert session_info.script_run_count == 5
+        patched_restore_snapshot.assert_called_once_with(snapshot)
+        assert "spilled_session" not in storage.snapshots
+
+    @patch("streamlit.runtime.app_session.AppSession.restore_snapshot")
+    def test_connect_session_without_snapshot(self, patched_restore_snapshot):
+        self.session_mgr._session_storage = MockSnapshotSessionStorage()
+
+        session_id = self.connect_session(existing_session_id="unknown_session")
+
+        assert session_id != "unknown_session"
+        patched_restore_snapshot.assert_not_called()
+
+    @patch("streamlit.runtime.websocket_session_manager._LOGGER.warning")
+    def test_connect_session_on_snapshot_error(self, patched_warning):
+        storage = MockSnapshotSessionStorage()
+        storage.pop_snapshot = MagicMock(side_effect=SessionStorageError())
+        self.session_mgr._session_storage = storage
+
+        session_id = self.connect_session(existing_session_id="spilled_session")
+
+        assert session_id != "spilled_session"
+        patched_warning.assert_called_once()
+
     def test_disconnect_session_on_invalid_session_id(self):
         # Just check that no error is thrown.
         self.session_mgr.disconnect_session("nonexistent_session")
@@ -270,3 +327,45 @@ class WebsocketSessionManagerTests(unittest.TestCase):
         assert {s.session.id for s in self.session_mgr.list_sessions()} == set(
             session_ids
         )
+
+
+class WebsocketSessionManagerPrepareConnectSessionTests(
+    unittest.IsolatedAsyncioTestCase
+):
+    def setUp(self):
+        self.storage = MockSnapshotSessionStorage()
+        self.storage.load_snapshot = AsyncMock()
+        self.session_mgr = WebsocketSessionManager(
+            session_storage=self.storage,
+            uploaded_file_manager=MagicMock(),
+            script_cache=MagicMock(),
+            message_enqueued_callback=MagicMock(),
+        )
+
+    async def test_loads_snapshot(self):
+        await self.session_mgr.prepare_connect_session("spilled_session")
+
+        self.storage.load_snapshot.assert_awaited_once_with("spilled_session")
+
+    async def test_does_not_load_snapshot_of_stored_session(self):
+        session = MagicMock()
+        session.id = "stored_session"
+        self.storage.save(SessionInfo(client=None, session=session))
+
+        await self.session_mgr.prepare_connect_session("stored_session")
+
+        self.storage.load_snapshot.assert_not_awaited()
+
+    async def test_does_not_load_snapshot_without_snapshot_storage(self):
+        self.session_mgr._session_storage = MockSessionStorage()
+
+        # Just check that no error is thrown.
+        await self.session_mgr.prepare_connect_session("spilled_session")
+
+    @patch("streamlit.runtime.websocket_session_manager._LOGGER.warning")
+    async def test_logs_snapshot_errors(self, patched_warning):
+        self.storage.load_snapshot.side_effect = SessionStorageError()
+
+        await self.session_mgr.prepare_connect_session("spilled_session")
+
+        patched_warning.assert_called_once()
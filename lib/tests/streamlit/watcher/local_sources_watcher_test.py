@@ -57,6 +57,8 @@ class LocalSourcesWatcherTest(unittest.TestCase):
 
         the_globals = globals()
 
+        local_sources_watcher._module_paths_index.clear()
+
         for name in modules:
             try:
                 del sys.modules[the_globals[name].__name__]
@@ -319,6 +321,45 @@ class LocalSourcesWatcherTest(unittest.TestCase):
         lsw.update_watched_modules()
         register.assert_not_called()
 
+    @patch("streamlit.watcher.local_sources_watcher.PathWatcher")
+    def test_only_examines_new_modules(self, _fob):
+        lsw = local_sources_watcher.LocalSourcesWatcher(PagesManager(SCRIPT_PATH))
+        lsw.update_watched_modules()
+
+        register = MagicMock()
+        lsw._register_necessary_watchers = register
+        sys.modules["DUMMY_MODULE_2"] = DUMMY_MODULE_2
+        lsw.update_watched_modules()
+
+        register.assert_called_once_with({"DUMMY_MODULE_2": {DUMMY_MODULE_2_FILE}})
+
+        # Unloaded modules are examined again when they are imported again.
+        del sys.modules["DUMMY_MODULE_2"]
+        lsw.update_watched_modules()
+        sys.modules["DUMMY_MODULE_2"] = DUMMY_MODULE_2
+        register.reset_mock()
+        lsw.update_watched_modules()
+
+        register.assert_called_once_with({"DUMMY_MODULE_2": {DUMMY_MODULE_2_FILE}})
+
+    @patch("streamlit.watcher.local_sources_watcher.PathWatcher")
+    def test_module_paths_are_shared_between_sessions(self, _fob):
+        lsw1 = local_sources_watcher.LocalSourcesWatcher(PagesManager(SCRIPT_PATH))
+        lsw2 = local_sources_watcher.LocalSourcesWatcher(PagesManager(SCRIPT_PATH))
+        sys.modules["DUMMY_MODULE_1"] = DUMMY_MODULE_1
+
+        with patch(
+            "streamlit.watcher.local_sources_watcher.get_module_paths",
+            wraps=local_sources_watcher.get_module_paths,
+        ) as get_module_paths:
+            lsw1.update_watched_modules()
+            num_calls = get_module_paths.call_count
+            lsw2.update_watched_modules()
+
+            self.assertGreater(num_calls, 0)
+            self.assertEqual(num_calls, get_module_paths.call_count)
+            self.assertIn(DUMMY_MODULE_1_FILE, lsw2._watched_modules)
+
     @patch(
         "streamlit.runtime.pages_manager.PagesManager.get_pages",
         MagicMock(
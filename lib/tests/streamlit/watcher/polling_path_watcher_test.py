@@ -43,11 +43,19 @@ class PollingPathWatcherTest(unittest.TestCase):
         )
         self.sleep_patch.start()
 
+        # Give each test its own registry of watched paths.
+        self.registry_patch = mock.patch(
+            "streamlit.watcher.polling_path_watcher.PollingPathWatcher._registry",
+            new=polling_path_watcher._PollingRegistry(),
+        )
+        self.registry_patch.start()
+
     def tearDown(self):
         super(PollingPathWatcherTest, self).tearDown()
         self.util_patch.stop()
         self.executor_patch.stop()
         self.sleep_patch.stop()
+        self.registry_patch.stop()
 
     def _submit_executor_task(self, task):
         """Submit a new task to our mock executor."""
@@ -60,6 +68,12 @@ class PollingPathWatcherTest(unittest.TestCase):
         for task in tasks:
             task()
 
+    def _poll_until_settled(self):
+        """Run the polling task that detects changes, and the next one, which
+        calls the callbacks if nothing changed in between."""
+        self._run_executor_tasks()
+        self._run_executor_tasks()
+
     def test_file_watch_and_callback(self):
         """Test that when a file is modified, the callback is called."""
         callback = mock.Mock()
@@ -77,7 +91,7 @@ class PollingPathWatcherTest(unittest.TestCase):
         self.util_mock.path_modification_time = lambda *args: 102.0
         self.util_mock.calc_md5_with_blocking_retries = lambda _, **kwargs: "2"
 
-        self._run_executor_tasks()
+        self._poll_until_settled()
         callback.assert_called_once()
 
         watcher.close()
@@ -123,7 +137,7 @@ class PollingPathWatcherTest(unittest.TestCase):
         self.util_mock.calc_md5_with_blocking_retries = lambda _, **kwargs: "22"
 
         # This is the test:
-        self._run_executor_tasks()
+        self._poll_until_settled()
         callback.assert_called()
 
         watcher.close()
@@ -181,7 +195,7 @@ class PollingPathWatcherTest(unittest.TestCase):
         self.util_mock.path_modification_time = lambda *args: 102.0
         self.util_mock.calc_md5_with_blocking_retries = mock.Mock(return_value="2")
 
-        self._run_executor_tasks()
+        self._poll_until_settled()
         callback.assert_called_once()
         _, kwargs = self.util_mock.calc_md5_with_blocking_retries.call_args
         assert kwargs == {"glob_pattern": "*.py", "allow_nonexistent": True}
@@ -217,7 +231,7 @@ class PollingPathWatcherTest(unittest.TestCase):
 
         # "Modify" our file
         modify_mock_file()
-        self._run_executor_tasks()
+        self._poll_until_settled()
 
         self.assertEqual(callback1.call_count, 1)
         self.assertEqual(callback2.call_count, 1)
@@ -227,7 +241,7 @@ class PollingPathWatcherTest(unittest.TestCase):
 
         # Modify our file again
         modify_mock_file()
-        self._run_executor_tasks()
+        self._poll_until_settled()
 
         self.assertEqual(callback1.call_count, 1)
         self.assertEqual(callback2.call_count, 2)
@@ -241,3 +255,136 @@ class PollingPathWatcherTest(unittest.TestCase):
         # should not have increased.
         self.assertEqual(callback1.call_count, 1)
         self.assertEqual(callback2.call_count, 2)
+
+    def test_paths_are_polled_once(self):
+        """Test that a path watched by several watchers is only polled and
+        hashed once."""
+        self.util_mock.path_modification_time = mock.Mock(return_value=101.0)
+        self.util_mock.calc_md5_with_blocking_retries = mock.Mock(return_value="1")
+
+        watchers = [
+            polling_path_watcher.PollingPathWatcher("/this/is/my/file.py", mock.Mock())
+            for _ in range(3)
+        ]
+        self.util_mock.calc_md5_with_blocking_retries.assert_called_once()
+
+        self.util_mock.path_modification_time.reset_mock()
+        self._run_executor_tasks()
+        self.util_mock.path_modification_time.assert_called_once()
+        self.assertEqual(1, len(self._executor_tasks))
+
+        for watcher in watchers:
+            watcher.close()
+
+    def test_changes_are_debounced(self):
+        """Test that callbacks are only called once changes stop happening, and
+        then for all the paths that changed."""
+        mtimes = {"/a.py": 101.0, "/b.py": 101.0}
+        self.util_mock.path_modification_time = lambda path, *args: mtimes[path]
+        self.util_mock.calc_md5_with_blocking_retries = lambda path, **kwargs: str(
+            mtimes[path]
+        )
+
+        callback = mock.Mock()
+        watcher_a = polling_path_watcher.PollingPathWatcher("/a.py", callback)
+        watcher_b = polling_path_watcher.PollingPathWatcher("/b.py", callback)
+
+        mtimes["/a.py"] = 102.0
+        self._run_executor_tasks()
+        callback.assert_not_called()
+
+        mtimes["/b.py"] = 102.0
+        self._run_executor_tasks()
+        callback.assert_not_called()
+
+        self._run_executor_tasks()
+        self.assertEqual(
+            [mock.call("/a.py"), mock.call("/b.py")], callback.call_args_list
+        )
+
+        watcher_a.close()
+        watcher_b.close()
+
+    def test_changes_are_debounced_for_a_limited_time(self):
+        """Test that a path that changes on every poll doesn't hold back the
+        callbacks of the other paths forever."""
+        mtimes = {"/a.py": 101.0, "/b.py": 101.0}
+        self.util_mock.path_modification_time = lambda path, *args: mtimes[path]
+        self.util_mock.calc_md5_with_blocking_retries = lambda path, **kwargs: str(
+            mtimes[path]
+        )
+
+        callback = mock.Mock()
+        watcher_a = polling_path_watcher.PollingPathWatcher("/a.py", callback)
+        watcher_b = polling_path_watcher.PollingPathWatcher("/b.py", callback)
+
+        mtimes["/b.py"] = 102.0
+        for _ in range(polling_path_watcher._MAX_DEBOUNCE_POLLS):
+            mtimes["/a.py"] += 1
+            self._run_executor_tasks()
+        callback.assert_not_called()
+
+        mtimes["/a.py"] += 1
+        self._run_executor_tasks()
+        self.assertEqual(
+            [mock.call("/a.py"), mock.call("/b.py")], callback.call_args_list
+        )
+
+        watcher_a.close()
+        watcher_b.close()
+
+    def test_closed_watchers_are_not_notified(self):
+        """Test that a watcher that is closed by the callback of another one
+        isn't notified of the same change."""
+        self.util_mock.path_modification_time = lambda *args: 101.0
+        self.util_mock.calc_md5_with_blocking_retries = lambda _, **kwargs: "1"
+
+        callback = mock.Mock()
+        watcher = polling_path_watcher.PollingPathWatcher("/a.py", callback)
+        closing_watcher = polling_path_watcher.PollingPathWatcher(
+            "/a.py", lambda _: watcher.close()
+        )
+        # Make closing_watcher's callback run first.
+        callbacks = polling_path_watcher.PollingPathWatcher._registry._watched_paths[
+            ("/a.py", None, False)
+        ].callbacks
+        callbacks.reverse()
+
+        self.util_mock.path_modification_time = lambda *args: 102.0
+        self.util_mock.calc_md5_with_blocking_retries = lambda _, **kwargs: "2"
+        self._poll_until_settled()
+
+        callback.assert_not_called()
+        closing_watcher.close()
+
+    def test_hashes_new_paths_outside_of_lock(self):
+        registry = polling_path_watcher.PollingPathWatcher._registry
+
+        def calc_md5(*args, **kwargs):
+            self.assertFalse(registry._lock.locked())
+            return "1"
+
+        self.util_mock.path_modification_time = lambda *args: 101.0
+        self.util_mock.calc_md5_with_blocking_retries = calc_md5
+
+        watcher = polling_path_watcher.PollingPathWatcher("/a.py", mock.Mock())
+        watcher.close()
+
+    def test_stops_polling_without_watchers(self):
+        """Test that polling stops once all watchers are closed, and starts
+        again with the next watcher."""
+        self.util_mock.path_modification_time = lambda *args: 101.0
+        self.util_mock.calc_md5_with_blocking_retries = lambda _, **kwargs: "1"
+
+        watcher = polling_path_watcher.PollingPathWatcher(
+            "/this/is/my/file.py", mock.Mock()
+        )
+        watcher.close()
+        self._run_executor_tasks()
+        self.assertEqual([], self._executor_tasks)
+
+        watcher = polling_path_watcher.PollingPathWatcher(
+            "/this/is/my/file.py", mock.Mock()
+        )
+        self.assertEqual(1, len(self._executor_tasks))
+        watcher.close()
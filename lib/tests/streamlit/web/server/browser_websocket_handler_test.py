@@ -49,11 +49,14 @@ class BrowserWebSocketHandlerTest(ServerTestCase):
     @tornado.testing.gen_test
     async def test_connect_with_session_id(self):
         with self._patch_app_session(), patch.object(
+            self.server._runtime, "prepare_connect_session"
+        ) as patched_prepare_connect_session, patch.object(
             self.server._runtime, "connect_session"
         ) as patched_connect_session:
             await self.server.start()
             await self.ws_connect(existing_session_id="session_id")
 
+            patched_prepare_connect_session.assert_awaited_once_with("session_id")
             patched_connect_session.assert_called_with(
                 client=ANY,
                 user_info=ANY,
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
 from unittest import mock
 from unittest.mock import MagicMock
 
@@ -20,8 +21,10 @@ import tornado.web
 from parameterized import parameterized
 from typing_extensions import Final
 
+from streamlit.runtime.disk_media_file_storage import DiskMediaFileStorage
 from streamlit.runtime.media_file_manager import MediaFileManager
 from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.web.server import media_file_handler
 from streamlit.web.server.media_file_handler import MediaFileHandler
 
 MOCK_ENDPOINT: Final = "/mock/media"
@@ -100,8 +103,75 @@ class MediaFileHandlerTest(tornado.testing.AsyncHTTPTestCase):
         self.assertEqual(str(len(b"mock_data")), rsp.headers["Content-Length"])
         self.assertEqual(content_disposition_header, rsp.headers["Content-Disposition"])
 
+    @mock.patch(
+        "streamlit.runtime.media_file_manager._get_session_id",
+        MagicMock(return_value="mock_session_id"),
+    )
+    @mock.patch.object(media_file_handler, "_CHUNK_SIZE_BYTES", 4)
+    def test_range_request(self) -> None:
+        """Range requests are served in chunks."""
+        url = self.media_file_manager.add(b"0123456789", "video/mp4", "mock_coords")
+        rsp = self.fetch(url, method="GET", headers={"Range": "bytes=1-8"})
+
+        self.assertEqual(206, rsp.code)
+        self.assertEqual(b"12345678", rsp.body)
+        self.assertEqual("bytes 1-8/10", rsp.headers["Content-Range"])
+
+    @mock.patch(
+        "streamlit.runtime.media_file_manager._get_session_id",
+        MagicMock(return_value="mock_session_id"),
+    )
+    def test_revalidation(self) -> None:
+        """Media files have an ETag and a Last-Modified header, so that
+        browsers can revalidate them."""
+        url = self.media_file_manager.add(b"mock_data", "video/mp4", "mock_coords")
+        rsp = self.fetch(url, method="GET")
+
+        file_id = os.path.splitext(os.path.basename(url))[0]
+        self.assertEqual(f'"{file_id}"', rsp.headers["Etag"])
+
+        rsp = self.fetch(url, method="GET", headers={"If-None-Match": f'"{file_id}"'})
+        self.assertEqual(304, rsp.code)
+
+        rsp = self.fetch(
+            url,
+            method="GET",
+            headers={"If-Modified-Since": rsp.headers["Last-Modified"]},
+        )
+        self.assertEqual(304, rsp.code)
+
     def test_invalid_file(self) -> None:
         """Requests for invalid files fail with 404."""
         url = f"{MOCK_ENDPOINT}/invalid_media_file.mp4"
         rsp = self.fetch(url, method="GET")
         self.assertEqual(404, rsp.code)
+
+
+class DiskMediaFileHandlerTest(tornado.testing.AsyncHTTPTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        storage = DiskMediaFileStorage(MOCK_ENDPOINT, memory_budget_bytes=0)
+        self.media_file_manager = MediaFileManager(storage)
+        MediaFileHandler.initialize_storage(storage)
+
+    def get_app(self) -> tornado.web.Application:
+        return tornado.web.Application(
+            [(f"{MOCK_ENDPOINT}/(.*)", MediaFileHandler, {"path": ""})]
+        )
+
+    @mock.patch(
+        "streamlit.runtime.media_file_manager._get_session_id",
+        MagicMock(return_value="mock_session_id"),
+    )
+    def test_media_file(self) -> None:
+        """Media files on disk are served like the ones in memory."""
+        url = self.media_file_manager.add(b"0123456789", "video/mp4", "mock_coords")
+
+        rsp = self.fetch(url, method="GET")
+        self.assertEqual(200, rsp.code)
+        self.assertEqual(b"0123456789", rsp.body)
+        self.assertEqual("video/mp4", rsp.headers["Content-Type"])
+
+        rsp = self.fetch(url, method="GET", headers={"Range": "bytes=2-"})
+        self.assertEqual(206, rsp.code)
+        self.assertEqual(b"23456789", rsp.body)
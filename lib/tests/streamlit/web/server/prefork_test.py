@@ -0,0 +1,275 @@
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""prefork unit tests"""
+
+from __future__ import annotations
+
+import asyncio
+import socket
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import pytest
+import tornado.testing
+from tornado.httputil import HTTPHeaders, HTTPServerRequest
+
+from streamlit.web.server import prefork
+from streamlit.web.server.prefork import (
+    WORKER_COOKIE_NAME,
+    ConnectionRouter,
+    WorkerInfo,
+    fork_workers,
+    get_handoff_socket_path,
+    make_worker_cookie_transform,
+    parse_worker_cookie,
+    receive_connection,
+    send_connection,
+)
+from tests.testutil import patch_config_options
+
+requires_unix_sockets = pytest.mark.skipif(
+    sys.platform == "win32", reason="Workers are only supported on POSIX systems"
+)
+
+
+class ParseWorkerCookieTest(unittest.TestCase):
+    def test_cookie(self):
+        head = (
+            b"GET /_stcore/stream HTTP/1.1\r\n"
+            b"Host: localhost\r\n"
+            b"Cookie: _streamlit_xsrf=abc; _streamlit_worker=3; other=1"
+        )
+        self.assertEqual(parse_worker_cookie(head), 3)
+
+    def test_no_cookie(self):
+        head = b"GET / HTTP/1.1\r\nHost: localhost"
+        self.assertIsNone(parse_worker_cookie(head))
+
+    def test_invalid_cookie(self):
+        head = b"GET / HTTP/1.1\r\ncookie: _streamlit_worker=abc"
+        self.assertIsNone(parse_worker_cookie(head))
+
+    def test_header_names_are_case_insensitive(self):
+        head = b"GET / HTTP/1.1\r\ncOOkie: _streamlit_worker=1"
+        self.assertEqual(parse_worker_cookie(head), 1)
+
+
+class WorkerCookieTransformTest(unittest.TestCase):
+    def _transform(
+        self, cookie_header: str | None, status_code: int = 200
+    ) -> HTTPHeaders:
+        request_headers = HTTPHeaders()
+        if cookie_header is not None:
+            request_headers["Cookie"] = cookie_header
+        request = HTTPServerRequest(method="GET", uri="/", headers=request_headers)
+
+        transform = make_worker_cookie_transform(2)(request)
+        _, headers, _ = transform.transform_first_chunk(
+            status_code, HTTPHeaders(), b"", True
+        )
+        return headers
+
+    def test_sets_cookie(self):
+        headers = self._transform(None)
+        self.assertEqual(
+            headers.get_list("Set-Cookie"),
+            [f"{WORKER_COOKIE_NAME}=2; Path=/; SameSite=Lax"],
+        )
+
+    def test_keeps_other_workers_cookie(self):
+        """Requests that another worker couldn't take don't change the cookie."""
+        headers = self._transform(f"{WORKER_COOKIE_NAME}=1")
+        self.assertEqual(headers.get_list("Set-Cookie"), [])
+
+    def test_replaces_other_workers_cookie_on_websocket_handshake(self):
+        """The worker that creates the browser's session takes it over."""
+        headers = self._transform(f"{WORKER_COOKIE_NAME}=1", status_code=101)
+        self.assertEqual(
+            headers.get_list("Set-Cookie"),
+            [f"{WORKER_COOKIE_NAME}=2; Path=/; SameSite=Lax"],
+        )
+
+    def test_keeps_own_cookie(self):
+        headers = self._transform(f"{WORKER_COOKIE_NAME}=2", status_code=101)
+        self.assertEqual(headers.get_list("Set-Cookie"), [])
+
+
+class ForkWorkersTest(unittest.TestCase):
+    @patch_config_options({"server.sslCertFile": "/tmp/cert.pem"})
+    @patch("streamlit.web.server.prefork.os.fork")
+    def test_refuses_ssl(self, mock_fork: MagicMock):
+        """Requests can't be routed when they're encrypted."""
+        with self.assertRaises(SystemExit):
+            fork_workers(2, [])
+        mock_fork.assert_not_called()
+
+
+@requires_unix_sockets
+class ConnectionHandoffTest(unittest.TestCase):
+    def test_send_and_receive_connection(self):
+        """A connected socket passed to another worker stays usable."""
+        with tempfile.TemporaryDirectory() as run_dir:
+            path = get_handoff_socket_path(run_dir, 1)
+            receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            receiver.bind(path)
+            sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            client, server = socket.socketpair()
+
+            send_connection(sender, path, server, ["127.0.0.1", 1234])
+            server.close()
+            conn, address = receive_connection(receiver)
+
+            self.assertEqual(address, ("127.0.0.1", 1234))
+            client.sendall(b"ping")
+            self.assertEqual(conn.recv(4), b"ping")
+
+            for sock in (receiver, sender, client, conn):
+                sock.close()
+
+    def test_send_to_missing_worker(self):
+        with tempfile.TemporaryDirectory() as run_dir:
+            sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            client, server = socket.socketpair()
+
+            with self.assertRaises(OSError):
+                send_connection(
+                    sender, get_handoff_socket_path(run_dir, 1), server, None
+                )
+
+            for sock in (sender, client, server):
+                sock.close()
+
+
+@requires_unix_sockets
+class ConnectionRouterTest(tornado.testing.AsyncTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.run_dir = tempfile.TemporaryDirectory()
+        self.listen_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listen_sock.bind(("127.0.0.1", 0))
+        self.listen_sock.setblocking(False)
+        self.listen_sock.listen()
+
+        self.http_server = MagicMock()
+        self.http_server.max_buffer_size = None
+        self.http_server.read_chunk_size = None
+        worker = WorkerInfo(0, 2, self.run_dir.name, [self.listen_sock])
+        self.router = ConnectionRouter(self.http_server, worker)
+        self.clients: list[socket.socket] = []
+
+    def tearDown(self) -> None:
+        for sock in self.clients:
+            sock.close()
+        self.listen_sock.close()
+        self.run_dir.cleanup()
+        super().tearDown()
+
+    def _connect(self, request_head: bytes) -> None:
+        client = socket.create_connection(self.listen_sock.getsockname())
+        client.sendall(request_head + b"\r\n\r\n")
+        self.clients.append(client)
+
+    async def _wait_for(self, condition) -> None:
+        for _ in range(200):
+            if condition():
+                return
+            await asyncio.sleep(0.01)
+        self.fail("Timed out")
+
+    @tornado.testing.gen_test
+    async def test_serves_connection_without_cookie(self):
+        self.router.start()
+        self._connect(b"GET / HTTP/1.1\r\nHost: localhost")
+
+        await self._wait_for(lambda: self.http_server.handle_stream.called)
+
+    @tornado.testing.gen_test
+    async def test_serves_own_connection(self):
+        self.router.start()
+        self._connect(b"GET / HTTP/1.1\r\nCookie: _streamlit_worker=0")
+
+        await self._wait_for(lambda: self.http_server.handle_stream.called)
+
+    @tornado.testing.gen_test
+    async def test_hands_off_connection_to_owner(self):
+        owner_sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        owner_sock.bind(get_handoff_socket_path(self.run_dir.name, 1))
+        owner_sock.setblocking(False)
+        self.clients.append(owner_sock)
+
+        self.router.start()
+        self._connect(b"GET / HTTP/1.1\r\nCookie: _streamlit_worker=1")
+
+        received: list[socket.socket] = []
+
+        def receive() -> bool:
+            try:
+                received.append(receive_connection(owner_sock)[0])
+            except BlockingIOError:
+                pass
+            return bool(received)
+
+        await self._wait_for(receive)
+        self.clients.extend(received)
+        self.http_server.handle_stream.assert_not_called()
+
+        # The owner reads the request that was only peeked at.
+        received[0].setblocking(True)
+        self.assertTrue(received[0].recv(1024).startswith(b"GET / HTTP/1.1"))
+
+    @tornado.testing.gen_test
+    async def test_serves_connection_of_missing_owner(self):
+        """If the owning worker isn't running, the connection is served here."""
+        self.router.start()
+        self._connect(b"GET / HTTP/1.1\r\nCookie: _streamlit_worker=1")
+
+        await self._wait_for(lambda: self.http_server.handle_stream.called)
+
+    @tornado.testing.gen_test
+    async def test_serves_handed_off_connection(self):
+        self.router.start()
+        sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        client, server = socket.socketpair()
+        self.clients.extend([sender, client, server])
+
+        send_connection(
+            sender,
+            get_handoff_socket_path(self.run_dir.name, 0),
+            server,
+            ["127.0.0.1", 1234],
+        )
+
+        await self._wait_for(lambda: self.http_server.handle_stream.called)
+        _, address = self.http_server.handle_stream.call_args[0]
+        self.assertEqual(address, ("127.0.0.1", 1234))
+
+
+class IsPrimaryProcessTest(unittest.TestCase):
+    def tearDown(self) -> None:
+        prefork._worker = None
+        super().tearDown()
+
+    def test_without_workers(self):
+        self.assertTrue(prefork.is_primary_process())
+
+    def test_first_worker(self):
+        prefork._worker = WorkerInfo(0, 2, "", [])
+        self.assertTrue(prefork.is_primary_process())
+
+    def test_other_worker(self):
+        prefork._worker = WorkerInfo(1, 2, "", [])
+        self.assertFalse(prefork.is_primary_process())
@@ -20,7 +20,13 @@ from google.protobuf.json_format import MessageToDict
 from tornado.httputil import HTTPHeaders
 
 from streamlit.proto.openmetrics_data_model_pb2 import MetricSet as MetricSetProto
-from streamlit.runtime.stats import CacheStat
+from streamlit.runtime.stats import (
+    CacheStat,
+    CounterStat,
+    GaugeStat,
+    HistogramStat,
+    MetricFamily,
+)
 from streamlit.web.server.server import METRIC_ENDPOINT
 from streamlit.web.server.stats_request_handler import StatsRequestHandler
 
@@ -95,6 +101,181 @@ class StatsHandlerTest(tornado.testing.AsyncHTTPTestCase):
 
         self.assertEqual(expected_body, response.body)
 
+    def test_has_gauge_stats(self):
+        """Non-cache gauges are reported under their own metric family,
+        after the cache memory one."""
+        family = MetricFamily(
+            name="session_pending_bytes",
+            type="gauge",
+            unit="bytes",
+            help="Size of pending messages.",
+        )
+        self.mock_stats = [
+            GaugeStat(family, (("session_id", "abc"),), 1024),
+            CacheStat(
+                category_name="st.memo",
+                cache_name="bar",
+                byte_length=256,
+            ),
+        ]
+
+        response = self.fetch("/_stcore/metrics")
+        self.assertEqual(200, response.code)
+
+        expected_body = (
+            "# TYPE cache_memory_bytes gauge\n"
+            "# UNIT cache_memory_bytes bytes\n"
+            "# HELP Total memory consumed by a cache.\n"
+            'cache_memory_bytes{cache_type="st.memo",cache="bar"} 256\n'
+            "# TYPE session_pending_bytes gauge\n"
+            "# UNIT session_pending_bytes bytes\n"
+            "# HELP session_pending_bytes Size of pending messages.\n"
+            'session_pending_bytes{session_id="abc"} 1024\n'
+            "# EOF\n"
+        ).encode("utf-8")
+
+        self.assertEqual(expected_body, response.body)
+
+        headers = HTTPHeaders()
+        headers.add("Accept", "application/x-protobuf")
+        response = self.fetch("/_stcore/metrics", headers=headers)
+
+        metric_set = MetricSetProto()
+        metric_set.ParseFromString(response.body)
+        self.assertEqual(
+            ["cache_memory_bytes", "session_pending_bytes"],
+            [family.name for family in metric_set.metric_families],
+        )
+        self.assertEqual(
+            1024,
+            metric_set.metric_families[1]
+            .metrics[0]
+            .metric_points[0]
+            .gauge_value.int_value,
+        )
+
+    def test_has_counter_stats(self):
+        """Counters are reported with the "_total" suffix."""
+        family = MetricFamily(
+            name="cache_evictions",
+            type="counter",
+            unit="",
+            help="Number of evicted entries.",
+        )
+        self.mock_stats = [CounterStat(family, (("cache", "foo"),), 3)]
+
+        response = self.fetch("/_stcore/metrics")
+        self.assertEqual(200, response.code)
+
+        expected_body = (
+            "# TYPE cache_memory_bytes gauge\n"
+            "# UNIT cache_memory_bytes bytes\n"
+            "# HELP Total memory consumed by a cache.\n"
+            "# TYPE cache_evictions counter\n"
+            "# HELP cache_evictions Number of evicted entries.\n"
+            'cache_evictions_total{cache="foo"} 3\n'
+            "# EOF\n"
+        ).encode("utf-8")
+
+        self.assertEqual(expected_body, response.body)
+
+        headers = HTTPHeaders()
+        headers.add("Accept", "application/x-protobuf")
+        response = self.fetch("/_stcore/metrics", headers=headers)
+
+        metric_set = MetricSetProto()
+        metric_set.ParseFromString(response.body)
+        self.assertEqual(
+            {
+                "name": "cache_evictions",
+                "type": "COUNTER",
+                "help": "Number of evicted entries.",
+                "metrics": [
+                    {
+                        "labels": [{"name": "cache", "value": "foo"}],
+                        "metricPoints": [{"counterValue": {"intValue": "3"}}],
+                    }
+                ],
+            },
+            MessageToDict(metric_set)["metricFamilies"][1],
+        )
+
+    def test_has_histogram_stats(self):
+        """Histograms are reported with their buckets, count and sum."""
+        family = MetricFamily(
+            name="cache_phase_duration_seconds",
+            type="histogram",
+            unit="seconds",
+            help="Time spent in each phase.",
+        )
+        self.mock_stats = [
+            HistogramStat(
+                family,
+                (("cache", "foo"), ("phase", "hash_args")),
+                bucket_bounds=(0.1, 1.0),
+                bucket_counts=(1, 2),
+                sum=1.5,
+                observation_count=3,
+            )
+        ]
+
+        response = self.fetch("/_stcore/metrics")
+        self.assertEqual(200, response.code)
+
+        expected_body = (
+            "# TYPE cache_memory_bytes gauge\n"
+            "# UNIT cache_memory_bytes bytes\n"
+            "# HELP Total memory consumed by a cache.\n"
+            "# TYPE cache_phase_duration_seconds histogram\n"
+            "# UNIT cache_phase_duration_seconds seconds\n"
+            "# HELP cache_phase_duration_seconds Time spent in each phase.\n"
+            'cache_phase_duration_seconds_bucket{cache="foo",phase="hash_args",le="0.1"} 1\n'
+            'cache_phase_duration_seconds_bucket{cache="foo",phase="hash_args",le="1.0"} 2\n'
+            'cache_phase_duration_seconds_bucket{cache="foo",phase="hash_args",le="+Inf"} 3\n'
+            'cache_phase_duration_seconds_count{cache="foo",phase="hash_args"} 3\n'
+            'cache_phase_duration_seconds_sum{cache="foo",phase="hash_args"} 1.5\n'
+            "# EOF\n"
+        ).encode("utf-8")
+
+        self.assertEqual(expected_body, response.body)
+
+        headers = HTTPHeaders()
+        headers.add("Accept", "application/x-protobuf")
+        response = self.fetch("/_stcore/metrics", headers=headers)
+
+        metric_set = MetricSetProto()
+        metric_set.ParseFromString(response.body)
+        self.assertEqual(
+            {
+                "name": "cache_phase_duration_seconds",
+                "type": "HISTOGRAM",
+                "unit": "seconds",
+                "help": "Time spent in each phase.",
+                "metrics": [
+                    {
+                        "labels": [
+                            {"name": "cache", "value": "foo"},
+                            {"name": "phase", "value": "hash_args"},
+                        ],
+                        "metricPoints": [
+                            {
+                                "histogramValue": {
+                                    "doubleValue": 1.5,
+                                    "count": "3",
+                                    "buckets": [
+                                        {"count": "1", "upperBound": 0.1},
+                                        {"count": "2", "upperBound": 1.0},
+                                        {"count": "3", "upperBound": "Infinity"},
+                                    ],
+                                }
+                            }
+                        ],
+                    }
+                ],
+            },
+            MessageToDict(metric_set)["metricFamilies"][1],
+        )
+
     def test_new_metrics_endpoint_should_not_display_deprecation_warning(self):
         response = self.fetch("/_stcore/metrics")
         self.assertNotIn("link", response.headers)
@@ -14,7 +14,10 @@
 
 """UploadFileHandler.py unit tests"""
 
+import mmap
+import unittest
 from typing import NamedTuple
+from unittest.mock import patch
 
 import requests
 import tornado.testing
@@ -25,7 +28,10 @@ from streamlit.logger import get_logger
 from streamlit.runtime.memory_uploaded_file_manager import MemoryUploadedFileManager
 from streamlit.runtime.uploaded_file_manager import UploadedFileManager
 from streamlit.web.server.server import UPLOAD_FILE_ENDPOINT
-from streamlit.web.server.upload_file_request_handler import UploadFileRequestHandler
+from streamlit.web.server.upload_file_request_handler import (
+    UploadFileRequestHandler,
+    _MultipartParser,
+)
 
 LOGGER = get_logger(__name__)
 
@@ -129,6 +135,34 @@ class UploadFileRequestHandlerTest(tornado.testing.AsyncHTTPTestCase):
         self.assertEqual(404, response.code)
         self.assertIn("Not Found", response.reason)
 
+    @patch(
+        "streamlit.web.server.upload_file_request_handler._SPILL_THRESHOLD_BYTES",
+        100,
+    )
+    def test_upload_large_file(self):
+        """Files over the spill threshold should be memory-mapped from disk."""
+        file = MockFile("filename", b"0123456789" * 100)
+        response = self._upload_files(
+            {file.name: file.data}, session_id="test_session_id", file_id=file.name
+        )
+
+        self.assertEqual(204, response.code, response.reason)
+
+        [rec] = self.file_mgr.get_files("test_session_id", [file.name])
+        self.assertIsInstance(rec.data, mmap.mmap)
+        self.assertEqual(file.data, rec.data[:])
+
+    def test_upload_malformed_body_error(self):
+        """A body that isn't multipart/form-data should fail with 400 status."""
+        response = self.fetch(
+            f"{UPLOAD_FILE_ENDPOINT}/session_id/file_id",
+            method="PUT",
+            headers={"Content-Type": "multipart/form-data; boundary=foo"},
+            body=b"--foo\r\nContent-Disposition: form-data",
+        )
+        self.assertEqual(400, response.code)
+        self.assertIn("Incomplete multipart body", response.reason)
+
     def test_upload_missing_file_error(self):
         """Missing file should fail with 400 status."""
         file_body = {
@@ -186,3 +220,42 @@ class UploadFileRequestHandlerInvalidSessionTest(tornado.testing.AsyncHTTPTestCa
         self.assertEqual(400, response.code)
         self.assertIn("Invalid session_id", response.reason)
         self.assertEqual(self.file_mgr.get_files("sessionId", ["fileId"]), [])
+
+
+class MultipartParserTest(unittest.TestCase):
+    def test_parses_chunked_body(self):
+        """The body should be parsed the same way however it is split."""
+        req = requests.Request(
+            method="PUT",
+            url="http://localhost/upload",
+            files={
+                "field": (None, b"value"),
+                "file1": ("file1.txt", b"foo\r\n--bar" * 50, "text/plain"),
+                "file2": ("file2", b""),
+            },
+        ).prepare()
+        boundary = req.headers["Content-Type"].split("boundary=")[1].encode()
+
+        for chunk_size in [1, 7, 64, len(req.body)]:
+            parser = _MultipartParser(boundary, spill_threshold=100)
+            for i in range(0, len(req.body), chunk_size):
+                parser.feed(req.body[i : i + chunk_size])
+            parser.close()
+
+            for file in parser.files:
+                file.file.seek(0)
+            self.assertEqual(
+                [
+                    ("file1.txt", "text/plain", b"foo\r\n--bar" * 50),
+                    ("file2", "application/unknown", b""),
+                ],
+                [
+                    (file.name, file.content_type, file.file.read())
+                    for file in parser.files
+                ],
+            )
+
+    def test_invalid_boundary(self):
+        parser = _MultipartParser(b"foo", spill_threshold=100)
+        with self.assertRaises(ValueError):
+            parser.feed(b"--fooXY")
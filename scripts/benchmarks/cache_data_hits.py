@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compares st.cache_data hit latency and peak RSS for `copy="deep"` (plain
+pickle) and `copy="zero"` (pickle protocol 5 with out-of-band buffers).
+
+A cached DataFrame of the given size is read back once per simulated session,
+and every session holds on to its result, like a script rerun would. Each mode
+runs in a fresh process so that peak RSS numbers don't affect each other.
+
+Usage:
+    python scripts/benchmarks/cache_data_hits.py --size-mb 500 --sessions 10
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import pickle
+import resource
+import time
+
+import click
+import numpy as np
+import pandas as pd
+
+from streamlit.runtime.caching import zero_copy_pickle
+
+
+def _run_mode(mode: str, size_mb: int, sessions: int) -> tuple[float, float, float]:
+    num_rows = size_mb * 1_000_000 // (8 * 4)
+    df = pd.DataFrame(
+        {f"col{i}": np.random.default_rng(i).random(num_rows) for i in range(4)}
+    )
+
+    if mode == "zero":
+        data = zero_copy_pickle.dumps(df)
+        loads = zero_copy_pickle.loads
+    else:
+        data = pickle.dumps(df)
+        loads = pickle.loads
+    del df
+
+    rss_before_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    results = []
+    start = time.perf_counter()
+    for _ in range(sessions):
+        results.append(loads(data))
+    elapsed = time.perf_counter() - start
+
+    rss_after_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return elapsed / sessions * 1000, rss_before_mb, rss_after_mb
+
+
+@click.command()
+@click.option(
+    "--size-mb",
+    type=int,
+    default=500,
+    show_default=True,
+    help="Size of the cached DataFrame, in MB.",
+)
+@click.option(
+    "--sessions",
+    type=int,
+    default=10,
+    show_default=True,
+    help="Number of cache hits, each held on to like a session would.",
+)
+def main(size_mb: int, sessions: int) -> None:
+    click.echo(
+        f"{'mode':>6} {'ms/hit':>9} {'peak RSS before':>16} {'peak RSS after':>15}"
+    )
+    ctx = multiprocessing.get_context("spawn")
+    for mode in ("deep", "zero"):
+        with ctx.Pool(1) as pool:
+            ms_per_hit, rss_before_mb, rss_after_mb = pool.apply(
+                _run_mode, (mode, size_mb, sessions)
+            )
+        click.echo(
+            f"{mode:>6} {ms_per_hit:>9.2f} {rss_before_mb:>13.0f} MB"
+            f" {rss_after_mb:>12.0f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measures how many ForwardMsgs per second the Runtime can deliver to its
+clients, with and without `server.batchForwardMessages`.
+
+Each simulated session enqueues a full script run worth of small deltas, and
+a single pass of the Runtime's ForwardMsgScheduler delivers them to a client
+that serializes every frame, like BrowserWebSocketHandler does.
+
+Usage:
+    python scripts/benchmarks/forward_msg_delivery.py --sessions 100 500 1000
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Iterator
+from unittest.mock import MagicMock
+
+import click
+
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.runtime import Runtime, RuntimeConfig
+from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.runtime.memory_uploaded_file_manager import MemoryUploadedFileManager
+from streamlit.runtime.runtime_util import serialize_forward_msg
+from streamlit.runtime.session_manager import ActiveSessionInfo
+from streamlit.testing.v1.util import patch_config_options
+
+
+class _FakeSession:
+    """The parts of AppSession that the ForwardMsgScheduler relies on."""
+
+    def __init__(self, session_id: str):
+        self.id = session_id
+        self._queue = ForwardMsgQueue()
+
+    def enqueue(self, msg: ForwardMsg) -> None:
+        self._queue.enqueue(msg)
+
+    def flush_browser_queue(self) -> list[ForwardMsg]:
+        return self._queue.flush()
+
+
+class _CountingClient:
+    """A SessionClient that serializes and counts the frames it's asked to write."""
+
+    def __init__(self):
+        self.frames = 0
+        self.bytes = 0
+
+    def write_forward_msg(self, msg: ForwardMsg) -> None:
+        self.frames += 1
+        self.bytes += len(serialize_forward_msg(msg))
+
+
+def _create_script_run_msgs(num_msgs: int) -> Iterator[ForwardMsg]:
+    for i in range(num_msgs):
+        msg = ForwardMsg()
+        msg.metadata.delta_path[:] = [0, i]
+        msg.delta.new_element.markdown.body = f"Row {i}: " + "lorem ipsum " * 8
+        yield msg
+
+
+async def _run_once(num_sessions: int, msgs_per_session: int) -> tuple[int, int, float]:
+    runtime = Runtime(
+        RuntimeConfig(
+            script_path="benchmark.py",
+            command_line=None,
+            media_file_storage=MemoryMediaFileStorage("/media"),
+            uploaded_file_manager=MemoryUploadedFileManager("/upload"),
+            session_manager_class=MagicMock,
+            session_storage=MagicMock(),
+            cache_storage_manager=MagicMock(),
+        )
+    )
+
+    session_infos = []
+    clients = []
+    for i in range(num_sessions):
+        session = _FakeSession(f"session-{i}")
+        for msg in _create_script_run_msgs(msgs_per_session):
+            session.enqueue(msg)
+        client = _CountingClient()
+        clients.append(client)
+        session_infos.append(ActiveSessionInfo(client, session))  # type: ignore[arg-type]
+
+    try:
+        start = time.perf_counter()
+        await runtime._send_scheduler.send_pass(session_infos)
+        elapsed = time.perf_counter() - start
+    finally:
+        Runtime._instance = None
+
+    return (
+        sum(c.frames for c in clients),
+        sum(c.bytes for c in clients),
+        elapsed,
+    )
+
+
+@click.command()
+@click.option(
+    "--sessions",
+    "-s",
+    multiple=True,
+    type=int,
+    default=(100, 500, 1000),
+    show_default=True,
+    help="Numbers of concurrent sessions to benchmark.",
+)
+@click.option(
+    "--msgs-per-session",
+    type=int,
+    default=200,
+    show_default=True,
+    help="Number of deltas each session enqueues before a flush.",
+)
+def main(sessions: tuple[int, ...], msgs_per_session: int) -> None:
+    click.echo(
+        f"{'sessions':>8} {'mode':>8} {'frames':>9} {'MB':>8} {'secs':>7} {'msgs/sec':>11}"
+    )
+    for num_sessions in sessions:
+        for batched in (False, True):
+            with patch_config_options({"server.batchForwardMessages": batched}):
+                frames, num_bytes, elapsed = asyncio.run(
+                    _run_once(num_sessions, msgs_per_session)
+                )
+            msgs_per_sec = num_sessions * msgs_per_session / elapsed
+            click.echo(
+                f"{num_sessions:>8} {'batched' if batched else 'single':>8} "
+                f"{frames:>9} {num_bytes / 1e6:>8.1f} {elapsed:>7.2f} {msgs_per_sec:>11,.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
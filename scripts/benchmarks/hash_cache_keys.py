@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measures how long it takes to compute the cache key of a large argument
+passed to a cached function, for the first call and for repeated calls with
+the same object (like on every rerun).
+
+Read-only arrays and DataFrames (e.g. values returned by
+`st.cache_data(copy="zero")`) and PyArrow tables have their hashes memoized,
+so repeated calls should be much faster than the first one for them.
+
+Usage:
+    python scripts/benchmarks/hash_cache_keys.py --rows 1000000
+"""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from typing import Any, Callable
+
+import click
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from streamlit.runtime.caching import zero_copy_pickle
+from streamlit.runtime.caching.cache_type import CacheType
+from streamlit.runtime.caching.hashing import update_hash
+
+
+def _hash(obj: Any) -> bytes:
+    hasher = hashlib.new("md5")
+    update_hash(obj, hasher, CacheType.DATA)
+    return hasher.digest()
+
+
+def _time_ms(func: Callable[[], Any], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def _read_only(arr: np.ndarray) -> np.ndarray:
+    arr = arr.copy()
+    arr.flags.writeable = False
+    return arr
+
+
+@click.command()
+@click.option(
+    "--rows",
+    type=int,
+    default=1_000_000,
+    show_default=True,
+    help="Number of rows of the hashed frames and arrays.",
+)
+@click.option(
+    "--repeat",
+    type=int,
+    default=20,
+    show_default=True,
+    help="Number of repeated calls to average over.",
+)
+def main(rows: int, repeat: int) -> None:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({f"col{i}": rng.random(rows) for i in range(4)})
+    arr = rng.random((rows, 4))
+
+    # Build every object before hashing any of them, so that each object's
+    # first call is a memo miss.
+    objects = {
+        "DataFrame": df,
+        "DataFrame (zero-copy)": zero_copy_pickle.loads(zero_copy_pickle.dumps(df)),
+        "ndarray": arr,
+        "ndarray (read-only)": _read_only(arr),
+        "ndarray (small, 100k)": rng.random(100_000),
+        "pyarrow.Table": pa.Table.from_pandas(df),
+    }
+
+    click.echo(f"{'argument':<24} {'first call ms':>14} {'repeat call ms':>15}")
+    for name, obj in objects.items():
+        first_ms = _time_ms(lambda: _hash(obj), 1)  # noqa: B023
+        repeat_ms = _time_ms(lambda: _hash(obj), repeat)  # noqa: B023
+        click.echo(f"{name:<24} {first_ms:>14.2f} {repeat_ms:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
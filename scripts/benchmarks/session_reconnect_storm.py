@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+
+# Copyright (c) Streamlit Inc. (2018-2022) Snowflake Inc. (2022-2024)
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measures how DiskSessionStorage copes with a reconnect storm: many sessions
+disconnect at once (e.g. a mobile network drops), stay away for longer than
+the in-memory TTL, and then all reconnect at once.
+
+The storage is used from an event loop, like the Runtime's. Reports how long
+the event loop is blocked while the sessions are spilled to disk and restored,
+how long it takes to spill and restore each session, and how many sessions
+could be restored. MemorySessionStorage would have lost all of them.
+
+Usage:
+    python scripts/benchmarks/session_reconnect_storm.py --sessions 1000 --state-kb 64
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import pickle
+import tempfile
+import time
+from typing import Any
+
+import click
+import numpy as np
+
+from streamlit.runtime.disk_session_storage import DiskSessionStorage
+from streamlit.runtime.session_manager import SessionInfo, SessionSnapshot
+
+
+class _FakeSession:
+    """Stands in for an AppSession with some values in its session state."""
+
+    def __init__(self, session_id: str, state_kb: int):
+        self.id = session_id
+        self._user_values = {
+            "counter": 1,
+            "data": np.random.default_rng().random(state_kb * 1024 // 8),
+        }
+
+    def get_snapshot(self, script_run_count: int) -> SessionSnapshot:
+        return SessionSnapshot(
+            session_id=self.id,
+            script_run_count=script_run_count,
+            client_state=b"",
+            user_state={k: pickle.dumps(v) for k, v in self._user_values.items()},
+        )
+
+    def shutdown(self) -> None:
+        pass
+
+
+@click.command()
+@click.option(
+    "--sessions",
+    type=int,
+    default=1000,
+    show_default=True,
+    help="Number of sessions that disconnect and reconnect.",
+)
+@click.option(
+    "--state-kb",
+    type=int,
+    default=64,
+    show_default=True,
+    help="Size of each session's state, in KB.",
+)
+@click.option(
+    "--max-size-mb",
+    type=int,
+    default=100,
+    show_default=True,
+    help="server.sessionStorageMaxSize, in MB.",
+)
+def main(sessions: int, state_kb: int, max_size_mb: int) -> None:
+    asyncio.run(_run(sessions, state_kb, max_size_mb))
+
+
+async def _wait_for_background_work(storage: DiskSessionStorage) -> None:
+    # The storage's thread runs its work in order, so this is done last.
+    await asyncio.get_running_loop().run_in_executor(
+        storage._get_executor(), lambda: None
+    )
+
+
+async def _run(sessions: int, state_kb: int, max_size_mb: int) -> None:
+    now = 0.0
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "sessions.db")
+        storage = DiskSessionStorage(
+            db_path,
+            script_path="/app.py",
+            max_bytes=max_size_mb * 1024 * 1024,
+            # Spill all sessions at once, below.
+            maxsize=sessions,
+            clock=lambda: now,
+        )
+
+        session_ids = [f"session_{i}" for i in range(sessions)]
+        for session_id in session_ids:
+            session: Any = _FakeSession(session_id, state_kb)
+            storage.save(SessionInfo(client=None, session=session))
+
+        # Everyone stays away for longer than the in-memory TTL.
+        now = 24 * 60 * 60
+        start = time.perf_counter()
+        storage.list()
+        spill_blocked_seconds = time.perf_counter() - start
+        await _wait_for_background_work(storage)
+        spill_seconds = time.perf_counter() - start
+
+        # Everyone comes back at once, the way the SessionManager restores them.
+        async def restore(session_id: str) -> bool:
+            await storage.load_snapshot(session_id)
+            snapshot = storage.pop_snapshot(session_id)
+            if snapshot is None:
+                return False
+            for value in snapshot.user_state.values():
+                pickle.loads(value)
+            return True
+
+        start = time.perf_counter()
+        restored = sum(
+            await asyncio.gather(*(restore(session_id) for session_id in session_ids))
+        )
+        restore_seconds = time.perf_counter() - start
+        await _wait_for_background_work(storage)
+
+        db_size_mb = sum(
+            os.path.getsize(os.path.join(tmp_dir, name)) for name in os.listdir(tmp_dir)
+        ) / (1024 * 1024)
+
+    click.echo(f"sessions spilled:        {sessions}")
+    click.echo(f"ms loop blocked (spill): {spill_blocked_seconds * 1000:.2f}")
+    click.echo(f"ms per spill:            {spill_seconds / sessions * 1000:.2f}")
+    click.echo(f"sessions restored:       {restored} ({restored / sessions:.0%})")
+    click.echo(f"ms per restore:          {restore_seconds / sessions * 1000:.2f}")
+    click.echo(f"database size:           {db_size_mb:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()